@@ -0,0 +1,7 @@
+"""Micro-benchmarks for SDK hot paths.
+
+Run the whole suite with `python -m benchmarks`, which saves its results as JSON (see `benchmarks.harness`) so runs
+can be compared with `--compare`. Each module is also runnable on its own, e.g. `python -m benchmarks.bench_client`,
+and prints its measurements. Client round trips go to a local stub of the AI Horde API (`benchmarks.stub_server`)
+which replays the fixtures under `tests/test_data`.
+"""
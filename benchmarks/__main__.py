@@ -0,0 +1,127 @@
+"""Run the benchmark suite and save the results as JSON.
+
+Usage:
+    python -m benchmarks --output results.json
+    python -m benchmarks --output results.json --compare baseline.json --fail-on-regression
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections.abc import Callable
+from pathlib import Path
+
+from loguru import logger
+
+from benchmarks.bench_chain_flow import run_chain_flow_suite
+from benchmarks.bench_client import run_client_benchmarks
+from benchmarks.bench_follow_ups import run_follow_up_benchmarks
+from benchmarks.bench_generation_history import run_generation_history_benchmarks
+from benchmarks.bench_parameters import run_parameter_benchmarks
+from benchmarks.bench_worker_scheduling import run_model_affinity_benchmarks
+from benchmarks.harness import (
+    DEFAULT_REGRESSION_THRESHOLD,
+    BenchmarkResult,
+    BenchmarkRun,
+    SkippedBenchmark,
+    compare_runs,
+    format_result,
+)
+
+
+def _client(scale: float) -> tuple[list[BenchmarkResult], list[SkippedBenchmark]]:
+    return run_client_benchmarks(
+        iterations=max(1, int(2_000 * scale)),
+        round_trip_iterations=max(1, int(200 * scale)),
+    ), []
+
+
+def _parameters(scale: float) -> tuple[list[BenchmarkResult], list[SkippedBenchmark]]:
+    return run_parameter_benchmarks(iterations=max(1, int(2_000 * scale)))
+
+
+def _follow_ups(scale: float) -> tuple[list[BenchmarkResult], list[SkippedBenchmark]]:
+    return run_follow_up_benchmarks(iterations=max(1, int(20_000 * scale))), []
+
+
+def _chain_flow(scale: float) -> tuple[list[BenchmarkResult], list[SkippedBenchmark]]:
+    return run_chain_flow_suite(max(4, int(20_000 * scale))), []
+
+
+def _generation_history(scale: float) -> tuple[list[BenchmarkResult], list[SkippedBenchmark]]:
+    return run_generation_history_benchmarks(
+        retained=max(100, int(50_000 * scale)),
+        iterations=max(1, int(20_000 * scale)),
+    ), []
+
+
+def _worker_scheduling(scale: float) -> tuple[list[BenchmarkResult], list[SkippedBenchmark]]:
+    return run_model_affinity_benchmarks(pop_count=max(50, int(500 * scale))), []
+
+
+SUITES: dict[str, Callable[[float], tuple[list[BenchmarkResult], list[SkippedBenchmark]]]] = {
+    "client": _client,
+    "parameters": _parameters,
+    "follow_ups": _follow_ups,
+    "chain_flow": _chain_flow,
+    "generation_history": _generation_history,
+    "worker_scheduling": _worker_scheduling,
+}
+"""The benchmark groups the runner knows about, by the name accepted by `--only`."""
+
+
+def main() -> int:
+    """Run the selected suites, save the results, and optionally compare them to an earlier run."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"), help="Where to write results.")
+    parser.add_argument("--only", choices=sorted(SUITES), action="append", help="Run only these suites.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for the iterations of every case.")
+    parser.add_argument("--compare", type=Path, help="An earlier results file to compare against.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help="The relative median slowdown reported as a regression when comparing.",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 if any case regressed beyond the threshold.",
+    )
+    args = parser.parse_args()
+
+    # Validator debug logging would otherwise dominate the output (and the figures).
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    run = BenchmarkRun.new()
+    for suite_name in args.only or SUITES:
+        results, skipped = SUITES[suite_name](args.scale)
+        run.results.extend(results)
+        run.skipped.extend(skipped)
+        for result in results:
+            print(format_result(result))
+        for skip in skipped:
+            print(f"{skip.group}/{skip.name}: skipped ({skip.reason})")
+
+    run.save(args.output)
+    print(f"Saved {len(run.results)} results to {args.output}")
+
+    if args.compare is None:
+        return 0
+
+    regressions = 0
+    print(f"\nCompared to {args.compare} (median, current / baseline):")
+    for comparison in compare_runs(BenchmarkRun.load(args.compare), run):
+        flag = ""
+        if comparison.ratio > 1 + args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{comparison.key:<72} {comparison.ratio:>6.2f}x{flag}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
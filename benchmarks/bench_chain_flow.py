@@ -0,0 +1,120 @@
+"""Benchmark chain flow construction and progress-driven execution.
+
+Drives the full image-generation progress walk through `ChainExecutionContext.advance_for_progress` for a large
+number of jobs, the way a worker's orchestration loop would, and reports per-job and per-event costs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+
+from benchmarks.harness import BenchmarkResult, measure
+from horde_sdk.worker.chaining import ChainExecutionContext, image_generation_flow
+from horde_sdk.worker.consts import GENERATION_PROGRESS
+
+_PROGRESS_WALK = (
+    GENERATION_PROGRESS.PRELOADING,
+    GENERATION_PROGRESS.PRELOADING_COMPLETE,
+    GENERATION_PROGRESS.GENERATING,
+    GENERATION_PROGRESS.GENERATION_COMPLETE,
+    GENERATION_PROGRESS.POST_PROCESSING,
+    GENERATION_PROGRESS.POST_PROCESSING_COMPLETE,
+    GENERATION_PROGRESS.SAFETY_CHECKING,
+    GENERATION_PROGRESS.SAFETY_CHECK_COMPLETE,
+    GENERATION_PROGRESS.SUBMITTING,
+    GENERATION_PROGRESS.SUBMIT_COMPLETE,
+    GENERATION_PROGRESS.COMPLETE,
+)
+
+
+def simulate_image_job(job_index: int) -> int:
+    """Drive one image job through its chain and return the number of progress events delivered.
+
+    Even-indexed jobs include post-processing, and every fourth job aborts mid-generation so that the failure path
+    (descendant skipping) is exercised as well.
+
+    Args:
+        job_index (int): The index of the job, which selects its shape.
+
+    Returns:
+        int: The number of progress events delivered.
+
+    Raises:
+        RuntimeError: If the chain did not finish.
+    """
+    flow = image_generation_flow(post_processing=job_index % 2 == 0, safety_check=True)
+    context = ChainExecutionContext(flow)
+
+    if job_index % 4 == 3:
+        context.advance_for_progress(GENERATION_PROGRESS.GENERATING)
+        context.advance_for_progress(GENERATION_PROGRESS.ABORTED)
+        events = 2
+    else:
+        for progress in _PROGRESS_WALK:
+            context.advance_for_progress(progress)
+        events = len(_PROGRESS_WALK)
+
+    if not context.is_finished:
+        raise RuntimeError(f"Job {job_index} did not finish its chain")
+    return events
+
+
+def run_chain_flow_benchmark(num_jobs: int) -> dict[str, float]:
+    """Drive `num_jobs` image jobs through their chain and return timing figures.
+
+    Args:
+        num_jobs (int): The number of jobs to simulate.
+
+    Returns:
+        dict[str, float]: Total seconds, jobs per second, and mean nanoseconds per progress event.
+    """
+    events = 0
+    start = time.perf_counter()
+
+    for job_index in range(num_jobs):
+        events += simulate_image_job(job_index)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "jobs": num_jobs,
+        "seconds": elapsed,
+        "jobs_per_second": num_jobs / elapsed,
+        "ns_per_event": elapsed / events * 1e9,
+    }
+
+
+def run_chain_flow_suite(iterations: int) -> list[BenchmarkResult]:
+    """Time chain execution per job, in the suite's result format.
+
+    Args:
+        iterations (int): Jobs per round; a multiple of four keeps every job shape equally represented.
+
+    Returns:
+        list[BenchmarkResult]: The per-job timing of the mixed job shapes.
+    """
+    job_indices = itertools.cycle(range(4))
+    return [
+        measure(
+            "worker.chain_flow",
+            "image_job_mixed",
+            lambda: simulate_image_job(next(job_indices)),
+            iterations=iterations,
+        ),
+    ]
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=100_000, help="The number of jobs to simulate.")
+    args = parser.parse_args()
+
+    results = run_chain_flow_benchmark(args.jobs)
+    for key, value in results.items():
+        print(f"{key}: {value:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Benchmark the API client's request preparation, response parsing and full round trips.
+
+Request and response bodies come from the swagger-derived fixtures under `tests/test_data`, so every request type
+the SDK defines (and that has fixtures) is covered. Round trips go to `StubHordeServer` on localhost, which isolates
+the client's own overhead from the network and the real API.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import functools
+import json
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from typing import Any
+
+import aiohttp
+from pydantic import ValidationError
+
+import horde_sdk.ai_horde_api.apimodels
+from benchmarks.harness import BenchmarkResult, format_result, measure, measure_async
+from benchmarks.stub_server import (
+    StubHordeServer,
+    default_success_status,
+    example_payload_path,
+    example_response_path,
+    load_fixture,
+    redirect_ai_horde_base_url,
+)
+from horde_sdk.ai_horde_api.ai_horde_clients import AIHordeAPIAsyncManualClient, AIHordeAPIManualClient
+from horde_sdk.ai_horde_api.apimodels import AllWorkersDetailsRequest, AllWorkersDetailsResponse
+from horde_sdk.ai_horde_api.columnar import columns_from_workers_json
+from horde_sdk.ai_horde_api.metadata import AIHordePathData, _default_path_values
+from horde_sdk.consts import HTTPMethod, HTTPStatusCode
+from horde_sdk.generic_api._reflection import get_all_request_types
+from horde_sdk.generic_api.apimodels import HordeRequest, HordeResponse
+from horde_sdk.generic_api.generic_clients import BaseHordeAPIClient
+
+ROUND_TRIP_REQUEST_TYPES: tuple[str, ...] = (
+    "ImageGenerateAsyncRequest",
+    "ImageGenerateCheckRequest",
+    "ImageGenerateStatusRequest",
+    "ImageGenerateJobPopRequest",
+    "ImageGenerationJobSubmitRequest",
+    "TextGenerateAsyncRequest",
+    "TextGenerateJobPopRequest",
+    "AlchemyPopRequest",
+    "HordeStatusModelsAllRequest",
+)
+"""The request types timed end to end; the ones a worker or a generating client sends most often."""
+
+
+@dataclass(frozen=True)
+class RequestCase:
+    """A request built from its example payload, paired with the example response for its default status code."""
+
+    request: HordeRequest
+    response_type: type[HordeResponse]
+    status_code: HTTPStatusCode
+    response_json: Any
+
+
+def _path_defaults_for(request_type: type[HordeRequest]) -> dict[str, str]:
+    defaults: dict[str, str] = {}
+    for field_name, field_info in request_type.model_fields.items():
+        if field_name in AIHordePathData.__members__:
+            path_field = AIHordePathData(field_info.alias or field_name)
+            if path_field in _default_path_values:
+                defaults[field_info.alias or field_name] = _default_path_values[path_field]
+    return defaults
+
+
+def load_request_cases() -> dict[str, RequestCase]:
+    """Build a `RequestCase` for every AI Horde request type with usable fixtures, keyed by request type name."""
+    cases: dict[str, RequestCase] = {}
+    _probe_client = AIHordeAPIManualClient()
+    for request_type in get_all_request_types(horde_sdk.ai_horde_api.apimodels.__name__):
+        payload: dict[str, Any] = {}
+        if request_type.get_http_method() not in (HTTPMethod.GET, HTTPMethod.DELETE):
+            payload_path = example_payload_path(request_type)
+            if not payload_path.exists():
+                continue
+            payload = load_fixture(payload_path)
+        payload.update(_path_defaults_for(request_type))
+
+        try:
+            request = request_type.model_validate(payload)
+            _probe_client._validate_and_prepare_request(request)
+        except (ValidationError, KeyError):
+            # Some fixtures do not validate, and paths with several placeholders cannot be filled from defaults.
+            continue
+
+        status_code = default_success_status(request_type)
+        response_path = example_response_path(request_type, status_code)
+        if not response_path.exists():
+            continue
+
+        cases[request_type.__name__] = RequestCase(
+            request=request,
+            response_type=request_type.get_default_success_response_type(),
+            status_code=status_code,
+            response_json=load_fixture(response_path),
+        )
+    return cases
+
+
+def run_prepare_benchmarks(cases: dict[str, RequestCase], iterations: int) -> list[BenchmarkResult]:
+    """Time `_validate_and_prepare_request` for each request case."""
+    client = AIHordeAPIManualClient()
+    return [
+        measure(
+            "client.prepare",
+            name,
+            functools.partial(client._validate_and_prepare_request, case.request),
+            iterations=iterations,
+        )
+        for name, case in sorted(cases.items())
+    ]
+
+
+def run_parse_benchmarks(cases: dict[str, RequestCase], iterations: int) -> list[BenchmarkResult]:
+    """Time `_after_request_handling` for each distinct response type in the request cases."""
+    client: BaseHordeAPIClient = AIHordeAPIManualClient()
+    by_response_type = {case.response_type.__name__: case for case in cases.values()}
+    results: list[BenchmarkResult] = []
+    for name, case in sorted(by_response_type.items()):
+
+        def _parse(case: RequestCase = case) -> object:
+            return client._after_request_handling(
+                raw_response_json=case.response_json,
+                returned_status_code=case.status_code.value,
+                expected_response_type=case.response_type,  # type: ignore[type-var]
+            )
+
+        results.append(measure("client.parse", name, _parse, iterations=iterations))
+    return results
+
+
+def run_sync_round_trip_benchmarks(
+    cases: dict[str, RequestCase],
+    server: StubHordeServer,
+    iterations: int,
+) -> list[BenchmarkResult]:
+    """Time synchronous `submit_request` calls against the stub server."""
+    client = AIHordeAPIManualClient()
+    results: list[BenchmarkResult] = []
+    with redirect_ai_horde_base_url(server.base_url):
+        for name in ROUND_TRIP_REQUEST_TYPES:
+            if name not in cases:
+                continue
+            case = cases[name]
+
+            def _submit(case: RequestCase = case) -> object:
+                return client.submit_request(case.request, case.response_type)  # type: ignore[type-var]
+
+            results.append(measure("client.submit_sync", name, _submit, iterations=iterations))
+    return results
+
+
+async def run_async_round_trip_benchmarks(
+    cases: dict[str, RequestCase],
+    server: StubHordeServer,
+    iterations: int,
+    *,
+    concurrency: int = 16,
+) -> list[BenchmarkResult]:
+    """Time asynchronous `submit_request` calls against the stub server, one at a time and with concurrency."""
+    results: list[BenchmarkResult] = []
+    with redirect_ai_horde_base_url(server.base_url):
+        async with aiohttp.ClientSession() as aiohttp_session:
+            client = AIHordeAPIAsyncManualClient(aiohttp_session)
+            for name in ROUND_TRIP_REQUEST_TYPES:
+                if name not in cases:
+                    continue
+                case = cases[name]
+
+                def _submit(case: RequestCase = case) -> Awaitable[object]:
+                    return client.submit_request(case.request, case.response_type)  # type: ignore[type-var]
+
+                results.append(await measure_async("client.submit_async", name, _submit, iterations=iterations))
+                results.append(
+                    await measure_async(
+                        "client.submit_async_concurrent",
+                        name,
+                        _submit,
+                        iterations=iterations,
+                        concurrency=concurrency,
+                    ),
+                )
+    return results
+
+
+def _synthetic_workers_json(workers: int) -> bytes:
+    """Build a `/workers` body of `workers` rows, varied from the swagger example so the categories are realistic."""
+    template = load_fixture(example_response_path(AllWorkersDetailsRequest, HTTPStatusCode.OK))[0]
+    rows = []
+    for index in range(workers):
+        row = copy.deepcopy(template)
+        row["name"] = f"worker-{index}"
+        row["type"] = ("image", "text", "interrogation")[index % 3]
+        row["megapixelsteps_generated"] = float(index)
+        row["uptime"] = index * 60
+        row["models"] = [f"model-{(index + offset) % 50}" for offset in range(index % 4)]
+        rows.append(row)
+    return json.dumps(rows).encode()
+
+
+def run_columnar_benchmarks(iterations: int, *, workers: int = 2_000) -> list[BenchmarkResult]:
+    """Time fleet-wide aggregates over a `/workers` body, via the models and via the columnar view."""
+    raw = _synthetic_workers_json(workers)
+
+    def _via_models() -> object:
+        totals: dict[str, float] = {}
+        uptimes = []
+        for worker in AllWorkersDetailsResponse.model_validate_json(raw).root:
+            totals[worker.type_] = totals.get(worker.type_, 0.0) + (worker.megapixelsteps_generated or 0)
+            uptimes.append(worker.uptime or 0)
+        uptimes.sort()
+        return totals, uptimes[len(uptimes) // 2]
+
+    def _via_columns() -> object:
+        table = columns_from_workers_json(raw)
+        return (
+            table.numeric("megapixelsteps_generated").sum_by(table.categorical("type")),
+            table.numeric("uptime").percentiles([50]),
+        )
+
+    results = [
+        measure("client.columnar", "workers.models", _via_models, iterations=iterations),
+        measure("client.columnar", "workers.columns", _via_columns, iterations=iterations),
+    ]
+    for result in results:
+        result.extra["rows"] = workers
+    return results
+
+
+def run_client_benchmarks(*, iterations: int = 2_000, round_trip_iterations: int = 200) -> list[BenchmarkResult]:
+    """Run every client benchmark.
+
+    Args:
+        iterations (int, optional): Calls per round for the in-process (prepare/parse) cases. Defaults to 2,000.
+        round_trip_iterations (int, optional): Calls per round for the cases which go through the stub server.
+            Defaults to 200.
+
+    Returns:
+        list[BenchmarkResult]: The results of every case.
+    """
+    cases = load_request_cases()
+    results = run_prepare_benchmarks(cases, iterations)
+    results.extend(run_parse_benchmarks(cases, iterations))
+    results.extend(run_columnar_benchmarks(max(1, iterations // 200)))
+    with StubHordeServer() as server:
+        results.extend(run_sync_round_trip_benchmarks(cases, server, round_trip_iterations))
+        results.extend(asyncio.run(run_async_round_trip_benchmarks(cases, server, round_trip_iterations)))
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2_000, help="Calls per round for in-process cases.")
+    parser.add_argument("--round-trips", type=int, default=200, help="Calls per round for stub server cases.")
+    args = parser.parse_args()
+
+    for result in run_client_benchmarks(iterations=args.iterations, round_trip_iterations=args.round_trips):
+        print(format_result(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark matching requests against a session's pending follow-ups when many jobs are outstanding.
+
+A long-running worker or a client with many generations in flight can hold thousands of responses awaiting a
+follow-up, and every request it sends is checked against them. These cases time that check with 10,000 pending.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import uuid
+
+from benchmarks.harness import BenchmarkResult, format_result, measure
+from horde_sdk.ai_horde_api.apimodels import (
+    DeleteImageGenerateRequest,
+    FindUserRequest,
+    ImageGenerateAsyncRequest,
+    ImageGenerateAsyncResponse,
+    ImageGenerateCheckRequest,
+    ImageGenerateCheckResponse,
+)
+from horde_sdk.generic_api.follow_ups import FollowUpRegistry
+
+_CHECK_IN_PROGRESS = ImageGenerateCheckResponse.model_validate(
+    {
+        "finished": 0,
+        "processing": 1,
+        "restarted": 0,
+        "waiting": 0,
+        "done": False,
+        "faulted": False,
+        "wait_time": 0,
+        "queue_position": 0,
+        "kudos": 10,
+        "is_possible": True,
+    },
+)
+
+
+def _job_ids(count: int) -> list[str]:
+    return [str(uuid.UUID(int=index + 1)) for index in range(count)]
+
+
+def _populated_registry(job_ids: list[str]) -> FollowUpRegistry:
+    request = ImageGenerateAsyncRequest(prompt="a cat in a hat", models=["Deliberate"])
+    registry = FollowUpRegistry()
+    for job_id in job_ids:
+        registry.add(request, ImageGenerateAsyncResponse.model_validate({"id": job_id, "kudos": 10.0}))
+    return registry
+
+
+def run_follow_up_benchmarks(*, pending: int = 10_000, iterations: int = 20_000) -> list[BenchmarkResult]:
+    """Time resolving requests against a registry of `pending` outstanding image generations.
+
+    Args:
+        pending (int, optional): The number of outstanding follow-ups. Defaults to 10,000.
+        iterations (int, optional): Requests resolved per round. Defaults to 20,000.
+
+    Returns:
+        list[BenchmarkResult]: The results of every case.
+    """
+    job_ids = _job_ids(pending)
+    registry = _populated_registry(job_ids)
+    extra = {"pending": pending}
+
+    unrelated = FindUserRequest()
+    newest_check = ImageGenerateCheckRequest(id=job_ids[-1])
+    # Completing the oldest job and re-adding it keeps the registry at the same size while exercising both ends.
+    async_request = ImageGenerateAsyncRequest(prompt="a cat in a hat", models=["Deliberate"])
+    churn = [
+        (
+            DeleteImageGenerateRequest(id=job_id),
+            ImageGenerateAsyncResponse.model_validate({"id": job_id, "kudos": 10.0}),
+        )
+        for job_id in job_ids
+    ]
+    churn_cycle = itertools.cycle(churn)
+
+    def _complete_and_replace() -> None:
+        cleanup, response = next(churn_cycle)
+        registry.resolve(cleanup, _CHECK_IN_PROGRESS)
+        registry.add(async_request, response)
+
+    results = [
+        measure(
+            "follow_ups.resolve",
+            "unrelated_request",
+            lambda: registry.resolve(unrelated, _CHECK_IN_PROGRESS),
+            iterations=iterations,
+        ),
+        measure(
+            "follow_ups.resolve",
+            "newest_job_in_progress",
+            lambda: registry.resolve(newest_check, _CHECK_IN_PROGRESS),
+            iterations=iterations,
+        ),
+        measure("follow_ups.resolve", "complete_oldest_and_replace", _complete_and_replace, iterations=iterations),
+    ]
+    for result in results:
+        result.extra.update(extra)
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pending", type=int, default=10_000, help="Outstanding follow-ups.")
+    parser.add_argument("--iterations", type=int, default=20_000, help="Requests resolved per round.")
+    args = parser.parse_args()
+
+    for result in run_follow_up_benchmarks(pending=args.pending, iterations=args.iterations):
+        print(format_result(result))
+
+
+if __name__ == "__main__":
+    main()
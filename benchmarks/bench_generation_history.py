@@ -0,0 +1,140 @@
+"""Benchmark the memory held by generation state histories.
+
+Compares the array-backed `ProgressTransitionLog`/`RetryEventLog` against the list-of-tuples representation they
+replaced, for a fleet of retained generations that each walked the full image pipeline, cleanly or with one
+retried error. Building each history is timed, with the bytes it retains per generation recorded in the result's
+`extra`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from benchmarks.harness import BenchmarkResult, format_result, measure
+from horde_sdk.worker.consts import GENERATION_PROGRESS, GENERATION_RETRY_KIND
+from horde_sdk.worker.progress_log import ProgressTransitionLog, RetryEventLog
+
+_CLEAN_WALK = (
+    GENERATION_PROGRESS.NOT_STARTED,
+    GENERATION_PROGRESS.PRELOADING,
+    GENERATION_PROGRESS.PRELOADING_COMPLETE,
+    GENERATION_PROGRESS.GENERATING,
+    GENERATION_PROGRESS.GENERATION_COMPLETE,
+    GENERATION_PROGRESS.POST_PROCESSING,
+    GENERATION_PROGRESS.POST_PROCESSING_COMPLETE,
+    GENERATION_PROGRESS.SAFETY_CHECKING,
+    GENERATION_PROGRESS.SAFETY_CHECK_COMPLETE,
+    GENERATION_PROGRESS.SUBMITTING,
+    GENERATION_PROGRESS.SUBMIT_COMPLETE,
+    GENERATION_PROGRESS.COMPLETE,
+)
+
+_RETRIED_WALK = (
+    *_CLEAN_WALK[:4],
+    GENERATION_PROGRESS.ERROR,
+    *_CLEAN_WALK[3:],
+)
+
+
+def _tuple_history(retried: bool) -> object:
+    """Build the histories the way `HordeSingleGeneration` stored them before the compact logs."""
+    progress_history: list[tuple[GENERATION_PROGRESS, float]] = []
+    for progress in _RETRIED_WALK if retried else _CLEAN_WALK:
+        progress_history.append((progress, time.monotonic()))
+    errored_states: list[tuple[GENERATION_PROGRESS, float]] = []
+    error_counts: dict[GENERATION_PROGRESS, int] = {}
+    retry_events: list[tuple[GENERATION_RETRY_KIND, GENERATION_PROGRESS, float]] = []
+    retry_counts: dict[GENERATION_RETRY_KIND, int] = {}
+    if retried:
+        errored_states.append((GENERATION_PROGRESS.GENERATING, time.monotonic()))
+        error_counts[GENERATION_PROGRESS.GENERATING] = 1
+        retry_events.append((GENERATION_RETRY_KIND.NORMAL, GENERATION_PROGRESS.GENERATING, time.monotonic()))
+        retry_counts[GENERATION_RETRY_KIND.NORMAL] = 1
+    return progress_history, errored_states, error_counts, retry_events, retry_counts
+
+
+def _compact_history(retried: bool) -> object:
+    """Build the same histories with the compact logs, allocating the error and retry logs only when used."""
+    progress_history = ProgressTransitionLog()
+    for progress in _RETRIED_WALK if retried else _CLEAN_WALK:
+        progress_history.append(progress, time.monotonic())
+    errored_states = None
+    retry_events = None
+    if retried:
+        errored_states = ProgressTransitionLog(capacity=4, track_durations=False)
+        errored_states.append(GENERATION_PROGRESS.GENERATING, time.monotonic())
+        retry_events = RetryEventLog()
+        retry_events.append(GENERATION_RETRY_KIND.NORMAL, GENERATION_PROGRESS.GENERATING, time.monotonic())
+    return progress_history, errored_states, retry_events
+
+
+def _bytes_per_history(factory: Callable[[bool], object], count: int, retried: bool) -> float:
+    """Return the bytes allocated per history built by `factory`, keeping the histories alive while measuring."""
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    retained = [factory(retried) for _ in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del retained
+    return (current - baseline) / count
+
+
+def _measure_stage_durations(label: str, retried: bool, iterations: int) -> BenchmarkResult:
+    """Time computing the stage durations of a compact progress log."""
+    progress_history = ProgressTransitionLog()
+    for progress in _RETRIED_WALK if retried else _CLEAN_WALK:
+        progress_history.append(progress, time.monotonic())
+    return measure(
+        "generation_history.stage_durations",
+        label,
+        lambda: progress_history.stage_durations(time.monotonic()),
+        iterations=iterations,
+    )
+
+
+def run_generation_history_benchmarks(*, retained: int = 50_000, iterations: int = 20_000) -> list[BenchmarkResult]:
+    """Time building generation histories under both representations, recording the memory each one retains.
+
+    Args:
+        retained (int, optional): The number of retained generations the memory is measured over. Defaults to
+            50,000.
+        iterations (int, optional): Histories built (or stage durations computed) per round. Defaults to 20,000.
+
+    Returns:
+        list[BenchmarkResult]: The results of every case. The build cases carry the bytes retained per generation
+            in `extra`.
+    """
+    results: list[BenchmarkResult] = []
+    for label, retried in (("clean", False), ("retried", True)):
+        for representation, factory in (("tuple", _tuple_history), ("compact", _compact_history)):
+            result = measure(
+                "generation_history.build",
+                f"{representation}_{label}",
+                functools.partial(factory, retried),
+                iterations=iterations,
+            )
+            result.extra.update(
+                {"retained": retained, "bytes_per_generation": _bytes_per_history(factory, retained, retried)},
+            )
+            results.append(result)
+        results.append(_measure_stage_durations(label, retried, iterations))
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--retained", type=int, default=50_000, help="The number of generations to retain.")
+    parser.add_argument("--iterations", type=int, default=20_000, help="Histories built per round.")
+    args = parser.parse_args()
+
+    for result in run_generation_history_benchmarks(retained=args.retained, iterations=args.iterations):
+        print(format_result(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Benchmark the conversion of API job payloads and templates into generation parameters.
+
+`convert_image_job_pop_response_to_parameters` needs a populated model reference, which is fetched over the network
+on first use; when it cannot be fetched those cases are reported as skipped rather than failing the run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import random
+import uuid
+
+from horde_model_reference.model_reference_manager import ModelReferenceManager, PrefetchStrategy
+
+from benchmarks.harness import BenchmarkResult, SkippedBenchmark, format_result, measure
+from horde_sdk.ai_horde_api.apimodels import (
+    ImageGenerateJobPopPayload,
+    ImageGenerateJobPopResponse,
+    ImageGenerateJobPopSkippedStatus,
+    LorasPayloadEntry,
+)
+from horde_sdk.backend_parsing.image.comfyui.hordelib import ComfyUIBackendValuesMapper
+from horde_sdk.generation_parameters.alchemy.consts import KNOWN_ALCHEMY_FORMS, KNOWN_UPSCALERS
+from horde_sdk.generation_parameters.alchemy.object_models import UpscaleAlchemyParametersTemplate
+from horde_sdk.generation_parameters.image.consts import KNOWN_IMAGE_SAMPLERS, KNOWN_IMAGE_SOURCE_PROCESSING
+from horde_sdk.generation_parameters.image.object_models import (
+    BasicImageGenerationParametersTemplate,
+    Image2ImageGenerationParameters,
+    ImageGenerationComponentContainer,
+    ImageGenerationParametersTemplate,
+    RemixGenerationParameters,
+    RemixImageEntry,
+)
+from horde_sdk.generation_parameters.text.object_models import (
+    BasicTextGenerationParametersTemplate,
+    TextGenerationParametersTemplate,
+)
+from horde_sdk.generation_parameters.utils import compute_parameter_fingerprint
+from horde_sdk.worker.dispatch.ai_horde.image.convert import convert_image_job_pop_response_to_parameters
+
+_MEBIBYTE = 1024 * 1024
+
+
+def _image_job_pop_responses() -> dict[str, ImageGenerateJobPopResponse]:
+    """Return representative image job pops, mirroring the shapes used in the test suite."""
+    job_id = uuid.UUID(int=1)
+    common = {
+        "ids": [job_id],
+        "skipped": ImageGenerateJobPopSkippedStatus(),
+        "model": "Deliberate",
+        "r2_uploads": [f"https://not.a.real.url.internal/upload/{job_id}"],
+    }
+    return {
+        "txt2img": ImageGenerateJobPopResponse(
+            payload=ImageGenerateJobPopPayload(prompt="a cat in a hat###blurry", seed="42"),
+            **common,
+        ),
+        "hires_fix": ImageGenerateJobPopResponse(
+            payload=ImageGenerateJobPopPayload(
+                prompt="a cat in a hat",
+                seed="42",
+                hires_fix=True,
+                width=1024,
+                height=1024,
+            ),
+            **common,
+        ),
+        "loras": ImageGenerateJobPopResponse(
+            payload=ImageGenerateJobPopPayload(
+                prompt="a cat in a hat",
+                seed="42",
+                loras=[LorasPayloadEntry(name="76693", model=1, clip=1)],
+            ),
+            **common,
+        ),
+    }
+
+
+async def _prefetch_model_reference_manager() -> ModelReferenceManager:
+    ModelReferenceManager(prefetch_strategy=PrefetchStrategy.ASYNC)
+    handle = ModelReferenceManager.get_instance().deferred_prefetch_handle
+    if handle:
+        await handle
+    return ModelReferenceManager.get_instance()
+
+
+def _load_model_reference_manager() -> ModelReferenceManager | str:
+    """Return the model reference manager, or the reason it could not be loaded."""
+    if ModelReferenceManager.has_instance():
+        return ModelReferenceManager.get_instance()
+    try:
+        return asyncio.run(_prefetch_model_reference_manager())
+    except Exception as e:
+        return f"model reference unavailable: {type(e).__name__}: {e}"
+
+
+def run_convert_benchmarks(iterations: int) -> tuple[list[BenchmarkResult], list[SkippedBenchmark]]:
+    """Time `convert_image_job_pop_response_to_parameters` for each representative job pop."""
+    job_pops = _image_job_pop_responses()
+    manager = _load_model_reference_manager()
+    if isinstance(manager, str):
+        return [], [
+            SkippedBenchmark(group="parameters.convert_image_job_pop", name=name, reason=manager) for name in job_pops
+        ]
+
+    return [
+        measure(
+            "parameters.convert_image_job_pop",
+            name,
+            functools.partial(convert_image_job_pop_response_to_parameters, job_pop, manager),
+            iterations=iterations,
+        )
+        for name, job_pop in job_pops.items()
+    ], []
+
+
+def run_template_benchmarks(iterations: int) -> list[BenchmarkResult]:
+    """Time `to_parameters` on image, text and alchemy templates."""
+    image_template = ImageGenerationParametersTemplate(
+        base_params=BasicImageGenerationParametersTemplate(prompt="a cat in a hat", model="example-model"),
+    )
+    image_updates = BasicImageGenerationParametersTemplate(prompt="a dog in a hat", seed="42")
+    text_template = TextGenerationParametersTemplate(
+        base_params=BasicTextGenerationParametersTemplate(prompt="Tell me about a cat.", model="example-model"),
+    )
+    alchemy_template = UpscaleAlchemyParametersTemplate(upscaler=KNOWN_UPSCALERS.RealESRGAN_x4plus)
+
+    return [
+        measure("parameters.to_parameters", "image", image_template.to_parameters, iterations=iterations),
+        measure(
+            "parameters.to_parameters",
+            "image_with_updates",
+            functools.partial(image_template.to_parameters, base_param_updates=image_updates),
+            iterations=iterations,
+        ),
+        measure("parameters.to_parameters", "text", text_template.to_parameters, iterations=iterations),
+        measure(
+            "parameters.to_parameters",
+            "alchemy_upscale",
+            functools.partial(
+                alchemy_template.to_parameters,
+                source_image=b"image-bytes",
+                default_form=KNOWN_ALCHEMY_FORMS.post_process,
+            ),
+            iterations=iterations,
+        ),
+    ]
+
+
+def _image_templates_with_source_images() -> dict[str, ImageGenerationParametersTemplate]:
+    """Return img2img, inpainting and remix templates carrying multi-megabyte (incompressible) images."""
+    base_params = BasicImageGenerationParametersTemplate(prompt="a cat in a hat", model="example-model")
+    source_image = random.Random(1).randbytes(4 * _MEBIBYTE)
+    source_mask = random.Random(2).randbytes(1 * _MEBIBYTE)
+    remix_images = [RemixImageEntry(image=random.Random(3 + index).randbytes(2 * _MEBIBYTE)) for index in range(3)]
+
+    return {
+        "img2img_4mib": ImageGenerationParametersTemplate(
+            base_params=base_params,
+            source_processing=KNOWN_IMAGE_SOURCE_PROCESSING.img2img,
+            additional_params=ImageGenerationComponentContainer(
+                components=[Image2ImageGenerationParameters(source_image=source_image, source_mask=None)],
+            ),
+        ),
+        "inpainting_4mib_mask_1mib": ImageGenerationParametersTemplate(
+            base_params=base_params,
+            source_processing=KNOWN_IMAGE_SOURCE_PROCESSING.inpainting,
+            additional_params=ImageGenerationComponentContainer(
+                components=[Image2ImageGenerationParameters(source_image=source_image, source_mask=source_mask)],
+            ),
+        ),
+        "remix_4mib_3x2mib": ImageGenerationParametersTemplate(
+            base_params=base_params,
+            source_processing=KNOWN_IMAGE_SOURCE_PROCESSING.remix,
+            additional_params=ImageGenerationComponentContainer(
+                components=[RemixGenerationParameters(source_image=source_image, remix_images=remix_images)],
+            ),
+        ),
+    }
+
+
+def run_fingerprint_benchmarks(iterations: int) -> list[BenchmarkResult]:
+    """Time fingerprinting, and `to_parameters` as a whole, for image templates with large source images."""
+    results: list[BenchmarkResult] = []
+    for name, template in _image_templates_with_source_images().items():
+        payload = template.model_dump()
+        results.append(
+            measure(
+                "parameters.fingerprint",
+                name,
+                functools.partial(compute_parameter_fingerprint, payload),
+                iterations=iterations,
+            ),
+        )
+        results.append(
+            measure("parameters.to_parameters_large_images", name, template.to_parameters, iterations=iterations),
+        )
+    return results
+
+
+def run_expand_benchmarks(iterations: int, *, variants: int = 200) -> list[BenchmarkResult]:
+    """Time building `variants` seed variations of an img2img template, one at a time and in bulk."""
+    template = _image_templates_with_source_images()["img2img_4mib"]
+    seed_variants = [BasicImageGenerationParametersTemplate(seed=str(index)) for index in range(variants)]
+
+    def _one_at_a_time() -> None:
+        for variant in seed_variants:
+            template.to_parameters(base_param_updates=variant)
+
+    def _bulk() -> None:
+        for _ in template.expand_parameters(seed_variants):
+            pass
+
+    results = [
+        measure("parameters.expand", "img2img_4mib_to_parameters_each", _one_at_a_time, iterations=iterations),
+        measure("parameters.expand", "img2img_4mib_expand_parameters", _bulk, iterations=iterations),
+    ]
+    for result in results:
+        result.extra["variants"] = variants
+    return results
+
+
+def run_backend_mapping_benchmarks(iterations: int) -> list[BenchmarkResult]:
+    """Time mapping SDK samplers to ComfyUI samplers, singly (as per job) and as a whole list."""
+    mapper = ComfyUIBackendValuesMapper()
+    supported_samplers = [sampler for sampler in KNOWN_IMAGE_SAMPLERS if sampler in mapper._to_backend_sampler_map]
+
+    return [
+        measure(
+            "parameters.backend_mapping",
+            "sampler_from_string",
+            functools.partial(mapper.map_to_backend_sampler, "k_euler_a"),
+            iterations=iterations,
+        ),
+        measure(
+            "parameters.backend_mapping",
+            "sampler_from_member",
+            functools.partial(mapper.map_to_backend_sampler, KNOWN_IMAGE_SAMPLERS.k_euler_a),
+            iterations=iterations,
+        ),
+        measure(
+            "parameters.backend_mapping",
+            "all_supported_samplers",
+            functools.partial(mapper.map_to_backend_samplers, supported_samplers),
+            iterations=iterations,
+        ),
+    ]
+
+
+def run_parameter_benchmarks(*, iterations: int = 2_000) -> tuple[list[BenchmarkResult], list[SkippedBenchmark]]:
+    """Run every parameter benchmark.
+
+    Args:
+        iterations (int, optional): Calls per round. Defaults to 2,000.
+
+    Returns:
+        tuple[list[BenchmarkResult], list[SkippedBenchmark]]: The results, and any cases which could not run.
+    """
+    results, skipped = run_convert_benchmarks(iterations)
+    results.extend(run_template_benchmarks(iterations))
+    results.extend(run_backend_mapping_benchmarks(iterations))
+    # Each call hashes megabytes of image data, so fewer calls give a comparable run time.
+    results.extend(run_fingerprint_benchmarks(max(1, iterations // 100)))
+    results.extend(run_expand_benchmarks(max(1, iterations // 1_000)))
+    return results, skipped
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2_000, help="Calls per round.")
+    args = parser.parse_args()
+
+    results, skipped = run_parameter_benchmarks(iterations=args.iterations)
+    for result in results:
+        print(format_result(result))
+    for skip in skipped:
+        print(f"{skip.group}/{skip.name}: skipped ({skip.reason})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Replay a sequence of job pops through the worker schedulers and count the model swaps each order costs.
+
+A worker which prefetches jobs holds several at once and may start them in any order. These cases replay the same
+pops, on a simulated clock, through a `JobDeadlineScheduler` (which starts them in deadline, i.e. pop, order) and a
+`ModelAffinityScheduler`, and record how many model and LoRA loads each order needed alongside the replay time.
+
+Pops can be recorded as JSON lines (`{"model": ..., "loras": [...], "ttl": ..., "runtime": ...}`) and replayed with
+`--pops`; by default, a deterministic synthetic sequence with a skewed model popularity is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import random
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from benchmarks.harness import BenchmarkResult, format_result, measure
+from horde_sdk.generation_parameters import ImageGenerationParameters
+from horde_sdk.generation_parameters.generic.consts import KNOWN_AUX_MODEL_SOURCE
+from horde_sdk.generation_parameters.image.object_models import (
+    BasicImageGenerationParameters,
+    ImageGenerationComponentContainer,
+    LoRaEntry,
+)
+from horde_sdk.worker.generations import ImageSingleGeneration
+from horde_sdk.worker.jobs import ImageWorkerJob
+from horde_sdk.worker.scheduling import (
+    JobDeadlineScheduler,
+    ModelAffinityKey,
+    ModelAffinityScheduler,
+    ModelResidency,
+)
+
+
+@dataclass(frozen=True)
+class RecordedPop:
+    """One job as it was popped."""
+
+    model: str
+    """The model the job was for."""
+    loras: tuple[str, ...] = ()
+    """The LoRAs the job requested."""
+    ttl: float = 150.0
+    """The job's time to live, in seconds."""
+    runtime: float = 4.0
+    """How long the job took to generate once its models were loaded, in seconds."""
+
+
+@dataclass
+class ReplayOutcome:
+    """What replaying a pop sequence through one scheduler cost."""
+
+    model_loads: int = 0
+    """The number of times a job needed a model which was not loaded."""
+    lora_loads: int = 0
+    """The number of times a job needed a LoRA which was not loaded."""
+    load_seconds: float = 0.0
+    """The simulated time spent loading."""
+    expired_jobs: int = 0
+    """The number of jobs which could no longer finish in time."""
+    elapsed_seconds: float = 0.0
+    """The simulated time the whole replay took."""
+
+
+class _SimulatedClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def synthetic_pops(count: int, *, models: int = 12, loras: int = 20, seed: int = 42) -> list[RecordedPop]:
+    """Return `count` pops with a Zipf-like model popularity, about a third of which request LoRAs."""
+    rng = random.Random(seed)
+    model_names = [f"model-{index}" for index in range(models)]
+    weights = [1 / (rank + 1) for rank in range(models)]
+    lora_names = [f"lora-{index}" for index in range(loras)]
+    pops = []
+    for _ in range(count):
+        requested_loras: tuple[str, ...] = ()
+        if rng.random() < 0.3:
+            requested_loras = tuple(rng.sample(lora_names, rng.randint(1, 2)))
+        pops.append(
+            RecordedPop(
+                model=rng.choices(model_names, weights)[0],
+                loras=requested_loras,
+                runtime=rng.uniform(2.0, 8.0),
+            ),
+        )
+    return pops
+
+
+def load_recorded_pops(path: Path) -> list[RecordedPop]:
+    """Read pops recorded as JSON lines."""
+    pops = []
+    for line in path.read_text().splitlines():
+        if line.strip():
+            record = json.loads(line)
+            record["loras"] = tuple(record.get("loras") or ())
+            pops.append(RecordedPop(**record))
+    return pops
+
+
+def _parameters_for(pops: Sequence[RecordedPop]) -> list[ImageGenerationParameters]:
+    return [
+        ImageGenerationParameters(
+            result_ids=[f"result-{index}"],
+            base_params=BasicImageGenerationParameters(model=pop.model, prompt="a cat in a hat"),
+            additional_params=ImageGenerationComponentContainer(
+                components=[
+                    LoRaEntry(name=lora, remote_version_id=None, source=KNOWN_AUX_MODEL_SOURCE.CIVITAI)
+                    for lora in pop.loras
+                ],
+            ),
+        )
+        for index, pop in enumerate(pops)
+    ]
+
+
+def replay(
+    pops: Sequence[RecordedPop],
+    parameters: Sequence[ImageGenerationParameters],
+    *,
+    affinity: bool,
+    prefetch: int,
+    residency: ModelResidency,
+) -> ReplayOutcome:
+    """Replay `pops` on a simulated clock, keeping up to `prefetch` jobs pending, and tally the loading it cost."""
+    clock = _SimulatedClock()
+    scheduler: JobDeadlineScheduler
+    if affinity:
+        scheduler = ModelAffinityScheduler(clock=clock, residency=residency)
+    else:
+        scheduler = JobDeadlineScheduler(clock=clock)
+
+    outcome = ReplayOutcome()
+    runtimes: dict[int, float] = {}
+    next_pop = 0
+    while True:
+        while next_pop < len(pops) and len(scheduler) < prefetch:
+            pop = pops[next_pop]
+            job = ImageWorkerJob(
+                generation=ImageSingleGeneration(generation_parameters=parameters[next_pop]),
+                time_received=clock.now,
+            )
+            runtimes[id(job)] = pop.runtime
+            scheduler.add(job, ttl=pop.ttl, estimated_runtime=pop.runtime)
+            next_pop += 1
+
+        dispatched = scheduler.pop_next()
+        if dispatched is None:
+            break
+
+        if isinstance(scheduler, ModelAffinityScheduler):
+            # The scheduler already loaded the job's models into `residency` when it chose the job.
+            load_seconds = scheduler.affinity_metrics().load_seconds - outcome.load_seconds
+        else:
+            key = ModelAffinityKey.from_job(dispatched)
+            assert key is not None
+            load_seconds = residency.swap_cost(key)
+            model_loads, lora_loads = residency.load(key)
+            outcome.model_loads += model_loads
+            outcome.lora_loads += lora_loads
+        outcome.load_seconds += load_seconds
+        clock.now += load_seconds + runtimes.pop(id(dispatched))
+
+    if isinstance(scheduler, ModelAffinityScheduler):
+        metrics = scheduler.affinity_metrics()
+        outcome.model_loads = metrics.model_loads
+        outcome.lora_loads = metrics.lora_loads
+    outcome.expired_jobs = scheduler.metrics().expired_jobs
+    outcome.elapsed_seconds = clock.now
+    return outcome
+
+
+def _replay_fresh(
+    pops: Sequence[RecordedPop],
+    parameters: Sequence[ImageGenerationParameters],
+    *,
+    affinity: bool,
+    prefetch: int,
+) -> ReplayOutcome:
+    return replay(pops, parameters, affinity=affinity, prefetch=prefetch, residency=ModelResidency())
+
+
+def run_model_affinity_benchmarks(
+    *,
+    pops: Sequence[RecordedPop] | None = None,
+    pop_count: int = 500,
+    prefetch: int = 8,
+    iterations: int = 1,
+) -> list[BenchmarkResult]:
+    """Time replaying a pop sequence through both schedulers and record the loading each order cost.
+
+    Args:
+        pops (Sequence[RecordedPop] | None, optional): The pops to replay. Defaults to `pop_count` synthetic pops.
+        pop_count (int, optional): The number of synthetic pops, if `pops` is not given. Defaults to 500.
+        prefetch (int, optional): The most jobs held pending at once. Defaults to 8.
+        iterations (int, optional): Replays per round. Defaults to 1.
+
+    Returns:
+        list[BenchmarkResult]: The results of every case.
+    """
+    if pops is None:
+        pops = synthetic_pops(pop_count)
+    parameters = _parameters_for(pops)
+
+    results = []
+    outcomes: dict[str, ReplayOutcome] = {}
+    for name, affinity in (("pop_order", False), ("model_affinity", True)):
+        outcomes[name] = _replay_fresh(pops, parameters, affinity=affinity, prefetch=prefetch)
+        result = measure(
+            "worker.scheduling",
+            name,
+            functools.partial(_replay_fresh, pops, parameters, affinity=affinity, prefetch=prefetch),
+            iterations=iterations,
+        )
+        outcome = outcomes[name]
+        result.extra.update(
+            {
+                "pops": len(pops),
+                "prefetch": prefetch,
+                "model_loads": outcome.model_loads,
+                "lora_loads": outcome.lora_loads,
+                "load_seconds": round(outcome.load_seconds, 2),
+                "expired_jobs": outcome.expired_jobs,
+                "simulated_seconds": round(outcome.elapsed_seconds, 2),
+            },
+        )
+        results.append(result)
+
+    results[-1].extra["model_loads_saved"] = outcomes["pop_order"].model_loads - outcomes["model_affinity"].model_loads
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pops", type=Path, help="Recorded pops to replay, as JSON lines.")
+    parser.add_argument("--pop-count", type=int, default=500, help="Synthetic pops to replay without --pops.")
+    parser.add_argument("--prefetch", type=int, default=8, help="The most jobs held pending at once.")
+    parser.add_argument("--iterations", type=int, default=1, help="Replays per round.")
+    args = parser.parse_args()
+
+    pops = load_recorded_pops(args.pops) if args.pops is not None else None
+    for result in run_model_affinity_benchmarks(
+        pops=pops,
+        pop_count=args.pop_count,
+        prefetch=args.prefetch,
+        iterations=args.iterations,
+    ):
+        print(format_result(result))
+        print(f"    {result.extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Timing, result models and JSON persistence shared by the benchmark suite.
+
+Each benchmark case is timed in several rounds of a fixed number of iterations (after a warmup round), and the
+per-operation figures of each round are summarised. A whole run is saved as a single JSON document so that two runs
+can be compared with `compare_runs` (or `python -m benchmarks --compare old.json`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import platform
+import statistics
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+DEFAULT_ROUNDS = 5
+"""The number of timed rounds per benchmark case."""
+
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+"""The relative slowdown of the median above which `compare_runs` reports a case as regressed."""
+
+
+class BenchmarkResult(BaseModel):
+    """The summarised timings of a single benchmark case."""
+
+    group: str
+    """The group the case belongs to, e.g. `client.prepare`."""
+    name: str
+    """The name of the case, unique within its group."""
+    iterations: int
+    """The number of operations timed per round."""
+    rounds: int
+    """The number of timed rounds."""
+    min_ns: float
+    """The fastest round's nanoseconds per operation."""
+    median_ns: float
+    """The median round's nanoseconds per operation."""
+    mean_ns: float
+    """The mean nanoseconds per operation across rounds."""
+    stdev_ns: float
+    """The standard deviation of the rounds' nanoseconds per operation."""
+    ops_per_second: float
+    """Operations per second, derived from the median."""
+    extra: dict[str, float] = Field(default_factory=dict)
+    """Any additional case-specific figures."""
+
+    @property
+    def key(self) -> str:
+        """The `group/name` identifier of the case."""
+        return f"{self.group}/{self.name}"
+
+
+class SkippedBenchmark(BaseModel):
+    """A benchmark case which could not run in this environment."""
+
+    group: str
+    name: str
+    reason: str
+
+
+class BenchmarkRun(BaseModel):
+    """All results of one invocation of the suite, plus enough context to tell runs apart."""
+
+    created_at: str
+    python_version: str
+    platform: str
+    git_revision: str | None
+    results: list[BenchmarkResult] = Field(default_factory=list)
+    skipped: list[SkippedBenchmark] = Field(default_factory=list)
+
+    @classmethod
+    def new(cls) -> BenchmarkRun:
+        """Create an empty run stamped with the current time, interpreter, platform and git revision."""
+        return cls(
+            created_at=datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+            python_version=platform.python_version(),
+            platform=platform.platform(),
+            git_revision=_git_revision(),
+        )
+
+    def save(self, path: Path) -> None:
+        """Write the run to `path` as indented JSON."""
+        path.write_text(self.model_dump_json(indent=2) + "\n", encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> BenchmarkRun:
+        """Read a run previously written by `save`."""
+        return cls.model_validate_json(path.read_text(encoding="utf-8"))
+
+
+class BenchmarkComparison(BaseModel):
+    """The change in median time of a case between two runs."""
+
+    key: str
+    baseline_median_ns: float
+    current_median_ns: float
+
+    @property
+    def ratio(self) -> float:
+        """The current median divided by the baseline median; above 1.0 is slower."""
+        return self.current_median_ns / self.baseline_median_ns
+
+
+def _git_revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=Path(__file__).parent,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def _summarise(group: str, name: str, iterations: int, round_seconds: list[float]) -> BenchmarkResult:
+    per_op_ns = [seconds / iterations * 1e9 for seconds in round_seconds]
+    median_ns = statistics.median(per_op_ns)
+    return BenchmarkResult(
+        group=group,
+        name=name,
+        iterations=iterations,
+        rounds=len(per_op_ns),
+        min_ns=min(per_op_ns),
+        median_ns=median_ns,
+        mean_ns=statistics.fmean(per_op_ns),
+        stdev_ns=statistics.stdev(per_op_ns) if len(per_op_ns) > 1 else 0.0,
+        ops_per_second=1e9 / median_ns if median_ns else 0.0,
+    )
+
+
+def measure(
+    group: str,
+    name: str,
+    operation: Callable[[], object],
+    *,
+    iterations: int,
+    rounds: int = DEFAULT_ROUNDS,
+) -> BenchmarkResult:
+    """Time `operation` and summarise the per-call cost.
+
+    Args:
+        group (str): The group the case belongs to.
+        name (str): The name of the case.
+        operation (Callable[[], object]): The operation to time; it is called `iterations` times per round.
+        iterations (int): The number of calls per round.
+        rounds (int, optional): The number of timed rounds, after one untimed warmup round.
+            Defaults to DEFAULT_ROUNDS.
+
+    Returns:
+        BenchmarkResult: The summarised timings.
+    """
+    iterations = max(1, iterations)
+    round_seconds: list[float] = []
+    for round_index in range(rounds + 1):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            operation()
+        elapsed = time.perf_counter() - start
+        if round_index:
+            round_seconds.append(elapsed)
+    return _summarise(group, name, iterations, round_seconds)
+
+
+async def measure_async(
+    group: str,
+    name: str,
+    operation: Callable[[], Awaitable[object]],
+    *,
+    iterations: int,
+    rounds: int = DEFAULT_ROUNDS,
+    concurrency: int = 1,
+) -> BenchmarkResult:
+    """Time an awaitable `operation` and summarise the per-call cost.
+
+    Args:
+        group (str): The group the case belongs to.
+        name (str): The name of the case.
+        operation (Callable[[], Awaitable[object]]): A factory for the awaitable to time.
+        iterations (int): The number of calls per round.
+        rounds (int, optional): The number of timed rounds, after one untimed warmup round.
+            Defaults to DEFAULT_ROUNDS.
+        concurrency (int, optional): The number of calls kept in flight at once. Per-call figures are still wall
+            time divided by calls, so they reflect throughput rather than latency when this is above 1.
+            Defaults to 1.
+
+    Returns:
+        BenchmarkResult: The summarised timings.
+    """
+    iterations = max(1, iterations)
+    concurrency = max(1, min(concurrency, iterations))
+
+    async def _worker(calls: int) -> None:
+        for _ in range(calls):
+            await operation()
+
+    shares = [iterations // concurrency + (1 if i < iterations % concurrency else 0) for i in range(concurrency)]
+
+    round_seconds: list[float] = []
+    for round_index in range(rounds + 1):
+        start = time.perf_counter()
+        await asyncio.gather(*(_worker(share) for share in shares))
+        elapsed = time.perf_counter() - start
+        if round_index:
+            round_seconds.append(elapsed)
+    result = _summarise(group, name, iterations, round_seconds)
+    result.extra["concurrency"] = concurrency
+    return result
+
+
+def compare_runs(baseline: BenchmarkRun, current: BenchmarkRun) -> list[BenchmarkComparison]:
+    """Pair up the cases present in both runs, ordered from the largest slowdown to the largest speedup.
+
+    Args:
+        baseline (BenchmarkRun): The earlier run.
+        current (BenchmarkRun): The run to compare against it.
+
+    Returns:
+        list[BenchmarkComparison]: One entry per case present in both runs.
+    """
+    baseline_by_key = {result.key: result for result in baseline.results}
+    comparisons = [
+        BenchmarkComparison(
+            key=result.key,
+            baseline_median_ns=baseline_by_key[result.key].median_ns,
+            current_median_ns=result.median_ns,
+        )
+        for result in current.results
+        if result.key in baseline_by_key and baseline_by_key[result.key].median_ns > 0
+    ]
+    comparisons.sort(key=lambda comparison: comparison.ratio, reverse=True)
+    return comparisons
+
+
+def format_result(result: BenchmarkResult) -> str:
+    """Return a one-line, human-readable summary of a result."""
+    return (
+        f"{result.key:<72} {result.median_ns / 1000:>12,.2f} us/op  "
+        f"(min {result.min_ns / 1000:,.2f}, stdev {result.stdev_ns / 1000:,.2f})  {result.ops_per_second:>12,.0f} op/s"
+    )
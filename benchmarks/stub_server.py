@@ -0,0 +1,226 @@
+"""A local stand-in for the AI Horde API which replays the JSON fixtures under `tests/test_data`.
+
+Routes are derived from the SDK's own request types: every request in `horde_sdk.ai_horde_api.apimodels` with an
+example response in `tests/test_data/ai_horde_api/example_responses` is served at its endpoint path, with its default
+success status code and the fixture as the body. Bodies are serialised once up front so the server adds as little as
+possible to the client-side figures being measured.
+
+The server runs its own event loop on a background thread, so both the synchronous (`requests`) and asynchronous
+(`aiohttp`) clients can be pointed at it from the benchmarking thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import threading
+from collections.abc import Awaitable, Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+import horde_sdk.ai_horde_api.apimodels
+import horde_sdk.ai_horde_api.apimodels.base
+from horde_sdk.consts import HTTPMethod, HTTPStatusCode
+from horde_sdk.generic_api._reflection import get_all_request_types
+from horde_sdk.generic_api.apimodels import HordeRequest
+from horde_sdk.generic_api.utils.swagger import SwaggerDoc
+
+TEST_DATA_DIR = Path(__file__).parent.parent / "tests" / "test_data"
+"""The repository's test data directory."""
+
+AI_HORDE_EXAMPLE_RESPONSES_DIR = TEST_DATA_DIR / "ai_horde_api" / "example_responses"
+"""The swagger-derived example responses, named by `SwaggerDoc.filename_from_endpoint_path`."""
+
+AI_HORDE_EXAMPLE_PAYLOADS_DIR = TEST_DATA_DIR / "ai_horde_api" / "example_payloads"
+"""The swagger-derived example request payloads, named by `SwaggerDoc.filename_from_endpoint_path`."""
+
+
+def default_success_status(request_type: type[HordeRequest]) -> HTTPStatusCode:
+    """Return the status code paired with the request's default success response type."""
+    default_response_type = request_type.get_default_success_response_type()
+    for status_code, response_type in request_type.get_success_status_response_pairs().items():
+        if response_type is default_response_type:
+            return status_code
+    return HTTPStatusCode.OK
+
+
+def example_response_path(request_type: type[HordeRequest], status_code: HTTPStatusCode) -> Path:
+    """Return the path of the example response fixture for a request type and status code."""
+    filename = SwaggerDoc.filename_from_endpoint_path(
+        request_type.get_api_endpoint_subpath(),
+        request_type.get_http_method(),
+        http_status_code=status_code,
+    )
+    return AI_HORDE_EXAMPLE_RESPONSES_DIR / f"{filename}.json"
+
+
+def example_payload_path(request_type: type[HordeRequest]) -> Path:
+    """Return the path of the example payload fixture for a request type."""
+    filename = SwaggerDoc.filename_from_endpoint_path(
+        request_type.get_api_endpoint_subpath(),
+        request_type.get_http_method(),
+    )
+    return AI_HORDE_EXAMPLE_PAYLOADS_DIR / f"{filename}.json"
+
+
+def load_fixture(path: Path) -> Any:  # noqa: ANN401
+    """Load a JSON fixture."""
+    with open(path, encoding="utf-8") as fixture_file:
+        return json.load(fixture_file)
+
+
+class StubHordeServer:
+    """Serve the AI Horde example responses on a local port.
+
+    Use as a context manager, or call `start` and `stop`. While running, `base_url` can be used in place of the
+    real API's base URL (see `redirect_ai_horde_base_url`).
+    """
+
+    def __init__(self, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Initialize the server without starting it.
+
+        Args:
+            host (str, optional): The interface to bind to. Defaults to "127.0.0.1".
+            port (int, optional): The port to bind to; 0 picks a free one. Defaults to 0.
+        """
+        self._host = host
+        self._port = port
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._runner: web.AppRunner | None = None
+        self._ready = threading.Event()
+        self._startup_error: BaseException | None = None
+        self.requests_served = 0
+        """The number of requests answered since the server started."""
+
+    @property
+    def base_url(self) -> str:
+        """The base URL of the running server, equivalent to `https://aihorde.net/api/`."""
+        return f"http://{self._host}:{self._port}/api/"
+
+    @staticmethod
+    def build_routes() -> dict[tuple[HTTPMethod, str], tuple[HTTPStatusCode, bytes]]:
+        """Map each `(method, endpoint path)` with a fixture to its status code and serialised body."""
+        routes: dict[tuple[HTTPMethod, str], tuple[HTTPStatusCode, bytes]] = {}
+        for request_type in get_all_request_types(horde_sdk.ai_horde_api.apimodels.__name__):
+            route_key = (request_type.get_http_method(), str(request_type.get_api_endpoint_subpath()))
+            if route_key in routes:
+                continue
+
+            status_code = default_success_status(request_type)
+            fixture_path = example_response_path(request_type, status_code)
+            if fixture_path.exists():
+                body = json.dumps(load_fixture(fixture_path)).encode("utf-8")
+            elif not request_type.get_default_success_response_type().model_fields:
+                body = b"{}"
+            else:
+                continue
+
+            routes[route_key] = (status_code, body)
+        return routes
+
+    def _build_app(self) -> web.Application:
+        app = web.Application()
+
+        # Static paths go first so that e.g. `/v2/workers/messages` is not captured by `/v2/workers/{worker_id}`.
+        ordered_routes = sorted(self.build_routes().items(), key=lambda item: item[0][1].count("{"))
+        for (http_method, subpath), (status_code, body) in ordered_routes:
+            app.router.add_route(http_method.value, f"/api{subpath}", self._make_handler(status_code, body))
+        return app
+
+    def _make_handler(
+        self,
+        status_code: HTTPStatusCode,
+        body: bytes,
+    ) -> Callable[[web.Request], Awaitable[web.StreamResponse]]:
+        async def _handler(request: web.Request) -> web.StreamResponse:
+            if request.can_read_body:
+                await request.read()
+            self.requests_served += 1
+            return web.Response(body=body, status=status_code.value, content_type="application/json")
+
+        return _handler
+
+    async def _serve(self) -> None:
+        self._runner = web.AppRunner(self._build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        if self._port == 0:
+            self._port = self._runner.addresses[0][1]
+
+    def _run_loop(self) -> None:
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._serve())
+        except BaseException as e:
+            self._startup_error = e
+            self._ready.set()
+            loop.close()
+            return
+
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            if self._runner is not None:
+                loop.run_until_complete(self._runner.cleanup())
+            loop.close()
+
+    def start(self, timeout: float = 10.0) -> None:
+        """Start serving on a background thread and wait until the port is bound.
+
+        Raises:
+            RuntimeError: If the server is already running or did not start within `timeout` seconds.
+        """
+        if self._thread is not None:
+            raise RuntimeError("The stub server is already running")
+
+        self._ready.clear()
+        self._startup_error = None
+        self._thread = threading.Thread(target=self._run_loop, name="stub-horde-server", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("The stub server did not start in time")
+        if self._startup_error is not None:
+            self._thread = None
+            raise RuntimeError("The stub server failed to start") from self._startup_error
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the server and join its thread."""
+        if self._thread is None or self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+        self._loop = None
+
+    def __enter__(self) -> StubHordeServer:
+        """Start the server."""
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop the server."""
+        self.stop()
+
+
+@contextlib.contextmanager
+def redirect_ai_horde_base_url(base_url: str) -> Iterator[None]:
+    """Point AI Horde requests at `base_url` for the duration of the block.
+
+    The SDK reads `AI_HORDE_URL` once at import time, so by the time a benchmark runs the base URL has already been
+    bound; this swaps the bound value instead and restores it afterwards.
+    """
+    module = horde_sdk.ai_horde_api.apimodels.base
+    original = getattr(module, "AI_HORDE_BASE_URL")  # noqa: B009
+    setattr(module, "AI_HORDE_BASE_URL", base_url)  # noqa: B010
+    try:
+        yield
+    finally:
+        setattr(module, "AI_HORDE_BASE_URL", original)  # noqa: B010
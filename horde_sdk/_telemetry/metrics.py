@@ -1,5 +1,15 @@
+import os
+import time
+
 import logfire
 
+_telemetry_client_timings_enabled = os.getenv("HORDE_SDK_TELEMETRY") not in (None, "", "0")
+"""Whether per-request phase timings and the in-flight/follow-up gauges are recorded.
+
+Follows the same `HORDE_SDK_TELEMETRY` switch as `horde_sdk.horde_logging`; see `set_client_request_telemetry_enabled`
+to change it at runtime.
+"""
+
 _telemetry_client_critical_errors_counter = logfire.metric_counter(
     "client_critical_errors",
     unit="1",
@@ -24,10 +34,140 @@ _telemetry_client_requests_finished_successfully_counter = logfire.metric_counte
     description="The number of requests finished",
 )
 
+_telemetry_client_request_prepare_duration_histogram = logfire.metric_histogram(
+    "client_request_prepare_duration",
+    unit="s",
+    description="Time spent validating a request and building its headers, query and body",
+)
+
+_telemetry_client_request_network_duration_histogram = logfire.metric_histogram(
+    "client_request_network_duration",
+    unit="s",
+    description="Time from sending a request until its response body was received",
+)
+
+_telemetry_client_response_decode_duration_histogram = logfire.metric_histogram(
+    "client_response_decode_duration",
+    unit="s",
+    description="Time spent decoding a response body as JSON",
+)
+
+_telemetry_client_response_validation_duration_histogram = logfire.metric_histogram(
+    "client_response_validation_duration",
+    unit="s",
+    description="Time spent validating a decoded response into its response model",
+)
+
+_telemetry_client_requests_in_flight = logfire.metric_up_down_counter(
+    "client_requests_in_flight",
+    unit="1",
+    description="The number of requests sent and not yet answered",
+)
+
+_telemetry_client_pending_follow_ups = logfire.metric_up_down_counter(
+    "client_pending_follow_ups",
+    unit="1",
+    description="The number of responses held by sessions which still require a follow-up or cleanup request",
+)
+
+_telemetry_client_connections_created_counter = logfire.metric_counter(
+    "client_connections_created",
+    unit="1",
+    description="The number of new connections opened by a warm connection pool, except those opened to warm it",
+)
+
+_telemetry_client_connections_reused_counter = logfire.metric_counter(
+    "client_connections_reused",
+    unit="1",
+    description="The number of requests, except warm-up ones, sent over a pooled connection of a warm connection pool",
+)
+
+_PHASE_HISTOGRAMS = (
+    _telemetry_client_request_prepare_duration_histogram,
+    _telemetry_client_request_network_duration_histogram,
+    _telemetry_client_response_decode_duration_histogram,
+    _telemetry_client_response_validation_duration_histogram,
+)
+
+
+class _RequestPhaseTimer:
+    """Times the phases of one request: prepare, network, decode and validation, in that order.
+
+    The status code is only known after the network phase, so durations are buffered and recorded together by
+    `finish`. Creating a timer counts the request as in flight until `close` is called.
+    """
+
+    __slots__ = ("_durations", "_endpoint", "_last")
+
+    def __init__(self, endpoint: str) -> None:
+        self._endpoint = str(endpoint)
+        self._durations: list[float] = []
+        _telemetry_client_requests_in_flight.add(1)
+        self._last = time.perf_counter()
+
+    def lap(self) -> None:
+        """Close the current phase and start the next."""
+        now = time.perf_counter()
+        self._durations.append(now - self._last)
+        self._last = now
+
+    def finish(self, status_code: int) -> None:
+        """Record the phases closed so far, labelled with the endpoint and the response's status code."""
+        attributes: dict[str, str | int] = {"endpoint": self._endpoint, "status_code": status_code}
+        for histogram, duration in zip(_PHASE_HISTOGRAMS, self._durations, strict=False):
+            histogram.record(duration, attributes)
+
+    def close(self) -> None:
+        """Stop counting the request as in flight."""
+        _telemetry_client_requests_in_flight.add(-1)
+
+
+def _start_request_timer(endpoint: str) -> _RequestPhaseTimer | None:
+    """Return a timer for a request to `endpoint`, or `None` if client request telemetry is disabled."""
+    if not _telemetry_client_timings_enabled:
+        return None
+    return _RequestPhaseTimer(endpoint)
+
+
+def _record_pending_follow_ups_change(delta: int) -> None:
+    """Adjust the pending follow-ups gauge, if client request telemetry is enabled."""
+    if _telemetry_client_timings_enabled and delta:
+        _telemetry_client_pending_follow_ups.add(delta)
+
+
+def _record_connection_use(host: str, *, reused: bool) -> None:
+    """Count a request to `host` as having opened or reused a connection, if client request telemetry is enabled."""
+    if not _telemetry_client_timings_enabled:
+        return
+    counter = _telemetry_client_connections_reused_counter if reused else _telemetry_client_connections_created_counter
+    counter.add(1, {"host": host})
+
+
+def set_client_request_telemetry_enabled(enabled: bool) -> None:
+    """Turn the per-request timings and gauges on or off, e.g. after configuring logfire yourself.
+
+    Requests already in progress keep the setting they started with.
+    """
+    global _telemetry_client_timings_enabled
+    _telemetry_client_timings_enabled = enabled
+
 
 __all__ = [
+    "_RequestPhaseTimer",
+    "_record_connection_use",
+    "_record_pending_follow_ups_change",
+    "_start_request_timer",
+    "_telemetry_client_connections_created_counter",
+    "_telemetry_client_connections_reused_counter",
     "_telemetry_client_critical_errors_counter",
     "_telemetry_client_horde_api_errors_counter",
+    "_telemetry_client_pending_follow_ups",
+    "_telemetry_client_request_network_duration_histogram",
+    "_telemetry_client_request_prepare_duration_histogram",
     "_telemetry_client_requests_finished_successfully_counter",
+    "_telemetry_client_requests_in_flight",
     "_telemetry_client_requests_started_counter",
+    "_telemetry_client_response_decode_duration_histogram",
+    "_telemetry_client_response_validation_duration_histogram",
+    "set_client_request_telemetry_enabled",
 ]
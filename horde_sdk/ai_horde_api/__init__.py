@@ -20,10 +20,12 @@ from horde_sdk.ai_horde_api.endpoints import (
 from horde_sdk.ai_horde_api.exceptions import (
     AIHordeGenerationTimedOutError,
     AIHordeImageValidationError,
+    AIHordeKeyPoolExhaustedError,
     AIHordeRequestError,
     AIHordeServerException,
 )
 from horde_sdk.ai_horde_api.fields import GenerationID, ImageID, TeamID, WorkerID
+from horde_sdk.ai_horde_api.key_pool import AIHordeAPIKeyPoolClientSession
 from horde_sdk.exceptions import PayloadValidationError
 from horde_sdk.generation_parameters.alchemy.consts import KNOWN_ALCHEMY_FORMS
 from horde_sdk.generation_parameters.image.consts import KNOWN_IMAGE_SAMPLERS, KNOWN_IMAGE_SOURCE_PROCESSING
@@ -40,10 +42,12 @@ __all__ = [
     "AIHordeAPIAsyncManualClient",
     "AIHordeAPIAsyncSimpleClient",
     "AIHordeAPIClientSession",
+    "AIHordeAPIKeyPoolClientSession",
     "AIHordeAPIManualClient",
     "AIHordeAPISimpleClient",
     "AIHordeGenerationTimedOutError",
     "AIHordeImageValidationError",
+    "AIHordeKeyPoolExhaustedError",
     "AIHordeRequestError",
     "AIHordeServerException",
     "GenerationID",
@@ -9,7 +9,8 @@ import io
 import time
 import urllib.parse
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Coroutine
+from collections.abc import Callable, Coroutine, Sequence
+from pathlib import Path
 from ssl import SSLContext
 from typing import cast
 
@@ -66,6 +67,12 @@ from horde_sdk.ai_horde_api.consts import GENERATION_MAX_LIFE, MODEL_STATE, PROG
 from horde_sdk.ai_horde_api.endpoints import AI_HORDE_BASE_URL
 from horde_sdk.ai_horde_api.exceptions import AIHordeImageValidationError, AIHordeRequestError
 from horde_sdk.ai_horde_api.fields import GenerationID, WorkerID
+from horde_sdk.ai_horde_api.image_downloads import (
+    DEFAULT_IMAGE_DOWNLOAD_CONCURRENCY,
+    DownloadedImage,
+    async_download_generation_images,
+    download_generation_images,
+)
 from horde_sdk.ai_horde_api.metadata import AIHordePathData, AIHordeQueryData
 from horde_sdk.generic_api.apimodels import (
     ContainsMessageResponseMixin,
@@ -75,6 +82,7 @@ from horde_sdk.generic_api.apimodels import (
     ResponseRequiringFollowUpMixin,
     ResponseWithProgressMixin,
 )
+from horde_sdk.generic_api.follow_ups import DEFAULT_CLEANUP_CONCURRENCY
 from horde_sdk.generic_api.generic_clients import (
     GenericAsyncHordeAPIManualClient,
     GenericAsyncHordeAPISession,
@@ -358,11 +366,18 @@ class AIHordeAPIClientSession(GenericHordeAPISession):
     `AIHordeAPIManualClient` instead.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        cleanup_concurrency: int = DEFAULT_CLEANUP_CONCURRENCY,
+        cleanup_deadline: float | None = None,
+    ) -> None:
         """Create a new instance of the RatingsAPIClient."""
         super().__init__(
             path_fields=AIHordePathData,
             query_fields=AIHordeQueryData,
+            cleanup_concurrency=cleanup_concurrency,
+            cleanup_deadline=cleanup_deadline,
         )
 
 
@@ -379,6 +394,9 @@ class AIHordeAPIAsyncClientSession(GenericAsyncHordeAPISession):
         aiohttp_session: aiohttp.ClientSession,
         ssl_context: SSLContext = _default_sslcontext,
         apikey: str | None = None,
+        *,
+        cleanup_concurrency: int = DEFAULT_CLEANUP_CONCURRENCY,
+        cleanup_deadline: float | None = None,
     ) -> None:
         """Create a new instance of the RatingsAPIClient."""
         super().__init__(
@@ -387,6 +405,8 @@ class AIHordeAPIAsyncClientSession(GenericAsyncHordeAPISession):
             path_fields=AIHordePathData,
             query_fields=AIHordeQueryData,
             ssl_context=ssl_context,
+            cleanup_concurrency=cleanup_concurrency,
+            cleanup_deadline=cleanup_deadline,
         )
 
 
@@ -589,6 +609,34 @@ class AIHordeAPISimpleClient(BaseAIHordeSimpleClient):
         """
         return download_image_from_url(url)
 
+    def download_images_from_generations(
+        self,
+        generations: Sequence[ImageGeneration],
+        *,
+        destination_dir: str | Path | None = None,
+        max_concurrency: int = DEFAULT_IMAGE_DOWNLOAD_CONCURRENCY,
+    ) -> list[DownloadedImage]:
+        """Download the images of several generations concurrently over one pooled session, without decoding them.
+
+        Args:
+            generations (Sequence[ImageGeneration]): The generations, e.g. `ImageGenerateStatusResponse.generations`.
+            destination_dir (str | Path | None, optional): If given, each image is streamed to
+                `<destination_dir>/<generation id>.webp` instead of being returned as bytes. Defaults to None.
+            max_concurrency (int, optional): The most images downloaded at once. Defaults to 8.
+
+        Returns:
+            list[DownloadedImage]: The images, in the order of `generations`.
+
+        Raises:
+            requests.HTTPError: If an image couldn't be downloaded.
+            AIHordeImageDownloadError: If an image's size did not match its `Content-Length`.
+        """
+        return download_generation_images(
+            generations,
+            destination_dir=destination_dir,
+            max_concurrency=max_concurrency,
+        )
+
     @logfire.instrument()
     def _do_request_with_check(
         self,
@@ -1313,6 +1361,38 @@ class AIHordeAPIAsyncSimpleClient(BaseAIHordeSimpleClient):
 
         return PIL.Image.open(io.BytesIO(image_bytes))
 
+    async def download_images_from_generations(
+        self,
+        generations: Sequence[ImageGeneration],
+        *,
+        destination_dir: str | Path | None = None,
+        max_concurrency: int = DEFAULT_IMAGE_DOWNLOAD_CONCURRENCY,
+    ) -> list[DownloadedImage]:
+        """Asynchronously download the images of several generations concurrently, without decoding them.
+
+        Args:
+            generations (Sequence[ImageGeneration]): The generations, e.g. `ImageGenerateStatusResponse.generations`.
+            destination_dir (str | Path | None, optional): If given, each image is streamed to
+                `<destination_dir>/<generation id>.webp` instead of being returned as bytes. Defaults to None.
+            max_concurrency (int, optional): The most images downloaded at once. Defaults to 8.
+
+        Returns:
+            list[DownloadedImage]: The images, in the order of `generations`.
+
+        Raises:
+            ClientResponseError: If an image couldn't be downloaded.
+            AIHordeImageDownloadError: If an image's size did not match its `Content-Length`.
+        """
+        if self._aiohttp_session is None:  # pragma: no cover
+            raise RuntimeError("No aiohttp session provided but an async request was made.")
+
+        return await async_download_generation_images(
+            self._aiohttp_session,
+            generations,
+            destination_dir=destination_dir,
+            max_concurrency=max_concurrency,
+        )
+
     @logfire.instrument()
     async def _do_request_with_check(
         self,
@@ -90,6 +90,10 @@ class ImageGenerateAsyncResponse(
     def get_api_model_name(cls) -> str | None:
         return "RequestAsync"
 
+    @override
+    def get_follow_up_cleanup_priority(self) -> float:
+        return self.kudos
+
     def __hash__(self) -> int:
         return hash(ImageGenerateAsyncResponse.__name__) + hash(self.id_)
 
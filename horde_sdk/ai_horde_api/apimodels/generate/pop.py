@@ -21,6 +21,7 @@ from horde_sdk.ai_horde_api.consts import (
 )
 from horde_sdk.ai_horde_api.endpoints import AI_HORDE_API_ENDPOINT_SUBPATH
 from horde_sdk.ai_horde_api.fields import GenerationID
+from horde_sdk.ai_horde_api.source_image_cache import CachedSourceImage, get_shared_source_image_cache
 from horde_sdk.consts import _OVERLOADED_MODEL, HTTPMethod
 from horde_sdk.generation_parameters.alchemy.consts import KNOWN_FACEFIXERS, KNOWN_UPSCALERS
 from horde_sdk.generation_parameters.image.consts import KNOWN_IMAGE_SOURCE_PROCESSING
@@ -122,8 +123,17 @@ class ImageGenerateJobPopPayload(ImageGenerateParamMixin):
     """The number of images to generate. Defaults to 1, maximum is 20."""
 
 
+async def _async_fetch_source_image_base64(client_session: aiohttp.ClientSession, url: str) -> str:
+    """Return the image at `url` as base64, through the shared source image cache."""
+    return (await get_shared_source_image_cache().async_fetch(client_session, url)).base64
+
+
 class ExtraSourceImageMixin(ResponseRequiringDownloadMixin):
-    """Mixin for jobs which have extra source images."""
+    """Mixin for jobs which have extra source images.
+
+    Images are downloaded through the process-wide `SourceImageCache`, so an image another job already fetched is
+    not downloaded again.
+    """
 
     extra_source_images: list[ExtraSourceImageEntry] | None = None
     """Additional uploaded images (as base64) which can be used for further operations."""
@@ -191,13 +201,13 @@ class ExtraSourceImageMixin(ResponseRequiringDownloadMixin):
         if self._downloaded_extra_source_images is None:
             self._downloaded_extra_source_images = []
 
-        if extra_source_image.image in (entry.original_url for entry in self._downloaded_extra_source_images):
+        if extra_source_image.image in {entry.original_url for entry in self._downloaded_extra_source_images}:
             logger.debug(f"Extra source image {extra_source_image.image} already downloaded.")
             return
 
         for attempt in range(max_retries):
             try:
-                downloaded_image = await self.download_file_as_base64(client_session, extra_source_image.image)
+                downloaded_image = await _async_fetch_source_image_base64(client_session, extra_source_image.image)
                 self._downloaded_extra_source_images.append(
                     ExtraSourceImageEntry(
                         image=downloaded_image,
@@ -216,12 +226,11 @@ class ExtraSourceImageMixin(ResponseRequiringDownloadMixin):
         if self.extra_source_images is None or self._downloaded_extra_source_images is None:
             return
 
-        _extra_source_images = self.extra_source_images.copy()
+        requested_order: dict[str | None, int] = {}
+        for index, extra_source_image in enumerate(self.extra_source_images):
+            requested_order.setdefault(extra_source_image.image, index)
         self._downloaded_extra_source_images.sort(
-            key=lambda entry: next(
-                (i for i, image in enumerate(_extra_source_images) if image.image == entry.original_url),
-                len(_extra_source_images),
-            ),
+            key=lambda entry: requested_order.get(entry.original_url, len(requested_order)),
         )
 
 
@@ -272,6 +281,8 @@ class ImageGenerateJobPopResponse(
     """The URL or Base64-encoded webp to use for img2img."""
     _downloaded_source_image: str | None = None
     """The downloaded source image (as base64), if any. This is not part of the API response."""
+    _source_image_digest: str | None = None
+    """The digest of the source image in the shared source image cache, once known."""
     source_processing: str | KNOWN_IMAGE_SOURCE_PROCESSING = KNOWN_IMAGE_SOURCE_PROCESSING.txt2img
     """If source_image is provided, specifies how to process it."""
     source_mask: str | None = None
@@ -280,6 +291,8 @@ class ImageGenerateJobPopResponse(
     alpha channel."""
     _downloaded_source_mask: str | None = None
     """The downloaded source mask (as base64), if any. This is not part of the API response."""
+    _source_mask_digest: str | None = None
+    """The digest of the source mask in the shared source image cache, once known."""
     r2_upload: str | None = None
     """(Obsolete) The r2 upload link to use to upload this image."""
     r2_uploads: list[str] | None = None
@@ -405,6 +418,44 @@ class ImageGenerateJobPopResponse(
         """Get the downloaded source mask."""
         return self._downloaded_source_mask
 
+    def get_cached_source_image(self) -> CachedSourceImage | None:
+        """Get the downloaded source image from the shared source image cache.
+
+        Use this rather than decoding `get_downloaded_source_image` yourself; the cache decodes each distinct image
+        once and shares its pixels between jobs.
+        """
+        if self._downloaded_source_image is None:
+            return None
+        cached = self._get_cached(self._downloaded_source_image, self._source_image_digest)
+        self._source_image_digest = cached.digest
+        return cached
+
+    def get_cached_source_mask(self) -> CachedSourceImage | None:
+        """Get the downloaded source mask from the shared source image cache."""
+        if self._downloaded_source_mask is None:
+            return None
+        cached = self._get_cached(self._downloaded_source_mask, self._source_mask_digest)
+        self._source_mask_digest = cached.digest
+        return cached
+
+    @staticmethod
+    def _get_cached(base64_str: str, digest: str | None) -> CachedSourceImage:
+        """Look an image up by its digest, only decoding and hashing `base64_str` if it is unknown or was evicted."""
+        cache = get_shared_source_image_cache()
+        cached = cache.get(digest) if digest is not None else None
+        return cached if cached is not None else cache.put_base64(base64_str)
+
+    async def _async_download_to_field(
+        self,
+        client_session: aiohttp.ClientSession,
+        url: str,
+        field_name: str,
+        digest_field_name: str,
+    ) -> None:
+        cached = await get_shared_source_image_cache().async_fetch(client_session, url)
+        setattr(self, field_name, cached.base64)
+        setattr(self, digest_field_name, cached.digest)
+
     def async_download_source_image(self, client_session: aiohttp.ClientSession) -> asyncio.Task[None]:
         """Download the source image concurrently."""
         # If the source image is not set, there is nothing to download.
@@ -417,7 +468,12 @@ class ImageGenerateJobPopResponse(
             return asyncio.create_task(asyncio.sleep(0))
 
         return asyncio.create_task(
-            self.download_file_to_field_as_base64(client_session, self.source_image, "_downloaded_source_image"),
+            self._async_download_to_field(
+                client_session,
+                self.source_image,
+                "_downloaded_source_image",
+                "_source_image_digest",
+            ),
         )
 
     def async_download_source_mask(self, client_session: aiohttp.ClientSession) -> asyncio.Task[None]:
@@ -432,7 +488,12 @@ class ImageGenerateJobPopResponse(
             return asyncio.create_task(asyncio.sleep(0))
 
         return asyncio.create_task(
-            self.download_file_to_field_as_base64(client_session, self.source_mask, "_downloaded_source_mask"),
+            self._async_download_to_field(
+                client_session,
+                self.source_mask,
+                "_downloaded_source_mask",
+                "_source_mask_digest",
+            ),
         )
 
     @override
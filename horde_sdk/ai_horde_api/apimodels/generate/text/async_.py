@@ -85,6 +85,10 @@ class TextGenerateAsyncResponse(
     def get_api_model_name(cls) -> str | None:
         return "RequestAsync"
 
+    @override
+    def get_follow_up_cleanup_priority(self) -> float:
+        return self.kudos or 0.0
+
     def __hash__(self) -> int:
         return hash(TextGenerateAsyncResponse.__name__) + hash(self.id_)
 
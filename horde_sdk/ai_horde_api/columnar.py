@@ -0,0 +1,487 @@
+"""Columnar views over the AI-Horde's bulk listing responses, built straight from the raw JSON.
+
+Validating `/workers` or `/users` into `AllWorkersDetailsResponse` or `ListUsersDetailsResponse` builds one pydantic
+object (and several nested ones) per row, which is wasted work when all that is wanted is fleet-wide aggregates. The
+functions here parse the body once and pick the numeric and categorical fields out of the rows into typed columns,
+each built only when first used:
+
+- numeric fields become `array('d')` columns, with `NaN` where a row has no value;
+- categorical fields are dictionary-encoded into `array('i')` codes (`-1` where missing) and a tuple of categories;
+- list-valued categorical fields (e.g., a worker's models) are stored Arrow-style as offsets into one flat array of
+  codes.
+
+The arrays support the buffer protocol, so `numpy.frombuffer(column.values)` (or the equivalent in Arrow or pandas)
+gives a zero-copy vectorizable view without the SDK depending on either. Simple group-bys and percentiles are also
+provided for callers without them.
+
+Example:
+    ```python
+    table = columns_from_workers_json(response_bytes)
+    table.numeric("megapixelsteps_generated").sum_by(table.categorical("type"))
+    table.numeric("uptime").percentiles([50, 90, 99])
+    ```
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from enum import auto
+from typing import Any
+
+import pydantic_core
+from strenum import StrEnum
+
+
+class COLUMN_KIND(StrEnum):
+    """How a field is stored in a `ColumnarTable`."""
+
+    numeric = auto()
+    """A number, stored as a double (`NaN` where missing)."""
+    categorical = auto()
+    """A string (or bool), dictionary-encoded as an int code (`-1` where missing)."""
+    categorical_list = auto()
+    """A list of strings, stored as offsets into a flat array of codes."""
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Where to find a field in each row of the raw JSON, and how to store it."""
+
+    name: str
+    """The name of the column."""
+    path: tuple[str, ...]
+    """The keys leading to the field in a row, e.g. `("kudos_details", "generated")`."""
+    kind: COLUMN_KIND
+    """How to store the field."""
+    parse: Callable[[Any], Any] | None = None
+    """Converts the raw value before it is stored (e.g., extracting the number from a string)."""
+
+
+class NumericColumn:
+    """A column of doubles, with `NaN` marking rows without a value."""
+
+    __slots__ = ("name", "values")
+
+    def __init__(self, name: str, values: array[float]) -> None:
+        """Initialize the column.
+
+        Args:
+            name (str): The name of the column.
+            values (array[float]): One value per row.
+        """
+        self.name = name
+        self.values = values
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.values)
+
+    def present(self) -> list[float]:
+        """Return the values of the rows which have one."""
+        return [value for value in self.values if not math.isnan(value)]
+
+    def sum(self) -> float:
+        """Return the sum of the present values."""
+        return math.fsum(self.present())
+
+    def percentiles(self, percents: Iterable[float]) -> list[float]:
+        """Return the given percentiles of the present values, linearly interpolated.
+
+        Args:
+            percents (Iterable[float]): Percentiles between 0 and 100.
+
+        Returns:
+            list[float]: The percentiles, `NaN` if no row has a value.
+        """
+        ordered = sorted(self.present())
+        results = []
+        for percent in percents:
+            if not 0 <= percent <= 100:
+                raise ValueError(f"Percentiles must be between 0 and 100, got {percent}")
+            if not ordered:
+                results.append(math.nan)
+                continue
+            position = (len(ordered) - 1) * percent / 100
+            lower = math.floor(position)
+            upper = min(lower + 1, len(ordered) - 1)
+            results.append(ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower))
+        return results
+
+    def sum_by(self, by: CategoricalColumn) -> dict[str, float]:
+        """Sum the present values grouped by the categories of another column of the same table.
+
+        Rows without a category are left out.
+
+        Args:
+            by (CategoricalColumn): The column to group by.
+
+        Returns:
+            dict[str, float]: The sum for each category.
+        """
+        totals = [0.0] * len(by.categories)
+        for code, value in zip(by.codes, self.values, strict=True):
+            if code >= 0 and not math.isnan(value):
+                totals[code] += value
+        return dict(zip(by.categories, totals, strict=True))
+
+
+class CategoricalColumn:
+    """A dictionary-encoded column of strings, with code `-1` marking rows without a value."""
+
+    __slots__ = ("categories", "codes", "name")
+
+    def __init__(self, name: str, codes: array[int], categories: tuple[str, ...]) -> None:
+        """Initialize the column.
+
+        Args:
+            name (str): The name of the column.
+            codes (array[int]): The index into `categories` for each row.
+            categories (tuple[str, ...]): The distinct values, in order of first appearance.
+        """
+        self.name = name
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> str | None:
+        """Return the value of a row."""
+        code = self.codes[row]
+        return self.categories[code] if code >= 0 else None
+
+    def value_counts(self) -> dict[str, int]:
+        """Return the number of rows with each category."""
+        counts = [0] * len(self.categories)
+        for code in self.codes:
+            if code >= 0:
+                counts[code] += 1
+        return dict(zip(self.categories, counts, strict=True))
+
+
+class CategoricalListColumn:
+    """A column of lists of strings; row `i` holds `codes[offsets[i]:offsets[i + 1]]`."""
+
+    __slots__ = ("categories", "codes", "name", "offsets")
+
+    def __init__(self, name: str, offsets: array[int], codes: array[int], categories: tuple[str, ...]) -> None:
+        """Initialize the column.
+
+        Args:
+            name (str): The name of the column.
+            offsets (array[int]): One more than the number of rows; the bounds of each row's codes.
+            codes (array[int]): The indexes into `categories` of every row's values, back to back.
+            categories (tuple[str, ...]): The distinct values, in order of first appearance.
+        """
+        self.name = name
+        self.offsets = offsets
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> list[str]:
+        """Return the values of a row."""
+        return [self.categories[code] for code in self.codes[self.offsets[row] : self.offsets[row + 1]]]
+
+    def value_counts(self) -> dict[str, int]:
+        """Return the number of rows including each category."""
+        counts = [0] * len(self.categories)
+        for code in self.codes:
+            counts[code] += 1
+        return dict(zip(self.categories, counts, strict=True))
+
+    def row_indices(self) -> Iterator[tuple[int, int]]:
+        """Yield `(row, code)` for every value of every row, i.e. the exploded column."""
+        for row in range(len(self)):
+            for code in self.codes[self.offsets[row] : self.offsets[row + 1]]:
+                yield row, code
+
+    def sum_by(self, values: NumericColumn) -> dict[str, float]:
+        """Sum a numeric column of the same table over the rows including each category.
+
+        Args:
+            values (NumericColumn): The column to sum.
+
+        Returns:
+            dict[str, float]: The sum for each category.
+        """
+        totals = [0.0] * len(self.categories)
+        for row, code in self.row_indices():
+            value = values.values[row]
+            if not math.isnan(value):
+                totals[code] += value
+        return dict(zip(self.categories, totals, strict=True))
+
+
+Column = NumericColumn | CategoricalColumn | CategoricalListColumn
+
+
+class ColumnarTable:
+    """Named, equal-length columns over the rows of a listing response.
+
+    Columns are built from the parsed rows the first time they are accessed, so only the columns actually used cost
+    anything. Once every column has been built (see `materialize`), the parsed rows are released.
+    """
+
+    __slots__ = ("_columns", "_rows", "_specs", "row_count")
+
+    def __init__(self, rows: Sequence[Mapping[str, Any]], specs: Sequence[ColumnSpec]) -> None:
+        """Initialize the table.
+
+        Args:
+            rows (Sequence[Mapping[str, Any]]): The parsed JSON rows.
+            specs (Sequence[ColumnSpec]): The columns which can be built from them.
+        """
+        self.row_count = len(rows)
+        self._rows: Sequence[Mapping[str, Any]] | None = rows
+        self._specs = {spec.name: spec for spec in specs}
+        self._columns: dict[str, Column] = {}
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return self.row_count
+
+    def __getitem__(self, name: str) -> Column:
+        """Return the column named `name`, building it if needed."""
+        column = self._columns.get(name)
+        if column is not None:
+            return column
+
+        spec = self._specs[name]
+        assert self._rows is not None  # Only released once every column is built
+        column = _build_column(spec, self._rows)
+        self._columns[name] = column
+        if len(self._columns) == len(self._specs):
+            self._rows = None
+        return column
+
+    @property
+    def column_names(self) -> list[str]:
+        """The names of the columns which can be accessed."""
+        return list(self._specs)
+
+    def materialize(self) -> dict[str, Column]:
+        """Build every column, release the parsed rows, and return the columns by name."""
+        return {name: self[name] for name in self._specs}
+
+    def numeric(self, name: str) -> NumericColumn:
+        """Return the numeric column named `name`."""
+        column = self[name]
+        if not isinstance(column, NumericColumn):
+            raise TypeError(f"Column '{name}' is not numeric")
+        return column
+
+    def categorical(self, name: str) -> CategoricalColumn:
+        """Return the categorical column named `name`."""
+        column = self[name]
+        if not isinstance(column, CategoricalColumn):
+            raise TypeError(f"Column '{name}' is not categorical")
+        return column
+
+    def categorical_list(self, name: str) -> CategoricalListColumn:
+        """Return the list-valued categorical column named `name`."""
+        column = self[name]
+        if not isinstance(column, CategoricalListColumn):
+            raise TypeError(f"Column '{name}' is not a categorical list")
+        return column
+
+
+class _Encoder:
+    """Dictionary-encodes strings in order of first appearance."""
+
+    __slots__ = ("categories", "index")
+
+    def __init__(self) -> None:
+        self.categories: list[str] = []
+        self.index: dict[str, int] = {}
+
+    def encode(self, value: object) -> int:
+        key = value if isinstance(value, str) else str(value).lower() if isinstance(value, bool) else str(value)
+        code = self.index.get(key)
+        if code is None:
+            code = len(self.categories)
+            self.index[key] = code
+            self.categories.append(key)
+        return code
+
+
+def _dig(row: Mapping[str, Any], path: tuple[str, ...]) -> Any:  # noqa: ANN401
+    value: Any = row
+    for key in path:
+        if not isinstance(value, Mapping):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _load_rows(raw: bytes | str | Sequence[Mapping[str, Any]]) -> Sequence[Mapping[str, Any]]:
+    rows = pydantic_core.from_json(raw) if isinstance(raw, bytes | str) else raw
+    if not isinstance(rows, list | tuple):
+        raise ValueError(f"Expected a JSON array of objects, got {type(rows).__name__}")
+    return rows
+
+
+def _build_column(spec: ColumnSpec, rows: Sequence[Mapping[str, Any]]) -> Column:
+    raw_values = [_dig(row, spec.path) for row in rows]
+    if spec.parse is not None:
+        raw_values = [spec.parse(value) if value is not None else None for value in raw_values]
+
+    if spec.kind == COLUMN_KIND.numeric:
+        values = array("d")
+        for value in raw_values:
+            try:
+                values.append(float(value) if value is not None else math.nan)
+            except (TypeError, ValueError):
+                values.append(math.nan)
+        return NumericColumn(spec.name, values)
+
+    encoder = _Encoder()
+    if spec.kind == COLUMN_KIND.categorical:
+        codes = array("i", (encoder.encode(value) if value is not None else -1 for value in raw_values))
+        return CategoricalColumn(spec.name, codes, tuple(encoder.categories))
+
+    offsets = array("l", [0])
+    flat_codes = array("i")
+    for value in raw_values:
+        if isinstance(value, list):
+            flat_codes.extend(encoder.encode(item) for item in value if item is not None)
+        offsets.append(len(flat_codes))
+    return CategoricalListColumn(spec.name, offsets, flat_codes, tuple(encoder.categories))
+
+
+def build_columnar_table(
+    raw: bytes | str | Sequence[Mapping[str, Any]],
+    specs: Sequence[ColumnSpec],
+) -> ColumnarTable:
+    """Parse a raw JSON array of objects into a `ColumnarTable`, without constructing any models.
+
+    The body is parsed once; each column is built when first accessed. Values which are missing, `null`, or (for
+    numeric columns) not convertible to a number are stored as missing.
+
+    Args:
+        raw (bytes | str | Sequence[Mapping[str, Any]]): The response body, or the already-parsed JSON array.
+        specs (Sequence[ColumnSpec]): The columns the table offers.
+
+    Returns:
+        ColumnarTable: The table.
+
+    Raises:
+        ValueError: If `raw` is not a JSON array.
+    """
+    return ColumnarTable(_load_rows(raw), specs)
+
+
+_LEADING_NUMBER = re.compile(r"^\s*([-+]?\d+(?:\.\d+)?)")
+
+
+def parse_leading_number(value: object) -> float | None:
+    """Parse the number at the start of a string such as a worker's `"1.5 megapixelsteps per second"`."""
+    if isinstance(value, int | float):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = _LEADING_NUMBER.match(value)
+    return float(match.group(1)) if match else None
+
+
+def _names_of(value: object) -> list[object] | None:
+    if not isinstance(value, list):
+        return None
+    return [item.get("name") if isinstance(item, Mapping) else item for item in value]
+
+
+WORKER_COLUMNS: tuple[ColumnSpec, ...] = (
+    ColumnSpec("name", ("name",), COLUMN_KIND.categorical),
+    ColumnSpec("type", ("type",), COLUMN_KIND.categorical),
+    ColumnSpec("online", ("online",), COLUMN_KIND.categorical),
+    ColumnSpec("maintenance_mode", ("maintenance_mode",), COLUMN_KIND.categorical),
+    ColumnSpec("trusted", ("trusted",), COLUMN_KIND.categorical),
+    ColumnSpec("bridge_agent", ("bridge_agent",), COLUMN_KIND.categorical),
+    ColumnSpec("team", ("team", "name"), COLUMN_KIND.categorical),
+    ColumnSpec("requests_fulfilled", ("requests_fulfilled",), COLUMN_KIND.numeric),
+    ColumnSpec("kudos_rewards", ("kudos_rewards",), COLUMN_KIND.numeric),
+    ColumnSpec("kudos_generated", ("kudos_details", "generated"), COLUMN_KIND.numeric),
+    ColumnSpec("kudos_uptime", ("kudos_details", "uptime"), COLUMN_KIND.numeric),
+    ColumnSpec("performance", ("performance",), COLUMN_KIND.numeric, parse=parse_leading_number),
+    ColumnSpec("threads", ("threads",), COLUMN_KIND.numeric),
+    ColumnSpec("uptime", ("uptime",), COLUMN_KIND.numeric),
+    ColumnSpec("uncompleted_jobs", ("uncompleted_jobs",), COLUMN_KIND.numeric),
+    ColumnSpec("max_pixels", ("max_pixels",), COLUMN_KIND.numeric),
+    ColumnSpec("megapixelsteps_generated", ("megapixelsteps_generated",), COLUMN_KIND.numeric),
+    ColumnSpec("tokens_generated", ("tokens_generated",), COLUMN_KIND.numeric),
+    ColumnSpec("max_length", ("max_length",), COLUMN_KIND.numeric),
+    ColumnSpec("max_context_length", ("max_context_length",), COLUMN_KIND.numeric),
+    ColumnSpec("models", ("models",), COLUMN_KIND.categorical_list),
+    ColumnSpec("forms", ("forms",), COLUMN_KIND.categorical_list),
+)
+"""The columns built from `AllWorkersDetailsResponse` (`WorkerDetailItem`) rows."""
+
+USER_COLUMNS: tuple[ColumnSpec, ...] = (
+    ColumnSpec("username", ("username",), COLUMN_KIND.categorical),
+    ColumnSpec("trusted", ("trusted",), COLUMN_KIND.categorical),
+    ColumnSpec("flagged", ("flagged",), COLUMN_KIND.categorical),
+    ColumnSpec("id", ("id",), COLUMN_KIND.numeric),
+    ColumnSpec("kudos", ("kudos",), COLUMN_KIND.numeric),
+    ColumnSpec("evaluating_kudos", ("evaluating_kudos",), COLUMN_KIND.numeric),
+    ColumnSpec("account_age", ("account_age",), COLUMN_KIND.numeric),
+    ColumnSpec("concurrency", ("concurrency",), COLUMN_KIND.numeric),
+    ColumnSpec("worker_count", ("worker_count",), COLUMN_KIND.numeric),
+    ColumnSpec("kudos_accumulated", ("kudos_details", "accumulated"), COLUMN_KIND.numeric),
+    ColumnSpec("kudos_awarded", ("kudos_details", "awarded"), COLUMN_KIND.numeric),
+    ColumnSpec("kudos_received", ("kudos_details", "received"), COLUMN_KIND.numeric),
+    ColumnSpec("megapixelsteps_contributed", ("contributions", "megapixelsteps"), COLUMN_KIND.numeric),
+    ColumnSpec("fulfillments", ("contributions", "fulfillments"), COLUMN_KIND.numeric),
+    ColumnSpec("megapixelsteps_used", ("usage", "megapixelsteps"), COLUMN_KIND.numeric),
+    ColumnSpec("requests", ("usage", "requests"), COLUMN_KIND.numeric),
+)
+"""The columns built from `ListUsersDetailsResponse` (`UserDetailsResponse`) rows."""
+
+MODEL_COLUMNS: tuple[ColumnSpec, ...] = (
+    ColumnSpec("name", ("name",), COLUMN_KIND.categorical),
+    ColumnSpec("type", ("type",), COLUMN_KIND.categorical),
+    ColumnSpec("count", ("count",), COLUMN_KIND.numeric),
+    ColumnSpec("eta", ("eta",), COLUMN_KIND.numeric),
+    ColumnSpec("jobs", ("jobs",), COLUMN_KIND.numeric),
+    ColumnSpec("performance", ("performance",), COLUMN_KIND.numeric),
+    ColumnSpec("queued", ("queued",), COLUMN_KIND.numeric),
+)
+"""The columns built from `HordeStatusModelsAllResponse` (`ActiveModel`) rows."""
+
+TEAM_COLUMNS: tuple[ColumnSpec, ...] = (
+    ColumnSpec("name", ("name",), COLUMN_KIND.categorical),
+    ColumnSpec("creator", ("creator",), COLUMN_KIND.categorical),
+    ColumnSpec("kudos", ("kudos",), COLUMN_KIND.numeric),
+    ColumnSpec("requests_fulfilled", ("requests_fulfilled",), COLUMN_KIND.numeric),
+    ColumnSpec("uptime", ("uptime",), COLUMN_KIND.numeric),
+    ColumnSpec("worker_count", ("worker_count",), COLUMN_KIND.numeric),
+    ColumnSpec("models", ("models",), COLUMN_KIND.categorical_list, parse=_names_of),
+)
+"""The columns built from `AllTeamDetailsResponse` (`TeamDetails`) rows."""
+
+
+def columns_from_workers_json(raw: bytes | str | Sequence[Mapping[str, Any]]) -> ColumnarTable:
+    """Build the `WORKER_COLUMNS` of a `/workers` response body without constructing `WorkerDetailItem`s."""
+    return build_columnar_table(raw, WORKER_COLUMNS)
+
+
+def columns_from_users_json(raw: bytes | str | Sequence[Mapping[str, Any]]) -> ColumnarTable:
+    """Build the `USER_COLUMNS` of a `/users` response body without constructing `UserDetailsResponse`s."""
+    return build_columnar_table(raw, USER_COLUMNS)
+
+
+def columns_from_models_json(raw: bytes | str | Sequence[Mapping[str, Any]]) -> ColumnarTable:
+    """Build the `MODEL_COLUMNS` of a `/status/models` response body without constructing `ActiveModel`s."""
+    return build_columnar_table(raw, MODEL_COLUMNS)
+
+
+def columns_from_teams_json(raw: bytes | str | Sequence[Mapping[str, Any]]) -> ColumnarTable:
+    """Build the `TEAM_COLUMNS` of a `/teams` response body without constructing `TeamDetails`."""
+    return build_columnar_table(raw, TEAM_COLUMNS)
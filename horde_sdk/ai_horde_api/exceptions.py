@@ -64,3 +64,26 @@ class AIHordeServerException(HordeException):
         if error_response.object_data is not None:
             logger.error(f"Response object data: {error_response.object_data}")
         super().__init__(message)
+
+
+class AIHordeKeyPoolExhaustedError(HordeException):
+    """Exception for when every API key of a key pool has used up its kudos budget."""
+
+
+class AIHordeImageDownloadError(HordeException):
+    """Exception for when a downloaded generation image is not the size the server announced."""
+
+    def __init__(self, *, url: str, expected_length: int, received_length: int) -> None:
+        """Initialize the exception.
+
+        Args:
+            url: The URL the image was downloaded from.
+            expected_length: The size announced by the `Content-Length` header.
+            received_length: The number of bytes actually received.
+        """
+        self.url = url
+        self.expected_length = expected_length
+        self.received_length = received_length
+        super().__init__(
+            f"Downloaded {received_length} bytes from {url}, but the server announced {expected_length}",
+        )
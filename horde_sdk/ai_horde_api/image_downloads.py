@@ -0,0 +1,299 @@
+"""Concurrent download of the images of completed image generations.
+
+`download_image_from_generation` fetches and decodes one image at a time. The functions here fetch every image of
+a batch at once over one pooled session, and either stream each image to a file or return its raw bytes, without
+decoding anything with PIL. Downloads whose size does not match the `Content-Length` the server announced are
+rejected rather than silently truncated.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import os
+import urllib.parse
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import aiohttp
+import requests
+import requests.adapters
+from loguru import logger
+
+from horde_sdk import _default_sslcontext
+from horde_sdk.ai_horde_api.apimodels import ImageGeneration
+from horde_sdk.ai_horde_api.exceptions import AIHordeImageDownloadError
+from horde_sdk.ai_horde_api.fields import GenerationID
+
+DEFAULT_IMAGE_DOWNLOAD_CONCURRENCY = 8
+"""The default number of images downloaded at once."""
+
+DEFAULT_IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+"""The number of bytes read from the network at a time when streaming an image to a file."""
+
+DEFAULT_IMAGE_FILE_EXTENSION = "webp"
+"""The extension given to image files; the AI-Horde returns generations as WebP."""
+
+
+@dataclass(frozen=True)
+class DownloadedImage:
+    """One downloaded (or base64-decoded) generation image."""
+
+    generation_id: GenerationID
+    """The generation the image belongs to."""
+    size: int
+    """The size of the image, in bytes."""
+    data: bytes | None = None
+    """The image bytes, if it was not written to a file."""
+    path: Path | None = None
+    """Where the image was written, if a destination directory was given."""
+
+
+def _is_url(img: str) -> bool:
+    return urllib.parse.urlparse(img).scheme in ("http", "https")
+
+
+def _expected_length(content_length: int | str | None, content_encoding: str | None) -> int | None:
+    # A compressed response's Content-Length counts the compressed bytes, not the decoded ones we receive.
+    if content_length is None or (content_encoding and content_encoding.lower() != "identity"):
+        return None
+    return int(content_length)
+
+
+def _check_length(url: str, expected: int | None, received: int) -> None:
+    if expected is not None and received != expected:
+        raise AIHordeImageDownloadError(url=url, expected_length=expected, received_length=received)
+
+
+def _destination_path(destination_dir: Path, generation: ImageGeneration, file_extension: str) -> Path:
+    return destination_dir / f"{generation.id_}.{file_extension}"
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    partial_path = path.with_name(path.name + ".part")
+    partial_path.write_bytes(data)
+    os.replace(partial_path, path)
+
+
+def _decode_base64_generation(
+    generation: ImageGeneration,
+    destination_dir: Path | None,
+    file_extension: str,
+) -> DownloadedImage:
+    data = base64.b64decode(generation.img)
+    if destination_dir is None:
+        return DownloadedImage(generation_id=generation.id_, size=len(data), data=data)
+
+    path = _destination_path(destination_dir, generation, file_extension)
+    _write_atomically(path, data)
+    return DownloadedImage(generation_id=generation.id_, size=len(data), path=path)
+
+
+def _download_one(
+    session: requests.Session,
+    generation: ImageGeneration,
+    destination_dir: Path | None,
+    file_extension: str,
+    timeout: float | None,
+) -> DownloadedImage:
+    if not _is_url(generation.img):
+        return _decode_base64_generation(generation, destination_dir, file_extension)
+
+    url = generation.img
+    with session.get(url, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            logger.error(f"Error downloading image: {response.status_code}")
+            response.raise_for_status()
+
+        expected = _expected_length(
+            response.headers.get("Content-Length"),
+            response.headers.get("Content-Encoding"),
+        )
+
+        if destination_dir is None:
+            data = response.content
+            _check_length(url, expected, len(data))
+            return DownloadedImage(generation_id=generation.id_, size=len(data), data=data)
+
+        path = _destination_path(destination_dir, generation, file_extension)
+        partial_path = path.with_name(path.name + ".part")
+        received = 0
+        try:
+            with open(partial_path, "wb") as file:
+                for chunk in response.iter_content(chunk_size=DEFAULT_IMAGE_DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+                    received += len(chunk)
+            _check_length(url, expected, received)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        os.replace(partial_path, path)
+
+    logger.debug(f"Downloaded image: {url}")
+    return DownloadedImage(generation_id=generation.id_, size=received, path=path)
+
+
+def download_generation_images(
+    generations: Sequence[ImageGeneration],
+    *,
+    destination_dir: str | Path | None = None,
+    max_concurrency: int = DEFAULT_IMAGE_DOWNLOAD_CONCURRENCY,
+    session: requests.Session | None = None,
+    file_extension: str = DEFAULT_IMAGE_FILE_EXTENSION,
+    timeout: float | None = None,
+) -> list[DownloadedImage]:
+    """Download the images of `generations` concurrently, without decoding them.
+
+    Generations whose `img` is base64 rather than a URL are decoded from base64 without any request.
+
+    Args:
+        generations (Sequence[ImageGeneration]): The generations whose images to download.
+        destination_dir (str | Path | None, optional): If given, each image is streamed to
+            `<destination_dir>/<generation id>.<file_extension>` instead of being returned as bytes. The directory
+            is created if needed. Defaults to None.
+        max_concurrency (int, optional): The most images downloaded at once. Defaults to 8.
+        session (requests.Session | None, optional): The session to download with. Defaults to a new session with a
+            connection pool of `max_concurrency` connections, closed when done.
+        file_extension (str, optional): The extension of written files. Defaults to "webp".
+        timeout (float | None, optional): The timeout of each request, in seconds. Defaults to None.
+
+    Returns:
+        list[DownloadedImage]: The images, in the order of `generations`.
+
+    Raises:
+        ValueError: If `max_concurrency` is less than 1.
+        requests.HTTPError: If an image could not be downloaded.
+        AIHordeImageDownloadError: If an image's size did not match its `Content-Length`.
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+    directory = Path(destination_dir) if destination_dir is not None else None
+    if directory is not None:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    owns_session = session is None
+    if session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, max(len(generations), 1)),
+            thread_name_prefix="horde-sdk-download",
+        ) as executor:
+            futures = [
+                executor.submit(_download_one, session, generation, directory, file_extension, timeout)
+                for generation in generations
+            ]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        if owns_session:
+            session.close()
+
+
+async def _async_download_one(
+    aiohttp_session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    generation: ImageGeneration,
+    destination_dir: Path | None,
+    file_extension: str,
+) -> DownloadedImage:
+    if not _is_url(generation.img):
+        return _decode_base64_generation(generation, destination_dir, file_extension)
+
+    url = generation.img
+    async with semaphore, aiohttp_session.get(url, ssl=_default_sslcontext) as response:
+        if response.status != 200:
+            logger.error(f"Error downloading image: {response.status}")
+            response.raise_for_status()
+
+        expected = _expected_length(response.content_length, response.headers.get("Content-Encoding"))
+
+        if destination_dir is None:
+            data = await response.read()
+            _check_length(url, expected, len(data))
+            return DownloadedImage(generation_id=generation.id_, size=len(data), data=data)
+
+        path = _destination_path(destination_dir, generation, file_extension)
+        partial_path = path.with_name(path.name + ".part")
+        received = 0
+        try:
+            # File writes go to a thread so a slow disk does not stall the other downloads on the event loop.
+            file = await asyncio.to_thread(partial_path.open, "wb")
+            try:
+                async for chunk in response.content.iter_chunked(DEFAULT_IMAGE_DOWNLOAD_CHUNK_SIZE):
+                    await asyncio.to_thread(file.write, chunk)
+                    received += len(chunk)
+            finally:
+                await asyncio.to_thread(file.close)
+            _check_length(url, expected, received)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        os.replace(partial_path, path)
+
+    logger.debug(f"Downloaded image: {url}")
+    return DownloadedImage(generation_id=generation.id_, size=received, path=path)
+
+
+async def async_download_generation_images(
+    aiohttp_session: aiohttp.ClientSession,
+    generations: Sequence[ImageGeneration],
+    *,
+    destination_dir: str | Path | None = None,
+    max_concurrency: int = DEFAULT_IMAGE_DOWNLOAD_CONCURRENCY,
+    file_extension: str = DEFAULT_IMAGE_FILE_EXTENSION,
+) -> list[DownloadedImage]:
+    """Asynchronously download the images of `generations` concurrently, without decoding them.
+
+    Generations whose `img` is base64 rather than a URL are decoded from base64 without any request. If any download
+    fails, the others are cancelled.
+
+    Args:
+        aiohttp_session (aiohttp.ClientSession): The session to download with.
+        generations (Sequence[ImageGeneration]): The generations whose images to download.
+        destination_dir (str | Path | None, optional): If given, each image is streamed to
+            `<destination_dir>/<generation id>.<file_extension>` instead of being returned as bytes. The directory
+            is created if needed. Defaults to None.
+        max_concurrency (int, optional): The most images downloaded at once. Defaults to 8.
+        file_extension (str, optional): The extension of written files. Defaults to "webp".
+
+    Returns:
+        list[DownloadedImage]: The images, in the order of `generations`.
+
+    Raises:
+        ValueError: If `max_concurrency` is less than 1.
+        aiohttp.ClientResponseError: If an image could not be downloaded.
+        AIHordeImageDownloadError: If an image's size did not match its `Content-Length`.
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+    directory = Path(destination_dir) if destination_dir is not None else None
+    if directory is not None:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [
+        asyncio.create_task(
+            _async_download_one(aiohttp_session, semaphore, generation, directory, file_extension),
+        )
+        for generation in generations
+    ]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -0,0 +1,377 @@
+"""An async AI-Horde client session which spreads requests over a pool of API keys.
+
+Operators running many keys (often shared keys, see `SharedKeyCreateRequest`) would otherwise need one client per
+key and their own logic to pick between them. `AIHordeAPIKeyPoolClientSession` holds all of the keys behind one
+aiohttp session (so one connection pool) and, for every request which accepts an API key and does not carry one
+already:
+
+- routes it to the key with the most of its request budget left, skipping keys cooling down after a 429 or whose
+  kudos budget is used up, and waiting for one to free up if need be;
+- retries a request rejected with a 429 on another key; and
+- pins follow-ups which carry a key (such as the job submit after a pop, or its failure-cleanup) to the key which
+  created the job. Status checks and deletes are not keyed by the API, so any key may send them.
+
+The kudos each key's jobs are expected to cost is tallied from the responses, and shared key budgets can be loaded
+from the API with `refresh_shared_key_budgets`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable, Sequence
+from contextvars import ContextVar
+from ssl import SSLContext
+from typing import Any, override
+
+import aiohttp
+from loguru import logger
+from pydantic import BaseModel
+
+from horde_sdk import _default_sslcontext
+from horde_sdk.ai_horde_api.apimodels import (
+    ExpiryStrSharedKeyDetailsResponse,
+    SharedKeyDetailsRequest,
+)
+from horde_sdk.ai_horde_api.exceptions import AIHordeKeyPoolExhaustedError
+from horde_sdk.ai_horde_api.metadata import AIHordePathData, AIHordeQueryData
+from horde_sdk.consts import HTTPStatusCode
+from horde_sdk.generic_api.apimodels import (
+    APIKeyAllowedInRequestMixin,
+    HordeRequest,
+    RequestErrorResponse,
+    ResponseRequiringFollowUpMixin,
+)
+from horde_sdk.generic_api.consts import ANON_API_KEY
+from horde_sdk.generic_api.follow_ups import DEFAULT_CLEANUP_CONCURRENCY
+from horde_sdk.generic_api.generic_clients import (
+    GenericAsyncHordeAPISession,
+    HordeResponseTypeVar,
+)
+
+DEFAULT_KEY_REQUESTS_PER_SECOND = 2.0
+"""The default sustained request rate allowed per key."""
+
+DEFAULT_KEY_REQUEST_BURST = 5
+"""The default number of requests a key may send at once after being idle."""
+
+DEFAULT_RATE_LIMIT_COOLDOWN = 5.0
+"""The default time, in seconds, a key is rested after a 429. Repeated 429s double it, up to a minute."""
+
+DEFAULT_RATE_LIMIT_RETRIES = 2
+"""The default number of times a request rejected with a 429 is retried on another key."""
+
+_MAX_RATE_LIMIT_COOLDOWN = 60.0
+
+_response_status: ContextVar[int | None] = ContextVar("_response_status", default=None)
+"""The HTTP status of the last response handled in the current task."""
+
+
+def _key_label(apikey: str) -> str:
+    """Return a label identifying a key in logs and stats without revealing it."""
+    return f"...{apikey[-4:]}"
+
+
+class APIKeyUsage(BaseModel):
+    """How one key of a key pool has been used."""
+
+    label: str
+    """The last characters of the key, to identify it."""
+    requests: int
+    """The requests sent with the key."""
+    in_flight: int
+    """The requests sent with the key which have not returned yet."""
+    rate_limited: int
+    """The requests rejected with a 429."""
+    cooling_down_for: float
+    """The time, in seconds, until the key is used again after a 429; `0` if it is not cooling down."""
+    kudos_spent: float
+    """The kudos the key's jobs were expected to cost (plus, for shared keys, what was utilized before)."""
+    kudos_budget: float | None
+    """The most kudos to spend with the key, if limited."""
+
+
+class APIKeyPoolStats(BaseModel):
+    """How a key pool has been used."""
+
+    keys: list[APIKeyUsage]
+    """The usage of each key, in the order the keys were given."""
+    pinned_requests: int
+    """The requests sent with the key of the job they followed up on."""
+    rate_limit_retries: int
+    """The requests retried on another key after a 429."""
+    budget_waits: int
+    """The times a request had to wait for a key to have budget left."""
+
+
+class _KeyState:
+    """The request budget and usage of one key, as a token bucket refilled at the pool's request rate."""
+
+    __slots__ = (
+        "apikey",
+        "consecutive_rate_limits",
+        "cooldown_until",
+        "in_flight",
+        "kudos_budget",
+        "kudos_spent",
+        "rate_limited",
+        "refilled_at",
+        "requests",
+        "tokens",
+    )
+
+    def __init__(self, apikey: str, *, burst: int, now: float) -> None:
+        self.apikey = apikey
+        self.tokens = float(burst)
+        self.refilled_at = now
+        self.cooldown_until = 0.0
+        self.consecutive_rate_limits = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.kudos_spent = 0.0
+        self.kudos_budget: float | None = None
+
+    @property
+    def exhausted(self) -> bool:
+        return self.kudos_budget is not None and self.kudos_spent >= self.kudos_budget
+
+    def refill(self, now: float, *, rate: float, burst: int) -> None:
+        self.tokens = min(float(burst), self.tokens + (now - self.refilled_at) * rate)
+        self.refilled_at = now
+
+    def seconds_until_usable(self, now: float, *, rate: float) -> float:
+        return max(self.cooldown_until - now, (1 - self.tokens) / rate, 0.0)
+
+
+class AIHordeAPIKeyPoolClientSession(GenericAsyncHordeAPISession):
+    """An async AI-Horde client session which spreads requests over several API keys; see the module documentation.
+
+    Requests which already carry an API key (other than the anonymous one) are sent as they are.
+    """
+
+    def __init__(
+        self,
+        aiohttp_session: aiohttp.ClientSession,
+        apikeys: Sequence[str],
+        *,
+        requests_per_second: float = DEFAULT_KEY_REQUESTS_PER_SECOND,
+        burst: int = DEFAULT_KEY_REQUEST_BURST,
+        rate_limit_cooldown: float = DEFAULT_RATE_LIMIT_COOLDOWN,
+        rate_limit_retries: int = DEFAULT_RATE_LIMIT_RETRIES,
+        kudos_budgets: dict[str, float] | None = None,
+        ssl_context: SSLContext = _default_sslcontext,
+        cleanup_concurrency: int = DEFAULT_CLEANUP_CONCURRENCY,
+        cleanup_deadline: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create a key pool session.
+
+        Args:
+            aiohttp_session (aiohttp.ClientSession): The session every key's requests are sent with.
+            apikeys (Sequence[str]): The API keys to spread requests over.
+            requests_per_second (float, optional): The sustained request rate allowed per key. Defaults to 2.
+            burst (int, optional): The requests a key may send at once after being idle. Defaults to 5.
+            rate_limit_cooldown (float, optional): How long, in seconds, to rest a key after a 429. Repeated 429s
+                double it, up to a minute. Defaults to 5.
+            rate_limit_retries (int, optional): How many times to retry a request rejected with a 429 on another
+                key. Defaults to 2.
+            kudos_budgets (dict[str, float] | None, optional): The most kudos to spend with each key, for the keys
+                which are limited. Defaults to None.
+            ssl_context (SSLContext, optional): The SSL context to use for requests. Defaults to using `certifi`.
+            cleanup_concurrency (int, optional): How many failure-cleanups to send at once on exit. Defaults to 8.
+            cleanup_deadline (float | None, optional): The most time, in seconds, to spend on failure-cleanups on
+                exit. Defaults to None, which waits for all of them.
+            clock (Callable[[], float], optional): The monotonic clock budgets are measured with.
+                Defaults to `time.monotonic`.
+
+        Raises:
+            ValueError: If no keys are given, a key is given twice, or a budget setting is not positive.
+        """
+        if not apikeys:
+            raise ValueError("A key pool needs at least one API key")
+        if len(set(apikeys)) != len(apikeys):
+            raise ValueError("Each API key may only be given once")
+        if requests_per_second <= 0:
+            raise ValueError(f"requests_per_second must be positive, got {requests_per_second}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        if rate_limit_cooldown <= 0:
+            raise ValueError(f"rate_limit_cooldown must be positive, got {rate_limit_cooldown}")
+
+        super().__init__(
+            aiohttp_session,
+            apikey=apikeys[0],
+            path_fields=AIHordePathData,
+            query_fields=AIHordeQueryData,
+            ssl_context=ssl_context,
+            cleanup_concurrency=cleanup_concurrency,
+            cleanup_deadline=cleanup_deadline,
+        )
+        self._clock = clock
+        self._requests_per_second = requests_per_second
+        self._burst = burst
+        self._rate_limit_cooldown = rate_limit_cooldown
+        self._rate_limit_retries = rate_limit_retries
+
+        now = clock()
+        self._keys = {apikey: _KeyState(apikey, burst=burst, now=now) for apikey in apikeys}
+        for apikey, budget in (kudos_budgets or {}).items():
+            self.set_kudos_budget(apikey, budget)
+
+        self._pinned_requests = 0
+        self._rate_limit_retry_count = 0
+        self._budget_waits = 0
+
+    def set_kudos_budget(self, apikey: str, kudos_budget: float | None) -> None:
+        """Limit (or, with `None`, stop limiting) the kudos spent with a key of the pool.
+
+        Raises:
+            KeyError: If the key is not in the pool.
+        """
+        self._keys[apikey].kudos_budget = kudos_budget
+
+    def stats(self) -> APIKeyPoolStats:
+        """Return how the pool's keys have been used."""
+        now = self._clock()
+        return APIKeyPoolStats(
+            keys=[
+                APIKeyUsage(
+                    label=_key_label(state.apikey),
+                    requests=state.requests,
+                    in_flight=state.in_flight,
+                    rate_limited=state.rate_limited,
+                    cooling_down_for=max(state.cooldown_until - now, 0.0),
+                    kudos_spent=state.kudos_spent,
+                    kudos_budget=state.kudos_budget,
+                )
+                for state in self._keys.values()
+            ],
+            pinned_requests=self._pinned_requests,
+            rate_limit_retries=self._rate_limit_retry_count,
+            budget_waits=self._budget_waits,
+        )
+
+    async def refresh_shared_key_budgets(self) -> None:
+        """Load the kudos limit and utilization of every shared key in the pool from the API.
+
+        Shared keys are told apart from user keys by their UUID form. Keys whose details cannot be fetched are left
+        as they are.
+        """
+        for state in self._keys.values():
+            if len(state.apikey) != 36:
+                continue
+
+            api_request = SharedKeyDetailsRequest(id=state.apikey)
+            response = await super().submit_request(api_request, api_request.get_default_success_response_type())
+            if not isinstance(response, ExpiryStrSharedKeyDetailsResponse):
+                logger.warning(f"Could not fetch the details of shared key {_key_label(state.apikey)}")
+                continue
+
+            state.kudos_budget = None if response.kudos == -1 else float(response.kudos)
+            state.kudos_spent = float(response.utilized)
+
+    @override
+    def _after_request_handling(
+        self,
+        *,
+        raw_response_json: dict[str, Any],
+        returned_status_code: int,
+        expected_response_type: type[HordeResponseTypeVar],
+    ) -> HordeResponseTypeVar | RequestErrorResponse:
+        # Remember the status for `submit_request`, which only gets the parsed response back.
+        _response_status.set(returned_status_code)
+        return super()._after_request_handling(
+            raw_response_json=raw_response_json,
+            returned_status_code=returned_status_code,
+            expected_response_type=expected_response_type,
+        )
+
+    @override
+    async def submit_request(
+        self,
+        api_request: HordeRequest,
+        expected_response_type: type[HordeResponseTypeVar],
+    ) -> HordeResponseTypeVar | RequestErrorResponse:
+        if not isinstance(api_request, APIKeyAllowedInRequestMixin) or api_request.apikey not in (None, ANON_API_KEY):
+            return await super().submit_request(api_request, expected_response_type)
+
+        async with self._pending_follow_ups_lock:
+            pending = self._pending_follow_ups.find(api_request)
+        if pending is not None and isinstance(pending.request, APIKeyAllowedInRequestMixin):
+            pinned = self._keys.get(pending.request.apikey or "")
+            if pinned is not None:
+                self._pinned_requests += 1
+                return await self._submit_with_key(pinned, api_request, expected_response_type)
+
+        excluded: set[str] = set()
+        retries = 0
+        while True:
+            state = await self._acquire_key(excluded)
+            response = await self._submit_with_key(state, api_request, expected_response_type)
+            if _response_status.get() != HTTPStatusCode.TOO_MANY_REQUESTS or retries >= self._rate_limit_retries:
+                return response
+
+            retries += 1
+            self._rate_limit_retry_count += 1
+            excluded.add(state.apikey)
+            if len(excluded) == len(self._keys):
+                excluded.clear()
+
+    async def _submit_with_key(
+        self,
+        state: _KeyState,
+        api_request: HordeRequest,
+        expected_response_type: type[HordeResponseTypeVar],
+    ) -> HordeResponseTypeVar | RequestErrorResponse:
+        routed_request = api_request.model_copy(update={"apikey": state.apikey})
+        state.requests += 1
+        state.in_flight += 1
+        _response_status.set(None)
+        try:
+            response = await super().submit_request(routed_request, expected_response_type)
+        finally:
+            state.in_flight -= 1
+
+        if _response_status.get() == HTTPStatusCode.TOO_MANY_REQUESTS:
+            state.rate_limited += 1
+            state.consecutive_rate_limits += 1
+            cooldown = self._rate_limit_cooldown * 2 ** (state.consecutive_rate_limits - 1)
+            state.cooldown_until = self._clock() + min(cooldown, _MAX_RATE_LIMIT_COOLDOWN)
+            logger.debug(f"API key {_key_label(state.apikey)} was rate limited; resting it for {cooldown:.1f}s")
+        elif not isinstance(response, RequestErrorResponse):
+            state.consecutive_rate_limits = 0
+            kudos = getattr(response, "kudos", None)
+            if isinstance(response, ResponseRequiringFollowUpMixin) and isinstance(kudos, int | float):
+                state.kudos_spent += kudos
+
+        return response
+
+    async def _acquire_key(self, excluded: set[str]) -> _KeyState:
+        """Take one request of budget from the best key, waiting until one has budget left if none has."""
+        waited = False
+        while True:
+            now = self._clock()
+            candidates = [
+                state for state in self._keys.values() if not state.exhausted and state.apikey not in excluded
+            ]
+            if not candidates:
+                candidates = [state for state in self._keys.values() if not state.exhausted]
+            if not candidates:
+                raise AIHordeKeyPoolExhaustedError("Every API key in the pool has used up its kudos budget")
+
+            for state in candidates:
+                state.refill(now, rate=self._requests_per_second, burst=self._burst)
+
+            ready = [state for state in candidates if state.cooldown_until <= now and state.tokens >= 1]
+            if ready:
+                best = max(ready, key=lambda state: (state.tokens - state.in_flight, -state.requests))
+                best.tokens -= 1
+                return best
+
+            if not waited:
+                self._budget_waits += 1
+                waited = True
+            await asyncio.sleep(
+                min(state.seconds_until_usable(now, rate=self._requests_per_second) for state in candidates),
+            )
@@ -1,5 +1,18 @@
 """Contains the definitions and functions for dealing with kudos."""
 
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from horde_sdk.ai_horde_api.apimodels import (
+    ImageGenerateAsyncDryRunResponse,
+    ImageGenerateAsyncRequest,
+    ImageGenerationInputPayload,
+)
+from horde_sdk.generation_parameters.image.consts import KNOWN_IMAGE_SAMPLERS, KNOWN_IMAGE_SOURCE_PROCESSING
+
 
 class KudosInfo:
     """Defines how kudos are calculated."""
@@ -37,3 +50,304 @@ class KudosInfo:
             int: The amount of kudos earned per hour.
         """
         return int(self.get_uptime_reward_per_tick(number_of_models) * self.uptime_frequency_per_hour)
+
+
+_DOUBLE_EVALUATION_SAMPLERS = frozenset(
+    {
+        KNOWN_IMAGE_SAMPLERS.k_heun,
+        KNOWN_IMAGE_SAMPLERS.k_dpm_2,
+        KNOWN_IMAGE_SAMPLERS.k_dpm_2_a,
+        KNOWN_IMAGE_SAMPLERS.k_dpmpp_2s_a,
+    },
+)
+"""Samplers which evaluate the model twice per step, and so are charged for twice the steps."""
+
+_ADAPTIVE_SAMPLER_STEPS = 50
+"""The step count charged for `k_dpm_adaptive`, which picks its own number of steps."""
+
+_BASE_PIXELS = 64 * 64
+_REFERENCE_PIXELS = 1024 * 1024
+
+_DEFAULT_IMAGE_PARAMS = ImageGenerationInputPayload()
+
+
+def _solve_linear_system(matrix: list[list[float]], vector: list[float]) -> list[float]:
+    """Solve `matrix @ x = vector` by Gaussian elimination with partial pivoting (for small, dense systems)."""
+    size = len(vector)
+    augmented = [[*row, value] for row, value in zip(matrix, vector, strict=True)]
+    for pivot in range(size):
+        best = max(range(pivot, size), key=lambda row: abs(augmented[row][pivot]))
+        augmented[pivot], augmented[best] = augmented[best], augmented[pivot]
+        pivot_value = augmented[pivot][pivot]
+        for row in range(pivot + 1, size):
+            scale = augmented[row][pivot] / pivot_value
+            if scale:
+                for column in range(pivot, size + 1):
+                    augmented[row][column] -= scale * augmented[pivot][column]
+
+    solution = [0.0] * size
+    for row in reversed(range(size)):
+        remainder = augmented[row][size] - sum(
+            augmented[row][column] * solution[column] for column in range(row + 1, size)
+        )
+        solution[row] = remainder / augmented[row][row]
+    return solution
+
+
+@dataclass(frozen=True, slots=True)
+class ImageCostShape:
+    """The parts of an image request which determine its cost per image.
+
+    Two requests with the same shape cost the same per image; the prompt, seed and most sampling options do not
+    affect the cost and are not part of the shape.
+    """
+
+    width: int
+    """The width of each image."""
+    height: int
+    """The height of each image."""
+    steps: int
+    """The requested number of steps."""
+    sampler_name: str
+    """The sampler, which can change the number of steps charged."""
+    denoising_strength: float | None
+    """Only set for img2img and inpainting requests, where it scales the steps charged."""
+    hires_fix: bool
+    """Whether hires fix was requested."""
+    post_processing: tuple[str, ...]
+    """The post-processors requested, sorted."""
+    control_type: str | None
+    """The ControlNet requested, if any."""
+    source_processing: str
+    """How the source image is used, or "txt2img" without one."""
+    lora_count: int
+    """The number of LoRAs requested."""
+    ti_count: int
+    """The number of textual inversions requested."""
+    transparent: bool
+    """Whether a transparent image was requested."""
+
+    @classmethod
+    def from_request(cls, request: ImageGenerateAsyncRequest) -> tuple[ImageCostShape, int]:
+        """Return the shape of `request` and its number of images (`n`)."""
+        params = request.params or _DEFAULT_IMAGE_PARAMS
+        uses_source = request.source_image is not None and request.source_processing in (
+            KNOWN_IMAGE_SOURCE_PROCESSING.img2img,
+            KNOWN_IMAGE_SOURCE_PROCESSING.inpainting,
+        )
+        shape = cls(
+            width=params.width,
+            height=params.height,
+            steps=params.steps,
+            sampler_name=str(params.sampler_name),
+            denoising_strength=params.denoising_strength if uses_source else None,
+            hires_fix=params.hires_fix,
+            post_processing=tuple(sorted(str(post_processor) for post_processor in params.post_processing)),
+            control_type=str(params.control_type) if params.control_type is not None else None,
+            source_processing=str(request.source_processing) if request.source_image is not None else "txt2img",
+            lora_count=len(params.loras or ()),
+            ti_count=len(params.tis or ()),
+            transparent=bool(params.transparent),
+        )
+        return shape, params.n
+
+    def charged_steps(self) -> float:
+        """Return the number of steps the horde charges for, accounting for the sampler and img2img strength."""
+        if self.sampler_name == KNOWN_IMAGE_SAMPLERS.k_dpm_adaptive:
+            steps: float = _ADAPTIVE_SAMPLER_STEPS
+        elif self.sampler_name in _DOUBLE_EVALUATION_SAMPLERS:
+            steps = self.steps * 2
+        else:
+            steps = self.steps
+        if self.denoising_strength is not None:
+            steps *= self.denoising_strength
+        return steps
+
+    def base_cost(self) -> float:
+        """Return the cost of one plain txt2img image of this size and step count, in units of the per-step rate."""
+        pixel_term: float = ((self.width * self.height - _BASE_PIXELS) / (_REFERENCE_PIXELS - _BASE_PIXELS)) ** 1.75
+        return self.charged_steps() * (1 + KudosEstimator.pixel_weight * pixel_term)
+
+    def cost_features(self) -> tuple[str, ...]:
+        """Return the options of this shape which multiply its cost, as the names of their calibrated factors."""
+        features = [f"post_processing:{post_processor}" for post_processor in self.post_processing]
+        if self.hires_fix:
+            features.append("hires_fix")
+        if self.control_type is not None:
+            features.append("control_type")
+        if self.source_processing != "txt2img":
+            features.append(f"source_processing:{self.source_processing}")
+        if self.lora_count:
+            features.append("loras")
+        if self.ti_count:
+            features.append("tis")
+        if self.transparent:
+            features.append("transparent")
+        return tuple(features)
+
+
+@dataclass(frozen=True, slots=True)
+class KudosEstimate:
+    """The estimated cost of one request."""
+
+    kudos: float
+    """The estimated total cost of the request."""
+    per_image_kudos: float
+    """The estimated cost of each image."""
+    calibrated: bool
+    """Whether a dry run of a request of the same shape has been observed; if not, the estimate is modelled."""
+
+
+class KudosEstimator:
+    """Estimates the kudos cost of image requests offline, calibrated from observed dry runs.
+
+    A dry run (`image_generate_request_dry_run`) costs a full round trip. The estimator remembers the per-image cost
+    of every request shape (see `ImageCostShape`) it has seen a dry run for, so requests of that shape need no further
+    dry runs. For shapes it has not seen, it models the cost the way the horde does: a per-step rate times the steps
+    charged, scaled super-linearly with resolution, then multiplied by a factor for each costed option (hires fix,
+    each post-processor, ControlNet, img2img, LoRAs, ...). The rate and the factors are fitted to the observed dry
+    runs; factors for options never observed stay at 1.0.
+
+    The estimator is not thread-safe; give each thread its own or guard it with a lock.
+    """
+
+    pixel_weight = 8.75
+    """How much more a 1024x1024 step costs than a 64x64 one, less one."""
+    default_rate_per_step = 0.1232
+    """The per-step rate used before any dry run has been observed."""
+
+    _RIDGE = 1e-6
+
+    def __init__(self) -> None:
+        """Initialize an uncalibrated estimator."""
+        self._observed: dict[ImageCostShape, float] = {}
+        self._rate_per_step = self.default_rate_per_step
+        self._factors: dict[str, float] = {}
+        self._modelled: dict[ImageCostShape, float] = {}
+        self._needs_fit = False
+
+    @property
+    def observed_shape_count(self) -> int:
+        """The number of distinct request shapes with an observed dry run."""
+        return len(self._observed)
+
+    def calibrate(
+        self,
+        request: ImageGenerateAsyncRequest,
+        dry_run: ImageGenerateAsyncDryRunResponse | float,
+    ) -> None:
+        """Record the cost a dry run reported for `request`.
+
+        Args:
+            request (ImageGenerateAsyncRequest): The request which was dry run.
+            dry_run (ImageGenerateAsyncDryRunResponse | float): The dry run response, or the kudos it reported.
+        """
+        kudos = dry_run.kudos if isinstance(dry_run, ImageGenerateAsyncDryRunResponse) else dry_run
+        shape, n = ImageCostShape.from_request(request)
+        self._observed[shape] = kudos / n
+        self._needs_fit = True
+
+    def is_calibrated(self, request: ImageGenerateAsyncRequest) -> bool:
+        """Return whether a dry run of a request with the same shape as `request` has been observed."""
+        shape, _ = ImageCostShape.from_request(request)
+        return shape in self._observed
+
+    def _fit(self) -> None:
+        observations = [
+            (shape.cost_features(), math.log(per_image / shape.base_cost()))
+            for shape, per_image in self._observed.items()
+            if per_image > 0
+        ]
+        self._modelled.clear()
+        self._needs_fit = False
+        if not observations:
+            return
+
+        # Least squares fit of log(per_image / base) = log(rate) + sum(log(factor) for each costed option), solved
+        # through the normal equations. The small ridge term keeps options which only ever appear together (and so
+        # cannot be told apart) solvable, and pulls their factors towards 1.0.
+        features = sorted({feature for observed_features, _ in observations for feature in observed_features})
+        column_of = {feature: column for column, feature in enumerate(features, start=1)}
+        size = len(features) + 1
+        normal = [[0.0] * size for _ in range(size)]
+        target = [0.0] * size
+        for observed_features, log_ratio in observations:
+            columns = [0, *(column_of[feature] for feature in observed_features)]
+            for row in columns:
+                target[row] += log_ratio
+                for column in columns:
+                    normal[row][column] += 1.0
+        for column in range(1, size):
+            normal[column][column] += self._RIDGE
+
+        solution = _solve_linear_system(normal, target)
+        self._rate_per_step = math.exp(solution[0])
+        self._factors = {feature: math.exp(solution[column_of[feature]]) for feature in features}
+
+    def _per_image(self, shape: ImageCostShape) -> tuple[float, bool]:
+        observed = self._observed.get(shape)
+        if observed is not None:
+            return observed, True
+
+        modelled = self._modelled.get(shape)
+        if modelled is None:
+            modelled = self._rate_per_step * shape.base_cost()
+            for feature in shape.cost_features():
+                modelled *= self._factors.get(feature, 1.0)
+            self._modelled[shape] = modelled
+        return modelled, False
+
+    def estimate(self, request: ImageGenerateAsyncRequest) -> KudosEstimate:
+        """Estimate the cost of one request.
+
+        Args:
+            request (ImageGenerateAsyncRequest): The request to estimate.
+
+        Returns:
+            KudosEstimate: The estimate.
+        """
+        return self.estimate_many([request])[0]
+
+    def estimate_many(self, requests: Sequence[ImageGenerateAsyncRequest]) -> list[KudosEstimate]:
+        """Estimate the cost of many candidate requests at once.
+
+        Each distinct shape among `requests` is costed once, and modelled costs are memoized by shape until the next
+        calibration.
+
+        Args:
+            requests (Sequence[ImageGenerateAsyncRequest]): The requests to estimate.
+
+        Returns:
+            list[KudosEstimate]: The estimates, in the order of `requests`.
+        """
+        if self._needs_fit:
+            self._fit()
+
+        shapes = [ImageCostShape.from_request(request) for request in requests]
+        per_image_by_shape = {shape: self._per_image(shape) for shape in {shape for shape, _ in shapes}}
+
+        estimates = []
+        for shape, n in shapes:
+            per_image, calibrated = per_image_by_shape[shape]
+            estimates.append(
+                KudosEstimate(kudos=round(per_image * n, 2), per_image_kudos=per_image, calibrated=calibrated),
+            )
+        return estimates
+
+    def uncalibrated(self, requests: Sequence[ImageGenerateAsyncRequest]) -> list[ImageGenerateAsyncRequest]:
+        """Return one request for each shape among `requests` which has no observed dry run.
+
+        Dry running these (and passing the results to `calibrate`) makes every estimate for `requests` calibrated.
+
+        Args:
+            requests (Sequence[ImageGenerateAsyncRequest]): The candidate requests.
+
+        Returns:
+            list[ImageGenerateAsyncRequest]: The requests to dry run.
+        """
+        to_dry_run: dict[ImageCostShape, ImageGenerateAsyncRequest] = {}
+        for request in requests:
+            shape, _ = ImageCostShape.from_request(request)
+            if shape not in self._observed and shape not in to_dry_run:
+                to_dry_run[shape] = request
+        return list(to_dry_run.values())
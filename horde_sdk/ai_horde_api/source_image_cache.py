@@ -0,0 +1,340 @@
+"""A process-wide, content-addressed cache of job source images.
+
+Remix, img2img and ControlNet jobs often reuse the same source images, whether by URL or as identical base64
+payloads. `SourceImageCache` keeps each distinct image once, addressed by the SHA-256 of its bytes:
+
+- the URL of every fetched image is remembered, so a URL seen before is not downloaded again;
+- concurrent fetches of the same URL share one download;
+- the base64 form and the decoded pixels of an image are computed at most once, and the pixels are shared between
+  jobs as a read-only buffer; and
+- the cache is kept within a memory budget by evicting the least recently used images.
+
+Images handed out stay valid after they are evicted; eviction only stops the cache from holding on to them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import aiohttp
+import PIL.Image
+from pydantic import BaseModel
+
+from horde_sdk import _default_sslcontext
+
+DEFAULT_SOURCE_IMAGE_CACHE_MAX_BYTES = 512 * 1024**2
+"""The default memory budget of a source image cache: 512 MiB."""
+
+DEFAULT_SOURCE_IMAGE_CACHE_MAX_URLS = 4096
+"""The default number of URLs whose content hash a source image cache remembers."""
+
+_SHAREABLE_MODES = frozenset({"L", "RGBA", "RGBX", "CMYK", "I;16"})
+"""Modes PIL can map onto an existing buffer without copying it."""
+
+
+class SourceImageCacheStats(BaseModel):
+    """Counters describing how a source image cache has been used."""
+
+    url_hits: int = 0
+    """Fetches served without downloading, because the URL was fetched before."""
+    downloads: int = 0
+    """Fetches which downloaded the image."""
+    deduplicated_downloads: int = 0
+    """Fetches which joined a download of the same URL already in progress."""
+    content_hits: int = 0
+    """Images added (downloaded or from base64) which were already in the cache under the same hash."""
+    decodes: int = 0
+    """Images decoded to pixels."""
+    evictions: int = 0
+    """Images evicted to stay within the memory budget."""
+    cached_images: int = 0
+    """The images currently in the cache."""
+    cached_bytes: int = 0
+    """The bytes currently held by the cache (encoded, base64 and decoded forms)."""
+
+
+class CachedSourceImage:
+    """One source image held by a `SourceImageCache`, with its base64 form and pixels computed on demand.
+
+    Do not create these directly; use `SourceImageCache.put` and friends.
+    """
+
+    def __init__(self, cache: SourceImageCache, digest: str, data: bytes, base64_str: str | None = None) -> None:
+        """Initialize the entry. Use `SourceImageCache.put` instead."""
+        self._cache = cache
+        self._digest = digest
+        self._data = data
+        self._base64 = base64_str
+        self._pixels: bytes | None = None
+        self._mode = ""
+        self._size = (0, 0)
+        self._lock = threading.Lock()
+        self._counted_bytes = 0
+        """The bytes of this image the cache accounts for. Only used with the cache's lock held."""
+
+    @property
+    def digest(self) -> str:
+        """The SHA-256 hex digest of the image bytes, which addresses the image in the cache."""
+        return self._digest
+
+    @property
+    def data(self) -> bytes:
+        """The encoded image bytes, as downloaded."""
+        return self._data
+
+    @property
+    def nbytes(self) -> int:
+        """The bytes this image holds in memory, in all the forms computed so far."""
+        return len(self._data) + len(self._base64 or "") + len(self._pixels or b"")
+
+    @property
+    def base64(self) -> str:
+        """The image bytes as base64; encoded once and shared."""
+        if self._base64 is None:
+            with self._lock:
+                if self._base64 is None:
+                    self._base64 = base64.b64encode(self._data).decode("utf-8")
+                    self._cache._grew(self, len(self._base64))
+        return self._base64
+
+    def pixels(self) -> tuple[str, tuple[int, int], memoryview]:
+        """Return the decoded pixels of the image, decoding it the first time.
+
+        Images with transparency are decoded to RGBA, greyscale images to L and everything else to RGB.
+
+        Returns:
+            tuple[str, tuple[int, int], memoryview]: The PIL mode, the size and a read-only view of the raw pixels,
+            shared by every caller.
+
+        Raises:
+            PIL.UnidentifiedImageError: If the bytes are not an image.
+        """
+        if self._pixels is None:
+            with self._lock:
+                if self._pixels is None:
+                    with PIL.Image.open(io.BytesIO(self._data)) as image:
+                        if image.mode not in ("L", "RGB", "RGBA"):
+                            has_alpha = "A" in image.getbands() or "transparency" in image.info
+                            image = image.convert("RGBA" if has_alpha else "RGB")
+                        self._mode = image.mode
+                        self._size = image.size
+                        pixels = image.tobytes()
+                    self._pixels = pixels
+                    self._cache._decoded(self, len(pixels))
+        return self._mode, self._size, memoryview(self._pixels).toreadonly()
+
+    def image(self) -> PIL.Image.Image:
+        """Return the decoded image.
+
+        For L and RGBA images, this is a read-only view of the shared pixels (PIL copies it first if you modify it);
+        for RGB images, it is a fresh copy of the shared pixels, which is still far cheaper than decoding again.
+
+        Returns:
+            PIL.Image.Image: The image.
+        """
+        mode, size, pixels = self.pixels()
+        if mode in _SHAREABLE_MODES:
+            return PIL.Image.frombuffer(mode, size, pixels, "raw", mode, 0, 1)
+        return PIL.Image.frombytes(mode, size, pixels.tobytes())
+
+
+class SourceImageCache:
+    """A content-addressed, memory-bounded cache of source images; see the module documentation.
+
+    The cache is thread-safe. Concurrent fetches of a URL are only shared within one event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = DEFAULT_SOURCE_IMAGE_CACHE_MAX_BYTES,
+        max_urls: int = DEFAULT_SOURCE_IMAGE_CACHE_MAX_URLS,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_bytes (int, optional): The memory budget, counting every form of every image. Defaults to 512 MiB.
+            max_urls (int, optional): How many URLs to remember the content hash of. Defaults to 4096.
+
+        Raises:
+            ValueError: If `max_bytes` or `max_urls` is negative.
+        """
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must not be negative, got {max_bytes}")
+        if max_urls < 0:
+            raise ValueError(f"max_urls must not be negative, got {max_urls}")
+
+        self._max_bytes = max_bytes
+        self._max_urls = max_urls
+        self._images: OrderedDict[str, CachedSourceImage] = OrderedDict()
+        self._url_digests: OrderedDict[str, str] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task[CachedSourceImage]] = {}
+        self._cached_bytes = 0
+        self._stats = SourceImageCacheStats()
+        self._lock = threading.RLock()
+
+    def stats(self) -> SourceImageCacheStats:
+        """Return the cache's counters.
+
+        Returns:
+            SourceImageCacheStats: A copy of the counters.
+        """
+        with self._lock:
+            return self._stats.model_copy(
+                update={"cached_images": len(self._images), "cached_bytes": self._cached_bytes},
+            )
+
+    def clear(self) -> None:
+        """Forget every image and URL."""
+        with self._lock:
+            self._images.clear()
+            self._url_digests.clear()
+            self._cached_bytes = 0
+
+    def get(self, digest: str) -> CachedSourceImage | None:
+        """Return the image with a content hash, if it is cached."""
+        with self._lock:
+            image = self._images.get(digest)
+            if image is not None:
+                self._images.move_to_end(digest)
+            return image
+
+    def get_by_url(self, url: str) -> CachedSourceImage | None:
+        """Return the image previously fetched from a URL, if it is still cached."""
+        with self._lock:
+            digest = self._url_digests.get(url)
+            return self.get(digest) if digest is not None else None
+
+    def put(self, data: bytes, *, url: str | None = None) -> CachedSourceImage:
+        """Add image bytes to the cache, or return the cached image with the same content.
+
+        Args:
+            data (bytes): The encoded image.
+            url (str | None, optional): The URL the image was fetched from, to remember. Defaults to None.
+
+        Returns:
+            CachedSourceImage: The cached image.
+        """
+        return self._put(hashlib.sha256(data).hexdigest(), data, None, url)
+
+    def put_base64(self, base64_str: str) -> CachedSourceImage:
+        """Add a base64 encoded image to the cache, or return the cached image with the same content.
+
+        Args:
+            base64_str (str): The base64 encoded image.
+
+        Returns:
+            CachedSourceImage: The cached image.
+
+        Raises:
+            binascii.Error: If `base64_str` is not valid base64.
+        """
+        data = base64.b64decode(base64_str, validate=True)
+        return self._put(hashlib.sha256(data).hexdigest(), data, base64_str, None)
+
+    def _put(self, digest: str, data: bytes, base64_str: str | None, url: str | None) -> CachedSourceImage:
+        with self._lock:
+            image = self._images.get(digest)
+            if image is not None:
+                self._stats.content_hits += 1
+                self._images.move_to_end(digest)
+            else:
+                image = CachedSourceImage(self, digest, data, base64_str)
+                self._images[digest] = image
+                image._counted_bytes = image.nbytes
+                self._cached_bytes += image._counted_bytes
+                self._evict(keep=digest)
+
+            if url is not None and self._max_urls:
+                self._url_digests[url] = digest
+                self._url_digests.move_to_end(url)
+                while len(self._url_digests) > self._max_urls:
+                    self._url_digests.popitem(last=False)
+            return image
+
+    async def async_fetch(self, client_session: aiohttp.ClientSession, url: str) -> CachedSourceImage:
+        """Return the image at a URL, downloading it only if it was not fetched (and kept) before.
+
+        Args:
+            client_session (aiohttp.ClientSession): The session to download with.
+            url (str): The URL of the image.
+
+        Returns:
+            CachedSourceImage: The cached image.
+
+        Raises:
+            aiohttp.ClientResponseError: If the download failed.
+        """
+        with self._lock:
+            image = self.get_by_url(url)
+            if image is not None:
+                self._stats.url_hits += 1
+                return image
+
+            task = self._in_flight.get(url)
+            if task is not None and task.get_loop() is asyncio.get_running_loop():
+                self._stats.deduplicated_downloads += 1
+            else:
+                self._stats.downloads += 1
+                task = asyncio.create_task(self._download(client_session, url))
+                self._in_flight[url] = task
+                task.add_done_callback(lambda done: self._forget_in_flight(url, done))
+
+        return await asyncio.shield(task)
+
+    def _forget_in_flight(self, url: str, task: asyncio.Task[CachedSourceImage]) -> None:
+        with self._lock:
+            if self._in_flight.get(url) is task:
+                del self._in_flight[url]
+
+    async def _download(self, client_session: aiohttp.ClientSession, url: str) -> CachedSourceImage:
+        async with client_session.get(url, ssl=_default_sslcontext) as response:
+            response.raise_for_status()
+            data = await response.read()
+        return self.put(data, url=url)
+
+    def _grew(self, image: CachedSourceImage, nbytes: int) -> None:
+        with self._lock:
+            if self._images.get(image.digest) is image:
+                image._counted_bytes += nbytes
+                self._cached_bytes += nbytes
+                self._evict(keep=image.digest)
+
+    def _decoded(self, image: CachedSourceImage, nbytes: int) -> None:
+        with self._lock:
+            self._stats.decodes += 1
+        self._grew(image, nbytes)
+
+    def _evict(self, *, keep: str) -> None:
+        for digest in list(self._images):
+            if self._cached_bytes <= self._max_bytes:
+                return
+            if digest == keep:
+                continue
+            evicted = self._images.pop(digest)
+            # Not `nbytes`: a form computed on another thread may be published before the cache has counted it.
+            self._cached_bytes -= evicted._counted_bytes
+            self._stats.evictions += 1
+
+
+_shared_source_image_cache: SourceImageCache | None = None
+_shared_source_image_cache_lock = threading.Lock()
+
+
+def get_shared_source_image_cache() -> SourceImageCache:
+    """Return the process-wide source image cache, used by job pop responses to download their images.
+
+    Returns:
+        SourceImageCache: The shared cache, created with the default budget on first use.
+    """
+    global _shared_source_image_cache
+    if _shared_source_image_cache is None:
+        with _shared_source_image_cache_lock:
+            if _shared_source_image_cache is None:
+                _shared_source_image_cache = SourceImageCache()
+    return _shared_source_image_cache
@@ -1,4 +1,6 @@
+import functools
 from abc import ABC
+from collections.abc import Iterable, Mapping
 
 from strenum import StrEnum
 from typing_extensions import TypeVar
@@ -22,6 +24,80 @@ BackendControlnetsTypeVar = TypeVar("BackendControlnetsTypeVar", bound=StrEnum)
 MappingOutputTypeVar = TypeVar("MappingOutputTypeVar", bound=StrEnum)
 
 
+class _CompiledValueMapping[MappingOutputTypeVar: StrEnum]:
+    """Precomputed lookups equivalent to `BackendValuesMapper._map_value`, for one mapping and pair of types.
+
+    `by_member` resolves members of the input type (which map by name when absent from the mapping) and `by_string`
+    resolves plain strings (the mapping, then names, then values of the target type). `by_casefold` is consulted
+    only when both miss, so that e.g. `"LMS"` resolves as `"lms"` would, unless the case-folded form is ambiguous.
+    """
+
+    __slots__ = ("by_casefold", "by_member", "by_string", "known_input_type", "known_target_type", "mapping")
+
+    def __init__(
+        self,
+        mapping: Mapping[str, MappingOutputTypeVar],
+        known_input_type: type[StrEnum],
+        known_target_type: type[MappingOutputTypeVar],
+    ) -> None:
+        self.mapping = dict(mapping)
+        self.known_input_type = known_input_type
+        self.known_target_type = known_target_type
+        self.by_string: dict[str, MappingOutputTypeVar] = {}
+        self.by_member: dict[str, MappingOutputTypeVar] = {}
+
+        if not mapping:
+            # Without a mapping, both kinds of input are looked up by value only.
+            for member in known_target_type.__members__.values():
+                self.by_string.setdefault(str(member), member)
+            self.by_member = self.by_string
+        else:
+            # Later updates take precedence: the mapping over names over values.
+            for member in known_target_type.__members__.values():
+                self.by_string.setdefault(str(member), member)
+            self.by_string.update(known_target_type.__members__)
+            self.by_string.update({str(key): value for key, value in mapping.items()})
+
+            for name, input_member in known_input_type.__members__.items():
+                if input_member in mapping:
+                    self.by_member[str(input_member)] = mapping[input_member]
+                elif name in known_target_type.__members__:
+                    self.by_member[str(input_member)] = known_target_type[name]
+
+        by_casefold: dict[str, MappingOutputTypeVar | None] = {}
+        for key, value in self.by_string.items():
+            folded = key.casefold()
+            if by_casefold.get(folded, value) is not value:
+                by_casefold[folded] = None
+            else:
+                by_casefold[folded] = value
+        self.by_casefold = {key: value for key, value in by_casefold.items() if value is not None}
+
+    def lookup(self, value: str) -> MappingOutputTypeVar | None:
+        """Return what `value` maps to, or `None` if the tables cannot map it."""
+        # Enum members are always exactly of their enum's type, and this is much cheaper than `isinstance`.
+        table = self.by_member if type(value) is self.known_input_type else self.by_string
+        mapped = table.get(value)
+        if mapped is None and isinstance(value, str):
+            mapped = self.by_casefold.get(value.casefold())
+        return mapped
+
+
+@functools.cache
+def _compile_value_mapping[OutputT: StrEnum](
+    mapping_items: tuple[tuple[str, OutputT], ...],
+    known_input_type: type[StrEnum],
+    known_target_type: type[OutputT],
+) -> _CompiledValueMapping[OutputT]:
+    return _CompiledValueMapping(dict(mapping_items), known_input_type, known_target_type)
+
+
+@functools.cache
+def _known_values(known_type: type[StrEnum]) -> frozenset[str]:
+    """Return the names and values of `known_type`'s members."""
+    return frozenset(known_type.__members__) | frozenset(str(member) for member in known_type.__members__.values())
+
+
 class BackendValuesMapper[SDKParameterSetTypeVar: CompositeParametersBase](ABC):
     """Base class for all backend values mappers.
 
@@ -33,6 +109,32 @@ class BackendValuesMapper[SDKParameterSetTypeVar: CompositeParametersBase](ABC):
     _worker_type: WORKER_TYPE
     _inference_backend: KNOWN_INFERENCE_BACKEND
 
+    _compiled_value_mappings: dict[
+        tuple[int, type[StrEnum], type[StrEnum]],
+        tuple[Mapping[str, StrEnum], _CompiledValueMapping[StrEnum]],
+    ]
+
+    def _get_compiled_value_mapping(
+        self,
+        mapping: dict[str, MappingOutputTypeVar],
+        known_input_type: type[StrEnum],
+        known_target_type: type[MappingOutputTypeVar],
+    ) -> _CompiledValueMapping[MappingOutputTypeVar]:
+        """Return the lookup tables for `mapping`, which must not be modified after it is first used."""
+        try:
+            compiled_value_mappings = self._compiled_value_mappings
+        except AttributeError:
+            compiled_value_mappings = self._compiled_value_mappings = {}
+
+        # The entry holds a reference to `mapping`, so its id cannot be reused by another object while cached.
+        key = (id(mapping), known_input_type, known_target_type)
+        entry = compiled_value_mappings.get(key)
+        if entry is None:
+            compiled = _compile_value_mapping(tuple(mapping.items()), known_input_type, known_target_type)
+            entry = (mapping, compiled)
+            compiled_value_mappings[key] = entry
+        return entry[1]  # type: ignore[return-value]
+
     def _map_value(
         self,
         value: str,
@@ -40,6 +142,35 @@ class BackendValuesMapper[SDKParameterSetTypeVar: CompositeParametersBase](ABC):
         known_input_type: type[StrEnum],
         known_target_type: type[MappingOutputTypeVar],
     ) -> MappingOutputTypeVar:
+        return self._map_compiled_value(
+            value,
+            self._get_compiled_value_mapping(mapping, known_input_type, known_target_type),
+        )
+
+    def _map_compiled_value(
+        self,
+        value: str,
+        compiled: _CompiledValueMapping[MappingOutputTypeVar],
+    ) -> MappingOutputTypeVar:
+        mapped = compiled.lookup(value)
+        if mapped is not None:
+            return mapped
+
+        return self._map_value_uncompiled(
+            value,
+            compiled.mapping,
+            compiled.known_input_type,
+            compiled.known_target_type,
+        )
+
+    def _map_value_uncompiled(
+        self,
+        value: str,
+        mapping: dict[str, MappingOutputTypeVar],
+        known_input_type: type[StrEnum],
+        known_target_type: type[MappingOutputTypeVar],
+    ) -> MappingOutputTypeVar:
+        """Map a value without the precomputed tables; raises the appropriate error for values they cannot map."""
         if len(mapping) == 0:
             return known_target_type(value)
 
@@ -71,13 +202,22 @@ class BackendValuesMapper[SDKParameterSetTypeVar: CompositeParametersBase](ABC):
             return True
 
         if isinstance(value, str):
-            if value in known_type.__members__:
-                return True
-            if value in known_type.__members__.values():
-                return True
+            return value in _known_values(known_type)
 
         return False
 
+    def _map_compiled_values(
+        self,
+        values: Iterable[str],
+        compiled: _CompiledValueMapping[MappingOutputTypeVar],
+    ) -> list[MappingOutputTypeVar]:
+        lookup = compiled.lookup
+        mapped_values = []
+        for value in values:
+            mapped = lookup(value)
+            mapped_values.append(mapped if mapped is not None else self._map_compiled_value(value, compiled))
+        return mapped_values
+
 
 class ImageBackendValuesMapper[
     BackendSamplersTypeVar: StrEnum,
@@ -106,6 +246,14 @@ class ImageBackendValuesMapper[
     _to_backend_scheduler_map: dict[KNOWN_IMAGE_SCHEDULERS | str, BackendSchedulersTypeVar]
     _to_backend_controlnet_map: dict[KNOWN_IMAGE_CONTROLNETS | str, BackendControlnetsTypeVar]
 
+    _to_sdk_sampler_lookup: _CompiledValueMapping[KNOWN_IMAGE_SAMPLERS]
+    _to_sdk_scheduler_lookup: _CompiledValueMapping[KNOWN_IMAGE_SCHEDULERS]
+    _to_sdk_controlnet_lookup: _CompiledValueMapping[KNOWN_IMAGE_CONTROLNETS]
+
+    _to_backend_sampler_lookup: _CompiledValueMapping[BackendSamplersTypeVar]
+    _to_backend_scheduler_lookup: _CompiledValueMapping[BackendSchedulersTypeVar]
+    _to_backend_controlnet_lookup: _CompiledValueMapping[BackendControlnetsTypeVar]
+
     def __init__(
         self,
         *,
@@ -138,29 +286,66 @@ class ImageBackendValuesMapper[
         self._to_backend_scheduler_map = {v: backend_schedulers_type(k) for k, v in sdk_schedulers_map.items()}
         self._to_backend_controlnet_map = {v: backend_controlnets_type(k) for k, v in sdk_controlnets_map.items()}
 
+        # Mapping is done for every job, so the lookups are compiled up front (and shared by every mapper with the
+        # same maps) rather than searching the maps and enums on each call.
+        self._to_sdk_sampler_lookup = self._get_compiled_value_mapping(
+            self._to_sdk_sampler_map,
+            backend_samplers_type,
+            KNOWN_IMAGE_SAMPLERS,
+        )
+        self._to_sdk_scheduler_lookup = self._get_compiled_value_mapping(
+            self._to_sdk_scheduler_map,
+            backend_schedulers_type,
+            KNOWN_IMAGE_SCHEDULERS,
+        )
+        self._to_sdk_controlnet_lookup = self._get_compiled_value_mapping(
+            self._to_sdk_controlnet_map,
+            backend_controlnets_type,
+            KNOWN_IMAGE_CONTROLNETS,
+        )
+        self._to_backend_sampler_lookup = self._get_compiled_value_mapping(
+            self._to_backend_sampler_map,
+            KNOWN_IMAGE_SAMPLERS,
+            backend_samplers_type,
+        )
+        self._to_backend_scheduler_lookup = self._get_compiled_value_mapping(
+            self._to_backend_scheduler_map,
+            KNOWN_IMAGE_SCHEDULERS,
+            backend_schedulers_type,
+        )
+        self._to_backend_controlnet_lookup = self._get_compiled_value_mapping(
+            self._to_backend_controlnet_map,
+            KNOWN_IMAGE_CONTROLNETS,
+            backend_controlnets_type,
+        )
+
     def map_to_sdk_sampler(
         self,
         backend_sampler: BackendSamplersTypeVar | str,
     ) -> KNOWN_IMAGE_SAMPLERS:
         """Map a backend sampler to a SDK sampler."""
-        return self._map_value(
-            value=backend_sampler,
-            mapping=self._to_sdk_sampler_map,
-            known_input_type=self._backend_samplers_type,
-            known_target_type=KNOWN_IMAGE_SAMPLERS,
-        )
+        return self._map_compiled_value(backend_sampler, self._to_sdk_sampler_lookup)
 
     def map_to_backend_sampler(
         self,
         sdk_sampler: KNOWN_IMAGE_SAMPLERS | str,
     ) -> BackendSamplersTypeVar | str:
         """Map a SDK sampler to a backend sampler."""
-        return self._map_value(
-            value=sdk_sampler,
-            mapping=self._to_backend_sampler_map,
-            known_input_type=KNOWN_IMAGE_SAMPLERS,
-            known_target_type=self._backend_samplers_type,
-        )
+        return self._map_compiled_value(sdk_sampler, self._to_backend_sampler_lookup)
+
+    def map_to_sdk_samplers(
+        self,
+        backend_samplers: Iterable[BackendSamplersTypeVar | str],
+    ) -> list[KNOWN_IMAGE_SAMPLERS]:
+        """Map backend samplers to SDK samplers, e.g. for a worker's `PerBaselineFeatureFlags`."""
+        return self._map_compiled_values(backend_samplers, self._to_sdk_sampler_lookup)
+
+    def map_to_backend_samplers(
+        self,
+        sdk_samplers: Iterable[KNOWN_IMAGE_SAMPLERS | str],
+    ) -> list[BackendSamplersTypeVar]:
+        """Map SDK samplers to backend samplers."""
+        return self._map_compiled_values(sdk_samplers, self._to_backend_sampler_lookup)
 
     def is_valid_backend_sampler(
         self,
@@ -177,24 +362,28 @@ class ImageBackendValuesMapper[
         backend_scheduler: BackendSchedulersTypeVar | str,
     ) -> KNOWN_IMAGE_SCHEDULERS:
         """Map a backend scheduler to a SDK scheduler."""
-        return self._map_value(
-            value=backend_scheduler,
-            mapping=self._to_sdk_scheduler_map,
-            known_input_type=self._backend_schedulers_type,
-            known_target_type=KNOWN_IMAGE_SCHEDULERS,
-        )
+        return self._map_compiled_value(backend_scheduler, self._to_sdk_scheduler_lookup)
 
     def map_to_backend_scheduler(
         self,
         sdk_scheduler: KNOWN_IMAGE_SCHEDULERS | str,
     ) -> BackendSchedulersTypeVar | str:
         """Map a SDK scheduler to a backend scheduler."""
-        return self._map_value(
-            value=sdk_scheduler,
-            mapping=self._to_backend_scheduler_map,
-            known_input_type=KNOWN_IMAGE_SCHEDULERS,
-            known_target_type=self._backend_schedulers_type,
-        )
+        return self._map_compiled_value(sdk_scheduler, self._to_backend_scheduler_lookup)
+
+    def map_to_sdk_schedulers(
+        self,
+        backend_schedulers: Iterable[BackendSchedulersTypeVar | str],
+    ) -> list[KNOWN_IMAGE_SCHEDULERS]:
+        """Map backend schedulers to SDK schedulers, e.g. for a worker's `PerBaselineFeatureFlags`."""
+        return self._map_compiled_values(backend_schedulers, self._to_sdk_scheduler_lookup)
+
+    def map_to_backend_schedulers(
+        self,
+        sdk_schedulers: Iterable[KNOWN_IMAGE_SCHEDULERS | str],
+    ) -> list[BackendSchedulersTypeVar]:
+        """Map SDK schedulers to backend schedulers."""
+        return self._map_compiled_values(sdk_schedulers, self._to_backend_scheduler_lookup)
 
     def is_valid_backend_scheduler(
         self,
@@ -211,24 +400,14 @@ class ImageBackendValuesMapper[
         backend_controlnet: BackendControlnetsTypeVar | str,
     ) -> KNOWN_IMAGE_CONTROLNETS:
         """Map a backend controlnet to a SDK controlnet."""
-        return self._map_value(
-            value=backend_controlnet,
-            mapping=self._to_sdk_controlnet_map,
-            known_input_type=self._backend_controlnets,
-            known_target_type=KNOWN_IMAGE_CONTROLNETS,
-        )
+        return self._map_compiled_value(backend_controlnet, self._to_sdk_controlnet_lookup)
 
     def map_to_backend_controlnet(
         self,
         sdk_controlnet: KNOWN_IMAGE_CONTROLNETS | str,
     ) -> BackendControlnetsTypeVar | str:
         """Map a SDK controlnet to a backend controlnet."""
-        return self._map_value(
-            value=sdk_controlnet,
-            mapping=self._to_backend_controlnet_map,
-            known_input_type=KNOWN_IMAGE_CONTROLNETS,
-            known_target_type=self._backend_controlnets,
-        )
+        return self._map_compiled_value(sdk_controlnet, self._to_backend_controlnet_lookup)
 
     def is_valid_backend_controlnet(
         self,
@@ -0,0 +1,319 @@
+r"""Streaming schema migration of stored generation parameter payloads.
+
+Archives of serialized parameters are kept as JSON lines, one payload per line. This module upgrades them to the
+current schema in fixed-size chunks spread across a process pool, holding only a bounded number of chunks in memory
+at once, so that archives of any size can be migrated.
+
+Usage:
+    python -m horde_sdk.generation_parameters.bulk_migration \
+        horde_sdk.generation_parameters.image:ImageGenerationParameters archive.jsonl migrated.jsonl
+
+Workers look up migrations in their own process. Migrations must therefore be registered when the module defining
+the parameter type (or a module it imports) is imported; migrations registered at runtime are only visible to an
+in-process migration (`workers=0`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import importlib
+import json
+import os
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import IO
+
+from loguru import logger
+from pydantic import BaseModel
+
+from horde_sdk.generation_parameters.generic import CompositeParametersBase
+from horde_sdk.generation_parameters.versioning import apply_parameter_schema_migrations
+
+DEFAULT_MIGRATION_CHUNK_SIZE = 1_000
+"""The number of lines sent to a worker at once."""
+
+
+@dataclass(frozen=True)
+class MigratedLine:
+    """The outcome of migrating one line of a JSON lines archive."""
+
+    line_number: int
+    """The 1-based line number in the input."""
+    payload: str | None
+    """The migrated payload as a single line of JSON (without a newline), or `None` if migration failed."""
+    error: str | None = None
+    """Why the line could not be migrated, if it could not."""
+
+
+class BulkMigrationProgress(BaseModel):
+    """Running totals for a bulk migration."""
+
+    lines: int = 0
+    """The number of non-blank lines processed so far."""
+    migrated: int = 0
+    """The number of payloads migrated successfully."""
+    failed: int = 0
+    """The number of lines which could not be parsed or migrated."""
+    elapsed_seconds: float = 0.0
+    """The time since the migration started."""
+
+    @property
+    def lines_per_second(self) -> float:
+        """The throughput so far."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.lines / self.elapsed_seconds
+
+
+def _migrate_line(parameter_type: type[CompositeParametersBase], line: str) -> tuple[str | None, str | None]:
+    try:
+        payload = json.loads(line)
+        if not isinstance(payload, dict):
+            return None, f"Expected a JSON object, got {type(payload).__name__}"
+        migrated = apply_parameter_schema_migrations(parameter_type, payload)
+        return json.dumps(migrated, separators=(",", ":"), ensure_ascii=False), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _migrate_chunk(
+    parameter_type: type[CompositeParametersBase],
+    chunk: list[tuple[int, str]],
+) -> list[MigratedLine]:
+    results = []
+    for line_number, line in chunk:
+        payload, error = _migrate_line(parameter_type, line)
+        results.append(MigratedLine(line_number=line_number, payload=payload, error=error))
+    return results
+
+
+def _chunk_lines(lines: Iterable[str], chunk_size: int) -> Iterator[list[tuple[int, str]]]:
+    chunk: list[tuple[int, str]] = []
+    for line_number, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        chunk.append((line_number, stripped))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_migrated_lines(
+    parameter_type: type[CompositeParametersBase],
+    lines: Iterable[str],
+    *,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_MIGRATION_CHUNK_SIZE,
+    on_progress: Callable[[BulkMigrationProgress], None] | None = None,
+) -> Iterator[MigratedLine]:
+    """Migrate JSON lines payloads of `parameter_type` to its current schema, yielding results in input order.
+
+    Blank lines are skipped. Lines which are not JSON objects, or which cannot be migrated, are yielded with an
+    `error` rather than raising, so that one bad record does not stop a migration of millions.
+
+    Args:
+        parameter_type (type[CompositeParametersBase]): The type of parameters the payloads serialize.
+        lines (Iterable[str]): The input, one JSON payload per line; e.g. an open file. It is read lazily.
+        workers (int | None, optional): The number of worker processes. `0` migrates in this process. Defaults to
+            the number of CPUs.
+        chunk_size (int, optional): The number of lines sent to a worker at once. Defaults to 1,000.
+        on_progress (Callable[[BulkMigrationProgress], None] | None, optional): Called with the running totals
+            after each chunk. Defaults to None.
+
+    Returns:
+        Iterator[MigratedLine]: The outcome of each non-blank line.
+
+    Raises:
+        ValueError: If `workers` is negative or `chunk_size` is less than 1.
+    """
+    if workers is not None and workers < 0:
+        raise ValueError(f"workers must not be negative, got {workers}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    return _iter_migrated_lines(parameter_type, lines, workers, chunk_size, on_progress)
+
+
+def _iter_migrated_lines(
+    parameter_type: type[CompositeParametersBase],
+    lines: Iterable[str],
+    workers: int,
+    chunk_size: int,
+    on_progress: Callable[[BulkMigrationProgress], None] | None,
+) -> Iterator[MigratedLine]:
+    progress = BulkMigrationProgress()
+    start = time.monotonic()
+
+    def _report(results: list[MigratedLine]) -> None:
+        failed = sum(1 for result in results if result.error is not None)
+        progress.lines += len(results)
+        progress.failed += failed
+        progress.migrated += len(results) - failed
+        progress.elapsed_seconds = time.monotonic() - start
+        if on_progress is not None:
+            on_progress(progress)
+
+    chunks = _chunk_lines(lines, chunk_size)
+
+    if workers == 0:
+        for chunk in chunks:
+            results = _migrate_chunk(parameter_type, chunk)
+            _report(results)
+            yield from results
+        return
+
+    # Keeping at most two chunks per worker in flight bounds memory while keeping every worker busy.
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight: collections.deque[Future[list[MigratedLine]]] = collections.deque()
+        for chunk in chunks:
+            in_flight.append(executor.submit(_migrate_chunk, parameter_type, chunk))
+            if len(in_flight) >= max_in_flight:
+                results = in_flight.popleft().result()
+                _report(results)
+                yield from results
+
+        while in_flight:
+            results = in_flight.popleft().result()
+            _report(results)
+            yield from results
+
+
+def migrate_jsonl(
+    parameter_type: type[CompositeParametersBase],
+    source: IO[str],
+    destination: IO[str],
+    *,
+    rejects: IO[str] | None = None,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_MIGRATION_CHUNK_SIZE,
+    on_progress: Callable[[BulkMigrationProgress], None] | None = None,
+) -> BulkMigrationProgress:
+    """Migrate a JSON lines archive of `parameter_type` payloads, writing the migrated payloads in input order.
+
+    Args:
+        parameter_type (type[CompositeParametersBase]): The type of parameters the payloads serialize.
+        source (IO[str]): The archive to read.
+        destination (IO[str]): Where to write the migrated payloads, one per line.
+        rejects (IO[str] | None, optional): Where to write a JSON line describing each line which could not be
+            migrated. Failures are only counted if not given. Defaults to None.
+        workers (int | None, optional): See `iter_migrated_lines`. Defaults to the number of CPUs.
+        chunk_size (int, optional): See `iter_migrated_lines`. Defaults to 1,000.
+        on_progress (Callable[[BulkMigrationProgress], None] | None, optional): See `iter_migrated_lines`.
+            Defaults to None.
+
+    Returns:
+        BulkMigrationProgress: The final totals.
+    """
+    final_progress = BulkMigrationProgress()
+
+    def _track(progress: BulkMigrationProgress) -> None:
+        nonlocal final_progress
+        final_progress = progress
+        if on_progress is not None:
+            on_progress(progress)
+
+    for result in iter_migrated_lines(
+        parameter_type,
+        source,
+        workers=workers,
+        chunk_size=chunk_size,
+        on_progress=_track,
+    ):
+        if result.payload is not None:
+            destination.write(result.payload)
+            destination.write("\n")
+        elif rejects is not None:
+            rejects.write(json.dumps({"line_number": result.line_number, "error": result.error}))
+            rejects.write("\n")
+
+    return final_progress
+
+
+def _import_parameter_type(path: str) -> type[CompositeParametersBase]:
+    module_name, _, qualified_name = path.partition(":")
+    if not qualified_name:
+        raise ValueError(f"Expected 'module:ClassName', got '{path}'")
+
+    target: object = importlib.import_module(module_name)
+    for attribute in qualified_name.split("."):
+        target = getattr(target, attribute)
+
+    if not isinstance(target, type) or not issubclass(target, CompositeParametersBase):
+        raise ValueError(f"'{path}' is not a CompositeParametersBase subclass")
+    return target
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Migrate a JSON lines archive from the command line.
+
+    Args:
+        argv (list[str] | None, optional): The arguments, excluding the program name. Defaults to `sys.argv`.
+
+    Returns:
+        int: The exit code; `1` if any line failed to migrate.
+    """
+    parser = argparse.ArgumentParser(description="Migrate stored generation parameter payloads (JSON lines).")
+    parser.add_argument(
+        "parameter_type",
+        help="The parameters class the payloads serialize, as 'module:ClassName'.",
+    )
+    parser.add_argument("source", help="The archive to migrate, or '-' for stdin.")
+    parser.add_argument("destination", help="Where to write the migrated archive, or '-' for stdout.")
+    parser.add_argument("--rejects", help="Where to write the lines which could not be migrated.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (0 to run in-process).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_MIGRATION_CHUNK_SIZE, help="Lines per chunk.")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress reports.")
+    args = parser.parse_args(argv)
+
+    parameter_type = _import_parameter_type(args.parameter_type)
+    last_report = time.monotonic()
+
+    def _log_progress(progress: BulkMigrationProgress) -> None:
+        nonlocal last_report
+        now = time.monotonic()
+        if now - last_report < args.progress_interval:
+            return
+        last_report = now
+        logger.info(
+            f"{progress.lines:,} lines ({progress.failed:,} failed) in {progress.elapsed_seconds:.1f}s,"
+            f" {progress.lines_per_second:,.0f} lines/s",
+        )
+
+    source = sys.stdin if args.source == "-" else open(args.source, encoding="utf-8")  # noqa: SIM115
+    destination = sys.stdout if args.destination == "-" else open(args.destination, "w", encoding="utf-8")  # noqa: SIM115
+    rejects = open(args.rejects, "w", encoding="utf-8") if args.rejects else None  # noqa: SIM115
+    try:
+        progress = migrate_jsonl(
+            parameter_type,
+            source,
+            destination,
+            rejects=rejects,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            on_progress=_log_progress,
+        )
+    finally:
+        for stream in (source, destination, rejects):
+            if stream is not None and stream not in (sys.stdin, sys.stdout):
+                stream.close()
+
+    logger.info(
+        f"Migrated {progress.migrated:,} of {progress.lines:,} payloads in {progress.elapsed_seconds:.1f}s"
+        f" ({progress.failed:,} failed, {progress.lines_per_second:,.0f} lines/s)",
+    )
+    return 1 if progress.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Iterator, Sequence
 from pathlib import Path
 from typing import override
 
@@ -28,7 +28,9 @@ from horde_sdk.generation_parameters.image.consts import (
     TI_TRIGGER_INJECT_CHOICE,
 )
 from horde_sdk.generation_parameters.utils import (
+    PartialParameterFingerprint,
     ResultIdAllocator,
+    SharedTemplateFields,
     finalize_template_for_parameters,
     resolve_result_ids_from_payload,
 )
@@ -707,6 +709,93 @@ class ImageGenerationParametersTemplate(CompositeParametersBase):
             from_attributes=True,
         )
 
+    def expand_parameters(
+        self,
+        variants: Iterable[BasicImageGenerationParametersTemplate | None],
+        *,
+        allocator: ResultIdAllocator | None = None,
+        seed: str = "image",
+    ) -> Iterator[ImageGenerationParameters]:
+        """Lazily convert this template into concrete parameters for each variant of its base parameters.
+
+        Each result equals `to_parameters(base_param_updates=variant, allocator=allocator, seed=seed)`, but the
+        template is checked, dumped and (except for its base parameters) fingerprinted once, rather than per
+        variant. Frozen sub-models are shared between the results; mutable ones are copied for each.
+
+        Args:
+            variants (Iterable[BasicImageGenerationParametersTemplate | None]): The updates to apply to the base
+                parameters for each result, e.g. a different seed or prompt. `None` uses them unchanged. Consumed
+                lazily, so this may be a generator.
+            allocator (ResultIdAllocator | None, optional): Allocates result IDs in batch when the template has
+                none. Defaults to None, which uses random IDs.
+            seed (str, optional): The seed for `allocator`. Defaults to "image".
+
+        Returns:
+            Iterator[ImageGenerationParameters]: The parameters for each variant, in order.
+
+        Raises:
+            ValueError: If the template cannot be converted. Raised by this call, not on iteration.
+        """
+        base_params = self.base_params
+        if base_params is None:
+            raise ValueError("Image generation templates must define base_params before conversion.")
+
+        batch_size = self.batch_size or 1
+        fixed_payload = self.model_dump(exclude={"base_params"})
+        template_result_ids = fixed_payload.pop("result_ids", None)
+        if template_result_ids is not None:
+            # Raise any problem with the IDs (such as a count mismatch) now rather than on iteration.
+            resolve_result_ids_from_payload(
+                explicit_ids=None,
+                payload_value=template_result_ids,
+                count=batch_size,
+                allocator=allocator,
+                seed=seed,
+                fingerprint="",
+            )
+
+        fingerprints = PartialParameterFingerprint(fixed_payload, "base_params")
+        shared_fields = SharedTemplateFields(
+            self,
+            exclude=("base_params", "result_ids"),
+            overrides={
+                "additional_params": self.additional_params or ImageGenerationComponentContainer(),
+                "batch_size": batch_size,
+            },
+        )
+
+        def _expand() -> Iterator[ImageGenerationParameters]:
+            for variant in variants:
+                resolved_base_params = base_params
+                if variant:
+                    resolved_base_params = base_params.model_copy(update=variant.model_dump(exclude_none=True))
+
+                # Dumped through the template so that it serialises exactly as `to_parameters` fingerprints it.
+                base_params_payload = self.model_copy(update={"base_params": resolved_base_params}).model_dump(
+                    include={"base_params"},
+                )["base_params"]
+                result_ids = resolve_result_ids_from_payload(
+                    explicit_ids=None,
+                    payload_value=template_result_ids,
+                    count=batch_size,
+                    allocator=allocator,
+                    seed=seed,
+                    fingerprint=fingerprints.fingerprint(base_params_payload),
+                )
+
+                yield ImageGenerationParameters.model_validate(
+                    {
+                        **shared_fields.values(),
+                        "base_params": BasicImageGenerationParameters.model_validate(
+                            resolved_base_params,
+                            from_attributes=True,
+                        ),
+                        "result_ids": result_ids,
+                    },
+                )
+
+        return _expand()
+
 
 class ImageGenerationParameters(ImageGenerationParametersTemplate):
     """Represents the common bare-minimum parameters for an image generation."""
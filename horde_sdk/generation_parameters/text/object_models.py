@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Iterator, Sequence
 from enum import auto
 from typing import Self, override
 
@@ -16,7 +16,9 @@ from horde_sdk.generation_parameters.generic import (
 )
 from horde_sdk.generation_parameters.generic.object_models import GenerationFeatureFlags
 from horde_sdk.generation_parameters.utils import (
+    PartialParameterFingerprint,
     ResultIdAllocator,
+    SharedTemplateFields,
     TemplateFinalization,
     finalize_template_for_parameters,
     resolve_result_ids_from_payload,
@@ -283,6 +285,81 @@ class TextGenerationParametersTemplate(CompositeParametersBase):
             from_attributes=True,
         )
 
+    def expand_parameters(
+        self,
+        variants: Iterable[BasicTextGenerationParametersTemplate | None],
+        *,
+        allocator: ResultIdAllocator | None = None,
+        seed: str = "text",
+    ) -> Iterator[TextGenerationParameters]:
+        """Lazily convert this template into concrete parameters for each variant of its base parameters.
+
+        Each result equals `to_parameters(base_param_updates=variant, allocator=allocator, seed=seed)`, but the
+        template is checked, dumped and (except for its base parameters) fingerprinted once, rather than per
+        variant. Frozen sub-models are shared between the results; mutable ones are copied for each.
+
+        Args:
+            variants (Iterable[BasicTextGenerationParametersTemplate | None]): The updates to apply to the base
+                parameters for each result, e.g. a different prompt. `None` uses them unchanged. Consumed lazily,
+                so this may be a generator.
+            allocator (ResultIdAllocator | None, optional): Allocates result IDs in batch when the template has
+                none. Defaults to None, which uses random IDs.
+            seed (str, optional): The seed for `allocator`. Defaults to "text".
+
+        Returns:
+            Iterator[TextGenerationParameters]: The parameters for each variant, in order.
+
+        Raises:
+            ValueError: If the template cannot be converted. Raised by this call, not on iteration.
+        """
+        base_params = self.base_params
+        if base_params is None:
+            raise ValueError("Text generation templates must define base_params before conversion.")
+
+        fixed_payload = self.model_dump(exclude={"base_params"})
+        template_result_ids = fixed_payload.pop("result_ids", None)
+        if template_result_ids is not None:
+            # Raise any problem with the IDs (such as a count mismatch) now rather than on iteration.
+            resolve_result_ids_from_payload(
+                explicit_ids=None,
+                payload_value=template_result_ids,
+                count=1,
+                allocator=allocator,
+                seed=seed,
+                fingerprint="",
+            )
+
+        fingerprints = PartialParameterFingerprint(fixed_payload, "base_params")
+        shared_fields = SharedTemplateFields(self, exclude=("base_params", "result_ids"))
+
+        def _expand() -> Iterator[TextGenerationParameters]:
+            for variant in variants:
+                resolved_base_params = base_params
+                if variant:
+                    resolved_base_params = base_params.model_copy(update=variant.model_dump(exclude_none=True))
+
+                result_ids = resolve_result_ids_from_payload(
+                    explicit_ids=None,
+                    payload_value=template_result_ids,
+                    count=1,
+                    allocator=allocator,
+                    seed=seed,
+                    fingerprint=fingerprints.fingerprint(resolved_base_params.model_dump(exclude_none=False)),
+                )
+
+                yield TextGenerationParameters.model_validate(
+                    {
+                        **shared_fields.values(),
+                        "base_params": BasicTextGenerationParameters.model_validate(
+                            resolved_base_params,
+                            from_attributes=True,
+                        ),
+                        "result_ids": result_ids,
+                    },
+                )
+
+        return _expand()
+
 
 class TextGenerationParameters(TextGenerationParametersTemplate):
     """Represents the common bare-minium parameters for a text generation."""
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import base64
+import copy
 import hashlib
-import json
+import struct
 import uuid
+import weakref
 from collections.abc import Callable, Collection, Mapping, Sequence
 from dataclasses import dataclass
 from enum import Enum
@@ -54,6 +55,74 @@ def apply_template_overrides[TemplateT: BaseModel](
     return TemplateFinalization(template=updated, payload=payload)
 
 
+_fingerprint_memos: dict[int, dict[tuple[object, ...], str]] = {}
+"""Fingerprints already computed for deeply frozen templates, by `id()` of the template."""
+
+
+def _is_deeply_frozen(value: object) -> bool:
+    """Return whether `value` and everything it contains is immutable, so its fingerprint can never change."""
+    if value is None or isinstance(value, bool | int | float | str | bytes | Enum | UUID | Path):
+        return True
+    if isinstance(value, BaseModel):
+        return bool(value.model_config.get("frozen")) and all(
+            _is_deeply_frozen(getattr(value, field_name)) for field_name in type(value).model_fields
+        )
+    if isinstance(value, tuple | frozenset):
+        return all(_is_deeply_frozen(item) for item in value)
+    return False
+
+
+def _get_fingerprint_memo(template: BaseModel) -> dict[tuple[object, ...], str] | None:
+    """Return the fingerprint memo for `template`, or `None` if it could be mutated and must not be memoized.
+
+    Memos are dropped when their template is garbage collected, so an `id()` is never reused for a stale entry.
+    """
+    memo = _fingerprint_memos.get(id(template))
+    if memo is not None:
+        return memo
+    if not _is_deeply_frozen(template):
+        return None
+
+    memo = _fingerprint_memos.setdefault(id(template), {})
+    weakref.finalize(template, _fingerprint_memos.pop, id(template), None)
+    return memo
+
+
+class SharedTemplateFields:
+    """The field values every parameter set expanded from one template has in common.
+
+    Deeply frozen values (including frozen sub-models) are shared by all of the expansions. Anything mutable is
+    deep-copied for each expansion, so that changing one expansion can never change another.
+    """
+
+    def __init__(
+        self,
+        template: BaseModel,
+        *,
+        exclude: Collection[str] = (),
+        overrides: Mapping[str, object] | None = None,
+    ) -> None:
+        """Collect the field values of `template`, without those in `exclude` and with `overrides` applied."""
+        values = {
+            field_name: getattr(template, field_name)
+            for field_name in type(template).model_fields
+            if field_name not in exclude
+        }
+        if overrides:
+            values.update(overrides)
+
+        self._shared = {key: value for key, value in values.items() if _is_deeply_frozen(value)}
+        self._copied = {key: value for key, value in values.items() if key not in self._shared}
+
+    def values(self) -> dict[str, object]:
+        """Return the field values for one expansion."""
+        copied = {
+            key: value.model_copy(deep=True) if isinstance(value, BaseModel) else copy.deepcopy(value)
+            for key, value in self._copied.items()
+        }
+        return {**self._shared, **copied}
+
+
 def finalize_template_for_parameters[TemplateT: BaseModel](
     template: TemplateT,
     *,
@@ -62,13 +131,27 @@ def finalize_template_for_parameters[TemplateT: BaseModel](
     fingerprint_exclude_fields: Collection[str] | None = None,
     fingerprint_transform: Callable[[TemplateFinalization[TemplateT], dict[str, object]], None] | None = None,
 ) -> TemplateFingerprintSnapshot[TemplateT]:
-    """Finalize a template payload and compute a deterministic fingerprint."""
+    """Finalize a template payload and compute a deterministic fingerprint.
+
+    Fingerprints of deeply frozen templates are memoized per instance, when no overrides or transform are given.
+    """
     finalization = apply_template_overrides(
         template,
         overrides=overrides,
         exclude_none=exclude_none,
     )
 
+    memo: dict[tuple[object, ...], str] | None = None
+    memo_key = (exclude_none, tuple(sorted(fingerprint_exclude_fields or ())))
+    if not overrides and fingerprint_transform is None:
+        memo = _get_fingerprint_memo(template)
+    if memo is not None and memo_key in memo:
+        return TemplateFingerprintSnapshot(
+            template=finalization.template,
+            payload=finalization.payload,
+            fingerprint=memo[memo_key],
+        )
+
     fingerprint_payload = dict(finalization.payload)
     if fingerprint_exclude_fields:
         for field in fingerprint_exclude_fields:
@@ -78,6 +161,8 @@ def finalize_template_for_parameters[TemplateT: BaseModel](
         fingerprint_transform(finalization, fingerprint_payload)
 
     fingerprint = compute_parameter_fingerprint(fingerprint_payload)
+    if memo is not None:
+        memo[memo_key] = fingerprint
     return TemplateFingerprintSnapshot(
         template=finalization.template,
         payload=finalization.payload,
@@ -85,38 +170,133 @@ def finalize_template_for_parameters[TemplateT: BaseModel](
     )
 
 
-def _normalise_for_fingerprint(value: object) -> object:
-    """Convert values into JSON-serialisable structures with deterministic ordering."""
-    if value is None:
-        return None
-    if isinstance(value, bool | int | float | str):
-        return value
-    if isinstance(value, Enum):
-        enum_value = value.value
-        if isinstance(enum_value, bool | int | float | str):
-            return enum_value
-        return value.name
-    if isinstance(value, UUID | Path):
-        return str(value)
-    if isinstance(value, bytes):
-        encoded = base64.b64encode(value).decode("ascii")
-        return {"__type__": "bytes", "base64": encoded}
-    if isinstance(value, Mapping):
-        return {
-            str(key): _normalise_for_fingerprint(value_item)
-            for key, value_item in sorted(value.items(), key=lambda item: str(item[0]))
-        }
-    if isinstance(value, Sequence) and not isinstance(value, str | bytes | bytearray):
-        return [_normalise_for_fingerprint(item) for item in value]
-    raise TypeError(f"Unsupported value type for fingerprinting: {type(value)!r}")
+_FINGERPRINT_VERSION: Final[bytes] = b"horde-sdk-parameter-fingerprint-v1\x00"
+"""Prefixes every fingerprint digest; bump the version if the framing below ever changes."""
+
+_FINGERPRINT_DIRECT_UPDATE_THRESHOLD: Final[int] = 4096
+"""`bytes` values at least this large are fed to the digest directly rather than copied into the framing buffer."""
+
+_LENGTH: Final[struct.Struct] = struct.Struct(">Q")
+
+
+class _FingerprintHasher:
+    """Feed a parameter payload into a sha256 digest, walking it in a canonical order.
+
+    Every value is framed as a one byte type tag followed by its contents, with a length prefix wherever the contents
+    vary in size, so no two distinct payloads produce the same stream. Small frames are accumulated in a buffer;
+    large `bytes` values (source images, masks) are passed to the digest as-is, without being copied or encoded.
+
+    Values are normalised as follows, so that equal parameters fingerprint equally whatever their python type:
+    enums by their primitive value (or otherwise their name), and `UUID` and `Path` instances as strings.
+    """
+
+    __slots__ = ("_buffer", "_digest")
+
+    def __init__(self, digest: hashlib._Hash | None = None) -> None:
+        self._digest = digest if digest is not None else hashlib.sha256(_FINGERPRINT_VERSION)
+        self._buffer = bytearray()
+
+    def hexdigest(self) -> str:
+        self._flush()
+        return self._digest.hexdigest()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._digest.update(self._buffer)
+            self._buffer.clear()
+
+    def _write_sized(self, tag: bytes, data: bytes | bytearray | memoryview) -> None:
+        self._buffer += tag
+        self._buffer += _LENGTH.pack(len(data))
+        if len(data) >= _FINGERPRINT_DIRECT_UPDATE_THRESHOLD:
+            self._flush()
+            self._digest.update(data)
+        else:
+            self._buffer += data
+
+    def update(self, value: object) -> None:
+        """Feed `value` (and everything it contains) into the digest."""
+        if isinstance(value, Enum):
+            enum_value = value.value
+            value = enum_value if isinstance(enum_value, bool | int | float | str) else value.name
+        elif isinstance(value, UUID | Path):
+            value = str(value)
+
+        if value is None:
+            self._buffer += b"N"
+        elif value is True:
+            self._buffer += b"T"
+        elif value is False:
+            self._buffer += b"F"
+        elif isinstance(value, str):
+            self._write_sized(b"s", value.encode("utf-8"))
+        elif isinstance(value, int):
+            self._write_sized(b"i", str(value).encode("ascii"))
+        elif isinstance(value, float):
+            self._write_sized(b"f", repr(value).encode("ascii"))
+        elif isinstance(value, bytes | bytearray | memoryview):
+            self._write_sized(b"b", value)
+        elif isinstance(value, Mapping):
+            self._buffer += b"m"
+            self._buffer += _LENGTH.pack(len(value))
+            for key, item in sorted(value.items(), key=lambda entry: str(entry[0])):
+                self._write_sized(b"s", str(key).encode("utf-8"))
+                self.update(item)
+        elif isinstance(value, Sequence):
+            self._buffer += b"l"
+            self._buffer += _LENGTH.pack(len(value))
+            for item in value:
+                self.update(item)
+        else:
+            raise TypeError(f"Unsupported value type for fingerprinting: {type(value)!r}")
+
+
+class PartialParameterFingerprint:
+    """Fingerprints of one payload in which a single field varies, e.g. the base parameters of template variants.
+
+    Every field sorting before the varying one is hashed once, up front; each `fingerprint` call resumes from a copy
+    of that digest. `fingerprint(value)` equals `compute_parameter_fingerprint({**payload, varying_field: value})`.
+    """
+
+    def __init__(self, payload: Mapping[str, object], varying_field: str) -> None:
+        """Hash the fixed part of `payload`; any existing value for `varying_field` is ignored."""
+        fixed = sorted(
+            ((str(key), value) for key, value in payload.items() if str(key) != varying_field),
+            key=lambda entry: entry[0],
+        )
+        self._varying_field = varying_field
+        self._after = [entry for entry in fixed if entry[0] > varying_field]
+
+        self._prefix = _FingerprintHasher()
+        self._prefix._buffer += b"m"
+        self._prefix._buffer += _LENGTH.pack(len(fixed) + 1)
+        for key, value in fixed:
+            if key > varying_field:
+                break
+            self._prefix._write_sized(b"s", key.encode("utf-8"))
+            self._prefix.update(value)
+        self._prefix._flush()
+
+    def fingerprint(self, value: object) -> str:
+        """Return the fingerprint of the payload with `value` as its varying field."""
+        hasher = _FingerprintHasher(self._prefix._digest.copy())
+        hasher._write_sized(b"s", self._varying_field.encode("utf-8"))
+        hasher.update(value)
+        for key, fixed_value in self._after:
+            hasher._write_sized(b"s", key.encode("utf-8"))
+            hasher.update(fixed_value)
+        return hasher.hexdigest()
 
 
 def compute_parameter_fingerprint(payload: Mapping[str, object]) -> str:
-    """Produce a stable fingerprint for a parameter payload."""
-    normalised = _normalise_for_fingerprint(payload)
-    serialised = json.dumps(normalised, sort_keys=True, separators=(",", ":"))
-    digest = hashlib.sha256(serialised.encode("utf-8"))
-    return digest.hexdigest()
+    """Produce a stable fingerprint for a parameter payload.
+
+    The payload is streamed into the digest (see `_FingerprintHasher`), so large binary values such as source
+    images are hashed in place rather than encoded and serialised first.
+    """
+    hasher = _FingerprintHasher()
+    hasher.update(payload)
+    return hasher.hexdigest()
 
 
 class ResultIdAllocator:
@@ -133,6 +313,20 @@ class ResultIdAllocator:
         payload = f"{seed}:{fingerprint}:{index}" if fingerprint is not None else f"{seed}:{index}"
         return str(uuid.uuid5(self._namespace, payload))
 
+    def allocate_many(self, *, seed: str, count: int, fingerprint: str | None = None) -> list[str]:
+        """Derive the identifiers for positional indexes `0` to `count - 1`, as `allocate` would for each.
+
+        The namespace, seed and fingerprint are hashed once and shared between the identifiers.
+        """
+        prefix = f"{seed}:{fingerprint}:" if fingerprint is not None else f"{seed}:"
+        shared = hashlib.sha1(self._namespace.bytes + prefix.encode("utf-8"), usedforsecurity=False)
+        identifiers: list[str] = []
+        for index in range(count):
+            digest = shared.copy()
+            digest.update(str(index).encode("utf-8"))
+            identifiers.append(str(uuid.UUID(bytes=digest.digest()[:16], version=5)))
+        return identifiers
+
 
 def ensure_result_ids(
     existing: Sequence[ID_TYPES] | None,
@@ -152,7 +346,7 @@ def ensure_result_ids(
     if allocator is None:
         return [str(uuid.uuid4()) for _ in range(count)]
 
-    return [allocator.allocate(seed=seed, index=index, fingerprint=fingerprint) for index in range(count)]
+    return list(allocator.allocate_many(seed=seed, count=count, fingerprint=fingerprint))
 
 
 def ensure_result_id(
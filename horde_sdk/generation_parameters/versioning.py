@@ -8,6 +8,9 @@ from horde_sdk.generation_parameters.generic import CompositeParametersBase
 
 ParameterSchemaMigrationFunc = Callable[[dict[str, object]], dict[str, object]]
 
+ParameterSchemaMigrationPath = tuple[tuple[str, ParameterSchemaMigrationFunc], ...]
+"""The `(version reached, migration)` steps which upgrade a payload from one version to the current one."""
+
 
 class ParameterSchemaMigrationError(RuntimeError):
     """Raised when a parameter payload cannot be migrated to the current schema."""
@@ -18,6 +21,7 @@ class _ParameterSchemaMigrationRegistry:
 
     def __init__(self) -> None:
         self._entries: dict[type[CompositeParametersBase], dict[str, tuple[str, ParameterSchemaMigrationFunc]]] = {}
+        self._paths: dict[tuple[type[CompositeParametersBase], str], ParameterSchemaMigrationPath] = {}
 
     def register(
         self,
@@ -34,31 +38,35 @@ class _ParameterSchemaMigrationRegistry:
                 f"Migration from version '{from_version}' is already registered for {parameter_type.__qualname__}.",
             )
         migration_map[from_version] = (to_version, migration)
+        self._paths.clear()
 
-    def apply(
+    def migration_path(
         self,
         parameter_type: type[CompositeParametersBase],
-        payload: Mapping[str, object],
-    ) -> dict[str, object]:
-        """Apply registered migrations to ``payload`` so it matches the current schema version."""
-        payload_dict = dict(payload)
-
-        schema_value = payload_dict.get("schema_version")
-        if isinstance(schema_value, str) and schema_value:
-            current_version = schema_value
-        else:
-            current_version = parameter_type.legacy_schema_version()
-
-        payload_dict["schema_version"] = current_version
+        from_version: str,
+    ) -> ParameterSchemaMigrationPath:
+        """Return the migration steps from ``from_version`` to ``parameter_type``'s current schema version.
+
+        Paths are resolved once per ``(parameter_type, from_version)`` and cached until another migration is
+        registered.
+        """
+        cache_key = (parameter_type, from_version)
+        path = self._paths.get(cache_key)
+        if path is None:
+            path = self._resolve_migration_path(parameter_type, from_version)
+            self._paths[cache_key] = path
+        return path
+
+    def _resolve_migration_path(
+        self,
+        parameter_type: type[CompositeParametersBase],
+        from_version: str,
+    ) -> ParameterSchemaMigrationPath:
         target_version = parameter_type.current_schema_version()
-
-        if current_version == target_version:
-            payload_dict["schema_version"] = target_version
-            return payload_dict
-
         migrations = self._entries.get(parameter_type, {})
         visited_versions: set[str] = set()
-        updated_payload = payload_dict
+        steps: list[tuple[str, ParameterSchemaMigrationFunc]] = []
+        current_version = from_version
 
         while current_version != target_version:
             entry = migrations.get(current_version)
@@ -69,17 +77,38 @@ class _ParameterSchemaMigrationRegistry:
                 )
 
             next_version, migration = entry
-            updated_payload = migration(dict(updated_payload))
-            updated_payload["schema_version"] = next_version
-
             if next_version in visited_versions:
                 raise ParameterSchemaMigrationError(
                     f"Detected migration cycle when upgrading {parameter_type.__qualname__}.",
                 )
 
+            steps.append((next_version, migration))
             visited_versions.add(next_version)
             current_version = next_version
 
+        return tuple(steps)
+
+    def apply(
+        self,
+        parameter_type: type[CompositeParametersBase],
+        payload: Mapping[str, object],
+    ) -> dict[str, object]:
+        """Apply registered migrations to ``payload`` so it matches the current schema version."""
+        payload_dict = dict(payload)
+
+        schema_value = payload_dict.get("schema_version")
+        if isinstance(schema_value, str) and schema_value:
+            current_version = schema_value
+        else:
+            current_version = parameter_type.legacy_schema_version()
+
+        payload_dict["schema_version"] = current_version
+
+        updated_payload = payload_dict
+        for next_version, migration in self.migration_path(parameter_type, current_version):
+            updated_payload = migration(dict(updated_payload))
+            updated_payload["schema_version"] = next_version
+
         return updated_payload
 
 
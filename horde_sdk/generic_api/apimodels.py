@@ -246,6 +246,14 @@ class ResponseRequiringFollowUpMixin(abc.ABC):
         # ImageGenerateJobPopResponse was the use case at the time of writing
         return False
 
+    def get_follow_up_cleanup_priority(self) -> float:
+        """Return how urgently this response should be cleaned up if its session ends early; higher goes first.
+
+        A session which cannot clean up every pending response before its deadline starts with the highest
+        priority ones. Responses which report the kudos their job costs return that; the default is `0`.
+        """
+        return 0.0
+
     def does_target_request_follow_up(self, target_request: HordeRequest) -> bool:
         """Return whether the `target_request` would follow up on this request.
 
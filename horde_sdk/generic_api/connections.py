@@ -0,0 +1,444 @@
+"""Warm, pooled HTTP connections for the async clients.
+
+Without a warm pool, a cold start pays for DNS resolution, TCP setup and the TLS handshake. That includes the first
+job pop after a worker starts, the first request after an idle period, and the first upload to or download from each
+R2/CDN host. `WarmConnectionPool` owns the `aiohttp.ClientSession` the async clients send their requests with. It:
+
+- caches DNS lookups for a configurable TTL,
+- opens `min_warm_connections` connections to every known host up front, before the first real request,
+- keeps them open with a periodic, cheap `HEAD` request, so that idle periods do not let them close, and
+- counts how many requests reused a pooled connection rather than opening a new one, per host (see `stats`, and the
+  `client_connections_created`/`client_connections_reused` telemetry counters). The pool's own warm-up requests are
+  counted separately, so that keeping connections warm does not pass for reuse.
+
+Hosts are known either up front (e.g. the worker's configured `horde_url`) or as they are seen, e.g. with
+`add_hosts` on a job pop's `r2_uploads` and `source_image` URLs.
+
+    async with WarmConnectionPool([bridge_data.horde_url]) as connections:
+        client = AIHordeAPIAsyncClientSession(connections.session)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import urllib.parse
+from collections.abc import Iterable
+from dataclasses import dataclass
+from ssl import SSLContext
+from types import SimpleNamespace, TracebackType
+
+import aiohttp
+from loguru import logger
+from pydantic import BaseModel
+
+from horde_sdk import _default_sslcontext
+from horde_sdk._telemetry.metrics import _record_connection_use
+
+DEFAULT_DNS_CACHE_TTL = 300
+"""The default number of seconds a DNS lookup is cached for."""
+
+DEFAULT_MIN_WARM_CONNECTIONS = 2
+"""The default number of idle connections kept open to each known host."""
+
+DEFAULT_KEEPALIVE_TIMEOUT = 90
+"""The default number of seconds an idle connection is kept in the pool."""
+
+DEFAULT_REWARM_INTERVAL = 30
+"""The default number of seconds between two refreshes of the warm connections."""
+
+DEFAULT_MAX_WARM_HOSTS = 16
+"""The default most hosts kept warm; hosts added past it are not warmed."""
+
+DEFAULT_WARMUP_TIMEOUT = 10
+"""The default number of seconds a warm-up request may take before it is abandoned."""
+
+
+class HostConnectionStats(BaseModel):
+    """How the connections to one host were used."""
+
+    host: str
+    """The host, as `scheme://host:port`."""
+    warm: bool
+    """Whether the host is kept warm."""
+    connections_created: int
+    """The connections opened to the host by requests other than warm-up ones."""
+    connections_reused: int
+    """The requests to the host, other than warm-up ones, which reused a pooled connection."""
+    reuse_ratio: float
+    """The share of requests which reused a connection, between 0 and 1; 0 if there were no requests. Warm-up
+    requests are not counted."""
+    warmup_connections_created: int
+    """The connections opened to the host to warm it."""
+    warmup_connections_reused: int
+    """The warm-up requests to the host which refreshed a pooled connection."""
+    dns_cache_hits: int
+    """The lookups of the host answered from the DNS cache."""
+    dns_cache_misses: int
+    """The lookups of the host which had to be resolved."""
+
+
+class ConnectionPoolStats(BaseModel):
+    """How a `WarmConnectionPool` was used."""
+
+    hosts: list[HostConnectionStats]
+    """The statistics for each host a request was sent to, or which is kept warm."""
+    connections_created: int
+    """The connections opened by requests other than warm-up ones, over all hosts."""
+    connections_reused: int
+    """The requests, other than warm-up ones, which reused a pooled connection, over all hosts."""
+    reuse_ratio: float
+    """The share of requests which reused a connection, over all hosts. Warm-up requests are not counted."""
+    warmup_connections_created: int
+    """The connections opened to warm hosts, over all hosts."""
+    warmup_connections_reused: int
+    """The warm-up requests which refreshed a pooled connection, over all hosts."""
+    warmups: int
+    """The warm-up rounds run, each of which refreshes every warm host."""
+    warmup_failures: int
+    """The warm-up requests which failed, e.g. because a host was unreachable."""
+
+
+@dataclass
+class _HostCounters:
+    warm: bool = False
+    connections_created: int = 0
+    connections_reused: int = 0
+    warmup_connections_created: int = 0
+    warmup_connections_reused: int = 0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+
+_WARMUP_REQUEST = object()
+"""The `trace_request_ctx` of the pool's warm-up requests, which tells them apart in the trace hooks."""
+
+
+def _reuse_ratio(created: int, reused: int) -> float:
+    requests = created + reused
+    return reused / requests if requests else 0.0
+
+
+def _origin(url: str) -> str:
+    """Return the `scheme://host:port` of `url`, which is what a connection is pooled by."""
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"Not an http(s) URL: {url!r}")
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    host = f"[{parsed.hostname}]" if ":" in parsed.hostname else parsed.hostname
+    return f"{parsed.scheme}://{host}:{port}"
+
+
+class WarmConnectionPool:
+    """An `aiohttp.ClientSession` with cached DNS, which keeps connections to known hosts open and warm.
+
+    Use it as an async context manager, or call `open` and `close`. Pass `session` to the async clients.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[str] = (),
+        *,
+        dns_cache_ttl: float = DEFAULT_DNS_CACHE_TTL,
+        min_warm_connections: int = DEFAULT_MIN_WARM_CONNECTIONS,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        rewarm_interval: float | None = DEFAULT_REWARM_INTERVAL,
+        max_warm_hosts: int = DEFAULT_MAX_WARM_HOSTS,
+        warmup_timeout: float = DEFAULT_WARMUP_TIMEOUT,
+        ssl_context: SSLContext = _default_sslcontext,
+    ) -> None:
+        """Initialize the pool. No connection is opened until `open` is called.
+
+        Args:
+            hosts (Iterable[str], optional): URLs of the hosts to keep warm, e.g. the `horde_url`; only their scheme,
+                host and port are used. Defaults to none.
+            dns_cache_ttl (float, optional): How long a DNS lookup is cached for, in seconds. Defaults to 300.
+            min_warm_connections (int, optional): The idle connections to keep open to each warm host. 0 only
+                caches DNS and pools connections as they are made. Defaults to 2.
+            keepalive_timeout (float, optional): How long an idle connection is kept in the pool, in seconds.
+                Defaults to 90.
+            rewarm_interval (float | None, optional): How often to refresh the warm connections, in seconds; it must
+                be shorter than `keepalive_timeout`. `None` warms only when `open` is called or a host is added.
+                Defaults to 30.
+            max_warm_hosts (int, optional): The most hosts to keep warm. Defaults to 16.
+            warmup_timeout (float, optional): How long a warm-up request may take, in seconds. Defaults to 10.
+            ssl_context (SSLContext, optional): The SSL context to connect with. It must be the one the clients
+                send their requests with, as connections are only reused for the same context. Defaults to the
+                one the clients use by default.
+
+        Raises:
+            ValueError: If an argument is out of range, or a host is not an http(s) URL.
+        """
+        if dns_cache_ttl <= 0:
+            raise ValueError(f"dns_cache_ttl must be positive, got {dns_cache_ttl}")
+        if min_warm_connections < 0:
+            raise ValueError(f"min_warm_connections must not be negative, got {min_warm_connections}")
+        if keepalive_timeout <= 0:
+            raise ValueError(f"keepalive_timeout must be positive, got {keepalive_timeout}")
+        if rewarm_interval is not None and not 0 < rewarm_interval < keepalive_timeout:
+            raise ValueError(
+                f"rewarm_interval must be positive and shorter than keepalive_timeout, got {rewarm_interval}",
+            )
+        if max_warm_hosts < 1:
+            raise ValueError(f"max_warm_hosts must be at least 1, got {max_warm_hosts}")
+        if warmup_timeout <= 0:
+            raise ValueError(f"warmup_timeout must be positive, got {warmup_timeout}")
+
+        self._dns_cache_ttl = dns_cache_ttl
+        self._min_warm_connections = min_warm_connections
+        self._keepalive_timeout = keepalive_timeout
+        self._rewarm_interval = rewarm_interval
+        self._max_warm_hosts = max_warm_hosts
+        self._warmup_timeout = aiohttp.ClientTimeout(total=warmup_timeout)
+        self._ssl_context = ssl_context
+
+        self._counters: dict[str, _HostCounters] = {}
+        self._warm_hosts: list[str] = []
+        self._warmups = 0
+        self._warmup_failures = 0
+
+        self._session: aiohttp.ClientSession | None = None
+        self._rewarm_task: asyncio.Task[None] | None = None
+        self._warmup_tasks: set[asyncio.Task[None]] = set()
+
+        hosts = list(hosts)
+        for host in hosts:
+            _origin(host)
+        self.add_hosts(hosts)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The session to send requests with.
+
+        Raises:
+            RuntimeError: If the pool is not open.
+        """
+        if self._session is None:
+            raise RuntimeError("The connection pool must be opened before use")
+        return self._session
+
+    @property
+    def warm_hosts(self) -> list[str]:
+        """The hosts kept warm, as `scheme://host:port`, in the order they were added."""
+        return list(self._warm_hosts)
+
+    def _host_counters(self, host: str) -> _HostCounters:
+        counters = self._counters.get(host)
+        if counters is None:
+            counters = self._counters[host] = _HostCounters()
+        return counters
+
+    def add_hosts(self, urls: Iterable[str | None]) -> list[str]:
+        """Keep the hosts of `urls` warm, e.g. those of a job pop's R2 upload and source image URLs.
+
+        Hosts already warm, URLs which are `None` or not http(s) (e.g. base64 payloads), and hosts past
+        `max_warm_hosts` are skipped. If the pool is open, the new hosts are warmed in the background.
+
+        Args:
+            urls (Iterable[str | None]): The URLs whose hosts to keep warm.
+
+        Returns:
+            list[str]: The hosts which were added.
+        """
+        added: list[str] = []
+        for url in urls:
+            if url is None:
+                continue
+            try:
+                host = _origin(url)
+            except ValueError:
+                continue
+            if host in self._warm_hosts:
+                continue
+            if len(self._warm_hosts) >= self._max_warm_hosts:
+                logger.debug(f"Not keeping {host} warm; already keeping {self._max_warm_hosts} hosts warm")
+                continue
+            self._warm_hosts.append(host)
+            self._host_counters(host).warm = True
+            added.append(host)
+
+        if added and self._session is not None:
+            task = asyncio.create_task(self.warm(added))
+            self._warmup_tasks.add(task)
+            task.add_done_callback(self._warmup_tasks.discard)
+        return added
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceRequestStartParams,
+        ) -> None:
+            context.host = _origin(str(params.url))
+            context.warmup = context.trace_request_ctx is _WARMUP_REQUEST
+
+        async def on_connection_create_end(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceConnectionCreateEndParams,
+        ) -> None:
+            counters = self._host_counters(context.host)
+            if context.warmup:
+                counters.warmup_connections_created += 1
+                return
+            counters.connections_created += 1
+            _record_connection_use(context.host, reused=False)
+
+        async def on_connection_reuseconn(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceConnectionReuseconnParams,
+        ) -> None:
+            counters = self._host_counters(context.host)
+            if context.warmup:
+                counters.warmup_connections_reused += 1
+                return
+            counters.connections_reused += 1
+            _record_connection_use(context.host, reused=True)
+
+        async def on_dns_cache_hit(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceDnsCacheHitParams,
+        ) -> None:
+            self._host_counters(context.host).dns_cache_hits += 1
+
+        async def on_dns_cache_miss(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceDnsCacheMissParams,
+        ) -> None:
+            self._host_counters(context.host).dns_cache_misses += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+    async def open(self) -> None:
+        """Create the session, warm every known host and start refreshing the warm connections.
+
+        Warm-up failures are logged rather than raised; a host which cannot be reached yet is retried at the next
+        refresh.
+
+        Raises:
+            RuntimeError: If the pool is already open.
+        """
+        if self._session is not None:
+            raise RuntimeError("The connection pool is already open")
+
+        connector = aiohttp.TCPConnector(
+            use_dns_cache=True,
+            ttl_dns_cache=int(self._dns_cache_ttl),
+            keepalive_timeout=self._keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, trace_configs=[self._trace_config()])
+
+        await self.warm()
+        if self._rewarm_interval is not None:
+            self._rewarm_task = asyncio.create_task(self._rewarm_periodically(self._rewarm_interval))
+
+    async def close(self) -> None:
+        """Stop refreshing the warm connections and close the session and all of its connections."""
+        tasks = [*self._warmup_tasks, *([self._rewarm_task] if self._rewarm_task is not None else [])]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._rewarm_task = None
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> WarmConnectionPool:
+        """Open the pool."""
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Close the pool."""
+        await self.close()
+
+    async def _rewarm_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.warm()
+
+    async def _warm_connection(self, session: aiohttp.ClientSession, host: str) -> None:
+        try:
+            async with session.head(
+                f"{host}/",
+                allow_redirects=False,
+                ssl=self._ssl_context,
+                timeout=self._warmup_timeout,
+                trace_request_ctx=_WARMUP_REQUEST,
+            ) as response:
+                # Reading the (empty) body releases the connection back to the pool.
+                await response.read()
+        except (aiohttp.ClientError, TimeoutError) as e:
+            self._warmup_failures += 1
+            logger.debug(f"Failed to warm a connection to {host}: {e!r}")
+
+    async def warm(self, hosts: Iterable[str] | None = None) -> None:
+        """Make sure at least `min_warm_connections` connections to each host are open and idle in the pool.
+
+        The connections are opened (or refreshed, if already pooled) by concurrent `HEAD` requests, one per
+        connection, as concurrent requests cannot share a connection.
+
+        Args:
+            hosts (Iterable[str] | None, optional): The hosts to warm, as returned by `add_hosts`. Defaults to every
+                warm host.
+        """
+        session = self.session
+        hosts_to_warm = list(self._warm_hosts if hosts is None else hosts)
+        if not hosts_to_warm or self._min_warm_connections == 0:
+            return
+
+        await asyncio.gather(
+            *(
+                self._warm_connection(session, host)
+                for host in hosts_to_warm
+                for _ in range(self._min_warm_connections)
+            ),
+        )
+        self._warmups += 1
+
+    def stats(self) -> ConnectionPoolStats:
+        """Return how the pool's connections were used so far."""
+        hosts = [
+            HostConnectionStats(
+                host=host,
+                warm=counters.warm,
+                connections_created=counters.connections_created,
+                connections_reused=counters.connections_reused,
+                reuse_ratio=_reuse_ratio(counters.connections_created, counters.connections_reused),
+                warmup_connections_created=counters.warmup_connections_created,
+                warmup_connections_reused=counters.warmup_connections_reused,
+                dns_cache_hits=counters.dns_cache_hits,
+                dns_cache_misses=counters.dns_cache_misses,
+            )
+            for host, counters in self._counters.items()
+        ]
+        created = sum(host.connections_created for host in hosts)
+        reused = sum(host.connections_reused for host in hosts)
+        return ConnectionPoolStats(
+            hosts=hosts,
+            connections_created=created,
+            connections_reused=reused,
+            reuse_ratio=_reuse_ratio(created, reused),
+            warmup_connections_created=sum(host.warmup_connections_created for host in hosts),
+            warmup_connections_reused=sum(host.warmup_connections_reused for host in hosts),
+            warmups=self._warmups,
+            warmup_failures=self._warmup_failures,
+        )
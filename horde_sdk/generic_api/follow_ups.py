@@ -0,0 +1,327 @@
+"""Tracking of responses which still require a follow-up (or failure-cleanup) request.
+
+Sessions record every response implementing `ResponseRequiringFollowUpMixin` (a submitted generation, a popped job,
+etc.) until the request closing it has been sent, so that they can clean up on an unexpected exit. A long-lived
+session may have thousands of these outstanding, and every request it sends has to be checked against them, so the
+registry indexes them by `(request type, job identifier)` rather than scanning.
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterator
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel, RootModel
+
+from horde_sdk._telemetry.metrics import _record_pending_follow_ups_change
+from horde_sdk.generic_api.apimodels import (
+    HordeRequest,
+    HordeResponse,
+    RequestErrorResponse,
+    ResponseRequiringFollowUpMixin,
+    ResponseWithProgressMixin,
+)
+
+DEFAULT_CLEANUP_CONCURRENCY = 8
+"""How many failure-cleanups a session sends at once when it exits with follow-ups pending."""
+
+_FollowUpKey = tuple[tuple[str, Any], ...]
+"""The (python field name, normalized value) pairs identifying one job, e.g. `(("id_", "<uuid>"),)`."""
+
+
+def _normalize_key_value(value: object) -> object:
+    """Reduce an identifier to a plain hashable value, so that equal identifiers of different types hash alike."""
+    if isinstance(value, RootModel):
+        value = value.root
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _make_key(params: dict[str, Any]) -> _FollowUpKey:
+    return tuple(sorted((name, _normalize_key_value(value)) for name, value in params.items()))
+
+
+def _build_cleanup_requests_safely(response: ResponseRequiringFollowUpMixin) -> list[HordeRequest] | None:
+    """Build the failure-cleanup requests for a response without letting construction errors propagate.
+
+    Cleanup requests only matter if the session later exits with an exception, but they are built
+    eagerly as soon as the triggering response arrives. A response that was already successfully
+    received (and committed server-side) must never be lost because its *hypothetical* cleanup
+    request failed to validate. Returning `None` defers to the exit handlers, which log the
+    misconfiguration and treat the response as handled.
+
+    Args:
+        response (ResponseRequiringFollowUpMixin): The response to build cleanup requests for.
+
+    Returns:
+        list[HordeRequest] | None: The cleanup requests, or `None` if they could not be built.
+    """
+    try:
+        return response.get_follow_up_failure_cleanup_request()
+    except Exception as e:
+        logger.exception(e)
+        logger.critical(
+            "Failed to construct the failure-cleanup request(s) for a successful response! The response is "
+            "unaffected, but no automatic cleanup will occur if this session exits with an exception. "
+            f"This is a bug in `{type(response).__name__}`'s follow-up definitions; please report it!",
+        )
+        return None
+
+
+class PendingFollowUp:
+    """A response awaiting its follow-up, with the request that produced it and its failure-cleanup requests.
+
+    A response can cover several jobs (e.g. an alchemy pop with several forms); it stays pending until each of its
+    jobs has been followed up on.
+    """
+
+    __slots__ = ("_cleanup_by_key", "_outstanding_keys", "cleanup_requests", "request", "response", "sequence")
+
+    def __init__(
+        self,
+        *,
+        request: HordeRequest,
+        response: ResponseRequiringFollowUpMixin,
+        cleanup_requests: list[HordeRequest] | None,
+        keys: list[_FollowUpKey],
+        sequence: int,
+    ) -> None:
+        """Initialize the entry. Use `FollowUpRegistry.add` rather than creating these directly."""
+        self.request = request
+        """The request whose response requires the follow-up."""
+        self.response = response
+        """The response requiring the follow-up."""
+        self.cleanup_requests = cleanup_requests
+        """The requests to send if the session ends before the follow-up, or `None` if they could not be built."""
+        self.sequence = sequence
+        """The order in which the entry was added to its registry."""
+
+        self._outstanding_keys: dict[_FollowUpKey, None] = dict.fromkeys(keys)
+        self._cleanup_by_key: dict[_FollowUpKey, HordeRequest] = {}
+        if cleanup_requests is not None and len(cleanup_requests) == len(keys):
+            self._cleanup_by_key = dict(zip(keys, cleanup_requests, strict=True))
+
+    @property
+    def outstanding_cleanup_requests(self) -> list[HordeRequest] | None:
+        """The cleanup requests for the jobs of this response which have not been followed up on yet."""
+        if self.cleanup_requests is None or not self._cleanup_by_key:
+            return self.cleanup_requests
+        return [self._cleanup_by_key[key] for key in self._outstanding_keys if key in self._cleanup_by_key]
+
+    def is_cleanup_request(self, key: _FollowUpKey, api_request: HordeRequest) -> bool:
+        """Return whether `api_request` is (equal to) this entry's cleanup request for the job `key`."""
+        cleanup_request = self._cleanup_by_key.get(key)
+        if cleanup_request is not None:
+            return cleanup_request == api_request
+        return self.cleanup_requests is not None and api_request in self.cleanup_requests
+
+
+class FollowUpCleanupReport(BaseModel):
+    """How the failure-cleanup of a session's pending follow-ups went when the session exited."""
+
+    pending: int
+    """The number of responses which were awaiting a follow-up when the session exited."""
+    completed: int
+    """The number cleaned up successfully."""
+    failed: int
+    """The number whose cleanup was attempted but failed."""
+    elapsed_seconds: float
+    """How long the cleanup took, up to the session's cleanup deadline."""
+
+    @property
+    def unfinished(self) -> int:
+        """The number not cleaned up (or still being cleaned up) when the deadline was reached."""
+        return self.pending - self.completed - self.failed
+
+    def log(self) -> None:
+        """Log the outcome, as a warning if any cleanup did not complete."""
+        message = (
+            f"Cleaned up {self.completed} of {self.pending} pending follow-up(s) in {self.elapsed_seconds:.2f}s"
+            f" ({self.failed} failed, {self.unfinished} unfinished)"
+        )
+        if self.completed == self.pending:
+            logger.info(message)
+        else:
+            logger.warning(message)
+
+
+class FollowUpRegistry:
+    """The responses a session is holding until their follow-up requests have been sent.
+
+    Each entry is indexed under every `(request type, job key)` that could close it: the response's follow-up
+    request types and its failure-cleanup request type, for each job the response covers. Matching a request
+    against the registry is therefore a dictionary lookup, independent of how many entries are pending.
+
+    Iteration yields entries in the order they were added. The registry is not thread-safe; async sessions guard
+    it with their lock.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._entries: dict[int, PendingFollowUp] = {}
+        self._index: dict[tuple[type[HordeRequest], _FollowUpKey], dict[int, None]] = {}
+        self._key_field_sets: dict[tuple[str, ...], int] = {}
+        self._next_sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __iter__(self) -> Iterator[PendingFollowUp]:
+        return iter(list(self._entries.values()))
+
+    def by_cleanup_priority(self) -> list[PendingFollowUp]:
+        """Return the entries in the order they should be cleaned up: highest priority, then oldest, first."""
+        return sorted(self._entries.values(), key=lambda entry: -entry.response.get_follow_up_cleanup_priority())
+
+    def add(self, request: HordeRequest, response: ResponseRequiringFollowUpMixin) -> PendingFollowUp | None:
+        """Start tracking a response which requires a follow-up.
+
+        Responses which report that they need no failure handling (`ignore_failure`) are not tracked.
+
+        Args:
+            request (HordeRequest): The request which produced the response.
+            response (ResponseRequiringFollowUpMixin): The response requiring a follow-up.
+
+        Returns:
+            PendingFollowUp | None: The new entry, or `None` if the response was not tracked.
+        """
+        if response.ignore_failure():
+            return None
+
+        cleanup_requests = _build_cleanup_requests_safely(response)
+        keys = [_make_key(params) for params in response.get_follow_up_returned_params(as_python_field_name=True)]
+        if not keys:
+            logger.warning("No follow up returned params defined for this request")
+
+        entry = PendingFollowUp(
+            request=request,
+            response=response,
+            cleanup_requests=cleanup_requests,
+            keys=keys,
+            sequence=self._next_sequence,
+        )
+        self._next_sequence += 1
+        self._entries[entry.sequence] = entry
+
+        for request_type in self._closing_request_types(response):
+            for key in keys:
+                self._index.setdefault((request_type, key), {})[entry.sequence] = None
+        for key in keys:
+            field_names = tuple(name for name, _ in key)
+            self._key_field_sets[field_names] = self._key_field_sets.get(field_names, 0) + 1
+
+        _record_pending_follow_ups_change(1)
+        return entry
+
+    def remove(self, entry: PendingFollowUp) -> None:
+        """Stop tracking an entry, e.g. once it has been cleaned up."""
+        if self._entries.pop(entry.sequence, None) is None:
+            return
+
+        for request_type in self._closing_request_types(entry.response):
+            for key in entry._outstanding_keys:
+                self._unindex(request_type, key, entry.sequence)
+        for key in entry._outstanding_keys:
+            self._release_key_fields(key)
+        entry._outstanding_keys.clear()
+
+        _record_pending_follow_ups_change(-1)
+
+    def resolve(self, api_request: HordeRequest, response: HordeResponse) -> PendingFollowUp | None:
+        """Apply a completed request to the registry, marking the job it closes (if any) as followed up.
+
+        A request closes a pending job if it is that job's failure-cleanup request and succeeded, or if it targets
+        the job and its response is final: for responses carrying progress, only once they report the job complete.
+
+        Args:
+            api_request (HordeRequest): The request which was sent.
+            response (HordeResponse): The response it received.
+
+        Returns:
+            PendingFollowUp | None: The entry the request matched, if any. It has been removed from the registry if
+                none of its jobs remain outstanding.
+        """
+        match = self._find(api_request)
+        if match is None:
+            return None
+
+        entry, key = match
+        if entry.is_cleanup_request(key, api_request):
+            if isinstance(response, RequestErrorResponse):
+                logger.error(
+                    "This api request would have followed up on an operation which requires it, but it failed!",
+                )
+                logger.error(f"Request: {api_request.log_safe_model_dump()}")
+                logger.error(f"Response: {response.log_safe_model_dump()}")
+                return entry
+        elif isinstance(response, ResponseWithProgressMixin):
+            if not response.is_final_follow_up():
+                return entry
+            if not entry.request.get_requires_follow_up():
+                return entry
+            if not response.is_job_complete(entry.request.get_number_of_results_expected()):
+                return entry
+
+        self._complete_key(entry, key)
+        return entry
+
+    def find(self, api_request: HordeRequest) -> PendingFollowUp | None:
+        """Return the pending entry `api_request` would follow up on (or clean up), without changing the registry."""
+        match = self._find(api_request)
+        return match[0] if match is not None else None
+
+    def _find(self, api_request: HordeRequest) -> tuple[PendingFollowUp, _FollowUpKey] | None:
+        """Return the oldest entry indexed under the request's type and job key, with that key."""
+        request_type = type(api_request)
+        for field_names in self._key_field_sets:
+            try:
+                key = tuple(sorted((name, _normalize_key_value(getattr(api_request, name))) for name in field_names))
+            except AttributeError:
+                continue
+            sequences = self._index.get((request_type, key))
+            if sequences:
+                return self._entries[next(iter(sequences))], key
+        return None
+
+    def _complete_key(self, entry: PendingFollowUp, key: _FollowUpKey) -> None:
+        if len(entry._outstanding_keys) <= 1:
+            self.remove(entry)
+            return
+
+        del entry._outstanding_keys[key]
+        for request_type in self._closing_request_types(entry.response):
+            self._unindex(request_type, key, entry.sequence)
+        self._release_key_fields(key)
+
+    def _unindex(self, request_type: type[HordeRequest], key: _FollowUpKey, sequence: int) -> None:
+        sequences = self._index.get((request_type, key))
+        if sequences is None:
+            return
+        sequences.pop(sequence, None)
+        if not sequences:
+            del self._index[(request_type, key)]
+
+    def _release_key_fields(self, key: _FollowUpKey) -> None:
+        field_names = tuple(name for name, _ in key)
+        remaining = self._key_field_sets.get(field_names, 0) - 1
+        if remaining > 0:
+            self._key_field_sets[field_names] = remaining
+        else:
+            self._key_field_sets.pop(field_names, None)
+
+    @staticmethod
+    def _closing_request_types(response: ResponseRequiringFollowUpMixin) -> set[type[HordeRequest]]:
+        """Return the request types which can close a job of `response`: its follow-ups and its cleanup."""
+        request_types = set(response.get_follow_up_request_types())
+        request_types.add(response.get_follow_up_default_request_type())
+        try:
+            request_types.add(response.get_follow_up_failure_cleanup_request_type())
+        except Exception as e:
+            logger.debug(f"No cleanup request type for {type(response).__name__}: {e}")
+        return request_types
@@ -5,6 +5,8 @@ from __future__ import annotations
 import asyncio
 import enum
 import os
+import queue
+import threading
 import time
 from abc import ABC
 from ssl import SSLContext
@@ -19,6 +21,7 @@ from strenum import StrEnum
 
 from horde_sdk import _default_sslcontext
 from horde_sdk._telemetry.metrics import (
+    _start_request_timer,
     _telemetry_client_critical_errors_counter,
     _telemetry_client_horde_api_errors_counter,
     _telemetry_client_requests_finished_successfully_counter,
@@ -34,9 +37,14 @@ from horde_sdk.generic_api.apimodels import (
     HordeResponseRootModel,
     RequestErrorResponse,
     ResponseRequiringFollowUpMixin,
-    ResponseWithProgressMixin,
 )
 from horde_sdk.generic_api.consts import ANON_API_KEY
+from horde_sdk.generic_api.follow_ups import (
+    DEFAULT_CLEANUP_CONCURRENCY,
+    FollowUpCleanupReport,
+    FollowUpRegistry,
+    PendingFollowUp,
+)
 from horde_sdk.generic_api.metadata import (
     GenericAcceptTypes,
     GenericHeaderFields,
@@ -47,33 +55,6 @@ from horde_sdk.generic_api.metadata import (
 """The default SSL context to use for aiohttp requests."""
 
 
-def _build_cleanup_requests_safely(response: ResponseRequiringFollowUpMixin) -> list[HordeRequest] | None:
-    """Build the failure-cleanup requests for a response without letting construction errors propagate.
-
-    Cleanup requests only matter if the session later exits with an exception, but they are built
-    eagerly as soon as the triggering response arrives. A response that was already successfully
-    received (and committed server-side) must never be lost because its *hypothetical* cleanup
-    request failed to validate. Returning `None` defers to the exit handlers, which log the
-    misconfiguration and treat the response as handled.
-
-    Args:
-        response (ResponseRequiringFollowUpMixin): The response to build cleanup requests for.
-
-    Returns:
-        list[HordeRequest] | None: The cleanup requests, or `None` if they could not be built.
-    """
-    try:
-        return response.get_follow_up_failure_cleanup_request()
-    except Exception as e:
-        logger.exception(e)
-        logger.critical(
-            "Failed to construct the failure-cleanup request(s) for a successful response! The response is "
-            "unaffected, but no automatic cleanup will occur if this session exits with an exception. "
-            f"This is a bug in `{type(response).__name__}`'s follow-up definitions; please report it!",
-        )
-        return None
-
-
 class ParsedRawRequest(BaseModel):
     """A helper class for passing around the data needed to make an actual web request."""
 
@@ -474,49 +455,71 @@ class GenericHordeAPIManualClient(BaseHordeAPIClient):
             logger.warning(f"Passed expected_response_type: {expected_response_type}")
             logger.warning(f"Allowable pairs defined in the SDK : {api_request.get_success_status_response_pairs()}")
 
-        with logfire.span(
-            self._msg_format_submit_request.format(
+        timer = _start_request_timer(api_request.get_api_endpoint_subpath())
+        status_code: int | None = None
+        try:
+            with logfire.span(
+                self._msg_format_submit_request.format(
+                    sync_async="sync",
+                    http_method_name=http_method_name,
+                    api_request_type=type(api_request).__name__,
+                    expected_response_type=expected_response_type.__name__,
+                ),
                 sync_async="sync",
                 http_method_name=http_method_name,
                 api_request_type=type(api_request).__name__,
                 expected_response_type=expected_response_type.__name__,
-            ),
-            sync_async="sync",
-            http_method_name=http_method_name,
-            api_request_type=type(api_request).__name__,
-            expected_response_type=expected_response_type.__name__,
-        ):
-            parsed_request = self._validate_and_prepare_request(api_request)
-
-            raw_response: requests.Response | None = None
-
-            if http_method_name == HTTPMethod.GET:
-                if parsed_request.request_body is not None:
-                    raise RuntimeError(
-                        "GET requests cannot have a body! This may mean you forgot to override `get_header_fields()` "
-                        "or perhaps you may need to define a `metadata.py` module or entry in it for your API.",
+            ):
+                parsed_request = self._validate_and_prepare_request(api_request)
+                if timer is not None:
+                    timer.lap()
+
+                raw_response: requests.Response | None = None
+
+                if http_method_name == HTTPMethod.GET:
+                    if parsed_request.request_body is not None:
+                        raise RuntimeError(
+                            "GET requests cannot have a body! This may mean you forgot to override "
+                            "`get_header_fields()` or perhaps you may need to define a `metadata.py` module or entry "
+                            "in it for your API.",
+                        )
+                    raw_response = requests.get(
+                        parsed_request.endpoint_no_query,
+                        headers=parsed_request.request_headers,
+                        params=parsed_request.request_queries,
+                        allow_redirects=True,
                     )
-                raw_response = requests.get(
-                    parsed_request.endpoint_no_query,
-                    headers=parsed_request.request_headers,
-                    params=parsed_request.request_queries,
-                    allow_redirects=True,
-                )
-            else:
-                raw_response = requests.request(
-                    method=http_method_name,
-                    url=parsed_request.endpoint_no_query,
-                    headers=parsed_request.request_headers,
-                    params=parsed_request.request_queries,
-                    json=parsed_request.request_body,
-                    allow_redirects=True,
+                else:
+                    raw_response = requests.request(
+                        method=http_method_name,
+                        url=parsed_request.endpoint_no_query,
+                        headers=parsed_request.request_headers,
+                        params=parsed_request.request_queries,
+                        json=parsed_request.request_body,
+                        allow_redirects=True,
+                    )
+                status_code = raw_response.status_code
+                if timer is not None:
+                    timer.lap()
+
+                raw_response_json = raw_response.json()
+                if timer is not None:
+                    timer.lap()
+
+                handled_response = self._after_request_handling(
+                    raw_response_json=raw_response_json,
+                    returned_status_code=raw_response.status_code,
+                    expected_response_type=expected_response_type,
                 )
+                if timer is not None:
+                    timer.lap()
 
-            return self._after_request_handling(
-                raw_response_json=raw_response.json(),
-                returned_status_code=raw_response.status_code,
-                expected_response_type=expected_response_type,
-            )
+                return handled_response
+        finally:
+            if timer is not None:
+                if status_code is not None:
+                    timer.finish(status_code)
+                timer.close()
 
 
 class GenericAsyncHordeAPIManualClient(BaseHordeAPIClient):
@@ -574,45 +577,65 @@ class GenericAsyncHordeAPIManualClient(BaseHordeAPIClient):
         """
         http_method_name = api_request.get_http_method()
 
-        parsed_request = self._validate_and_prepare_request(api_request)
+        timer = _start_request_timer(api_request.get_api_endpoint_subpath())
+        response_status: int | None = None
+        try:
+            parsed_request = self._validate_and_prepare_request(api_request)
+            if timer is not None:
+                timer.lap()
 
-        raw_response_json: dict[str, Any] = {}
-        response_status: int = 599
+            raw_response_json: dict[str, Any] = {}
 
-        if not self._aiohttp_session:
-            raise RuntimeError("No aiohttp session was provided but an async method was called!")
+            if not self._aiohttp_session:
+                raise RuntimeError("No aiohttp session was provided but an async method was called!")
 
-        with logfire.span(
-            self._msg_format_submit_request.format(
+            with logfire.span(
+                self._msg_format_submit_request.format(
+                    sync_async="async",
+                    http_method_name=http_method_name,
+                    api_request_type=type(api_request).__name__,
+                    expected_response_type=expected_response_type.__name__,
+                ),
                 sync_async="async",
                 http_method_name=http_method_name,
                 api_request_type=type(api_request).__name__,
                 expected_response_type=expected_response_type.__name__,
-            ),
-            sync_async="async",
-            http_method_name=http_method_name,
-            api_request_type=type(api_request).__name__,
-            expected_response_type=expected_response_type.__name__,
-        ):
-            async with (
-                self._aiohttp_session.request(
-                    http_method_name.value,
-                    parsed_request.endpoint_no_query,
-                    headers=parsed_request.request_headers,
-                    params=parsed_request.request_queries,
-                    json=parsed_request.request_body,
-                    allow_redirects=True,
-                    ssl=self._ssl_context,
-                ) as response,
             ):
-                raw_response_json = await response.json()
-                response_status = response.status
+                async with (
+                    self._aiohttp_session.request(
+                        http_method_name.value,
+                        parsed_request.endpoint_no_query,
+                        headers=parsed_request.request_headers,
+                        params=parsed_request.request_queries,
+                        json=parsed_request.request_body,
+                        allow_redirects=True,
+                        ssl=self._ssl_context,
+                    ) as response,
+                ):
+                    response_status = response.status
+                    if timer is not None:
+                        # Read the body separately so the network and decode phases can be told apart;
+                        # `json()` then decodes the already-read body.
+                        await response.read()
+                        timer.lap()
+                    raw_response_json = await response.json()
+                    if timer is not None:
+                        timer.lap()
+
+                handled_response = self._after_request_handling(
+                    raw_response_json=raw_response_json,
+                    returned_status_code=response_status,
+                    expected_response_type=expected_response_type,
+                )
+                if timer is not None:
+                    timer.lap()
 
-            return self._after_request_handling(
-                raw_response_json=raw_response_json,
-                returned_status_code=response_status,
-                expected_response_type=expected_response_type,
-            )
+                return handled_response
+        finally:
+            if timer is not None:
+                if response_status is not None:
+                    timer.finish(response_status)
+                timer.close()
 
 
 class GenericHordeAPISession(GenericHordeAPIManualClient):
@@ -626,9 +649,17 @@ class GenericHordeAPISession(GenericHordeAPIManualClient):
     or anything labeled as `async` on the API.
     """
 
-    _pending_follow_ups: list[tuple[HordeRequest, HordeResponseBaseModel, list[HordeRequest] | None]]
-    """A `list` of 3-tuples containing the request, response, and a clean-up request for any requests which might need
-    it."""
+    _pending_follow_ups: FollowUpRegistry
+    """The responses still awaiting a follow-up request, with their requests and clean-up requests."""
+    _pending_follow_ups_lock: threading.Lock
+    """Guards `_pending_follow_ups`, which the cleanup threads update on exit."""
+
+    cleanup_concurrency: int
+    """How many failure-cleanups to send at once when exiting with follow-ups pending."""
+    cleanup_deadline: float | None
+    """The most time, in seconds, to spend on failure-cleanups when exiting. `None` waits for all of them."""
+    last_cleanup_report: FollowUpCleanupReport | None
+    """The outcome of the failure-cleanups sent on the last exit, if any were needed."""
 
     def __init__(
         self,
@@ -638,8 +669,28 @@ class GenericHordeAPISession(GenericHordeAPIManualClient):
         path_fields: type[GenericPathFields] = GenericPathFields,
         query_fields: type[GenericQueryFields] = GenericQueryFields,
         accept_types: type[GenericAcceptTypes] = GenericAcceptTypes,
+        cleanup_concurrency: int = DEFAULT_CLEANUP_CONCURRENCY,
+        cleanup_deadline: float | None = None,
     ) -> None:
-        """Initialize a new `GenericHordeAPISession` instance."""
+        """Initialize a new `GenericHordeAPISession` instance.
+
+        Args:
+            apikey (str | None, optional): The API key to use for authenticated requests. Defaults to None, which
+                will use the anonymous API key.
+            header_fields (type[GenericHeaderFields], optional): Pass this to define the API's Header fields.
+                Defaults to GenericHeaderFields.
+            path_fields (type[GenericPathFields], optional): Pass this to define the API's URL path fields.
+                Defaults to GenericPathFields.
+            query_fields (type[GenericQueryFields], optional): Pass this to define the API's URL query fields.
+                Defaults to GenericQueryFields.
+            accept_types (type[GenericAcceptTypes], optional): Pass this to define the API's accept types.
+                Defaults to GenericAcceptTypes.
+            cleanup_concurrency (int, optional): How many failure-cleanups to send at once if the session exits
+                with follow-ups pending. Defaults to `DEFAULT_CLEANUP_CONCURRENCY`.
+            cleanup_deadline (float | None, optional): The most time, in seconds, to spend on those cleanups. The
+                most expensive jobs are cleaned up first; any not done by the deadline are abandoned. Defaults to
+                None, which waits for every cleanup.
+        """
         super().__init__(
             apikey=apikey,
             header_fields=header_fields,
@@ -647,7 +698,13 @@ class GenericHordeAPISession(GenericHordeAPIManualClient):
             query_fields=query_fields,
             accept_types=accept_types,
         )
-        self._pending_follow_ups = []
+        if cleanup_concurrency < 1:
+            raise ValueError("cleanup_concurrency must be at least 1")
+        self._pending_follow_ups = FollowUpRegistry()
+        self._pending_follow_ups_lock = threading.Lock()
+        self.cleanup_concurrency = cleanup_concurrency
+        self.cleanup_deadline = cleanup_deadline
+        self.last_cleanup_report = None
 
     @override
     def submit_request(
@@ -657,52 +714,12 @@ class GenericHordeAPISession(GenericHordeAPIManualClient):
     ) -> HordeResponseTypeVar | RequestErrorResponse:
         response = super().submit_request(api_request, expected_response_type)
 
-        if isinstance(response, ResponseRequiringFollowUpMixin):
-            self._pending_follow_ups.append(
-                (api_request, response, _build_cleanup_requests_safely(response)),
-            )
-        else:  # TODO: This whole else is duplicated in the asyncio version of this class. Refactor it out.
-            # Check if this request is a cleanup or follow up request for a prior request
-            # Loop through each item in self._pending_follow_ups list
-            for index, (prior_request, prior_response, cleanup_request) in enumerate(self._pending_follow_ups):
-                if cleanup_request is not None and api_request in cleanup_request:
-                    if not isinstance(response, RequestErrorResponse):
-                        self._pending_follow_ups.pop(index)
-                    else:
-                        logger.error(
-                            "This api request would have followed up on an operation which requires it, but it "
-                            "failed!",
-                        )
-                        logger.error(f"Request: {api_request.log_safe_model_dump()}")
-                        logger.error(f"Response: {response}")
-                    break
-
-                if not isinstance(prior_response, ResponseRequiringFollowUpMixin):
-                    continue
-
-                # If the response isn't a final follow-up, we don't need to do anything else.
-                if isinstance(response, ResponseWithProgressMixin):
-                    if not response.is_final_follow_up():
-                        continue
-                    if not prior_request.get_requires_follow_up():
-                        continue
-
-                    # See if the current api_request is a follow-up to the prior_request
-                    if not prior_response.does_target_request_follow_up(api_request):
-                        continue
-
-                    # Check if the current response indicates that the job is complete
-                    if response.is_job_complete(prior_request.get_number_of_results_expected()):
-                        # Remove the current item from the _pending_follow_ups list
-                        # This is for the benefit of the __exit__ method (context management)
-                        self._pending_follow_ups.pop(index)
-                        break
-                else:
-                    if not prior_response.does_target_request_follow_up(api_request):
-                        continue
-
-                    self._pending_follow_ups.pop(index)
-                    break
+        with self._pending_follow_ups_lock:
+            if isinstance(response, ResponseRequiringFollowUpMixin):
+                self._pending_follow_ups.add(api_request, response)
+            else:
+                # Check if this request is a cleanup or follow up request for a prior request
+                self._pending_follow_ups.resolve(api_request, response)
 
         return response
 
@@ -733,10 +750,8 @@ class GenericHordeAPISession(GenericHordeAPIManualClient):
             return exc_type is asyncio.exceptions.CancelledError
 
         # Handle each pending follow-up request.
-        all_handled = True
-        for request_to_follow_up, response_to_follow_up, cleanup_request in self._pending_follow_ups:
-            handled = self._handle_exit(request_to_follow_up, response_to_follow_up, cleanup_request)
-            all_handled = all_handled and handled
+        report = self._clean_up_pending_follow_ups()
+        all_handled = report.completed == report.pending
 
         # Check if the exception was a CancelledError.
         is_cancelled = exc_type is asyncio.exceptions.CancelledError
@@ -744,10 +759,76 @@ class GenericHordeAPISession(GenericHordeAPIManualClient):
         # If we cancelled the task and everything cleaned up ok, we don't want to raise an exception.
         return all_handled and is_cancelled  # Returns True if everything was handled and we cancelled the task.
 
+    def _clean_up_pending_follow_ups(self) -> FollowUpCleanupReport:
+        """Send the failure-cleanups for every pending follow-up, most expensive first, on a pool of threads.
+
+        Returns once every cleanup has been handled or `cleanup_deadline` has passed. The threads are daemons, so a
+        cleanup still in flight at the deadline does not keep the interpreter alive.
+
+        Returns:
+            FollowUpCleanupReport: How many cleanups completed, failed or were unfinished by the deadline.
+        """
+        with self._pending_follow_ups_lock:
+            entries = self._pending_follow_ups.by_cleanup_priority()
+
+        start = time.monotonic()
+        if not entries:
+            return FollowUpCleanupReport(pending=0, completed=0, failed=0, elapsed_seconds=0.0)
+        deadline = None if self.cleanup_deadline is None else start + self.cleanup_deadline
+
+        work: queue.SimpleQueue[PendingFollowUp] = queue.SimpleQueue()
+        for entry in entries:
+            work.put(entry)
+
+        outcomes: list[bool] = []
+        outcomes_lock = threading.Lock()
+        all_done = threading.Event()
+
+        def _worker() -> None:
+            while deadline is None or time.monotonic() < deadline:
+                try:
+                    entry = work.get_nowait()
+                except queue.Empty:
+                    return
+
+                try:
+                    handled = self._handle_exit(entry.request, entry.response, entry.outstanding_cleanup_requests)
+                except Exception as e:
+                    logger.exception(e)
+                    handled = False
+
+                with outcomes_lock:
+                    outcomes.append(handled)
+                    if len(outcomes) == len(entries):
+                        all_done.set()
+
+        workers = [
+            threading.Thread(target=_worker, name=f"horde-sdk-cleanup-{index}", daemon=True)
+            for index in range(min(self.cleanup_concurrency, len(entries)))
+        ]
+        for worker in workers:
+            worker.start()
+        all_done.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+        with outcomes_lock:
+            completed = outcomes.count(True)
+            failed = len(outcomes) - completed
+
+        report = FollowUpCleanupReport(
+            pending=len(entries),
+            completed=completed,
+            failed=failed,
+            elapsed_seconds=time.monotonic() - start,
+        )
+        report.log()
+        self.last_cleanup_report = report
+        return report
+
     def _handle_exit(
         self,
         request_to_follow_up: HordeRequest,  # The request that is ending prematurely.
-        response_to_follow_up: HordeResponseBaseModel,  # The response to the request that is ending prematurely.
+        response_to_follow_up: HordeResponseBaseModel
+        | ResponseRequiringFollowUpMixin,  # The response to the request that is ending prematurely.
         cleanup_requests: list[HordeRequest] | None,  # The request to clean up after the premature ending, if any.
     ) -> bool:
         """Send any follow up requests needed to clean up after a request which is ending prematurely.
@@ -810,11 +891,18 @@ class GenericAsyncHordeAPISession(GenericAsyncHordeAPIManualClient):
     """A `list` of `HordeRequest` instances which are being `await`ed on asynchronously."""
     _awaiting_requests_lock: asyncio.Lock = asyncio.Lock()
 
-    _pending_follow_ups: list[tuple[HordeRequest, HordeResponse, list[HordeRequest] | None]]
-    """A `list` of 3-tuples containing the request, response, and a clean-up request for any requests which might need
-    it."""
+    _pending_follow_ups: FollowUpRegistry
+    """The responses still awaiting a follow-up request, with their requests and clean-up requests."""
     _pending_follow_ups_lock: asyncio.Lock = asyncio.Lock()
 
+    cleanup_concurrency: int
+    """How many failure-cleanups to send at once when exiting with follow-ups pending."""
+    cleanup_deadline: float | None
+    """The most time, in seconds, to spend on failure-cleanups when exiting. `None` waits for all of them. The most
+    expensive jobs are cleaned up first; any not done by the deadline are abandoned."""
+    last_cleanup_report: FollowUpCleanupReport | None
+    """The outcome of the failure-cleanups sent on the last exit, if any were needed."""
+
     @override
     def __init__(
         self,
@@ -826,6 +914,8 @@ class GenericAsyncHordeAPISession(GenericAsyncHordeAPIManualClient):
         query_fields: type[GenericQueryFields] = GenericQueryFields,
         accept_types: type[GenericAcceptTypes] = GenericAcceptTypes,
         ssl_context: SSLContext = _default_sslcontext,
+        cleanup_concurrency: int = DEFAULT_CLEANUP_CONCURRENCY,
+        cleanup_deadline: float | None = None,
     ) -> None:
         super().__init__(
             apikey=apikey,
@@ -836,8 +926,13 @@ class GenericAsyncHordeAPISession(GenericAsyncHordeAPIManualClient):
             accept_types=accept_types,
             ssl_context=ssl_context,
         )
-        self._pending_follow_ups = []
+        if cleanup_concurrency < 1:
+            raise ValueError("cleanup_concurrency must be at least 1")
+        self._pending_follow_ups = FollowUpRegistry()
         self._awaiting_requests = []
+        self.cleanup_concurrency = cleanup_concurrency
+        self.cleanup_deadline = cleanup_deadline
+        self.last_cleanup_report = None
 
     @override
     async def submit_request(
@@ -860,55 +955,10 @@ class GenericAsyncHordeAPISession(GenericAsyncHordeAPIManualClient):
             # Check if the response requires a follow-up request.
             if isinstance(response, ResponseRequiringFollowUpMixin):
                 # Add the follow-up request to the list of pending follow-ups.
-                if not response.ignore_failure():
-                    self._pending_follow_ups.append(
-                        (api_request, response, _build_cleanup_requests_safely(response)),
-                    )
-
+                self._pending_follow_ups.add(api_request, response)
             else:
                 # Check if this request is a cleanup or follow up request for a prior request
-
-                # Loop through each item in self._pending_follow_ups list
-                for index, (prior_request, prior_response, cleanup_request) in enumerate(self._pending_follow_ups):
-                    if cleanup_request is not None and api_request in cleanup_request:
-                        if not isinstance(response, RequestErrorResponse):
-                            self._pending_follow_ups.pop(index)
-                            break
-
-                        logger.error(
-                            "This api request would have followed up on an operation which requires it, but it "
-                            "failed!",
-                        )
-                        logger.error(f"Request: {api_request.log_safe_model_dump()}")
-                        logger.error(f"Response: {response.log_safe_model_dump()}")
-                        break
-
-                    if not isinstance(prior_response, ResponseRequiringFollowUpMixin):
-                        continue
-
-                    # If the response isn't a final follow-up, we don't need to do anything else.
-                    if isinstance(response, ResponseWithProgressMixin):
-                        if not response.is_final_follow_up():
-                            continue
-                        if not prior_request.get_requires_follow_up():
-                            continue
-
-                        # See if the current api_request is a follow-up to the prior_request
-                        if not prior_response.does_target_request_follow_up(api_request):
-                            continue
-
-                        # Check if the current response indicates that the job is complete
-                        if response.is_job_complete(prior_request.get_number_of_results_expected()):
-                            # Remove the current item from the _pending_follow_ups list
-                            # This is for the benefit of the __exit__ method (context management)
-                            self._pending_follow_ups.pop(index)
-                            break
-                    else:
-                        if not prior_response.does_target_request_follow_up(api_request):
-                            continue
-
-                        self._pending_follow_ups.pop(index)
-                        break
+                self._pending_follow_ups.resolve(api_request, response)
 
         # Return the response from the API.
         return response
@@ -948,12 +998,7 @@ class GenericAsyncHordeAPISession(GenericAsyncHordeAPIManualClient):
 
         try:
             # Handle each pending follow-up request asynchronously.
-            await asyncio.gather(
-                *[
-                    self._handle_exit_async(request_to_follow_up, response_to_follow_up, cleanup_request)
-                    for request_to_follow_up, response_to_follow_up, cleanup_request in self._pending_follow_ups
-                ],
-            )
+            await self._clean_up_pending_follow_ups_async()
 
             # Return True if everything was handled and the task was cancelled deliberately,
             # False otherwise (which will reraise the exception)
@@ -963,10 +1008,65 @@ class GenericAsyncHordeAPISession(GenericAsyncHordeAPIManualClient):
             logger.exception(e)
             return False
 
+    async def _clean_up_pending_follow_ups_async(self) -> FollowUpCleanupReport:
+        """Send the failure-cleanups for every pending follow-up, most expensive first, `cleanup_concurrency` at once.
+
+        Returns once every cleanup has been handled or `cleanup_deadline` has passed; cleanups still running at the
+        deadline are cancelled.
+
+        Returns:
+            FollowUpCleanupReport: How many cleanups completed, failed or were unfinished by the deadline.
+        """
+        async with self._pending_follow_ups_lock:
+            entries = self._pending_follow_ups.by_cleanup_priority()
+
+        start = time.monotonic()
+        if not entries:
+            return FollowUpCleanupReport(pending=0, completed=0, failed=0, elapsed_seconds=0.0)
+
+        # Semaphore waiters are woken in FIFO order, so the tasks start in priority order.
+        semaphore = asyncio.Semaphore(self.cleanup_concurrency)
+
+        async def _bounded_handle_exit(entry: PendingFollowUp) -> bool:
+            async with semaphore:
+                return await self._handle_exit_async(
+                    entry.request,
+                    entry.response,
+                    entry.outstanding_cleanup_requests,
+                )
+
+        tasks = [asyncio.create_task(_bounded_handle_exit(entry)) for entry in entries]
+        done, unfinished = await asyncio.wait(tasks, timeout=self.cleanup_deadline)
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+        completed = 0
+        failed = 0
+        for task in done:
+            if not task.cancelled() and task.exception() is None and task.result():
+                completed += 1
+            else:
+                failed += 1
+                if not task.cancelled() and task.exception() is not None:
+                    logger.exception(task.exception())
+
+        report = FollowUpCleanupReport(
+            pending=len(entries),
+            completed=completed,
+            failed=failed,
+            elapsed_seconds=time.monotonic() - start,
+        )
+        report.log()
+        self.last_cleanup_report = report
+        return report
+
     async def _handle_exit_async(
         self,
         request_to_follow_up: HordeRequest,  # The request that is ending prematurely.
-        response_to_follow_up: HordeResponse,  # The response to the request that is ending prematurely.
+        response_to_follow_up: HordeResponse
+        | ResponseRequiringFollowUpMixin,  # The response to the request that is ending prematurely.
         cleanup_requests: list[HordeRequest] | None,  # The request to clean up after the premature ending, if any.
     ) -> bool:
         """Send any follow up requests needed to clean up after a request which is ending prematurely.
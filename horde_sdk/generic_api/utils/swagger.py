@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import re
 import uuid
@@ -348,6 +349,65 @@ class SwaggerEndpoint(BaseModel):
         return v
 
 
+class SwaggerDocIndex:
+    """Lookups from an endpoint path and HTTP method to its definition and the models it uses.
+
+    Built once per `SwaggerDoc` (see `SwaggerDoc.get_index`), so that looking up an endpoint's models does not
+    rescan the doc.
+    """
+
+    __slots__ = ("endpoint_methods", "endpoints_by_model", "request_models", "response_models")
+
+    def __init__(self, paths: dict[str, SwaggerEndpoint]) -> None:
+        """Index the endpoints of a swagger doc.
+
+        Args:
+            paths (dict[str, SwaggerEndpoint]): The doc's endpoints, by path.
+        """
+        self.endpoint_methods: dict[tuple[str, HTTPMethod], SwaggerEndpointMethod] = {}
+        """Every endpoint method, by (path, HTTP method)."""
+        self.request_models: dict[tuple[str, HTTPMethod], tuple[str, ...]] = {}
+        """The names of the models each endpoint method takes as a payload."""
+        self.response_models: dict[tuple[str, HTTPMethod], dict[str, str]] = {}
+        """The name of the model each endpoint method responds with, by status code."""
+        self.endpoints_by_model: dict[str, list[tuple[str, HTTPMethod]]] = {}
+        """The endpoint methods which take or respond with each model."""
+
+        for path, endpoint in paths.items():
+            for method_name, endpoint_method in endpoint.get_defined_endpoints().items():
+                key = (path, HTTPMethod(method_name.upper()))
+                self.endpoint_methods[key] = endpoint_method
+
+                request_models = tuple(
+                    endpoint._remove_ref_syntax(parameter.schema_.ref)
+                    for parameter in endpoint_method.parameters or []
+                    if isinstance(parameter.schema_, SwaggerEndpointMethodParameterSchemaRef)
+                    and parameter.schema_.ref is not None
+                )
+                response_models = {
+                    status_code: endpoint._remove_ref_syntax(response.schema_.ref)
+                    for status_code, response in (endpoint_method.responses or {}).items()
+                    if response.schema_ and response.schema_.ref
+                }
+                self.request_models[key] = request_models
+                self.response_models[key] = response_models
+
+                for model_name in dict.fromkeys((*request_models, *response_models.values())):
+                    self.endpoints_by_model.setdefault(model_name, []).append(key)
+
+    def get_endpoint_method(self, path: str, http_method: HTTPMethod | str) -> SwaggerEndpointMethod | None:
+        """Return the definition of an endpoint method, or `None` if the doc does not define it."""
+        return self.endpoint_methods.get((path, HTTPMethod(str(http_method).upper())))
+
+    def get_request_models(self, path: str, http_method: HTTPMethod | str) -> tuple[str, ...]:
+        """Return the names of the models an endpoint method takes as a payload."""
+        return self.request_models.get((path, HTTPMethod(str(http_method).upper())), ())
+
+    def get_response_models(self, path: str, http_method: HTTPMethod | str) -> dict[str, str]:
+        """Return the name of the model an endpoint method responds with, by status code."""
+        return self.response_models.get((path, HTTPMethod(str(http_method).upper())), {})
+
+
 class SwaggerDoc(BaseModel):
     """The swagger doc for an API, represented as an object."""
 
@@ -372,6 +432,18 @@ class SwaggerDoc(BaseModel):
     definitions: dict[str, SwaggerModelDefinition | SwaggerModelDefinitionSchemaValidation]
     """The definitions of the models (data structures) used in the API."""
 
+    @functools.cached_property
+    def _index(self) -> SwaggerDocIndex:
+        # A cached property (unlike a private attribute) is ignored when comparing docs.
+        return SwaggerDocIndex(self.paths)
+
+    def get_index(self) -> SwaggerDocIndex:
+        """Return the lookups from endpoint path and HTTP method to definitions, building them on first use.
+
+        The index reflects `paths` when it was built; it is not updated if `paths` is modified afterwards.
+        """
+        return self._index
+
     def get_all_response_examples(
         self,
     ) -> dict[str, dict[HTTPMethod, dict[HTTPStatusCode, dict[str, object] | list[Any]]]]:
@@ -911,7 +983,7 @@ class SwaggerDoc(BaseModel):
 class SwaggerParser:
     """Parse a swagger doc from a URL or a local file."""
 
-    _swagger_json: dict[str, Any]
+    _swagger_doc_bytes: bytes
 
     def __init__(
         self,
@@ -932,8 +1004,7 @@ class SwaggerParser:
         if swagger_doc_path:
             swagger_doc_path = Path(swagger_doc_path)
             if swagger_doc_path.exists():
-                with open(swagger_doc_path, encoding="utf-8") as f:
-                    self._swagger_json = json.load(f)
+                self._swagger_doc_bytes = swagger_doc_path.read_bytes()
             else:
                 raise RuntimeError(f"Failed to find swagger.json at {swagger_doc_path}")
         # If a Swagger doc URL is provided, get the JSON from the URL
@@ -941,13 +1012,16 @@ class SwaggerParser:
             try:
                 response = requests.get(swagger_doc_url)
                 response.raise_for_status()
-                self._swagger_json = response.json()
+                self._swagger_doc_bytes = response.content
             except requests.exceptions.HTTPError as e:
                 raise RuntimeError(f"Failed to get swagger.json from server: {e.response}") from e
 
     def get_swagger_doc(self) -> SwaggerDoc:
-        """Get the swagger doc as a SwaggerDoc object."""
-        return SwaggerDoc.model_validate(self._swagger_json)
+        """Get the swagger doc as a SwaggerDoc object, with its endpoint index (see `SwaggerDoc.get_index`) built."""
+        # Validating the raw JSON directly skips building (and then walking) an intermediate tree of python objects.
+        swagger_doc = SwaggerDoc.model_validate_json(self._swagger_doc_bytes)
+        swagger_doc.get_index()
+        return swagger_doc
 
     def get_all_examples(self) -> dict[str, dict[str, object]]:
         """Get all examples from the swagger doc."""
@@ -165,13 +165,11 @@ def all_undefined_classes_for_endpoints(module: types.ModuleType) -> dict[str, s
     parser = SwaggerParser(swagger_doc_url=get_ai_horde_swagger_url())
     swagger_doc = parser.get_swagger_doc()
 
-    for path, swagger_endpoint in swagger_doc.paths.items():
-        endpoint_request_models: list[str] = swagger_endpoint.get_all_request_models()
-        endpoint_response_models: list[str] = swagger_endpoint.get_all_response_models()
-
-        for model_name in endpoint_request_models + endpoint_response_models:
-            if model_name not in defined_api_object_names:
-                undefined_classes[model_name] = path
+    for model_name, endpoints in swagger_doc.get_index().endpoints_by_model.items():
+        if model_name not in defined_api_object_names:
+            # Report the last endpoint (in path order) which uses the model.
+            undefined_path, _http_method = endpoints[-1]
+            undefined_classes[model_name] = undefined_path
 
     return undefined_classes
 
@@ -0,0 +1,23 @@
+"""Exceptions specific to the Ratings API."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from horde_sdk.exceptions import HordeException
+
+if TYPE_CHECKING:
+    from horde_sdk.generic_api.apimodels import RequestErrorResponse
+
+
+class RatingsAPIRequestError(HordeException):
+    """Exception for when the Ratings API returns an error response."""
+
+    def __init__(self, error_response: RequestErrorResponse) -> None:
+        """Initialize a Ratings API request error.
+
+        Args:
+            error_response (RequestErrorResponse): The error response returned by the Ratings API.
+        """
+        self.error_response = error_response
+        super().__init__(error_response.message)
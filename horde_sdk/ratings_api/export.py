@@ -0,0 +1,342 @@
+"""Streaming, resumable export of user ratings, e.g. to build datasets for aesthetic models.
+
+`export_user_ratings` pages through `UserRatingsRequest` with a few pages fetched ahead, and hands each page to a
+sink as soon as it arrives, in order. Only the pages in flight are ever held in memory, however many ratings are
+exported.
+
+After every page, the export records how far it got in a small JSON checkpoint next to the output. Running the same
+export again resumes from there. Anything the sink wrote after the last checkpoint (e.g. half a page, if the process
+was killed) is discarded first, so no rating is written twice.
+
+Two sinks are provided: `JSONLRatingsSink`, which writes one `UserRatingsResponseSubRecord` per line, and
+`ParquetRatingsSink`, which writes one Parquet file per page into a directory and requires `pyarrow`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import os
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Sequence
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from loguru import logger
+from pydantic import BaseModel
+
+from horde_sdk.ratings_api.apimodels import UserRatingsRequest, UserRatingsResponse, UserRatingsResponseSubRecord
+from horde_sdk.ratings_api.exceptions import RatingsAPIRequestError
+from horde_sdk.ratings_api.ratings_client import RatingsAPIAsyncClient
+
+if TYPE_CHECKING:
+    # Only imported for type checking, so that it is not mistaken for a model of this API.
+    from horde_sdk.generic_api.apimodels import RequestErrorResponse
+
+DEFAULT_RATINGS_EXPORT_PREFETCH = 4
+"""The default number of pages fetched ahead of the one being written."""
+
+
+class RatingsExportCheckpoint(BaseModel):
+    """How far an export got, as recorded after each page it wrote."""
+
+    next_offset: int
+    """The offset of the first rating not exported yet."""
+    records_written: int
+    """The ratings exported so far."""
+    sink_position: int | None = None
+    """Where the sink's output ended after the last page, if the sink needs it to resume (e.g. a file size)."""
+
+
+class RatingsExportReport(BaseModel):
+    """The outcome of an export run."""
+
+    records_written: int
+    """The ratings exported in total, including by earlier runs this one resumed."""
+    pages_written: int
+    """The pages written by this run."""
+    next_offset: int
+    """The offset of the first rating not exported, which a later run would resume from."""
+    total: int | None
+    """The `total` the API reported with the last page fetched, if any. The export does not depend on it."""
+    resumed_from: int | None
+    """The offset this run resumed from, or `None` if it started afresh."""
+
+
+class RatingsExportSink(ABC):
+    """Where an export writes its ratings.
+
+    Sinks are used from a worker thread, one call at a time, so they may block.
+    """
+
+    @property
+    @abstractmethod
+    def default_checkpoint_path(self) -> Path:
+        """The checkpoint file to use when the export is not given one."""
+
+    @abstractmethod
+    def open(self, checkpoint: RatingsExportCheckpoint | None) -> None:
+        """Prepare to write, discarding anything written after `checkpoint` (or everything, if it is `None`)."""
+
+    @abstractmethod
+    def write_page(self, offset: int, records: Sequence[UserRatingsResponseSubRecord]) -> None:
+        """Durably write one page of ratings, which starts at `offset`."""
+
+    @abstractmethod
+    def position(self) -> int | None:
+        """Return where the output currently ends, to be stored in the checkpoint; `None` if not needed."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the sink's resources."""
+
+
+class JSONLRatingsSink(RatingsExportSink):
+    """Write ratings to a file, one JSON object per line."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Initialize the sink.
+
+        Args:
+            path (str | Path): The file to write to.
+        """
+        self._path = Path(path)
+        self._file: IO[bytes] | None = None
+
+    @property
+    def default_checkpoint_path(self) -> Path:
+        """The output file's name with `.checkpoint.json` appended."""
+        return self._path.with_name(f"{self._path.name}.checkpoint.json")
+
+    def open(self, checkpoint: RatingsExportCheckpoint | None) -> None:
+        """Open the file, truncating it to where the checkpoint left it."""
+        if checkpoint is None or not self._path.exists():
+            self._file = self._path.open("wb")
+            return
+
+        self._file = self._path.open("r+b")
+        self._file.truncate(checkpoint.sink_position or 0)
+        self._file.seek(0, os.SEEK_END)
+
+    def write_page(self, offset: int, records: Sequence[UserRatingsResponseSubRecord]) -> None:
+        """Append the page's ratings and flush them to disk."""
+        if self._file is None:
+            raise RuntimeError("The sink must be opened before writing")
+        self._file.write(b"".join(record.model_dump_json().encode() + b"\n" for record in records))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def position(self) -> int | None:
+        """Return the size of the file."""
+        return self._file.tell() if self._file is not None else None
+
+    def close(self) -> None:
+        """Close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_PARQUET_PART_PREFIX = "ratings-"
+
+
+class ParquetRatingsSink(RatingsExportSink):
+    """Write ratings as Parquet files in a directory, one per page, named by the offset of the page.
+
+    Requires `pyarrow`. Read the export back as one dataset, e.g. with `pyarrow.parquet.read_table(directory)`.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        """Initialize the sink.
+
+        Args:
+            directory (str | Path): The directory to write to. It is created if needed.
+
+        Raises:
+            ImportError: If `pyarrow` is not installed.
+        """
+        try:
+            self._pyarrow: Any = importlib.import_module("pyarrow")
+            self._parquet: Any = importlib.import_module("pyarrow.parquet")
+        except ImportError as e:
+            raise ImportError("Exporting ratings to Parquet requires `pyarrow` (`pip install pyarrow`).") from e
+
+        self._directory = Path(directory)
+        pa = self._pyarrow
+        self._schema = pa.schema(
+            [
+                ("image", pa.string()),
+                ("rating", pa.int64()),
+                ("artifacts", pa.int64()),
+                ("average", pa.float64()),
+                ("times_rated", pa.int64()),
+                ("username", pa.string()),
+            ],
+        )
+
+    @property
+    def default_checkpoint_path(self) -> Path:
+        """A `checkpoint.json` file in the output directory."""
+        return self._directory / "checkpoint.json"
+
+    def _part_offset(self, path: Path) -> int | None:
+        if not path.name.startswith(_PARQUET_PART_PREFIX) or path.suffix != ".parquet":
+            return None
+        try:
+            return int(path.stem.removeprefix(_PARQUET_PART_PREFIX))
+        except ValueError:
+            return None
+
+    def open(self, checkpoint: RatingsExportCheckpoint | None) -> None:
+        """Create the directory and remove any page files past the checkpoint."""
+        self._directory.mkdir(parents=True, exist_ok=True)
+        for path in self._directory.iterdir():
+            offset = self._part_offset(path)
+            if path.name.endswith(".parquet.part") or (
+                offset is not None and (checkpoint is None or offset >= checkpoint.next_offset)
+            ):
+                path.unlink()
+
+    def write_page(self, offset: int, records: Sequence[UserRatingsResponseSubRecord]) -> None:
+        """Write the page to its own file, atomically."""
+        table = self._pyarrow.Table.from_pylist([record.model_dump() for record in records], schema=self._schema)
+        path = self._directory / f"{_PARQUET_PART_PREFIX}{offset:012d}.parquet"
+        partial_path = path.with_name(f"{path.name}.part")
+        self._parquet.write_table(table, partial_path)
+        os.replace(partial_path, path)
+
+    def position(self) -> int | None:
+        """Return `None`; the page files are enough to resume."""
+        return None
+
+    def close(self) -> None:
+        """Do nothing; every page file is closed once written."""
+
+
+def _fetch_ahead(total: int | None, next_fetch: int, *, fetching: bool) -> bool:
+    """Return whether to request the page at `next_fetch` while the pages before it are still being fetched.
+
+    Only a short page ends the export, so there is always one page in flight. More are only fetched ahead while the
+    reported `total` says there are ratings past them; it may count just the ratings of one page, so it is never
+    trusted to end the export.
+    """
+    if not fetching:
+        return True
+    return total is not None and next_fetch < total
+
+
+def _read_checkpoint(path: Path) -> RatingsExportCheckpoint | None:
+    if not path.exists():
+        return None
+    return RatingsExportCheckpoint.model_validate_json(path.read_text())
+
+
+def _write_checkpoint(path: Path, checkpoint: RatingsExportCheckpoint) -> None:
+    partial_path = path.with_name(f"{path.name}.part")
+    partial_path.write_text(checkpoint.model_dump_json())
+    os.replace(partial_path, path)
+
+
+async def export_user_ratings(
+    client: RatingsAPIAsyncClient,
+    request: UserRatingsRequest,
+    sink: RatingsExportSink,
+    *,
+    checkpoint_path: str | Path | None = None,
+    prefetch: int = DEFAULT_RATINGS_EXPORT_PREFETCH,
+) -> RatingsExportReport:
+    """Export every rating matching `request`, resuming an earlier run of the same export if there is one.
+
+    Pages of `request.limit` ratings are requested from `request.offset` on, until a page has fewer ratings than
+    that. Up to `prefetch` pages are in flight at once, while the reported `total` says there are more ratings.
+
+    Args:
+        client (RatingsAPIAsyncClient): The client to request pages with.
+        request (UserRatingsRequest): The first page to export; later pages differ only by their offset.
+        sink (RatingsExportSink): Where to write the ratings.
+        checkpoint_path (str | Path | None, optional): Where to record progress. Defaults to the sink's
+            `default_checkpoint_path`.
+        prefetch (int, optional): The most pages to have in flight at once. Defaults to 4.
+
+    Returns:
+        RatingsExportReport: The outcome of the export.
+
+    Raises:
+        ValueError: If `request.limit` or `prefetch` is less than 1.
+        RatingsAPIRequestError: If the API returned an error. Everything exported until then is kept, and the next
+            run resumes after it.
+    """
+    if request.limit < 1:
+        raise ValueError(f"request.limit must be at least 1, got {request.limit}")
+    if prefetch < 1:
+        raise ValueError(f"prefetch must be at least 1, got {prefetch}")
+
+    checkpoint_file = Path(checkpoint_path) if checkpoint_path is not None else sink.default_checkpoint_path
+    checkpoint = await asyncio.to_thread(_read_checkpoint, checkpoint_file)
+    if checkpoint is not None:
+        logger.info(f"Resuming the ratings export at offset {checkpoint.next_offset}")
+
+    next_offset = checkpoint.next_offset if checkpoint is not None else request.offset
+    records_written = checkpoint.records_written if checkpoint is not None else 0
+    pages_written = 0
+    total: int | None = None
+    exhausted = False
+
+    pending: deque[tuple[int, asyncio.Task[UserRatingsResponse | RequestErrorResponse]]] = deque()
+    next_fetch = next_offset
+
+    await asyncio.to_thread(sink.open, checkpoint)
+    try:
+        while True:
+            while (
+                len(pending) < prefetch and not exhausted and _fetch_ahead(total, next_fetch, fetching=bool(pending))
+            ):
+                page_request = request.model_copy(update={"offset": next_fetch})
+                pending.append(
+                    (next_fetch, asyncio.create_task(client.submit_request(page_request, UserRatingsResponse))),
+                )
+                next_fetch += request.limit
+
+            if not pending:
+                break
+
+            page_offset, task = pending.popleft()
+            response = await task
+            if not isinstance(response, UserRatingsResponse):
+                raise RatingsAPIRequestError(response)
+
+            total = response.total
+            if response.ratings:
+                await asyncio.to_thread(sink.write_page, page_offset, response.ratings)
+                pages_written += 1
+            records_written += len(response.ratings)
+            next_offset = page_offset + len(response.ratings)
+
+            if len(response.ratings) < request.limit:
+                exhausted = True
+                for _, stale_task in pending:
+                    stale_task.cancel()
+                pending.clear()
+
+            await asyncio.to_thread(
+                _write_checkpoint,
+                checkpoint_file,
+                RatingsExportCheckpoint(
+                    next_offset=next_offset,
+                    records_written=records_written,
+                    sink_position=sink.position(),
+                ),
+            )
+    finally:
+        for _, stale_task in pending:
+            stale_task.cancel()
+        await asyncio.to_thread(sink.close)
+
+    return RatingsExportReport(
+        records_written=records_written,
+        pages_written=pages_written,
+        next_offset=next_offset,
+        total=total,
+        resumed_from=checkpoint.next_offset if checkpoint is not None else None,
+    )
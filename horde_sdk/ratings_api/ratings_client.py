@@ -1,10 +1,14 @@
 """Definitions to help interact with the Ratings API."""
 
-from horde_sdk.generic_api.generic_clients import GenericHordeAPIManualClient
+from ssl import SSLContext
+
+import aiohttp
+
+from horde_sdk import _default_sslcontext
+from horde_sdk.generic_api.generic_clients import GenericAsyncHordeAPIManualClient, GenericHordeAPIManualClient
 from horde_sdk.ratings_api.metadata import RatingsAPIPathFields, RatingsAPIQueryFields
 
 
-# TODO: asyncio versions
 class RatingsAPIClient(GenericHordeAPIManualClient):
     """Represent a client specifically configured for the Ratings APi."""
 
@@ -14,3 +18,34 @@ class RatingsAPIClient(GenericHordeAPIManualClient):
             path_fields=RatingsAPIPathFields,
             query_fields=RatingsAPIQueryFields,
         )
+
+
+class RatingsAPIAsyncClient(GenericAsyncHordeAPIManualClient):
+    """Represent an asyncio based client specifically configured for the Ratings API.
+
+    Requests share the connection pool of the `aiohttp.ClientSession` passed in, rather than each opening a new
+    connection.
+    """
+
+    def __init__(
+        self,
+        aiohttp_session: aiohttp.ClientSession,
+        *,
+        apikey: str | None = None,
+        ssl_context: SSLContext = _default_sslcontext,
+    ) -> None:
+        """Create a new instance of the RatingsAPIAsyncClient.
+
+        Args:
+            aiohttp_session (aiohttp.ClientSession): The session to send requests with.
+            apikey (str | None, optional): The API key to use for requests which do not specify one.
+                Defaults to None, which uses the anonymous API key.
+            ssl_context (SSLContext, optional): The SSL context to use for requests. Defaults to using `certifi`.
+        """
+        super().__init__(
+            aiohttp_session=aiohttp_session,
+            apikey=apikey,
+            path_fields=RatingsAPIPathFields,
+            query_fields=RatingsAPIQueryFields,
+            ssl_context=ssl_context,
+        )
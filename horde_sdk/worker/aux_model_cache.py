@@ -0,0 +1,396 @@
+"""A shared, size-bounded disk cache of the auxiliary models (LoRas, TIs) jobs request.
+
+Converted image jobs reference their LoRas and textual inversions as `LoRaEntry`/`TIEntry`s, but it is up to the
+worker to have the files on disk before the job reaches the GPU. `AuxModelCache` does this for every worker:
+
+- `prefetch_job` starts downloading a job's aux models as soon as it is popped, concurrently with whatever the GPU
+  is doing, so they are usually on disk by the time the job is started;
+- concurrent requests for the same aux model share one download;
+- downloads are streamed to a temporary file and moved into place, so the cache never holds a partial file; and
+- the cache is kept under a disk budget by evicting the least recently (or least frequently) used files which are
+  not in use by a running job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import time
+from collections.abc import AsyncIterator, Callable, Sequence
+from dataclasses import dataclass
+from enum import auto
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from loguru import logger
+from pydantic import BaseModel
+from strenum import StrEnum
+
+from horde_sdk import _default_sslcontext
+from horde_sdk.generation_parameters.image.object_models import (
+    AuxModelEntry,
+    ImageGenerationParameters,
+    LoRaEntry,
+    TIEntry,
+)
+from horde_sdk.worker.exceptions import AuxModelDownloadError
+from horde_sdk.worker.job_base import HordeWorkerJob
+
+DEFAULT_AUX_MODEL_CACHE_MAX_BYTES = 10 * 1024**3
+"""The default disk budget of an aux model cache: 10 GiB."""
+
+DEFAULT_AUX_MODEL_DOWNLOAD_CONCURRENCY = 4
+"""The default number of aux models downloaded at once."""
+
+DEFAULT_AUX_MODEL_FILE_EXTENSION = "safetensors"
+"""The extension given to cached aux model files."""
+
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class AUX_MODEL_EVICTION_POLICY(StrEnum):
+    """Which cached aux models are evicted first when the cache is over its disk budget."""
+
+    LRU = auto()
+    """The least recently used."""
+    LFU = auto()
+    """The least frequently used, then the least recently used among equally used ones."""
+
+
+@dataclass(frozen=True)
+class AuxModelCacheKey:
+    """Identifies one version of one aux model."""
+
+    kind: str
+    """The kind of aux model, e.g. "lora" or "ti"."""
+    source: str
+    """Where the aux model is hosted (see `KNOWN_AUX_MODEL_SOURCE`)."""
+    identifier: str
+    """The hosted version ID if there is one, otherwise the name."""
+    release_version: str | None = None
+    """The release version (v1, v2, ...), if one was requested."""
+
+    @classmethod
+    def from_entry(cls, entry: AuxModelEntry) -> AuxModelCacheKey:
+        """Return the key of an aux model entry."""
+        if isinstance(entry, LoRaEntry):
+            kind = "lora"
+        elif isinstance(entry, TIEntry):
+            kind = "ti"
+        else:
+            kind = type(entry).__name__.lower()
+        identifier = entry.remote_version_id or entry.name or ""
+        return cls(kind=kind, source=str(entry.source), identifier=identifier, release_version=entry.release_version)
+
+    @property
+    def filename(self) -> str:
+        """The name of this aux model's file in the cache; stable across processes."""
+        digest = hashlib.sha256(repr((self.kind, self.source, self.identifier, self.release_version)).encode())
+        return f"{self.kind}-{digest.hexdigest()[:32]}.{DEFAULT_AUX_MODEL_FILE_EXTENSION}"
+
+
+class AuxModelCacheStats(BaseModel):
+    """Counters describing how an aux model cache has been used."""
+
+    hits: int = 0
+    """Requests served from files already in the cache."""
+    misses: int = 0
+    """Requests which started a download."""
+    deduplicated: int = 0
+    """Requests which joined a download already in progress."""
+    downloaded_bytes: int = 0
+    """The bytes downloaded into the cache."""
+    evictions: int = 0
+    """The files evicted to stay within the disk budget."""
+    evicted_bytes: int = 0
+    """The bytes freed by evictions."""
+    cached_bytes: int = 0
+    """The bytes currently in the cache."""
+    cached_files: int = 0
+    """The files currently in the cache."""
+
+
+@dataclass
+class _CachedFile:
+    path: Path
+    size: int
+    last_used: float
+    uses: int = 0
+    pins: int = 0
+
+
+def aux_model_entries_of_job(job: HordeWorkerJob[Any, Any]) -> list[AuxModelEntry]:
+    """Return the LoRas and TIs an image job needs, or an empty list for any other job."""
+    parameters = job.generation.generation_parameters
+    if not isinstance(parameters, ImageGenerationParameters):
+        return []
+    return [*parameters.additional_params.lora_entries, *parameters.additional_params.ti_entries]
+
+
+class AuxModelCache:
+    """A size-bounded disk cache of aux models, downloaded concurrently and deduplicated.
+
+    Aux models are downloaded from their entry's `remote_url`, or from the URL `url_resolver` returns for entries
+    without one (for example, by looking a CivitAI version up by name). Files found in `cache_dir` when the cache is
+    created are adopted, with their modification time as their last use.
+
+    An instance belongs to the event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        *,
+        max_bytes: int = DEFAULT_AUX_MODEL_CACHE_MAX_BYTES,
+        eviction_policy: AUX_MODEL_EVICTION_POLICY = AUX_MODEL_EVICTION_POLICY.LRU,
+        url_resolver: Callable[[AuxModelEntry], str | None] | None = None,
+        max_concurrency: int = DEFAULT_AUX_MODEL_DOWNLOAD_CONCURRENCY,
+        aiohttp_session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        """Initialize the cache, adopting any aux models already in `cache_dir`.
+
+        Args:
+            cache_dir (str | Path): The directory to keep the aux models in. It is created if needed.
+            max_bytes (int, optional): The disk budget. Defaults to 10 GiB.
+            eviction_policy (AUX_MODEL_EVICTION_POLICY, optional): Which files to evict first. Defaults to LRU.
+            url_resolver (Callable[[AuxModelEntry], str | None] | None, optional): Returns the download URL of an
+                entry without a `remote_url`, or None if it cannot be found. Defaults to None.
+            max_concurrency (int, optional): The most aux models downloaded at once. Defaults to 4.
+            aiohttp_session (aiohttp.ClientSession | None, optional): The session to download with. Defaults to a
+                session created on first use and closed by `close`.
+
+        Raises:
+            ValueError: If `max_bytes` is negative or `max_concurrency` is less than 1.
+        """
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must not be negative, got {max_bytes}")
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._eviction_policy = eviction_policy
+        self._url_resolver = url_resolver
+        self._max_concurrency = max_concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+        self._aiohttp_session = aiohttp_session
+        self._owns_session = aiohttp_session is None
+
+        self._files: dict[str, _CachedFile] = {}
+        self._in_flight: dict[str, asyncio.Task[Path]] = {}
+        self._stats = AuxModelCacheStats()
+
+        for path in self._cache_dir.glob(f"*.{DEFAULT_AUX_MODEL_FILE_EXTENSION}"):
+            stat = path.stat()
+            self._files[path.name] = _CachedFile(path=path, size=stat.st_size, last_used=stat.st_mtime)
+        for partial_path in self._cache_dir.glob("*.part"):
+            partial_path.unlink(missing_ok=True)
+
+    @property
+    def cache_dir(self) -> Path:
+        """The directory the aux models are kept in."""
+        return self._cache_dir
+
+    @property
+    def cached_bytes(self) -> int:
+        """The bytes currently in the cache."""
+        return sum(cached.size for cached in self._files.values())
+
+    def stats(self) -> AuxModelCacheStats:
+        """Return the cache's counters.
+
+        Returns:
+            AuxModelCacheStats: A copy of the counters.
+        """
+        return self._stats.model_copy(update={"cached_bytes": self.cached_bytes, "cached_files": len(self._files)})
+
+    def path_if_cached(self, entry: AuxModelEntry) -> Path | None:
+        """Return the path of an aux model if it is already in the cache, without downloading it."""
+        cached = self._files.get(AuxModelCacheKey.from_entry(entry).filename)
+        return cached.path if cached is not None else None
+
+    async def get(self, entry: AuxModelEntry) -> Path:
+        """Return the path of an aux model in the cache, downloading it first if needed.
+
+        Args:
+            entry (AuxModelEntry): The aux model.
+
+        Returns:
+            Path: The path of the aux model's file.
+
+        Raises:
+            AuxModelDownloadError: If the aux model could not be downloaded.
+            aiohttp.ClientError: If the download failed.
+        """
+        filename = AuxModelCacheKey.from_entry(entry).filename
+        cached = self._files.get(filename)
+        if cached is not None:
+            self._stats.hits += 1
+            cached.uses += 1
+            cached.last_used = time.time()
+            return cached.path
+
+        task = self._in_flight.get(filename)
+        if task is None:
+            self._stats.misses += 1
+            task = asyncio.create_task(self._download(entry, filename))
+            self._in_flight[filename] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(filename, None))
+        else:
+            self._stats.deduplicated += 1
+
+        # Shielded so that a cancelled caller does not abort a download other callers (or prefetches) wait on.
+        return await asyncio.shield(task)
+
+    def prefetch(self, entries: Sequence[AuxModelEntry]) -> list[asyncio.Task[Path]]:
+        """Start fetching aux models in the background.
+
+        Failures are logged, and raised again only to whoever awaits the returned tasks or later calls `get`.
+
+        Args:
+            entries (Sequence[AuxModelEntry]): The aux models to fetch.
+
+        Returns:
+            list[asyncio.Task[Path]]: One task per entry, resolving to the aux model's path.
+        """
+        tasks = [asyncio.create_task(self.get(entry)) for entry in entries]
+        for task in tasks:
+            task.add_done_callback(_log_prefetch_failure)
+        return tasks
+
+    def prefetch_job(self, job: HordeWorkerJob[Any, Any]) -> list[asyncio.Task[Path]]:
+        """Start fetching the LoRas and TIs of a job in the background; call this as soon as the job is popped.
+
+        Args:
+            job (HordeWorkerJob): The job.
+
+        Returns:
+            list[asyncio.Task[Path]]: One task per aux model the job needs.
+        """
+        return self.prefetch(aux_model_entries_of_job(job))
+
+    @contextlib.asynccontextmanager
+    async def use(self, entries: Sequence[AuxModelEntry]) -> AsyncIterator[list[Path]]:
+        """Fetch aux models and keep them from being evicted until the block exits.
+
+        Use this around running a job, so that downloads for other jobs cannot evict files the job is loading.
+
+        Args:
+            entries (Sequence[AuxModelEntry]): The aux models.
+
+        Yields:
+            list[Path]: The paths of the aux models, in the order of `entries`.
+        """
+        paths = list(await asyncio.gather(*(self.get(entry) for entry in entries)))
+        if not all(path.name in self._files for path in paths):
+            # Another download evicted one of these before the last of them arrived; fetch it again, once.
+            paths = list(await asyncio.gather(*(self.get(entry) for entry in entries)))
+        pinned = [self._files[path.name] for path in paths if path.name in self._files]
+        for cached in pinned:
+            cached.pins += 1
+        try:
+            yield paths
+        finally:
+            for cached in pinned:
+                cached.pins -= 1
+
+    def _resolve_url(self, entry: AuxModelEntry, identifier: str) -> str:
+        url = entry.remote_url
+        if url is None and self._url_resolver is not None:
+            url = self._url_resolver(entry)
+        if url is None:
+            raise AuxModelDownloadError(identifier, "no download URL is known")
+        return url
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self._aiohttp_session is None:
+            self._aiohttp_session = aiohttp.ClientSession()
+        return self._aiohttp_session
+
+    async def _download(self, entry: AuxModelEntry, filename: str) -> Path:
+        key = AuxModelCacheKey.from_entry(entry)
+        url = self._resolve_url(entry, key.identifier)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        path = self._cache_dir / filename
+        partial_path = path.with_name(path.name + ".part")
+        digest = hashlib.sha256()
+        size = 0
+        async with self._semaphore:
+            logger.debug(f"Downloading {key.kind} {key.identifier} from {url}")
+            try:
+                async with self._session().get(url, ssl=_default_sslcontext) as response:
+                    response.raise_for_status()
+                    # File writes go to a thread so a slow disk does not stall the event loop.
+                    file = await asyncio.to_thread(partial_path.open, "wb")
+                    try:
+                        async for chunk in response.content.iter_chunked(_DOWNLOAD_CHUNK_SIZE):
+                            digest.update(chunk)
+                            size += len(chunk)
+                            await asyncio.to_thread(file.write, chunk)
+                    finally:
+                        await asyncio.to_thread(file.close)
+
+                if entry.file_hash is not None and digest.hexdigest().lower() != entry.file_hash.lower():
+                    raise AuxModelDownloadError(key.identifier, "the downloaded file does not match its hash")
+                os.replace(partial_path, path)
+            except BaseException:
+                partial_path.unlink(missing_ok=True)
+                raise
+
+        self._stats.downloaded_bytes += size
+        self._files[filename] = _CachedFile(path=path, size=size, last_used=time.time(), uses=1)
+        self._evict(keep=filename)
+        return path
+
+    def _evict(self, *, keep: str) -> None:
+        total = self.cached_bytes
+        if total <= self._max_bytes:
+            return
+
+        candidates = [(name, cached) for name, cached in self._files.items() if name != keep and cached.pins == 0]
+        if self._eviction_policy == AUX_MODEL_EVICTION_POLICY.LFU:
+            candidates.sort(key=lambda item: (item[1].uses, item[1].last_used))
+        else:
+            candidates.sort(key=lambda item: item[1].last_used)
+
+        for name, cached in candidates:
+            if total <= self._max_bytes:
+                break
+            logger.debug(f"Evicting {cached.path} ({cached.size} bytes) from the aux model cache")
+            cached.path.unlink(missing_ok=True)
+            del self._files[name]
+            total -= cached.size
+            self._stats.evictions += 1
+            self._stats.evicted_bytes += cached.size
+
+        if total > self._max_bytes:
+            logger.warning(f"The aux model cache holds {total} bytes, over its budget of {self._max_bytes} bytes")
+
+    async def close(self) -> None:
+        """Cancel any downloads in progress and close the session, if the cache created it."""
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._owns_session and self._aiohttp_session is not None:
+            await self._aiohttp_session.close()
+            self._aiohttp_session = None
+
+    async def __aenter__(self) -> AuxModelCache:
+        """Return the cache."""
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        """Close the cache."""
+        await self.close()
+
+
+def _log_prefetch_failure(task: asyncio.Task[Path]) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Prefetching an aux model failed: {task.exception()}")
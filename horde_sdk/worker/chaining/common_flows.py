@@ -3,10 +3,14 @@
 These builders are the single construction point for the flows a worker routes internally. Stage boundaries are
 expressed as generation-progress states, so a `ChainExecutionContext` over one of these flows can be driven
 entirely by `advance_for_progress`.
+
+A `ChainFlow` is immutable, so each builder memoizes its result per option combination: every job of the same shape
+shares one compiled flow rather than rebuilding and revalidating an identical graph.
 """
 
 from __future__ import annotations
 
+from functools import cache
 from itertools import pairwise
 
 from horde_sdk.worker.chaining.consts import CHAIN_CAPABILITY, CHAIN_NODE_KIND
@@ -85,6 +89,11 @@ def image_generation_flow(
     Returns:
         ChainFlow: generate -> (post_process) -> (safety_check) -> (submit).
     """
+    return _cached_image_generation_flow(post_processing, safety_check, submit)
+
+
+@cache
+def _cached_image_generation_flow(post_processing: bool, safety_check: bool, submit: bool) -> ChainFlow:
     stages = [_generate_stage()]
     if post_processing:
         stages.append(_post_process_stage())
@@ -109,6 +118,11 @@ def alchemy_flow(
     Returns:
         ChainFlow: post_process -> (safety_check) -> (submit).
     """
+    return _cached_alchemy_flow(safety_check, submit)
+
+
+@cache
+def _cached_alchemy_flow(safety_check: bool, submit: bool) -> ChainFlow:
     stages = [_post_process_stage()]
     if safety_check:
         stages.append(_safety_check_stage())
@@ -131,6 +145,11 @@ def text_generation_flow(
     Returns:
         ChainFlow: generate -> (safety_check) -> (submit).
     """
+    return _cached_text_generation_flow(safety_check, submit)
+
+
+@cache
+def _cached_text_generation_flow(safety_check: bool, submit: bool) -> ChainFlow:
     stages = [_generate_stage()]
     if safety_check:
         stages.append(_safety_check_stage())
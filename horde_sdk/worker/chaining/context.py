@@ -21,6 +21,16 @@ _TERMINAL_NODE_STATES = {
     CHAIN_NODE_STATE.SKIPPED,
 }
 
+_SATISFYING_NODE_STATES = {
+    CHAIN_NODE_STATE.COMPLETED,
+    CHAIN_NODE_STATE.SKIPPED,
+}
+
+_STARTABLE_NODE_STATES = {
+    CHAIN_NODE_STATE.PENDING,
+    CHAIN_NODE_STATE.READY,
+}
+
 _TERMINAL_FAILURE_PROGRESS = {
     GENERATION_PROGRESS.ABORTED,
     GENERATION_PROGRESS.REPORTED_FAILED,
@@ -53,6 +63,38 @@ class ChainExecutionContext:
         self._started_at: dict[ChainNodeHandle, float] = {}
         self._finished_at: dict[ChainNodeHandle, float] = {}
 
+        # Bitsets over the flow's topological positions, kept in step with `_states` by `_set_state`. The
+        # satisfied mask holds completed or skipped nodes, i.e. those that no longer block their successors.
+        self._satisfied_mask = 0
+        self._terminal_mask = 0
+        self._failed_mask = 0
+        self._executing: set[ChainNodeHandle] = set()
+
+    def _set_state(self, handle: ChainNodeHandle, state: CHAIN_NODE_STATE) -> None:
+        """Record a node's new state and keep the derived bitsets consistent. Caller must hold the lock."""
+        self._states[handle] = state
+        bit = self._flow.bit_for(handle)
+
+        if state in _SATISFYING_NODE_STATES:
+            self._satisfied_mask |= bit
+        else:
+            self._satisfied_mask &= ~bit
+
+        if state in _TERMINAL_NODE_STATES:
+            self._terminal_mask |= bit
+        else:
+            self._terminal_mask &= ~bit
+
+        if state == CHAIN_NODE_STATE.FAILED:
+            self._failed_mask |= bit
+        else:
+            self._failed_mask &= ~bit
+
+        if state == CHAIN_NODE_STATE.EXECUTING:
+            self._executing.add(handle)
+        else:
+            self._executing.discard(handle)
+
     @property
     def flow(self) -> ChainFlow:
         """The flow this context tracks."""
@@ -84,10 +126,8 @@ class ChainExecutionContext:
 
     def _is_dependency_satisfied(self, handle: ChainNodeHandle) -> bool:
         """Whether all predecessors of a node have finished without failing."""
-        return all(
-            self._states[predecessor] in {CHAIN_NODE_STATE.COMPLETED, CHAIN_NODE_STATE.SKIPPED}
-            for predecessor in self._flow.predecessors(handle)
-        )
+        predecessor_mask = self._flow.predecessor_mask(handle)
+        return self._satisfied_mask & predecessor_mask == predecessor_mask
 
     def ready_nodes(self) -> tuple[ChainNodeHandle, ...]:
         """Return the nodes eligible to start: pending or ready, with all dependencies satisfied."""
@@ -95,21 +135,20 @@ class ChainExecutionContext:
             return tuple(
                 handle
                 for handle in self._flow.handles
-                if self._states[handle] in {CHAIN_NODE_STATE.PENDING, CHAIN_NODE_STATE.READY}
-                and self._is_dependency_satisfied(handle)
+                if self._states[handle] in _STARTABLE_NODE_STATES and self._is_dependency_satisfied(handle)
             )
 
     @property
     def is_finished(self) -> bool:
         """Whether every node has reached a terminal state."""
         with self._lock:
-            return all(state in _TERMINAL_NODE_STATES for state in self._states.values())
+            return self._terminal_mask == self._flow.all_nodes_mask
 
     @property
     def has_failed(self) -> bool:
         """Whether any node failed."""
         with self._lock:
-            return any(state == CHAIN_NODE_STATE.FAILED for state in self._states.values())
+            return self._failed_mask != 0
 
     def mark_executing(self, handle: ChainNodeHandle) -> None:
         """Mark a node as executing.
@@ -130,7 +169,7 @@ class ChainExecutionContext:
 
             for predecessor in self._flow.predecessors(handle):
                 predecessor_state = self._states[predecessor]
-                if predecessor_state in {CHAIN_NODE_STATE.COMPLETED, CHAIN_NODE_STATE.SKIPPED}:
+                if predecessor_state in _SATISFYING_NODE_STATES:
                     continue
                 if self._flow.get_node(predecessor).optional:
                     self._skip_subtree_rooted_at(predecessor, reason=f"optional stage bypassed by '{handle}'")
@@ -139,14 +178,14 @@ class ChainExecutionContext:
                     f"Node '{handle}' cannot start: required predecessor '{predecessor}' is {predecessor_state}",
                 )
 
-            self._states[handle] = CHAIN_NODE_STATE.EXECUTING
+            self._set_state(handle, CHAIN_NODE_STATE.EXECUTING)
             self._started_at[handle] = time.monotonic()
 
     def _skip_subtree_rooted_at(self, handle: ChainNodeHandle, *, reason: str) -> None:
         """Skip a non-terminal node; used for optional stages that the traversal bypassed."""
-        if self._states[handle] in _TERMINAL_NODE_STATES:
+        if self._terminal_mask & self._flow.bit_for(handle):
             return
-        self._states[handle] = CHAIN_NODE_STATE.SKIPPED
+        self._set_state(handle, CHAIN_NODE_STATE.SKIPPED)
         self._errors[handle].append(reason)
 
     def mark_completed(self, handle: ChainNodeHandle) -> tuple[ChainNodeHandle, ...]:
@@ -166,7 +205,7 @@ class ChainExecutionContext:
             if current in _TERMINAL_NODE_STATES:
                 raise ChainConsistencyError(f"Node '{handle}' cannot complete from state {current}")
 
-            self._states[handle] = CHAIN_NODE_STATE.COMPLETED
+            self._set_state(handle, CHAIN_NODE_STATE.COMPLETED)
             self._finished_at[handle] = time.monotonic()
             if handle not in self._started_at:
                 self._started_at[handle] = self._finished_at[handle]
@@ -185,14 +224,17 @@ class ChainExecutionContext:
             error (str | None, optional): A description of the failure. Defaults to None.
         """
         with self._lock:
-            self._states[handle] = CHAIN_NODE_STATE.FAILED
+            self._set_state(handle, CHAIN_NODE_STATE.FAILED)
             self._finished_at[handle] = time.monotonic()
             if error is not None:
                 self._errors[handle].append(error)
 
-            for descendant in self._flow.descendants(handle):
+            if not self._flow.descendant_mask(handle) & ~self._terminal_mask:
+                return
+
+            for descendant in self._flow.descendants_in_order(handle):
                 if self._states[descendant] not in _TERMINAL_NODE_STATES:
-                    self._states[descendant] = CHAIN_NODE_STATE.SKIPPED
+                    self._set_state(descendant, CHAIN_NODE_STATE.SKIPPED)
                     self._errors[descendant].append(f"upstream stage '{handle}' failed")
 
     def mark_skipped(self, handle: ChainNodeHandle, *, reason: str | None = None) -> None:
@@ -210,7 +252,7 @@ class ChainExecutionContext:
                 raise ChainConsistencyError(f"Node '{handle}' is required and cannot be skipped explicitly")
             if self._states[handle] in _TERMINAL_NODE_STATES:
                 raise ChainConsistencyError(f"Node '{handle}' is already {self._states[handle]}")
-            self._states[handle] = CHAIN_NODE_STATE.SKIPPED
+            self._set_state(handle, CHAIN_NODE_STATE.SKIPPED)
             if reason is not None:
                 self._errors[handle].append(reason)
 
@@ -229,23 +271,18 @@ class ChainExecutionContext:
         """
         with self._lock:
             if progress in _TERMINAL_FAILURE_PROGRESS:
-                for handle in self._flow.handles:
-                    if self._states[handle] == CHAIN_NODE_STATE.EXECUTING:
-                        self.mark_failed(handle, error=f"generation reached {progress}")
+                for handle in sorted(self._executing, key=self._flow.bit_for):
+                    self.mark_failed(handle, error=f"generation reached {progress}")
                 return ()
 
-            entering = self._flow.node_for_entry_progress(progress)
-            if entering is not None and self._states[entering] in {
-                CHAIN_NODE_STATE.PENDING,
-                CHAIN_NODE_STATE.READY,
-            }:
+            entering, completing = self._flow.route_for_progress(progress)
+            if entering is not None and self._states[entering] in _STARTABLE_NODE_STATES:
                 self.mark_executing(entering)
 
-            completing = self._flow.node_for_completion_progress(progress)
             if completing is not None and self._states[completing] not in _TERMINAL_NODE_STATES:
                 newly_ready = self.mark_completed(completing)
                 for handle in newly_ready:
-                    self._states[handle] = CHAIN_NODE_STATE.READY
+                    self._set_state(handle, CHAIN_NODE_STATE.READY)
                 return newly_ready
 
             return ()
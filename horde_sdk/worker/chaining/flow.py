@@ -3,6 +3,10 @@
 A `ChainFlow` is the immutable routing plan for a unit of work: which stages exist, what they require, and how
 they connect. Build one with `ChainFlowBuilder`; the build step validates the topology once so consumers can rely
 on the flow's shape without re-checking.
+
+Because a flow never changes after it is built, its adjacency is compiled once at construction: neighbour tuples,
+descendant lists, bitsets indexed by topological position, and a single progress -> (entering, completing) routing
+table. Execution contexts consult these tables on every progress event instead of walking the graph.
 """
 
 from __future__ import annotations
@@ -13,6 +17,8 @@ from horde_sdk.worker.chaining.graph import TypedChainGraph
 from horde_sdk.worker.chaining.nodes import ChainNodeHandle, ChainStageNode
 from horde_sdk.worker.consts import GENERATION_PROGRESS
 
+_NO_ROUTE: tuple[None, None] = (None, None)
+
 
 class ChainFlowValidationError(ValueError):
     """Raised when a chain flow fails structural validation at build time."""
@@ -46,6 +52,36 @@ class ChainFlow:
         self._entry_progress_index = {node.entry_progress: node.handle for node in nodes.values()}
         self._completion_progress_index = {node.completion_progress: node.handle for node in nodes.values()}
 
+        self._position_index = {handle: position for position, handle in enumerate(self._topological_order)}
+        self._successors = {handle: graph.successors(handle) for handle in self._topological_order}
+        self._predecessors = {handle: graph.predecessors(handle) for handle in self._topological_order}
+
+        self._descendant_masks: dict[ChainNodeHandle, int] = {}
+        for handle in reversed(self._topological_order):
+            mask = 0
+            for successor in self._successors[handle]:
+                mask |= self.bit_for(successor) | self._descendant_masks[successor]
+            self._descendant_masks[handle] = mask
+
+        self._descendants_in_order = {
+            handle: tuple(
+                candidate
+                for candidate in self._topological_order
+                if self._descendant_masks[handle] & self.bit_for(candidate)
+            )
+            for handle in self._topological_order
+        }
+        self._predecessor_masks = {
+            handle: sum(self.bit_for(predecessor) for predecessor in self._predecessors[handle])
+            for handle in self._topological_order
+        }
+        self._all_nodes_mask = (1 << len(self._topological_order)) - 1
+
+        self._progress_routes: dict[GENERATION_PROGRESS, tuple[ChainNodeHandle | None, ChainNodeHandle | None]] = {
+            progress: (self._entry_progress_index.get(progress), self._completion_progress_index.get(progress))
+            for progress in (*self._entry_progress_index, *self._completion_progress_index)
+        }
+
     @property
     def handles(self) -> tuple[ChainNodeHandle, ...]:
         """The node handles in topological order."""
@@ -105,15 +141,55 @@ class ChainFlow:
 
     def successors(self, handle: ChainNodeHandle) -> tuple[ChainNodeHandle, ...]:
         """Return the direct successors of a node."""
-        return self._graph.successors(handle)
+        return self._successors[handle]
 
     def predecessors(self, handle: ChainNodeHandle) -> tuple[ChainNodeHandle, ...]:
         """Return the direct predecessors of a node."""
-        return self._graph.predecessors(handle)
+        return self._predecessors[handle]
 
     def descendants(self, handle: ChainNodeHandle) -> set[ChainNodeHandle]:
         """Return all nodes reachable from a node, excluding the node itself."""
-        return self._graph.descendants(handle)
+        return set(self._descendants_in_order[handle])
+
+    def descendants_in_order(self, handle: ChainNodeHandle) -> tuple[ChainNodeHandle, ...]:
+        """Return all nodes reachable from a node, excluding the node itself, in topological order."""
+        return self._descendants_in_order[handle]
+
+    def bit_for(self, handle: ChainNodeHandle) -> int:
+        """Return the single-bit mask for a node, keyed by its topological position.
+
+        Raises:
+            KeyError: If the handle is not part of this flow.
+        """
+        return 1 << self._position_index[handle]
+
+    def descendant_mask(self, handle: ChainNodeHandle) -> int:
+        """Return the bitset of all nodes reachable from a node, excluding the node itself."""
+        return self._descendant_masks[handle]
+
+    def predecessor_mask(self, handle: ChainNodeHandle) -> int:
+        """Return the bitset of the direct predecessors of a node."""
+        return self._predecessor_masks[handle]
+
+    @property
+    def all_nodes_mask(self) -> int:
+        """The bitset with every node in the flow set."""
+        return self._all_nodes_mask
+
+    def route_for_progress(
+        self,
+        progress: GENERATION_PROGRESS,
+    ) -> tuple[ChainNodeHandle | None, ChainNodeHandle | None]:
+        """Return the (entering, completing) nodes for a generation progress in a single lookup.
+
+        Args:
+            progress (GENERATION_PROGRESS): The progress value to route.
+
+        Returns:
+            tuple[ChainNodeHandle | None, ChainNodeHandle | None]: The node whose stage begins at the progress and
+                the node whose stage completes at it; either is None when no stage is bounded by the progress.
+        """
+        return self._progress_routes.get(progress, _NO_ROUTE)
 
     def node_for_entry_progress(self, progress: GENERATION_PROGRESS) -> ChainNodeHandle | None:
         """Return the node whose stage begins at the given generation progress, if any."""
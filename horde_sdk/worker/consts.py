@@ -470,6 +470,8 @@ class HordeWorkerConfigDefaults:
     DEFAULT_RESULT_IMAGE_FORMAT: str = "WebP"
     DEFAULT_RESULT_IMAGE_QUALITY: int = 95
     DEFAULT_RESULT_IMAGE_PIL_METHOD: int = 6
+    DEFAULT_RESULT_IMAGE_ENCODE_LATENCY_BUDGET: float | None = None
+    """The default target time, in seconds, for encoding one result image; `None` always uses the configured method."""
 
     DEFAULT_GENERATION_STRICT_TRANSITION_MODE: bool = True
 
@@ -51,10 +51,18 @@ def convert_alchemy_job_pop_response_to_parameters(
 
     r2_upload_url_map = {}
 
+    # Every form of a job usually carries the same source image; decode each distinct one only once and share the
+    # resulting bytes between the forms' parameters.
+    decoded_source_images: dict[str, bytes | None] = {}
+
     for form in api_response.forms:
         if form.source_image is None:
             raise ValueError("The API response did not contain a source image for a form.")
 
+        if form.source_image not in decoded_source_images:
+            decoded_source_images[form.source_image] = base64_str_to_bytes(form.source_image)
+        source_image = decoded_source_images[form.source_image]
+
         # Text-output forms (caption/nsfw/interrogation/vectorize) are not in the server's
         # KNOWN_POST_PROCESSORS, so they pop without an r2_upload URL. Only image-output forms
         # get a destination; keep those out of the map rather than storing None into it.
@@ -66,7 +74,7 @@ def convert_alchemy_job_pop_response_to_parameters(
                 UpscaleAlchemyParameters(
                     result_id=str(form.id_),
                     form=KNOWN_ALCHEMY_FORMS.post_process,
-                    source_image=base64_str_to_bytes(form.source_image),
+                    source_image=source_image,
                     upscaler=form.form,
                 ),
             )
@@ -76,7 +84,7 @@ def convert_alchemy_job_pop_response_to_parameters(
                 FacefixAlchemyParameters(
                     result_id=str(form.id_),
                     form=KNOWN_ALCHEMY_FORMS.post_process,
-                    source_image=base64_str_to_bytes(form.source_image),
+                    source_image=source_image,
                     facefixer=form.form,
                 ),
             )
@@ -86,7 +94,7 @@ def convert_alchemy_job_pop_response_to_parameters(
                 InterrogateAlchemyParameters(
                     result_id=str(form.id_),
                     form=KNOWN_ALCHEMY_FORMS.interrogation,
-                    source_image=base64_str_to_bytes(form.source_image),
+                    source_image=source_image,
                     interrogator=KNOWN_INTERROGATORS.vit_l_14,
                 ),
             )
@@ -96,7 +104,7 @@ def convert_alchemy_job_pop_response_to_parameters(
                 CaptionAlchemyParameters(
                     result_id=str(form.id_),
                     form=KNOWN_ALCHEMY_FORMS.caption,
-                    source_image=base64_str_to_bytes(form.source_image),
+                    source_image=source_image,
                     caption_model=KNOWN_CAPTION_MODELS.BLIP_BASE_SALESFORCE,
                 ),
             )
@@ -106,7 +114,7 @@ def convert_alchemy_job_pop_response_to_parameters(
                 NSFWAlchemyParameters(
                     result_id=str(form.id_),
                     form=KNOWN_ALCHEMY_FORMS.nsfw,
-                    source_image=base64_str_to_bytes(form.source_image),
+                    source_image=source_image,
                     nsfw_detector=KNOWN_NSFW_DETECTOR.HORDE_SAFETY,
                 ),
             )
@@ -116,7 +124,7 @@ def convert_alchemy_job_pop_response_to_parameters(
                 SingleAlchemyParameters(
                     result_id=str(form.id_),
                     form=KNOWN_ALCHEMY_FORMS.vectorize,
-                    source_image=base64_str_to_bytes(form.source_image),
+                    source_image=source_image,
                 ),
             )
 
@@ -127,7 +135,7 @@ def convert_alchemy_job_pop_response_to_parameters(
                 AnnotationAlchemyParameters(
                     result_id=str(form.id_),
                     form=KNOWN_ALCHEMY_FORMS.annotation,
-                    source_image=base64_str_to_bytes(form.source_image),
+                    source_image=source_image,
                     control_type=form.payload.control_type,
                 ),
             )
@@ -137,7 +145,7 @@ def convert_alchemy_job_pop_response_to_parameters(
                 SingleAlchemyParameters(
                     result_id=str(form.id_),
                     form=form.form,
-                    source_image=base64_str_to_bytes(form.source_image),
+                    source_image=source_image,
                 ),
             )
 
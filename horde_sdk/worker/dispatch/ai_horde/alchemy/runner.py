@@ -0,0 +1,229 @@
+"""Run the forms of a multi-form alchemy job as independent, concurrently executing sub-tasks.
+
+An alchemy job popped from the AI-Horde API can carry several forms (e.g., an upscale, a caption and an NSFW check)
+for the same source image. Rather than processing them one after another and submitting at the end, the
+`AlchemyJobRunner` splits the job into one `AlchemyFormTask` per form, runs them concurrently within per-form-kind
+limits (GPU-bound upscalers are kept to one at a time by default while the lighter feature extractors may overlap),
+and hands each form's outcome to a delivery callback as soon as that form finishes, so its upload and submit are not
+held back by slower siblings.
+
+The SDK does not perform inference or uploads itself; both are supplied by the worker as async callbacks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+
+from loguru import logger
+
+from horde_sdk.ai_horde_api.apimodels import AlchemyJobPopResponse
+from horde_sdk.generation_parameters.alchemy import SingleAlchemyParameters
+from horde_sdk.generation_parameters.alchemy.consts import KNOWN_ALCHEMY_FORMS
+from horde_sdk.worker.dispatch.ai_horde.alchemy.convert import convert_alchemy_job_pop_response_to_parameters
+
+DEFAULT_ALCHEMY_FORM_CONCURRENCY: Mapping[KNOWN_ALCHEMY_FORMS | str, int] = {
+    KNOWN_ALCHEMY_FORMS.post_process: 1,
+    KNOWN_ALCHEMY_FORMS.interrogation: 2,
+    KNOWN_ALCHEMY_FORMS.annotation: 2,
+    KNOWN_ALCHEMY_FORMS.vectorize: 2,
+    KNOWN_ALCHEMY_FORMS.caption: 4,
+    KNOWN_ALCHEMY_FORMS.nsfw: 4,
+}
+"""The default number of forms of each kind which may run at once.
+
+Post-processors (upscalers, facefixers, background removal) hold most of a GPU, so only one runs at a time; captioning
+and NSFW detection are light enough to overlap with each other and with a post-processor.
+"""
+
+
+@dataclass(frozen=True)
+class AlchemyFormTask:
+    """One form of an alchemy job, to be processed, uploaded and submitted independently of the others."""
+
+    form_id: str
+    """The ID of the form, which is also the ID its result is submitted under."""
+    parameters: SingleAlchemyParameters
+    """The parameters of the form. Forms of the same job share the same decoded `source_image` object."""
+    r2_upload_url: str | None = None
+    """Where to upload the form's image result, or `None` for forms whose result is text."""
+
+    @property
+    def form_kind(self) -> KNOWN_ALCHEMY_FORMS | str:
+        """The kind of form, which determines its concurrency limit."""
+        return self.parameters.form
+
+
+@dataclass(frozen=True)
+class AlchemyFormOutcome:
+    """The outcome of running one `AlchemyFormTask`."""
+
+    task: AlchemyFormTask
+    """The task which was run."""
+    result: object | None = None
+    """What the form processor returned, if it succeeded."""
+    error: BaseException | None = None
+    """Why the form processor failed, if it did."""
+    elapsed_seconds: float = 0.0
+    """How long the form took to process, not including time spent waiting for a concurrency slot."""
+    delivery_error: BaseException | None = None
+    """Why the delivery callback failed for this outcome, if it did."""
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the form was processed without error."""
+        return self.error is None
+
+
+AlchemyFormProcessor = Callable[[AlchemyFormTask], Awaitable[object]]
+"""Process one form and return its result (e.g., the upscaled image bytes or the caption text)."""
+
+AlchemyFormDelivery = Callable[[AlchemyFormOutcome], Awaitable[None]]
+"""Upload and/or submit the outcome of one form, whether it succeeded or failed."""
+
+
+def split_alchemy_job_pop_response(api_response: AlchemyJobPopResponse) -> list[AlchemyFormTask]:
+    """Split an alchemy job pop response into one task per form, in the order the forms were popped.
+
+    Args:
+        api_response (AlchemyJobPopResponse): The job to split.
+
+    Returns:
+        list[AlchemyFormTask]: The tasks.
+
+    Raises:
+        ValueError: If the response has no forms or a form cannot be converted.
+    """
+    alchemy_parameters, dispatch_parameters = convert_alchemy_job_pop_response_to_parameters(api_response)
+    parameters_by_id = {operation.result_id: operation for operation in alchemy_parameters.all_alchemy_operations}
+
+    if api_response.forms is None:
+        raise ValueError("The API response did not contain any forms. Was this a skipped response?")
+    tasks = []
+    for form in api_response.forms:
+        form_id = str(form.id_)
+        tasks.append(
+            AlchemyFormTask(
+                form_id=form_id,
+                parameters=parameters_by_id[form_id],
+                r2_upload_url=dispatch_parameters.r2_upload_url_map.get(form.id_),
+            ),
+        )
+    return tasks
+
+
+class AlchemyJobRunner:
+    """Runs the forms of alchemy jobs concurrently, delivering each form's outcome as soon as it is ready.
+
+    The concurrency limits are shared by every job the runner runs, so jobs run at the same time on one runner do not
+    oversubscribe the GPU either.
+    """
+
+    def __init__(
+        self,
+        process_form: AlchemyFormProcessor,
+        deliver: AlchemyFormDelivery,
+        *,
+        concurrency: Mapping[KNOWN_ALCHEMY_FORMS | str, int] | None = None,
+        default_concurrency: int = 1,
+    ) -> None:
+        """Initialize the runner.
+
+        Args:
+            process_form (AlchemyFormProcessor): Processes one form and returns its result.
+            deliver (AlchemyFormDelivery): Uploads and/or submits one form's outcome. It is called once per form,
+                including for forms which failed, and may run concurrently with other forms still processing.
+            concurrency (Mapping[KNOWN_ALCHEMY_FORMS | str, int] | None, optional): Overrides for the number of forms
+                of each kind which may be processed at once. Kinds not given use `DEFAULT_ALCHEMY_FORM_CONCURRENCY`.
+                Defaults to None.
+            default_concurrency (int, optional): The limit for kinds of form with no default or override (e.g.,
+                forms unknown to the SDK). Defaults to 1.
+
+        Raises:
+            ValueError: If any limit is less than 1.
+        """
+        limits = {str(kind): limit for kind, limit in DEFAULT_ALCHEMY_FORM_CONCURRENCY.items()}
+        if concurrency is not None:
+            limits.update({str(kind): limit for kind, limit in concurrency.items()})
+
+        for kind, limit in limits.items():
+            if limit < 1:
+                raise ValueError(f"The concurrency for '{kind}' forms must be at least 1, got {limit}")
+        if default_concurrency < 1:
+            raise ValueError(f"default_concurrency must be at least 1, got {default_concurrency}")
+
+        self._process_form = process_form
+        self._deliver = deliver
+        self._limits = limits
+        self._default_concurrency = default_concurrency
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def get_concurrency(self, form_kind: KNOWN_ALCHEMY_FORMS | str) -> int:
+        """Return the number of forms of `form_kind` which may be processed at once.
+
+        Args:
+            form_kind (KNOWN_ALCHEMY_FORMS | str): The kind of form.
+
+        Returns:
+            int: The limit.
+        """
+        return self._limits.get(str(form_kind), self._default_concurrency)
+
+    def _get_semaphore(self, form_kind: KNOWN_ALCHEMY_FORMS | str) -> asyncio.Semaphore:
+        key = str(form_kind)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.get_concurrency(key))
+            self._semaphores[key] = semaphore
+        return semaphore
+
+    async def _run_task(self, task: AlchemyFormTask) -> AlchemyFormOutcome:
+        async with self._get_semaphore(task.form_kind):
+            start = time.monotonic()
+            try:
+                result = await self._process_form(task)
+            except Exception as e:
+                logger.error(f"Alchemy form {task.form_id} ({task.parameters.operation_name}) failed: {e}")
+                outcome = AlchemyFormOutcome(task=task, error=e, elapsed_seconds=time.monotonic() - start)
+            else:
+                outcome = AlchemyFormOutcome(task=task, result=result, elapsed_seconds=time.monotonic() - start)
+
+        # Delivery happens outside the form's slot so that uploads do not hold back the next form of the same kind.
+        try:
+            await self._deliver(outcome)
+        except Exception as e:
+            logger.error(f"Delivering alchemy form {task.form_id} failed: {e}")
+            outcome = dataclasses.replace(outcome, delivery_error=e)
+
+        return outcome
+
+    async def run_tasks(self, tasks: Iterable[AlchemyFormTask]) -> list[AlchemyFormOutcome]:
+        """Run `tasks` concurrently within the concurrency limits.
+
+        Failures of one form (in processing or delivery) do not affect the others; they are recorded on that form's
+        outcome.
+
+        Args:
+            tasks (Iterable[AlchemyFormTask]): The tasks to run.
+
+        Returns:
+            list[AlchemyFormOutcome]: The outcome of each task, in the order the tasks were given.
+        """
+        return list(await asyncio.gather(*(self._run_task(task) for task in tasks)))
+
+    async def run(self, api_response: AlchemyJobPopResponse) -> list[AlchemyFormOutcome]:
+        """Split an alchemy job into its forms and run them concurrently.
+
+        Args:
+            api_response (AlchemyJobPopResponse): The job to run.
+
+        Returns:
+            list[AlchemyFormOutcome]: The outcome of each form, in the order the forms were popped.
+
+        Raises:
+            ValueError: If the response has no forms or a form cannot be converted.
+        """
+        return await self.run_tasks(split_alchemy_job_pop_response(api_response))
@@ -37,6 +37,38 @@ class MetaInstruction(StrEnum):
 
     BOTTOM_N_REGEX = r"BOTTOM (\d+)"
 
+    @property
+    def pattern(self) -> re.Pattern[str]:
+        """The instruction's regex, compiled (case-insensitively) once for all matches."""
+        return _META_INSTRUCTION_PATTERNS[self]
+
+
+_META_INSTRUCTION_PATTERNS: dict[str, re.Pattern[str]] = {
+    instruction.value: re.compile(instruction.value, re.IGNORECASE) for instruction in MetaInstruction
+}
+"""The compiled regex of each meta instruction, by instruction."""
+
+
+def is_meta_instruction(model_entry: str) -> bool:
+    """Return whether an entry of a model list is a meta instruction (e.g. `top 10`) rather than a model name."""
+    return any(pattern.match(model_entry) for pattern in _META_INSTRUCTION_PATTERNS.values())
+
+
+def split_meta_instructions(model_entries: list[str]) -> tuple[list[str], list[str]]:
+    """Split the entries of a model list into model names and meta instructions, each in their original order.
+
+    Args:
+        model_entries (list[str]): The entries to split.
+
+    Returns:
+        tuple[list[str], list[str]]: The model names and the meta instructions.
+    """
+    model_names: list[str] = []
+    meta_instructions: list[str] = []
+    for model_entry in model_entries:
+        (meta_instructions if is_meta_instruction(model_entry) else model_names).append(model_entry)
+    return model_names, meta_instructions
+
 
 class BaseHordeBridgeData(BaseModel):
     """The base bridge data file for all worker types."""
@@ -324,7 +356,8 @@ class ImageWorkerBridgeData(SharedHordeBridgeData):
             )
             self.allow_sdxl_controlnet = False
 
-        self.image_models_to_skip.append("SDXL_beta::stability.ai#6901")  # FIXME: no magic strings
+        if "SDXL_beta::stability.ai#6901" not in self.image_models_to_skip:  # FIXME: no magic strings
+            self.image_models_to_skip.append("SDXL_beta::stability.ai#6901")
 
         return self
 
@@ -340,13 +373,10 @@ class ImageWorkerBridgeData(SharedHordeBridgeData):
     def handle_meta_instructions(self) -> ImageWorkerBridgeData:
         """Handle the meta instructions by resolving and applying them."""
         # See if any entries are meta instructions, and if so, remove them and place them in _meta_load_instructions
-        for instruction_regex in MetaInstruction.__members__.values():
-            for i, model in enumerate(self.image_models_to_load):
-                if re.match(instruction_regex, model, re.IGNORECASE):
-                    if self._meta_load_instructions is None:
-                        self._meta_load_instructions = []
-                    self._meta_load_instructions.append(model)
-                    self.image_models_to_load.pop(i)
+        model_names, meta_instructions = split_meta_instructions(self.image_models_to_load)
+        if meta_instructions:
+            self.image_models_to_load[:] = model_names
+            self._meta_load_instructions = [*(self._meta_load_instructions or []), *meta_instructions]
 
         return self
 
@@ -359,13 +389,10 @@ class ImageWorkerBridgeData(SharedHordeBridgeData):
     def handle_meta_skip_instructions(self) -> ImageWorkerBridgeData:
         """Handle the meta skip instructions by resolving and applying them."""
         # See if any entries are meta instructions, and if so, remove them and place them in _meta_skip_instructions
-        for instruction_regex in MetaInstruction.__members__.values():
-            for i, model in enumerate(self.image_models_to_skip):
-                if re.match(instruction_regex, model, re.IGNORECASE):
-                    if self._meta_skip_instructions is None:
-                        self._meta_skip_instructions = []
-                    self._meta_skip_instructions.append(model)
-                    self.image_models_to_skip.pop(i)
+        model_names, meta_instructions = split_meta_instructions(self.image_models_to_skip)
+        if meta_instructions:
+            self.image_models_to_skip[:] = model_names
+            self._meta_skip_instructions = [*(self._meta_skip_instructions or []), *meta_instructions]
 
         return self
 
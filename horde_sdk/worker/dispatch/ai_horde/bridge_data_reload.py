@@ -0,0 +1,302 @@
+"""Hot reload of `ImageWorkerBridgeData`, recomputing only the state derived from the fields which changed.
+
+A worker derives a few things from its bridge data: the models to pop jobs for, which takes resolving meta
+instructions such as `top 10` with `ImageModelLoadResolver` and so a request to the API, the `max_pixels` of a job,
+and the feature flags sent with every job pop. `ImageWorkerBridgeDataReloader` keeps those in an immutable
+`ImageWorkerConfigSnapshot`. On `reload`, it diffs the old and new bridge data field by field. It then recomputes
+only the derived state depending on a changed field. The meta instructions are only resolved again if they
+themselves changed.
+
+Running jobs pick the change up without a restart by starting from the reloader's snapshot and subscribing to new
+ones, e.g. `AIHordeImageWorkerJobPopStrategy(config_snapshot=reloader.snapshot, ...)` followed by
+`reloader.subscribe(pop_strategy.apply_config_snapshot)`.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from enum import auto
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel
+from strenum import StrEnum
+
+from horde_sdk import get_default_frozen_model_config_dict
+from horde_sdk.worker.dispatch.ai_horde.bridge_data import ImageWorkerBridgeData
+
+
+class BRIDGE_DATA_DERIVED_STATE(StrEnum):
+    """The state a worker derives from its bridge data, which a reload may have to recompute."""
+
+    models = auto()
+    """The models to pop jobs for."""
+    max_pixels = auto()
+    """The most pixels of a job."""
+    feature_flags = auto()
+    """The features advertised when popping jobs."""
+
+
+_MODEL_FIELDS = frozenset({"image_models_to_load", "image_models_to_skip"})
+_MAX_PIXELS_FIELDS = frozenset({"max_power"})
+_FEATURE_FLAG_FIELDS = frozenset(
+    {
+        "allow_controlnet",
+        "allow_img2img",
+        "allow_inpainting",
+        "allow_lora",
+        "allow_post_processing",
+        "allow_sdxl_controlnet",
+        "allow_unsafe_ip",
+        "extra_slow_worker",
+        "limit_max_steps",
+        "nsfw",
+        "require_upfront_kudos",
+    },
+)
+
+
+class ImageWorkerPopFeatureFlags(BaseModel):
+    """The features an image worker advertises when popping jobs, as set in its bridge data."""
+
+    model_config = get_default_frozen_model_config_dict()
+
+    allow_img2img: bool
+    """Whether img2img jobs are accepted."""
+    allow_inpainting: bool
+    """Whether inpainting jobs are accepted."""
+    allow_unsafe_ip: bool
+    """Whether source images from unsafe IP addresses are accepted."""
+    allow_post_processing: bool
+    """Whether jobs with post-processing are accepted."""
+    allow_controlnet: bool
+    """Whether ControlNet jobs are accepted."""
+    allow_sdxl_controlnet: bool
+    """Whether SDXL ControlNet jobs are accepted."""
+    allow_lora: bool
+    """Whether jobs with LoRAs are accepted."""
+    extra_slow_worker: bool
+    """Whether the worker is marked as extra slow."""
+    limit_max_steps: bool
+    """Whether jobs with more steps than the model average are refused."""
+    nsfw: bool
+    """Whether NSFW jobs are accepted."""
+    require_upfront_kudos: bool
+    """Whether jobs are only accepted from users with kudos."""
+
+    @classmethod
+    def from_bridge_data(cls, bridge_data: ImageWorkerBridgeData) -> ImageWorkerPopFeatureFlags:
+        """Return the feature flags set in `bridge_data`."""
+        return cls(**{field_name: getattr(bridge_data, field_name) for field_name in _FEATURE_FLAG_FIELDS})
+
+
+class ImageWorkerConfigSnapshot(BaseModel):
+    """A worker's bridge data and the state derived from it, as of one (re)load."""
+
+    model_config = get_default_frozen_model_config_dict()
+
+    version: int
+    """Incremented by every reload which changed anything; the first load is version 0."""
+    bridge_data: ImageWorkerBridgeData
+    """The bridge data. Do not modify it; reload changed bridge data instead."""
+    models: list[str]
+    """The models to pop jobs for, with the meta instructions resolved and the skipped models removed."""
+    max_pixels: int
+    """The most pixels of a job."""
+    feature_flags: ImageWorkerPopFeatureFlags
+    """The features advertised when popping jobs."""
+
+
+class BridgeDataReloadResult(BaseModel):
+    """What a reload changed."""
+
+    changed_fields: list[str]
+    """The bridge data fields whose value changed."""
+    recomputed: list[BRIDGE_DATA_DERIVED_STATE]
+    """The derived state recomputed because of those changes."""
+    meta_instructions_resolved: bool
+    """Whether meta instructions had to be resolved again, which requires a request to the API."""
+    snapshot: ImageWorkerConfigSnapshot
+    """The snapshot in effect after the reload."""
+
+
+def diff_bridge_data(old: ImageWorkerBridgeData, new: ImageWorkerBridgeData) -> list[str]:
+    """Return the names of the fields (including unknown, extra ones) whose value differs, in definition order.
+
+    A change to the meta instructions of `image_models_to_load` or `image_models_to_skip` counts as a change to that
+    field, even though the instructions are moved out of it during validation.
+    """
+    field_names = [*type(new).model_fields, *(new.model_extra or {}), *(old.model_extra or {})]
+    changed = [
+        field_name
+        for field_name in dict.fromkeys(field_names)
+        if getattr(old, field_name, None) != getattr(new, field_name, None)
+    ]
+
+    if old.meta_load_instructions != new.meta_load_instructions and "image_models_to_load" not in changed:
+        changed.append("image_models_to_load")
+    if old.meta_skip_instructions != new.meta_skip_instructions and "image_models_to_skip" not in changed:
+        changed.append("image_models_to_skip")
+    return changed
+
+
+class ImageWorkerBridgeDataReloader:
+    """Hold an image worker's current bridge data and derived state, and apply changed bridge data incrementally."""
+
+    def __init__(
+        self,
+        bridge_data: ImageWorkerBridgeData,
+        *,
+        resolve_meta_instructions: Callable[[list[str]], Iterable[str]] | None = None,
+    ) -> None:
+        """Initialize the reloader, deriving the state of `bridge_data`.
+
+        Args:
+            bridge_data (ImageWorkerBridgeData): The bridge data the worker started with.
+            resolve_meta_instructions (Callable[[list[str]], Iterable[str]] | None, optional): Return the model
+                names meta instructions such as `top 10` refer to, e.g. `ImageModelLoadResolver`'s
+                `resolve_meta_instructions` with its client bound. It is only called when the meta instructions
+                change. Defaults to None, in which case meta instructions are ignored (with a warning).
+        """
+        self._resolve_meta_instructions = resolve_meta_instructions
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[ImageWorkerConfigSnapshot], None]] = []
+        self._last_raw_bridge_data: dict[str, Any] | None = None
+        self._meta_instructions_resolved = False
+
+        self._resolved_load_instructions: tuple[list[str] | None, frozenset[str]] = (None, frozenset())
+        self._resolved_skip_instructions: tuple[list[str] | None, frozenset[str]] = (None, frozenset())
+
+        self._snapshot = ImageWorkerConfigSnapshot(
+            version=0,
+            bridge_data=bridge_data,
+            models=self._compute_models(bridge_data),
+            max_pixels=bridge_data.max_pixels,
+            feature_flags=ImageWorkerPopFeatureFlags.from_bridge_data(bridge_data),
+        )
+
+    @property
+    def snapshot(self) -> ImageWorkerConfigSnapshot:
+        """The current bridge data and derived state."""
+        return self._snapshot
+
+    def subscribe(self, callback: Callable[[ImageWorkerConfigSnapshot], None]) -> None:
+        """Call `callback` with the new snapshot after every reload which changed anything.
+
+        Callbacks are called in the reloading thread, in the order they subscribed. A callback which raises is
+        logged and does not prevent the others from being called.
+        """
+        self._subscribers.append(callback)
+
+    def _resolve(
+        self,
+        meta_instructions: list[str] | None,
+        previous: tuple[list[str] | None, frozenset[str]],
+    ) -> tuple[tuple[list[str] | None, frozenset[str]], bool]:
+        if meta_instructions == previous[0]:
+            return previous, False
+        if not meta_instructions:
+            return (meta_instructions, frozenset()), False
+        if self._resolve_meta_instructions is None:
+            logger.warning(
+                f"Ignoring the meta instructions {meta_instructions}; there is nothing to resolve them with."
+            )
+            return (meta_instructions, frozenset()), False
+        return (meta_instructions, frozenset(self._resolve_meta_instructions(list(meta_instructions)))), True
+
+    def _compute_models(self, bridge_data: ImageWorkerBridgeData) -> list[str]:
+        """Return the models to pop jobs for, resolving meta instructions only if they changed since the last call."""
+        self._resolved_load_instructions, resolved_load = self._resolve(
+            bridge_data.meta_load_instructions,
+            self._resolved_load_instructions,
+        )
+        self._resolved_skip_instructions, resolved_skip = self._resolve(
+            bridge_data.meta_skip_instructions,
+            self._resolved_skip_instructions,
+        )
+        self._meta_instructions_resolved = resolved_load or resolved_skip
+
+        skipped = set(bridge_data.image_models_to_skip) | self._resolved_skip_instructions[1]
+        model_names = [*bridge_data.image_models_to_load, *sorted(self._resolved_load_instructions[1])]
+        return [model_name for model_name in dict.fromkeys(model_names) if model_name not in skipped]
+
+    def reload(self, new_bridge_data: ImageWorkerBridgeData | Mapping[str, Any]) -> BridgeDataReloadResult:
+        """Apply new bridge data, recomputing only the derived state depending on the fields which changed.
+
+        A mapping (e.g. a freshly parsed `bridgeData.yaml`) which is equal to the one last reloaded is not validated
+        again, so reloading on every change notification of the file is cheap.
+
+        Args:
+            new_bridge_data (ImageWorkerBridgeData | Mapping[str, Any]): The new bridge data, validated or not.
+
+        Returns:
+            BridgeDataReloadResult: What changed, and the snapshot now in effect.
+
+        Raises:
+            pydantic.ValidationError: If `new_bridge_data` is a mapping which is not valid bridge data. The current
+                snapshot is kept.
+        """
+        with self._lock:
+            old = self._snapshot
+            if isinstance(new_bridge_data, Mapping):
+                raw_bridge_data = copy.deepcopy(dict(new_bridge_data))
+                if raw_bridge_data == self._last_raw_bridge_data:
+                    return BridgeDataReloadResult(
+                        changed_fields=[],
+                        recomputed=[],
+                        meta_instructions_resolved=False,
+                        snapshot=old,
+                    )
+                new_bridge_data = type(old.bridge_data).model_validate(raw_bridge_data)
+                self._last_raw_bridge_data = raw_bridge_data
+            else:
+                self._last_raw_bridge_data = None
+
+            changed_fields = diff_bridge_data(old.bridge_data, new_bridge_data)
+            changed = set(changed_fields)
+            recomputed: list[BRIDGE_DATA_DERIVED_STATE] = []
+            self._meta_instructions_resolved = False
+
+            models = old.models
+            if changed & _MODEL_FIELDS:
+                models = self._compute_models(new_bridge_data)
+                recomputed.append(BRIDGE_DATA_DERIVED_STATE.models)
+
+            max_pixels = old.max_pixels
+            if changed & _MAX_PIXELS_FIELDS:
+                max_pixels = new_bridge_data.max_pixels
+                recomputed.append(BRIDGE_DATA_DERIVED_STATE.max_pixels)
+
+            feature_flags = old.feature_flags
+            if changed & _FEATURE_FLAG_FIELDS:
+                feature_flags = ImageWorkerPopFeatureFlags.from_bridge_data(new_bridge_data)
+                recomputed.append(BRIDGE_DATA_DERIVED_STATE.feature_flags)
+
+            result = BridgeDataReloadResult(
+                changed_fields=changed_fields,
+                recomputed=recomputed,
+                meta_instructions_resolved=self._meta_instructions_resolved,
+                snapshot=old,
+            )
+            if not changed_fields:
+                return result
+
+            self._snapshot = ImageWorkerConfigSnapshot(
+                version=old.version + 1,
+                bridge_data=new_bridge_data,
+                models=models,
+                max_pixels=max_pixels,
+                feature_flags=feature_flags,
+            )
+            result = result.model_copy(update={"snapshot": self._snapshot})
+            logger.info(f"Reloaded the bridge data; changed: {', '.join(changed_fields)}")
+
+            for callback in self._subscribers:
+                try:
+                    callback(self._snapshot)
+                except Exception as e:
+                    logger.exception(f"Failed to apply the reloaded bridge data with {callback!r}: {e}")
+
+            return result
@@ -9,6 +9,10 @@ from horde_sdk.consts import WORKER_TYPE
 from horde_sdk.generation_parameters import ImageGenerationParameters
 from horde_sdk.utils import default_bridge_agent_string
 from horde_sdk.worker.dispatch.ai_horde.bridge_data import ImageWorkerBridgeData
+from horde_sdk.worker.dispatch.ai_horde.bridge_data_reload import (
+    ImageWorkerBridgeDataReloader,
+    ImageWorkerConfigSnapshot,
+)
 from horde_sdk.worker.dispatch.ai_horde.image.convert import convert_image_job_pop_response_to_parameters
 from horde_sdk.worker.dispatch.pop_strategy import JobPopStrategyGeneric
 from horde_sdk.worker.generations import (
@@ -20,7 +24,7 @@ from horde_sdk.worker.jobs import ImageWorkerJob
 class AIHordeImageWorkerJobPopStrategy(JobPopStrategyGeneric[ImageSingleGeneration, ImageGenerationParameters]):
     """Job pop strategy for AI Horde image worker jobs."""
 
-    _image_worker_bridge_data: ImageWorkerBridgeData
+    _config_snapshot: ImageWorkerConfigSnapshot
     _bridge_agent_string: str = default_bridge_agent_string
 
     _sync_client_session: AIHordeAPIClientSession | None
@@ -32,7 +36,8 @@ class AIHordeImageWorkerJobPopStrategy(JobPopStrategyGeneric[ImageSingleGenerati
         self,
         default_job_pop_time_spacing: float = JobPopStrategyGeneric._default_job_pop_time_spacing,
         *,
-        image_worker_bridge_data: ImageWorkerBridgeData,
+        image_worker_bridge_data: ImageWorkerBridgeData | None = None,
+        config_snapshot: ImageWorkerConfigSnapshot | None = None,
         bridge_agent_string: str = default_bridge_agent_string,
         sync_client_session: AIHordeAPIClientSession | None = None,
         async_client_session: AIHordeAPIAsyncClientSession | None = None,
@@ -42,24 +47,50 @@ class AIHordeImageWorkerJobPopStrategy(JobPopStrategyGeneric[ImageSingleGenerati
 
         Args:
             default_job_pop_time_spacing (float): Default minimum time spacing between job pops in seconds.
-            image_worker_bridge_data (ImageWorkerBridgeData): The bridge data for the image worker.
+            image_worker_bridge_data (ImageWorkerBridgeData | None): The bridge data for the image worker. Pass
+                either this or `config_snapshot`.
+            config_snapshot (ImageWorkerConfigSnapshot | None): The bridge data for the image worker and the state
+                derived from it, usually the `snapshot` of an `ImageWorkerBridgeDataReloader` whose reloads are
+                applied with `apply_config_snapshot`. Pass either this or `image_worker_bridge_data`.
             bridge_agent_string (str): The bridge agent string to use for the worker.
             sync_client_session (AIHordeAPIClientSession | None): Optional synchronous client session for API calls.
             async_client_session (AIHordeAPIAsyncClientSession | None): Optional asynchronous client session for API
                 calls.
             model_reference_manager (ModelReferenceManager): The model reference manager for handling model references.
+
+        Raises:
+            ValueError: If neither or both of `image_worker_bridge_data` and `config_snapshot` are passed.
         """
+        if config_snapshot is None:
+            if image_worker_bridge_data is None:
+                raise ValueError("Pass either image_worker_bridge_data or config_snapshot.")
+            # Derived the same way as a reloader's snapshots, so applying one later changes only what was reloaded.
+            config_snapshot = ImageWorkerBridgeDataReloader(image_worker_bridge_data).snapshot
+        elif image_worker_bridge_data is not None:
+            raise ValueError("Pass only one of image_worker_bridge_data and config_snapshot.")
+
         super().__init__(default_job_pop_time_spacing)
 
         self._bridge_agent_string = bridge_agent_string
 
-        self._image_worker_bridge_data = image_worker_bridge_data
+        self._config_snapshot = config_snapshot
 
         self._sync_client_session = sync_client_session
         self._async_client_session = async_client_session
 
         self._model_reference_manager = model_reference_manager
 
+    def apply_config_snapshot(self, snapshot: ImageWorkerConfigSnapshot) -> None:
+        """Pop the next jobs with reloaded bridge data, without restarting.
+
+        Subscribe this to an `ImageWorkerBridgeDataReloader`. Jobs already popped are not affected.
+
+        Args:
+            snapshot (ImageWorkerConfigSnapshot): The reloaded bridge data and the state derived from it.
+        """
+        # One assignment, so that a pop never mixes the new bridge data with the old derived state.
+        self._config_snapshot = snapshot
+
     @override
     def get_worker_type(self) -> WORKER_TYPE:
         return WORKER_TYPE.image
@@ -73,26 +104,29 @@ class AIHordeImageWorkerJobPopStrategy(JobPopStrategyGeneric[ImageSingleGenerati
         if self._sync_client_session is None:
             raise ValueError("Synchronous client session is not available.")
 
+        snapshot = self._config_snapshot
+        bridge_data = snapshot.bridge_data
+        feature_flags = snapshot.feature_flags
         job_pop_request = ImageGenerateJobPopRequest(
-            apikey=self._image_worker_bridge_data.api_key,
-            name=self._image_worker_bridge_data.dreamer_worker_name,
-            models=self._image_worker_bridge_data.image_models_to_load,
-            max_pixels=self._image_worker_bridge_data.max_pixels,
+            apikey=bridge_data.api_key,
+            name=bridge_data.dreamer_worker_name,
+            models=snapshot.models,
+            max_pixels=snapshot.max_pixels,
             bridge_agent=self._bridge_agent_string,
-            blacklist=self._image_worker_bridge_data.blacklist,
-            nsfw=self._image_worker_bridge_data.nsfw,
-            threads=self._image_worker_bridge_data.max_threads,
-            require_upfront_kudos=self._image_worker_bridge_data.require_upfront_kudos,
-            allow_img2img=self._image_worker_bridge_data.allow_img2img,
-            allow_painting=self._image_worker_bridge_data.allow_inpainting,
-            allow_unsafe_ipaddr=self._image_worker_bridge_data.allow_unsafe_ip,
-            allow_post_processing=self._image_worker_bridge_data.allow_post_processing,
-            allow_controlnet=self._image_worker_bridge_data.allow_controlnet,
-            allow_sdxl_controlnet=self._image_worker_bridge_data.allow_sdxl_controlnet,
-            extra_slow_worker=self._image_worker_bridge_data.extra_slow_worker,
-            limit_max_steps=self._image_worker_bridge_data.limit_max_steps,
-            allow_lora=self._image_worker_bridge_data.allow_lora,
-            amount=self._image_worker_bridge_data.max_batch,
+            blacklist=bridge_data.blacklist,
+            nsfw=feature_flags.nsfw,
+            threads=bridge_data.max_threads,
+            require_upfront_kudos=feature_flags.require_upfront_kudos,
+            allow_img2img=feature_flags.allow_img2img,
+            allow_painting=feature_flags.allow_inpainting,
+            allow_unsafe_ipaddr=feature_flags.allow_unsafe_ip,
+            allow_post_processing=feature_flags.allow_post_processing,
+            allow_controlnet=feature_flags.allow_controlnet,
+            allow_sdxl_controlnet=feature_flags.allow_sdxl_controlnet,
+            extra_slow_worker=feature_flags.extra_slow_worker,
+            limit_max_steps=feature_flags.limit_max_steps,
+            allow_lora=feature_flags.allow_lora,
+            amount=bridge_data.max_batch,
         )
 
         job_pop_response = self._sync_client_session.submit_request(
@@ -34,3 +34,18 @@ class GenerationStateErrorLimitExceeded(GenerationStateException):
         self.generation_id = generation_id
         self.error_limit = error_limit
         self.last_non_error_state = last_non_error_state
+
+
+class AuxModelDownloadError(Exception):
+    """Raised when an auxiliary model (LoRa, TI, ...) could not be fetched into the aux model cache."""
+
+    def __init__(self, identifier: str, reason: str) -> None:
+        """Initialize the aux model download error.
+
+        Args:
+            identifier (str): Identifies the aux model which could not be fetched.
+            reason (str): Why it could not be fetched.
+        """
+        super().__init__(f"Could not fetch aux model {identifier}: {reason}")
+        self.identifier = identifier
+        self.reason = reason
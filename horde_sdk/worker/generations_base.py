@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import itertools
 import threading
 import time
 import uuid
@@ -26,9 +25,17 @@ from horde_sdk.worker.consts import (
     validate_generation_progress_transitions,
 )
 from horde_sdk.worker.exceptions import GenerationStateErrorLimitExceeded
+from horde_sdk.worker.progress_log import ProgressTransitionLog, RetryEventLog
 
 GenerationResultTypeVar = TypeVar("GenerationResultTypeVar")
 
+ProgressListener = Callable[[GENERATION_PROGRESS, float], None]
+"""Called with the state a generation entered and the (monotonic) time it entered it.
+
+Listeners run synchronously, under the generation's lock, on whichever thread drove the transition; they should only
+hand the event off (e.g., enqueue it) and return.
+"""
+
 
 class InputCollectionConstraint(StrEnum):
     """Types of constraints for inputs collections."""
@@ -150,6 +157,32 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
         with self._lock:
             self._registered_callbacks[state].append(callback)
 
+    _progress_listeners: list[ProgressListener]
+
+    def add_progress_listener(self, listener: ProgressListener) -> None:
+        """Register a listener to be notified of every state the generation enters.
+
+        Exceptions raised by a listener are logged and otherwise ignored, so a faulty listener cannot wedge the
+        generation's state machine.
+
+        Args:
+            listener (ProgressListener): The listener to notify.
+        """
+        with self._lock:
+            self._progress_listeners.append(listener)
+
+    def remove_progress_listener(self, listener: ProgressListener) -> None:
+        """Unregister a listener previously added with `add_progress_listener`.
+
+        Args:
+            listener (ProgressListener): The listener to remove.
+
+        Raises:
+            ValueError: If the listener is not registered.
+        """
+        with self._lock:
+            self._progress_listeners.remove(listener)
+
     _dispatch_result_ids: list[ID_TYPES] | None
 
     def __init__(
@@ -300,10 +333,9 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
                 )
             self._generate_progress_transitions = generate_progress_transitions
 
-        self._errored_states = []
-        self._error_counts = {}
-        self._retry_events = []
-        self._retry_counts = {}
+        # Most generations never error or retry; their logs are only allocated on first use.
+        self._errored_states = None
+        self._retry_events = None
 
         self._state_error_limits = state_error_limits or {}
         self._generation_failed_messages = []
@@ -311,13 +343,15 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
 
         # This initialization is critical. The first state must be NOT_STARTED and ERROR must not be the next state.
         # Errors are only allowed after the first "action" state where something is done.
-        self._progress_history = [(GENERATION_PROGRESS.NOT_STARTED, time.monotonic())]
+        self._progress_history = ProgressTransitionLog()
+        self._progress_history.append(GENERATION_PROGRESS.NOT_STARTED, time.monotonic())
 
         self._lock = threading.RLock()
 
         self._strict_transition_mode = strict_transition_mode
 
         self._registered_callbacks = {}
+        self._progress_listeners = []
 
         for state in self._generate_progress_transitions:
             self._registered_callbacks[state] = []
@@ -360,39 +394,46 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
         with self._lock:
             return self._generation_progress
 
-    _progress_history: list[tuple[GENERATION_PROGRESS, float]]
-    """A list of tuples containing all of the generation states and the time they were set."""
+    _progress_history: ProgressTransitionLog
+    """All of the generation states and the time they were set, stored compactly."""
 
-    _errored_states: list[tuple[GENERATION_PROGRESS, float]]
-    _error_counts: dict[GENERATION_PROGRESS, int]
+    _errored_states: ProgressTransitionLog | None
+    """The states which occurred just before an error state and the time they were set, if any error occurred."""
     _any_error_count_exceeded: bool = False
 
-    _retry_events: list[tuple[GENERATION_RETRY_KIND, GENERATION_PROGRESS, float]]
-    _retry_counts: dict[GENERATION_RETRY_KIND, int]
+    _retry_events: RetryEventLog | None
 
     @property
     def errored_states(self) -> list[tuple[GENERATION_PROGRESS, float]]:
         """Return a tuple of states which occurred just before an error state and the time they were set."""
         with self._lock:
-            return self._errored_states.copy()
+            if self._errored_states is None:
+                return []
+            return self._errored_states.to_list()
 
     @property
     def error_counts(self) -> dict[GENERATION_PROGRESS, int]:
         """Return a dictionary of states and the number of times they occurred before an error state."""
         with self._lock:
-            return self._error_counts.copy()
+            if self._errored_states is None:
+                return {}
+            return self._errored_states.counts()
 
     @property
     def retry_events(self) -> list[tuple[GENERATION_RETRY_KIND, GENERATION_PROGRESS, float]]:
         """Return the recorded retries as (kind, retried state, monotonic time) tuples."""
         with self._lock:
-            return self._retry_events.copy()
+            if self._retry_events is None:
+                return []
+            return self._retry_events.to_list()
 
     @property
     def retry_counts(self) -> dict[GENERATION_RETRY_KIND, int]:
         """Return the number of recorded retries per retry kind."""
         with self._lock:
-            return self._retry_counts.copy()
+            if self._retry_events is None:
+                return {}
+            return self._retry_events.counts()
 
     def record_retry(
         self,
@@ -411,28 +452,25 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
         """
         with self._lock:
             retried_state = self.get_last_non_error_state()
-            self._retry_events.append((kind, retried_state, time.monotonic()))
-            self._retry_counts[kind] = self._retry_counts.get(kind, 0) + 1
+            if self._retry_events is None:
+                self._retry_events = RetryEventLog()
+            self._retry_events.append(kind, retried_state, time.monotonic())
             if error is not None:
                 self._generation_failure_exceptions.append(error)
 
     def get_progress_history(self) -> list[tuple[GENERATION_PROGRESS, float]]:
         """Get the generation progress history."""
         with self._lock:
-            return self._progress_history.copy()
+            return self._progress_history.to_list()
 
     def get_stage_durations(self) -> dict[GENERATION_PROGRESS, float]:
         """Return the cumulative wall-clock seconds spent in each state so far.
 
-        Computed from the progress history; the current state's ongoing time is included. States revisited via
-        retries accumulate.
+        Maintained incrementally as states are entered; the current state's ongoing time is included. States
+        revisited via retries accumulate.
         """
         with self._lock:
-            durations: dict[GENERATION_PROGRESS, float] = {}
-            history = [*self._progress_history, (self._generation_progress, time.monotonic())]
-            for (state, entered), (_, exited) in itertools.pairwise(history):
-                durations[state] = durations.get(state, 0.0) + (exited - entered)
-            return durations
+            return self._progress_history.stage_durations(time.monotonic())
 
     _generation_progress: GENERATION_PROGRESS = GENERATION_PROGRESS.NOT_STARTED
 
@@ -497,18 +535,18 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
     def get_last_non_error_state(self) -> GENERATION_PROGRESS:
         """Get the last non-error state."""
         with self._lock:
-            for state, _ in reversed(self._progress_history):
-                if state != GENERATION_PROGRESS.ERROR:
-                    return state
-            raise RuntimeError("No non-error state found in progress history")
+            last_non_error = self._progress_history.last_non_error()
+            if last_non_error is None:
+                raise RuntimeError("No non-error state found in progress history")
+            return last_non_error[0]
 
     def get_last_non_error_state_and_time(self) -> tuple[GENERATION_PROGRESS, float]:
         """Get the last non-error state and the time it was set."""
         with self._lock:
-            for state, time_set in reversed(self._progress_history):
-                if state != GENERATION_PROGRESS.ERROR:
-                    return state, time_set
-            raise RuntimeError("No non-error state found in progress history")
+            last_non_error = self._progress_history.last_non_error()
+            if last_non_error is None:
+                raise RuntimeError("No non-error state found in progress history")
+            return last_non_error
 
     def is_next_state_valid(
         self,
@@ -534,7 +572,7 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
             if current_state == GENERATION_PROGRESS.ERROR and len(self._progress_history) < 2:
                 return False
 
-            state_error_count = self._error_counts.get(next_state, 0)
+            state_error_count = self._error_count_for(next_state)
             state_error_limit = (
                 self._state_error_limits.get(next_state, float("inf")) if self._state_error_limits else float("inf")
             )
@@ -640,7 +678,14 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
 
             self._extra_log()(f"Generation {self.generation_id} progress history: {self._progress_history}")
             self._generation_progress = next_state
-            self._progress_history.append((next_state, time.monotonic()))
+            time_set = time.monotonic()
+            self._progress_history.append(next_state, time_set)
+
+            for listener in self._progress_listeners:
+                try:
+                    listener(next_state, time_set)
+                except Exception as e:
+                    logger.exception(f"Progress listener failed for generation {self.generation_id}: {e}")
 
             return next_state
 
@@ -661,16 +706,23 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
 
     def _get_last_non_error_state(self, current_state: GENERATION_PROGRESS) -> tuple[GENERATION_PROGRESS, float]:
         """Get the relevant previous state for transition logic."""
-        for state, time_set in reversed(self._progress_history):
-            if state != GENERATION_PROGRESS.ERROR:
-                return state, time_set
+        last_non_error = self._progress_history.last_non_error()
+        if last_non_error is not None:
+            return last_non_error
 
         return current_state, time.monotonic()
 
     def _update_error_tracking(self, last_state: GENERATION_PROGRESS, last_state_time: float) -> None:
         """Update error tracking when transitioning to an error state."""
-        self._errored_states.append((last_state, last_state_time))
-        self._error_counts[last_state] = self._error_counts.get(last_state, 0) + 1
+        if self._errored_states is None:
+            self._errored_states = ProgressTransitionLog(capacity=4, track_durations=False)
+        self._errored_states.append(last_state, last_state_time)
+
+    def _error_count_for(self, state: GENERATION_PROGRESS) -> int:
+        """Return the number of times `state` occurred just before an error state."""
+        if self._errored_states is None:
+            return 0
+        return self._errored_states.count(state)
 
     def _validate_normal_transition(self, next_state: GENERATION_PROGRESS, last_state: GENERATION_PROGRESS) -> None:
         """Validate a normal (non-error) state transition."""
@@ -690,7 +742,7 @@ class HordeSingleGeneration[GenerationResultTypeVar](ABC):
         if self._state_error_limits is None:
             return False
 
-        state_error_count = self._error_counts.get(state, 0)
+        state_error_count = self._error_count_for(state)
         state_error_limit = self._state_error_limits.get(state, float("inf"))
         return state_error_count >= state_error_limit
 
@@ -92,6 +92,11 @@ class HordeWorkerJobConfig(BaseModel):
         ge=0,
     )
 
+    result_image_encode_latency_budget: float | None = Field(
+        default=HordeWorkerConfigDefaults.DEFAULT_RESULT_IMAGE_ENCODE_LATENCY_BUDGET,
+        gt=0,
+    )
+
 
 class HordeWorkerJob[
     SingleGenerationTypeVar: HordeSingleGeneration[Any],
@@ -50,6 +50,7 @@ class ImageWorkerJob(HordeWorkerJob[ImageSingleGeneration, ImageGenerationParame
         dispatch_job_id: ID_TYPES | None = None,
         dispatch_result_ids: Sequence[ID_TYPES] | None = None,
         preserve_generation_id: bool = False,
+        time_received: float | None = None,
     ) -> None:
         """Initialize the image worker job.
 
@@ -64,6 +65,7 @@ class ImageWorkerJob(HordeWorkerJob[ImageSingleGeneration, ImageGenerationParame
                 generation.
             preserve_generation_id (bool): Retain the existing generation identifier instead of overwriting it with the
                 job identifier.
+            time_received (float | None): The epoch time the job was received from dispatch, if known.
         """
         super().__init__(
             generation=generation,
@@ -73,6 +75,7 @@ class ImageWorkerJob(HordeWorkerJob[ImageSingleGeneration, ImageGenerationParame
             dispatch_job_id=dispatch_job_id,
             dispatch_result_ids=dispatch_result_ids,
             preserve_generation_id=preserve_generation_id,
+            time_received=time_received,
         )
 
     @override
@@ -140,6 +143,7 @@ class AlchemyWorkerJob(HordeWorkerJob[AlchemySingleGeneration, SingleAlchemyPara
         dispatch_job_id: ID_TYPES | None = None,
         dispatch_result_ids: Sequence[ID_TYPES] | None = None,
         preserve_generation_id: bool = False,
+        time_received: float | None = None,
     ) -> None:
         """Initialize the alchemy worker job.
 
@@ -153,6 +157,7 @@ class AlchemyWorkerJob(HordeWorkerJob[AlchemySingleGeneration, SingleAlchemyPara
                 generation.
             preserve_generation_id (bool): Retain the existing generation identifier instead of overwriting it with the
                 job identifier.
+            time_received (float | None): The epoch time the job was received from dispatch, if known.
         """
         super().__init__(
             generation=generation,
@@ -162,6 +167,7 @@ class AlchemyWorkerJob(HordeWorkerJob[AlchemySingleGeneration, SingleAlchemyPara
             dispatch_job_id=dispatch_job_id,
             dispatch_result_ids=dispatch_result_ids,
             preserve_generation_id=preserve_generation_id,
+            time_received=time_received,
         )
 
     @override
@@ -235,6 +241,7 @@ class TextWorkerJob(HordeWorkerJob[TextSingleGeneration, TextGenerationParameter
         dispatch_job_id: ID_TYPES | None = None,
         dispatch_result_ids: Sequence[ID_TYPES] | None = None,
         preserve_generation_id: bool = False,
+        time_received: float | None = None,
     ) -> None:
         """Initialize the text worker job.
 
@@ -248,6 +255,7 @@ class TextWorkerJob(HordeWorkerJob[TextSingleGeneration, TextGenerationParameter
                 generation.
             preserve_generation_id (bool): Retain the existing generation identifier instead of overwriting it with the
                 job identifier.
+            time_received (float | None): The epoch time the job was received from dispatch, if known.
         """
         super().__init__(
             generation=generation,
@@ -257,6 +265,7 @@ class TextWorkerJob(HordeWorkerJob[TextSingleGeneration, TextGenerationParameter
             dispatch_job_id=dispatch_job_id,
             dispatch_result_ids=dispatch_result_ids,
             preserve_generation_id=preserve_generation_id,
+            time_received=time_received,
         )
 
     @override
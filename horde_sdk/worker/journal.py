@@ -0,0 +1,513 @@
+"""A persistent, append-only journal of worker jobs for crash recovery.
+
+When a worker process dies, the jobs it had popped are otherwise lost until the Horde's job TTL expires. A
+`JobJournal` records each popped job, every generation-progress transition and every result reference (for
+example, the path of a saved image or `"R2"` for an uploaded one) as JSON lines. After a restart,
+`JobJournal.replay` reconstructs the last known state of each unfinished job, so results which were generated but
+never submitted can be submitted straight away and everything else can be reported as faulted.
+
+Journal writes stay off the hot path: `HordeSingleGeneration` progress listeners only enqueue a tuple, and a
+background thread serializes, writes and `fsync`s the queued records in batches.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from enum import auto
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel, Field
+from strenum import StrEnum
+
+from horde_sdk.consts import ID_TYPES
+from horde_sdk.worker.consts import GENERATION_PROGRESS, finalized_generation_states
+from horde_sdk.worker.job_base import HordeWorkerJob
+
+_AWAITING_SUBMIT_PROGRESS = {
+    GENERATION_PROGRESS.PENDING_SUBMIT,
+    GENERATION_PROGRESS.SUBMITTING,
+}
+
+
+class JOURNAL_RECORD_KIND(StrEnum):
+    """The kinds of record written to a job journal."""
+
+    JOB_POPPED = auto()
+    """A job was received from the dispatch source."""
+    PROGRESS = auto()
+    """A job's generation entered a new state."""
+    RESULT_REFERENCE = auto()
+    """A result of a job's generation was persisted somewhere it can be recovered from."""
+    JOB_FORGOTTEN = auto()
+    """The worker no longer needs the job recovered (e.g., it was dropped without a submit)."""
+
+
+class JournaledJob(BaseModel):
+    """The last known state of a job, reconstructed from a journal."""
+
+    job_id: str
+    """The local identifier of the job."""
+    dispatch_job_id: str | None = None
+    """The identifier supplied by the dispatch source, if any."""
+    dispatch_result_ids: list[str] = Field(default_factory=list)
+    """The result identifiers supplied by the dispatch source, if any."""
+    result_ids: list[str] = Field(default_factory=list)
+    """The local result identifiers of the job's generation, in batch order."""
+    worker_type: str | None = None
+    """The worker type which can process the job."""
+    time_received: float | None = None
+    """The epoch time the job was received, if known."""
+    extra: dict[str, Any] = Field(default_factory=dict)
+    """Worker-defined data recorded with the pop (for example, the raw pop payload)."""
+    last_progress: GENERATION_PROGRESS = GENERATION_PROGRESS.NOT_STARTED
+    """The most recent state the job's generation entered."""
+    last_non_error_progress: GENERATION_PROGRESS = GENERATION_PROGRESS.NOT_STARTED
+    """The most recent non-error state the job's generation entered."""
+    last_updated: float | None = None
+    """The epoch time of the most recent record for the job."""
+    result_references: dict[str, str] = Field(default_factory=dict)
+    """Where each result was persisted, keyed by result identifier."""
+    forgotten: bool = False
+    """Whether the worker explicitly dropped the job from recovery."""
+
+    @property
+    def is_finalized(self) -> bool:
+        """Whether there is nothing left to do for the job."""
+        return self.forgotten or self.last_progress in finalized_generation_states
+
+    @property
+    def is_awaiting_submit(self) -> bool:
+        """Whether the job's results were generated and persisted, but never successfully submitted.
+
+        A job is awaiting submit when it reached `PENDING_SUBMIT` or `SUBMITTING` (possibly followed by a submit
+        error) and every one of its results has a recorded reference.
+        """
+        if self.is_finalized or self.last_non_error_progress not in _AWAITING_SUBMIT_PROGRESS:
+            return False
+        expected_results = self.result_ids or list(self.result_references)
+        return bool(expected_results) and all(result_id in self.result_references for result_id in expected_results)
+
+    @property
+    def is_interrupted(self) -> bool:
+        """Whether the job was in flight but cannot be resumed from its persisted results."""
+        return not self.is_finalized and not self.is_awaiting_submit
+
+    def apply(self, record: dict[str, Any]) -> None:
+        """Apply a journal record to this job's state.
+
+        Args:
+            record (dict[str, Any]): A decoded journal record for this job.
+        """
+        self.last_updated = record.get("at", self.last_updated)
+        kind = record["kind"]
+        if kind == JOURNAL_RECORD_KIND.PROGRESS:
+            progress = GENERATION_PROGRESS(record["progress"])
+            self.last_progress = progress
+            if progress != GENERATION_PROGRESS.ERROR:
+                self.last_non_error_progress = progress
+        elif kind == JOURNAL_RECORD_KIND.RESULT_REFERENCE:
+            self.result_references[record["result_id"]] = record["reference"]
+        elif kind == JOURNAL_RECORD_KIND.JOB_FORGOTTEN:
+            self.forgotten = True
+
+
+def _stringify_ids(identifiers: Sequence[ID_TYPES] | None) -> list[str]:
+    return [str(identifier) for identifier in identifiers] if identifiers else []
+
+
+_STOP = object()
+"""Sentinel which tells the writer thread to drain its queue and exit."""
+
+
+class JobJournal:
+    """An append-only, fsync-batched journal of job pops, state transitions and result references.
+
+    Use as a context manager, or call `start` and `close` explicitly. On `start`, an existing journal file is
+    compacted down to the jobs which are still unfinished before new records are appended.
+
+    Example:
+        ```python
+        with JobJournal(journal_path) as journal:
+            for recovered in JobJournal.replay(journal_path):
+                if recovered.is_awaiting_submit:
+                    ...  # submit `recovered.result_references` for `recovered.dispatch_job_id`
+
+            journal.attach_job(job)  # records the pop and every later progress transition
+            ...
+            journal.record_result_reference(job.job_id, result_id, "R2")
+        ```
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        flush_interval: float = 0.05,
+        max_batch_size: int = 512,
+        fsync: bool = True,
+    ) -> None:
+        """Initialize the journal. No file is touched until `start` is called.
+
+        Args:
+            path (str | Path): The journal file.
+            flush_interval (float, optional): How long, in seconds, the writer keeps gathering records after the
+                first one arrives, so that bursts share a single write and fsync. Defaults to 0.05.
+            max_batch_size (int, optional): The most records written (and fsync'd) as a single batch.
+                Defaults to 512.
+            fsync (bool, optional): Whether to fsync after each batch. Disabling this trades durability across
+                power loss for throughput; records still survive a process crash. Defaults to True.
+        """
+        self._path = Path(path)
+        self._flush_interval = flush_interval
+        self._max_batch_size = max(1, max_batch_size)
+        self._fsync = fsync
+
+        self._queue: queue.SimpleQueue[tuple[Any, ...] | object] = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._enqueued = 0
+        self._written = 0
+        self._written_condition = threading.Condition()
+        self._accepting_records = False
+        self._writer_stopped = True
+        self._write_error: BaseException | None = None
+
+    @property
+    def path(self) -> Path:
+        """The journal file."""
+        return self._path
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background writer is running."""
+        return self._writer is not None and self._writer.is_alive()
+
+    def __enter__(self) -> JobJournal:
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Compact any existing journal file and start the background writer.
+
+        Raises:
+            RuntimeError: If the journal is already running.
+        """
+        with self._lock:
+            if self.is_running:
+                raise RuntimeError(f"Journal {self._path} is already running")
+
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            if self._path.exists():
+                self.compact()
+
+            with self._written_condition:
+                self._accepting_records = True
+                self._writer_stopped = False
+            self._writer = threading.Thread(target=self._write_loop, name="horde-job-journal", daemon=True)
+            self._writer.start()
+
+    def close(self, timeout: float | None = None) -> None:
+        """Write every queued record and stop the background writer.
+
+        Args:
+            timeout (float | None, optional): The longest time, in seconds, to wait for the writer to finish.
+                Defaults to None (wait indefinitely).
+        """
+        with self._lock:
+            writer = self._writer
+            if writer is None:
+                return
+            with self._written_condition:
+                # Refuse records from now on, so none can be queued behind the stop sentinel and never written.
+                self._accepting_records = False
+                self._queue.put(_STOP)
+            writer.join(timeout)
+            if writer.is_alive():
+                logger.warning(f"Journal writer for {self._path} did not stop within {timeout} seconds")
+            else:
+                self._writer = None
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every record enqueued so far has been written (and fsync'd, if enabled).
+
+        Args:
+            timeout (float | None, optional): The longest time, in seconds, to wait. Defaults to None.
+
+        Returns:
+            bool: True if all records were written within the timeout; False if not, including when the writer
+            stopped (or was never started) with records left unwritten.
+
+        Raises:
+            RuntimeError: If the writer failed to write a batch.
+        """
+        with self._written_condition:
+            target = self._enqueued
+            self._written_condition.wait_for(lambda: self._written >= target or self._writer_stopped, timeout)
+            flushed = self._written >= target
+        if self._write_error is not None:
+            raise RuntimeError(f"Journal {self._path} failed to write records") from self._write_error
+        return flushed
+
+    def _enqueue(self, record: tuple[Any, ...]) -> None:
+        """Queue a record for the writer.
+
+        Raises:
+            RuntimeError: If the writer failed to write a batch, or is not running.
+        """
+        if self._write_error is not None:
+            raise RuntimeError(f"Journal {self._path} is unusable after a write failure") from self._write_error
+        with self._written_condition:
+            if not self._accepting_records:
+                raise RuntimeError(f"Journal {self._path} is not running; start it before recording")
+            self._enqueued += 1
+            self._queue.put(record)
+
+    def record_job_popped(
+        self,
+        job_id: ID_TYPES,
+        *,
+        dispatch_job_id: ID_TYPES | None = None,
+        dispatch_result_ids: Sequence[ID_TYPES] | None = None,
+        result_ids: Sequence[ID_TYPES] | None = None,
+        worker_type: str | None = None,
+        time_received: float | None = None,
+        extra: dict[str, Any] | None = None,
+    ) -> None:
+        """Record that a job was received.
+
+        Args:
+            job_id (ID_TYPES): The local identifier of the job.
+            dispatch_job_id (ID_TYPES | None, optional): The identifier supplied by dispatch. Defaults to None.
+            dispatch_result_ids (Sequence[ID_TYPES] | None, optional): The result identifiers supplied by dispatch.
+                Defaults to None.
+            result_ids (Sequence[ID_TYPES] | None, optional): The local result identifiers, in batch order.
+                Defaults to None.
+            worker_type (str | None, optional): The worker type which can process the job. Defaults to None.
+            time_received (float | None, optional): The epoch time the job was received. Defaults to None.
+            extra (dict[str, Any] | None, optional): JSON-serializable worker-defined data. Defaults to None.
+        """
+        self._enqueue(
+            (
+                JOURNAL_RECORD_KIND.JOB_POPPED,
+                str(job_id),
+                time.time(),
+                {
+                    "dispatch_job_id": str(dispatch_job_id) if dispatch_job_id is not None else None,
+                    "dispatch_result_ids": _stringify_ids(dispatch_result_ids),
+                    "result_ids": _stringify_ids(result_ids),
+                    "worker_type": worker_type,
+                    "time_received": time_received,
+                    "extra": extra or {},
+                },
+            ),
+        )
+
+    def record_progress(self, job_id: ID_TYPES, progress: GENERATION_PROGRESS) -> None:
+        """Record that a job's generation entered a new state.
+
+        Args:
+            job_id (ID_TYPES): The local identifier of the job.
+            progress (GENERATION_PROGRESS): The state entered.
+        """
+        self._enqueue((JOURNAL_RECORD_KIND.PROGRESS, str(job_id), time.time(), progress))
+
+    def record_result_reference(self, job_id: ID_TYPES, result_id: ID_TYPES, reference: str) -> None:
+        """Record where a result was persisted, so it can be submitted after a restart.
+
+        Args:
+            job_id (ID_TYPES): The local identifier of the job.
+            result_id (ID_TYPES): The local identifier of the result.
+            reference (str): Where the result can be recovered from (e.g., a file path, or `"R2"` once uploaded).
+        """
+        self._enqueue((JOURNAL_RECORD_KIND.RESULT_REFERENCE, str(job_id), time.time(), (str(result_id), reference)))
+
+    def forget_job(self, job_id: ID_TYPES) -> None:
+        """Record that a job no longer needs to be recovered.
+
+        Args:
+            job_id (ID_TYPES): The local identifier of the job.
+        """
+        self._enqueue((JOURNAL_RECORD_KIND.JOB_FORGOTTEN, str(job_id), time.time(), None))
+
+    def attach_job(self, job: HordeWorkerJob[Any, Any], *, extra: dict[str, Any] | None = None) -> None:
+        """Record a job's pop and journal every state its generation enters from now on.
+
+        Args:
+            job (HordeWorkerJob): The job to journal.
+            extra (dict[str, Any] | None, optional): JSON-serializable worker-defined data to store with the pop
+                (for example, the raw pop payload). Defaults to None.
+        """
+        generation = job.generation
+        job_id = str(job.job_id)
+        self.record_job_popped(
+            job_id,
+            dispatch_job_id=job.dispatch_job_id,
+            dispatch_result_ids=generation.dispatch_result_ids,
+            result_ids=generation.result_ids,
+            worker_type=job.job_worker_type(),
+            time_received=job.time_received,
+            extra=extra,
+        )
+
+        def _journal_progress(progress: GENERATION_PROGRESS, _time_set: float) -> None:
+            # The job may outlive the journal; a closed journal must not break its progress transitions.
+            try:
+                self._enqueue((JOURNAL_RECORD_KIND.PROGRESS, job_id, time.time(), progress))
+            except RuntimeError as e:
+                logger.warning(f"Not journaling progress {progress} of job {job_id}: {e}")
+
+        generation.add_progress_listener(_journal_progress)
+
+    @staticmethod
+    def _encode(record: tuple[Any, ...]) -> str:
+        kind, job_id, at, payload = record
+        encoded: dict[str, Any] = {"kind": kind, "job_id": job_id, "at": at}
+        if kind == JOURNAL_RECORD_KIND.JOB_POPPED:
+            encoded.update(payload)
+        elif kind == JOURNAL_RECORD_KIND.PROGRESS:
+            encoded["progress"] = payload
+        elif kind == JOURNAL_RECORD_KIND.RESULT_REFERENCE:
+            encoded["result_id"], encoded["reference"] = payload
+        return json.dumps(encoded, separators=(",", ":"))
+
+    def _collect_batch(self) -> tuple[list[tuple[Any, ...]], bool]:
+        """Block for a record, then gather more for up to `flush_interval` seconds (group commit).
+
+        Returns:
+            tuple[list[tuple[Any, ...]], bool]: The batch, and whether the stop sentinel was seen.
+        """
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+
+        batch: list[tuple[Any, ...]] = [item]  # type: ignore[list-item]
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)  # type: ignore[arg-type]
+        return batch, False
+
+    def _write_loop(self) -> None:
+        try:
+            self._write_batches()
+        finally:
+            with self._written_condition:
+                self._accepting_records = False
+                self._writer_stopped = True
+                self._written_condition.notify_all()
+
+    def _write_batches(self) -> None:
+        with open(self._path, "a", encoding="utf-8") as journal_file:
+            stopping = False
+            while not stopping:
+                batch, stopping = self._collect_batch()
+                if not batch:
+                    continue
+
+                try:
+                    journal_file.write("".join(self._encode(record) + "\n" for record in batch))
+                    journal_file.flush()
+                    if self._fsync:
+                        os.fsync(journal_file.fileno())
+                except Exception as e:
+                    logger.exception(f"Failed to write job journal {self._path}: {e}")
+                    self._write_error = e
+                    stopping = True
+                finally:
+                    with self._written_condition:
+                        self._written += len(batch)
+                        self._written_condition.notify_all()
+
+    @staticmethod
+    def _iter_records(path: Path) -> Iterator[dict[str, Any]]:
+        with open(path, encoding="utf-8") as journal_file:
+            for line_number, line in enumerate(journal_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line is expected if the process died mid-write.
+                    logger.warning(f"Skipping unreadable record on line {line_number} of job journal {path}")
+
+    @classmethod
+    def replay(cls, path: str | Path, *, include_finalized: bool = False) -> list[JournaledJob]:
+        """Reconstruct the last known state of each job recorded in a journal file.
+
+        Args:
+            path (str | Path): The journal file. A missing file replays as empty.
+            include_finalized (bool, optional): Whether to include jobs with nothing left to do.
+                Defaults to False.
+
+        Returns:
+            list[JournaledJob]: The jobs, in the order they were popped.
+        """
+        path = Path(path)
+        if not path.exists():
+            return []
+
+        jobs: dict[str, JournaledJob] = {}
+        for record in cls._iter_records(path):
+            job_id = record.get("job_id")
+            if job_id is None:
+                continue
+            if record.get("kind") == JOURNAL_RECORD_KIND.JOB_POPPED:
+                jobs[job_id] = JournaledJob(
+                    job_id=job_id,
+                    dispatch_job_id=record.get("dispatch_job_id"),
+                    dispatch_result_ids=record.get("dispatch_result_ids", []),
+                    result_ids=record.get("result_ids", []),
+                    worker_type=record.get("worker_type"),
+                    time_received=record.get("time_received"),
+                    extra=record.get("extra", {}),
+                    last_updated=record.get("at"),
+                )
+                continue
+            if job_id in jobs:
+                jobs[job_id].apply(record)
+
+        return [job for job in jobs.values() if include_finalized or not job.is_finalized]
+
+    def compact(self) -> int:
+        """Rewrite the journal file so it only holds the records of unfinished jobs.
+
+        The rewrite is atomic: a temporary file is written, fsync'd and moved over the journal. Must not be called
+        while the writer is running.
+
+        Returns:
+            int: The number of unfinished jobs retained.
+
+        Raises:
+            RuntimeError: If the background writer is running.
+        """
+        if self.is_running:
+            raise RuntimeError("Cannot compact a journal while its writer is running")
+        if not self._path.exists():
+            return 0
+
+        live_job_ids = {job.job_id for job in self.replay(self._path)}
+        temporary_path = self._path.with_name(f"{self._path.name}.compact")
+        with open(temporary_path, "w", encoding="utf-8") as compacted:
+            for record in self._iter_records(self._path):
+                if record.get("job_id") in live_job_ids:
+                    compacted.write(json.dumps(record, separators=(",", ":")) + "\n")
+            compacted.flush()
+            os.fsync(compacted.fileno())
+        os.replace(temporary_path, self._path)
+        return len(live_job_ids)
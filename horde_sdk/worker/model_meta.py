@@ -194,6 +194,8 @@ class ImageModelLoadResolver:
             A Match object if the target string matches the regex pattern, otherwise None.
 
         """
+        if isinstance(instruction, MetaInstruction):
+            return instruction.pattern.match(target_string)
         return re.match(instruction, target_string, re.IGNORECASE)
 
     def remove_large_models(
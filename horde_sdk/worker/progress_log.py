@@ -0,0 +1,274 @@
+"""Compact, array-backed logs of generation state transitions.
+
+A worker may keep tens of thousands of finished generations around for metrics, and each one records every state
+it visited. Storing those records as lists of `(GENERATION_PROGRESS, float)` tuples costs roughly 90 bytes per
+entry; the logs here store enum ordinals and monotonic timestamps in typed arrays instead (10 bytes per entry) and
+maintain the derived figures (per-state durations and visit counts) incrementally as entries are appended.
+
+The logs present the familiar tuple view through the `Sequence` protocol, so callers that iterate, index or
+reverse a progress history keep working unchanged.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Sequence
+from typing import overload
+
+from horde_sdk.worker.consts import GENERATION_PROGRESS, GENERATION_RETRY_KIND
+
+_PROGRESS_BY_ORDINAL: tuple[GENERATION_PROGRESS, ...] = tuple(GENERATION_PROGRESS)
+_ORDINAL_BY_PROGRESS: dict[GENERATION_PROGRESS, int] = {
+    progress: ordinal for ordinal, progress in enumerate(_PROGRESS_BY_ORDINAL)
+}
+_ERROR_ORDINAL = _ORDINAL_BY_PROGRESS[GENERATION_PROGRESS.ERROR]
+
+_RETRY_KIND_BY_ORDINAL: tuple[GENERATION_RETRY_KIND, ...] = tuple(GENERATION_RETRY_KIND)
+_ORDINAL_BY_RETRY_KIND: dict[GENERATION_RETRY_KIND, int] = {
+    kind: ordinal for ordinal, kind in enumerate(_RETRY_KIND_BY_ORDINAL)
+}
+
+_STATE_COUNT = len(_PROGRESS_BY_ORDINAL)
+_RETRY_KIND_COUNT = len(_RETRY_KIND_BY_ORDINAL)
+
+DEFAULT_PROGRESS_LOG_CAPACITY = 16
+"""The number of entries preallocated for a progress log; a full walk with post-processing fits without growing."""
+
+
+def _grow(column: array[int] | array[float], by: int) -> None:
+    """Extend a typed array by `by` zeroed items."""
+    column.frombytes(bytes(column.itemsize * by))
+
+
+class ProgressTransitionLog(Sequence[tuple[GENERATION_PROGRESS, float]]):
+    """An append-only log of `(GENERATION_PROGRESS, monotonic time)` entries backed by two typed arrays.
+
+    Besides the entries themselves, the log can maintain per-state visit counts and the cumulative time spent in
+    each state that has since been left, plus the index of the most recent non-error entry, so none of those
+    figures require a walk over the history.
+
+    Layout: the unsigned-short array holds one visit counter per state followed by the entry ordinals; the double
+    array holds (when durations are tracked) one accumulated duration per state followed by the entry timestamps.
+    """
+
+    __slots__ = ("_floats", "_ints", "_last_non_error_index", "_length", "_times_offset")
+
+    def __init__(self, capacity: int = DEFAULT_PROGRESS_LOG_CAPACITY, *, track_durations: bool = True) -> None:
+        """Initialize an empty log.
+
+        Args:
+            capacity (int, optional): The number of entries to preallocate. The log grows past this when needed.
+                Defaults to DEFAULT_PROGRESS_LOG_CAPACITY.
+            track_durations (bool, optional): Whether to accumulate per-state durations as entries are appended.
+                Defaults to True.
+        """
+        capacity = max(1, capacity)
+        self._times_offset = _STATE_COUNT if track_durations else 0
+        self._ints: array[int] = array("H", bytes(2 * (_STATE_COUNT + capacity)))
+        self._floats: array[float] = array("d", bytes(8 * (self._times_offset + capacity)))
+        self._length = 0
+        self._last_non_error_index = -1
+
+    def append(self, progress: GENERATION_PROGRESS, time_set: float) -> None:
+        """Record that the generation entered `progress` at `time_set`.
+
+        Args:
+            progress (GENERATION_PROGRESS): The state entered.
+            time_set (float): The monotonic time the state was entered.
+        """
+        length = self._length
+        times_offset = self._times_offset
+        if times_offset and length:
+            previous_ordinal = self._ints[_STATE_COUNT + length - 1]
+            self._floats[previous_ordinal] += time_set - self._floats[times_offset + length - 1]
+
+        if _STATE_COUNT + length == len(self._ints):
+            _grow(self._ints, length)
+            _grow(self._floats, length)
+
+        ordinal = _ORDINAL_BY_PROGRESS[progress]
+        self._ints[_STATE_COUNT + length] = ordinal
+        self._floats[times_offset + length] = time_set
+        if self._ints[ordinal] < 0xFFFF:
+            self._ints[ordinal] += 1
+        if ordinal != _ERROR_ORDINAL:
+            self._last_non_error_index = length
+        self._length = length + 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> tuple[GENERATION_PROGRESS, float]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[tuple[GENERATION_PROGRESS, float]]: ...
+
+    def __getitem__(
+        self,
+        index: int | slice,
+    ) -> tuple[GENERATION_PROGRESS, float] | list[tuple[GENERATION_PROGRESS, float]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("progress log index out of range")
+        return _PROGRESS_BY_ORDINAL[self._ints[_STATE_COUNT + index]], self._floats[self._times_offset + index]
+
+    def __iter__(self) -> Iterator[tuple[GENERATION_PROGRESS, float]]:
+        ints = self._ints
+        floats = self._floats
+        times_offset = self._times_offset
+        for index in range(self._length):
+            yield _PROGRESS_BY_ORDINAL[ints[_STATE_COUNT + index]], floats[times_offset + index]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({[(str(progress), time_set) for progress, time_set in self]})"
+
+    def to_list(self) -> list[tuple[GENERATION_PROGRESS, float]]:
+        """Return the entries as a list of tuples."""
+        return list(self)
+
+    def last(self) -> tuple[GENERATION_PROGRESS, float] | None:
+        """Return the most recent entry, or None if the log is empty."""
+        if not self._length:
+            return None
+        return self[-1]
+
+    def last_non_error(self) -> tuple[GENERATION_PROGRESS, float] | None:
+        """Return the most recent entry which is not `GENERATION_PROGRESS.ERROR`, or None if there is none."""
+        if self._last_non_error_index < 0:
+            return None
+        return self[self._last_non_error_index]
+
+    def count(self, value: object) -> int:
+        """Return the number of entries for a state, or for an exact `(state, time)` entry.
+
+        Visit counts saturate at 65535 per state.
+
+        Args:
+            value (object): A `GENERATION_PROGRESS` to count visits of, or an entry tuple (the `Sequence` contract).
+        """
+        if isinstance(value, GENERATION_PROGRESS):
+            return self._ints[_ORDINAL_BY_PROGRESS[value]]
+        return super().count(value)
+
+    def counts(self) -> dict[GENERATION_PROGRESS, int]:
+        """Return the number of entries for each state which appears in the log."""
+        ints = self._ints
+        return {_PROGRESS_BY_ORDINAL[ordinal]: ints[ordinal] for ordinal in range(_STATE_COUNT) if ints[ordinal]}
+
+    def stage_durations(self, now: float) -> dict[GENERATION_PROGRESS, float]:
+        """Return the cumulative seconds spent in each visited state, including the ongoing time of the last entry.
+
+        Args:
+            now (float): The monotonic time to measure the last (current) state's ongoing time against.
+
+        Raises:
+            RuntimeError: If the log was created without duration tracking.
+        """
+        if not self._times_offset:
+            raise RuntimeError("This progress log does not track stage durations")
+
+        ints = self._ints
+        floats = self._floats
+        durations = {
+            _PROGRESS_BY_ORDINAL[ordinal]: floats[ordinal] for ordinal in range(_STATE_COUNT) if ints[ordinal]
+        }
+        last = self.last()
+        if last is not None:
+            current_state, entered = last
+            durations[current_state] += now - entered
+        return durations
+
+    def nbytes(self) -> int:
+        """Return the number of bytes held by the log's arrays."""
+        return self._ints.itemsize * len(self._ints) + self._floats.itemsize * len(self._floats)
+
+
+class RetryEventLog(Sequence[tuple[GENERATION_RETRY_KIND, GENERATION_PROGRESS, float]]):
+    """An append-only log of `(GENERATION_RETRY_KIND, retried state, monotonic time)` entries backed by typed arrays.
+
+    Per-kind retry counts are maintained as entries are appended. The unsigned-short array holds one counter per
+    retry kind followed by (kind, state) ordinal pairs; the double array holds the timestamps.
+    """
+
+    __slots__ = ("_ints", "_length", "_times")
+
+    def __init__(self, capacity: int = 4) -> None:
+        """Initialize an empty log.
+
+        Args:
+            capacity (int, optional): The number of entries to preallocate. Defaults to 4.
+        """
+        capacity = max(1, capacity)
+        self._ints: array[int] = array("H", bytes(2 * (_RETRY_KIND_COUNT + 2 * capacity)))
+        self._times: array[float] = array("d", bytes(8 * capacity))
+        self._length = 0
+
+    def append(self, kind: GENERATION_RETRY_KIND, retried_state: GENERATION_PROGRESS, time_set: float) -> None:
+        """Record a retry.
+
+        Args:
+            kind (GENERATION_RETRY_KIND): The kind of retry.
+            retried_state (GENERATION_PROGRESS): The state being retried.
+            time_set (float): The monotonic time of the retry.
+        """
+        length = self._length
+        if length == len(self._times):
+            _grow(self._ints, 2 * length)
+            _grow(self._times, length)
+
+        kind_ordinal = _ORDINAL_BY_RETRY_KIND[kind]
+        self._ints[_RETRY_KIND_COUNT + 2 * length] = kind_ordinal
+        self._ints[_RETRY_KIND_COUNT + 2 * length + 1] = _ORDINAL_BY_PROGRESS[retried_state]
+        self._times[length] = time_set
+        if self._ints[kind_ordinal] < 0xFFFF:
+            self._ints[kind_ordinal] += 1
+        self._length = length + 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> tuple[GENERATION_RETRY_KIND, GENERATION_PROGRESS, float]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[tuple[GENERATION_RETRY_KIND, GENERATION_PROGRESS, float]]: ...
+
+    def __getitem__(
+        self,
+        index: int | slice,
+    ) -> (
+        tuple[GENERATION_RETRY_KIND, GENERATION_PROGRESS, float]
+        | list[tuple[GENERATION_RETRY_KIND, GENERATION_PROGRESS, float]]
+    ):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("retry log index out of range")
+        return (
+            _RETRY_KIND_BY_ORDINAL[self._ints[_RETRY_KIND_COUNT + 2 * index]],
+            _PROGRESS_BY_ORDINAL[self._ints[_RETRY_KIND_COUNT + 2 * index + 1]],
+            self._times[index],
+        )
+
+    def to_list(self) -> list[tuple[GENERATION_RETRY_KIND, GENERATION_PROGRESS, float]]:
+        """Return the entries as a list of tuples."""
+        return list(self)
+
+    def counts(self) -> dict[GENERATION_RETRY_KIND, int]:
+        """Return the number of retries for each kind which appears in the log."""
+        ints = self._ints
+        return {
+            _RETRY_KIND_BY_ORDINAL[ordinal]: ints[ordinal] for ordinal in range(_RETRY_KIND_COUNT) if ints[ordinal]
+        }
+
+    def nbytes(self) -> int:
+        """Return the number of bytes held by the log's arrays."""
+        return self._ints.itemsize * len(self._ints) + self._times.itemsize * len(self._times)
@@ -0,0 +1,261 @@
+"""Encoding of result images in a thread pool, honoring the image settings of a `HordeWorkerJobConfig`.
+
+Encoding WebP at a high PIL method takes hundreds of milliseconds per megapixel. PIL releases the GIL while it
+encodes, so `ResultImageEncoder` spreads the images of a batch across a pool of threads sized to the CPU count
+instead of encoding them one after another on the thread that finished the generation.
+
+When the job config sets `result_image_encode_latency_budget`, the encoder lowers the WebP method whenever an
+encode exceeds the budget, and raises it again (up to the configured method) once encodes are comfortably within it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any
+
+import PIL.Image
+from pydantic import BaseModel
+
+from horde_sdk.consts import ID_TYPES
+from horde_sdk.worker.job_base import HordeWorkerJobConfig
+
+_WEBP_MAX_METHOD = 6
+_STEP_UP_HEADROOM = 0.5
+"""An encode must take less than this fraction of the latency budget before the method is raised again."""
+
+
+@dataclass(frozen=True)
+class EncodedResultImage:
+    """One encoded result image."""
+
+    data: bytes
+    """The encoded image."""
+    image_format: str
+    """The format the image was encoded in (as passed to PIL)."""
+    method: int | None
+    """The PIL method the image was encoded with, or `None` for formats without one."""
+    raw_size: int
+    """The size of the decoded pixel data, in bytes."""
+    encode_seconds: float
+    """The time spent encoding the image."""
+
+    @property
+    def compression_ratio(self) -> float:
+        """The decoded size divided by the encoded size."""
+        if not self.data:
+            return 0.0
+        return self.raw_size / len(self.data)
+
+
+class ResultEncodingReport(BaseModel):
+    """What encoding the results of one job cost and achieved."""
+
+    job_id: ID_TYPES | None = None
+    """The job the results belong to, if given."""
+    images: int = 0
+    """The number of images encoded."""
+    raw_bytes: int = 0
+    """The total size of the decoded pixel data."""
+    encoded_bytes: int = 0
+    """The total size of the encoded images."""
+    encode_seconds: float = 0.0
+    """The summed encode time of every image (which exceeds `wall_seconds` when images are encoded in parallel)."""
+    wall_seconds: float = 0.0
+    """The time from the first encode starting to the last finishing."""
+    methods: list[int | None] = []
+    """The PIL method each image was encoded with, in order."""
+
+    @property
+    def compression_ratio(self) -> float:
+        """The total decoded size divided by the total encoded size."""
+        if self.encoded_bytes == 0:
+            return 0.0
+        return self.raw_bytes / self.encoded_bytes
+
+
+class ResultImageEncoder:
+    """Encodes result images in a thread pool using the format, quality and method of a `HordeWorkerJobConfig`.
+
+    The encoder owns its thread pool; call `shutdown` (or use it as a context manager) when done with it.
+    """
+
+    def __init__(
+        self,
+        job_config: HordeWorkerJobConfig | None = None,
+        *,
+        max_workers: int | None = None,
+    ) -> None:
+        """Initialize the encoder.
+
+        Args:
+            job_config (HordeWorkerJobConfig | None, optional): The image settings to honor. Defaults to the default
+                `HordeWorkerJobConfig`.
+            max_workers (int | None, optional): The number of encoding threads. Defaults to the number of CPUs.
+
+        Raises:
+            ValueError: If `max_workers` is less than 1.
+        """
+        if max_workers is not None and max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+        self._job_config = job_config or HordeWorkerJobConfig()
+        self._image_format = self._job_config.result_image_format
+        self._uses_method = self._image_format.upper() == "WEBP"
+        self._configured_method = min(self._job_config.result_image_pil_method, _WEBP_MAX_METHOD)
+        self._current_method = self._configured_method
+        self._method_lock = threading.Lock()
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count() or 1,
+            thread_name_prefix="horde-sdk-encode",
+        )
+
+    @property
+    def job_config(self) -> HordeWorkerJobConfig:
+        """The config whose image settings are honored."""
+        return self._job_config
+
+    @property
+    def current_method(self) -> int | None:
+        """The PIL method the next image will be encoded with, or `None` if the format has no method."""
+        if not self._uses_method:
+            return None
+        return self._current_method
+
+    def _observe_encode_time(self, method: int, seconds: float) -> None:
+        budget = self._job_config.result_image_encode_latency_budget
+        if budget is None:
+            return
+
+        with self._method_lock:
+            if seconds > budget and method > 0:
+                self._current_method = min(self._current_method, method - 1)
+            elif (
+                seconds < budget * _STEP_UP_HEADROOM
+                and method == self._current_method
+                and self._current_method < self._configured_method
+            ):
+                self._current_method += 1
+
+    def encode(self, image: PIL.Image.Image | bytes) -> EncodedResultImage:
+        """Encode one image on the calling thread.
+
+        Args:
+            image (PIL.Image.Image | bytes): The image, or bytes of an image in any format PIL can read.
+
+        Returns:
+            EncodedResultImage: The encoded image.
+        """
+        if isinstance(image, bytes):
+            image = PIL.Image.open(io.BytesIO(image))
+            image.load()
+
+        save_kwargs: dict[str, Any] = {"quality": self._job_config.result_image_quality}
+        method = self.current_method
+        if method is not None:
+            save_kwargs["method"] = method
+
+        if self._image_format.upper() in ("JPEG", "JPG") and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        raw_size = image.width * image.height * len(image.getbands())
+
+        start = time.perf_counter()
+        buffer = io.BytesIO()
+        image.save(buffer, format=self._image_format, **save_kwargs)
+        encode_seconds = time.perf_counter() - start
+
+        if method is not None:
+            self._observe_encode_time(method, encode_seconds)
+
+        return EncodedResultImage(
+            data=buffer.getvalue(),
+            image_format=self._image_format,
+            method=method,
+            raw_size=raw_size,
+            encode_seconds=encode_seconds,
+        )
+
+    def encode_batch(
+        self,
+        images: Sequence[PIL.Image.Image | bytes],
+        *,
+        job_id: ID_TYPES | None = None,
+    ) -> tuple[list[EncodedResultImage], ResultEncodingReport]:
+        """Encode the images of a batch in parallel, blocking until all are done.
+
+        Args:
+            images (Sequence[PIL.Image.Image | bytes]): The images to encode.
+            job_id (ID_TYPES | None, optional): The job the images belong to, recorded on the report. Defaults to
+                None.
+
+        Returns:
+            tuple[list[EncodedResultImage], ResultEncodingReport]: The encoded images, in order, and the report.
+        """
+        start = time.perf_counter()
+        encoded = list(self._executor.map(self.encode, images))
+        return encoded, self._build_report(encoded, job_id, time.perf_counter() - start)
+
+    async def async_encode_batch(
+        self,
+        images: Sequence[PIL.Image.Image | bytes],
+        *,
+        job_id: ID_TYPES | None = None,
+    ) -> tuple[list[EncodedResultImage], ResultEncodingReport]:
+        """Encode the images of a batch in parallel without blocking the event loop.
+
+        Args:
+            images (Sequence[PIL.Image.Image | bytes]): The images to encode.
+            job_id (ID_TYPES | None, optional): The job the images belong to, recorded on the report. Defaults to
+                None.
+
+        Returns:
+            tuple[list[EncodedResultImage], ResultEncodingReport]: The encoded images, in order, and the report.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        encoded = list(
+            await asyncio.gather(*(loop.run_in_executor(self._executor, self.encode, image) for image in images)),
+        )
+        return encoded, self._build_report(encoded, job_id, time.perf_counter() - start)
+
+    @staticmethod
+    def _build_report(
+        encoded: list[EncodedResultImage],
+        job_id: ID_TYPES | None,
+        wall_seconds: float,
+    ) -> ResultEncodingReport:
+        return ResultEncodingReport(
+            job_id=job_id,
+            images=len(encoded),
+            raw_bytes=sum(result.raw_size for result in encoded),
+            encoded_bytes=sum(len(result.data) for result in encoded),
+            encode_seconds=sum(result.encode_seconds for result in encoded),
+            wall_seconds=wall_seconds,
+            methods=[result.method for result in encoded],
+        )
+
+    def shutdown(self) -> None:
+        """Wait for pending encodes to finish and stop the encoding threads."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> ResultImageEncoder:
+        """Return the encoder."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Shut the encoder down."""
+        self.shutdown()
@@ -0,0 +1,598 @@
+"""Earliest-deadline-first ordering of a worker's pending jobs.
+
+Every job popped from the AI Horde comes with a time to live (`AIHordeDispatchParameters.ttl`): if the worker has not
+submitted it by then, the horde reassigns it and the work is wasted. A worker which prefetches jobs should therefore
+start whichever pending job is closest to its deadline rather than whichever arrived last, and should give up on jobs
+which can no longer finish in time instead of spending its GPU on them.
+
+`JobDeadlineScheduler` keeps pending `HordeWorkerJob`s ordered by deadline (`time_received + ttl`), estimates how long
+each will take to run, and faults (or silently drops) the jobs whose deadline can no longer be met.
+
+`ModelAffinityScheduler` additionally prefers jobs for models (and LoRAs) which are already loaded, as tracked by a
+least-recently-used `ModelResidency`, so that a worker switches models as rarely as its deadlines allow.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from enum import auto
+from typing import Any, override
+
+from loguru import logger
+from pydantic import BaseModel
+from strenum import StrEnum
+
+from horde_sdk.generation_parameters import ImageGenerationParameters
+from horde_sdk.worker.consts import WORKER_ERRORS
+from horde_sdk.worker.job_base import HordeWorkerJob
+
+DEFAULT_JOB_DEADLINE_MARGIN = 2.0
+"""The default time, in seconds, kept in reserve before a deadline for submitting the job's results."""
+
+
+class EXPIRED_JOB_ACTION(StrEnum):
+    """What the scheduler does with a job which can no longer finish before its deadline."""
+
+    FAULT = auto()
+    """Mark the job faulted (`WORKER_ERRORS.SAFEGUARD_TIMEOUT`) so the worker reports it as failed."""
+    DROP = auto()
+    """Remove the job from the schedule without touching its state."""
+
+
+class JobSchedulerMetrics(BaseModel):
+    """A snapshot of a `JobDeadlineScheduler`."""
+
+    pending_jobs: int
+    """The number of jobs waiting to be started."""
+    pending_jobs_without_deadline: int
+    """The number of pending jobs with no time to live, which run after every job with one."""
+    dispatched_jobs: int
+    """The number of jobs handed out by `pop_next` so far."""
+    expired_jobs: int
+    """The number of jobs which could no longer finish in time and were faulted or dropped so far."""
+    min_pending_slack: float | None
+    """The least slack of any pending job with a deadline, in seconds, or None if there is none."""
+    mean_pending_slack: float | None
+    """The mean slack of the pending jobs with a deadline, in seconds, or None if there are none."""
+    last_dispatched_slack: float | None
+    """The slack of the most recently dispatched job (when it was dispatched), or None."""
+    mean_dispatched_slack: float | None
+    """The mean slack of the dispatched jobs with a deadline (when they were dispatched), or None."""
+
+
+class _ScheduledJob:
+    __slots__ = ("deadline", "estimated_runtime", "job", "removed", "sequence")
+
+    def __init__(
+        self,
+        job: HordeWorkerJob[Any, Any],
+        deadline: float,
+        estimated_runtime: float,
+        sequence: int,
+    ) -> None:
+        self.job = job
+        self.deadline = deadline
+        self.estimated_runtime = estimated_runtime
+        self.sequence = sequence
+        self.removed = False
+
+    def __lt__(self, other: _ScheduledJob) -> bool:
+        return (self.deadline, self.sequence) < (other.deadline, other.sequence)
+
+    def slack(self, now: float) -> float:
+        return self.deadline - now - self.estimated_runtime
+
+
+class JobDeadlineScheduler:
+    """Orders pending worker jobs earliest-deadline-first and expires those which cannot finish in time.
+
+    A job's deadline is its `time_received` (or the time it was added, if unknown) plus its time to live. Its *slack*
+    is how long it could still wait before starting and finish by the deadline: `deadline - now - estimated runtime`.
+    A job whose slack has fallen below `deadline_margin` can no longer finish (and be submitted) in time, so it is
+    expired: faulted or dropped according to `expired_job_action`, and passed to `on_job_expired` if given.
+
+    Jobs without a time to live never expire and are started after every job with one, in the order they were added.
+
+    The scheduler is thread-safe.
+    """
+
+    def __init__(
+        self,
+        *,
+        runtime_estimator: Callable[[HordeWorkerJob[Any, Any]], float] | None = None,
+        expired_job_action: EXPIRED_JOB_ACTION = EXPIRED_JOB_ACTION.FAULT,
+        deadline_margin: float = DEFAULT_JOB_DEADLINE_MARGIN,
+        on_job_expired: Callable[[HordeWorkerJob[Any, Any]], None] | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize an empty scheduler.
+
+        Args:
+            runtime_estimator (Callable[[HordeWorkerJob], float] | None, optional): Estimates how many seconds a job
+                will take to run, for jobs added without an `estimated_runtime`. Defaults to assuming no time at all,
+                which only expires jobs whose deadline has (nearly) passed.
+            expired_job_action (EXPIRED_JOB_ACTION, optional): What to do with expired jobs. Defaults to
+                `EXPIRED_JOB_ACTION.FAULT`.
+            deadline_margin (float, optional): The slack, in seconds, below which a job is expired; time kept in
+                reserve for submitting results. Defaults to 2 seconds.
+            on_job_expired (Callable[[HordeWorkerJob], None] | None, optional): Called with each expired job, after
+                it was faulted or dropped. Defaults to None.
+            clock (Callable[[], float], optional): Returns the current epoch time. Defaults to `time.time`.
+
+        Raises:
+            ValueError: If `deadline_margin` is negative.
+        """
+        if deadline_margin < 0:
+            raise ValueError(f"deadline_margin must not be negative, got {deadline_margin}")
+
+        self._runtime_estimator = runtime_estimator
+        self._expired_job_action = expired_job_action
+        self._deadline_margin = deadline_margin
+        self._on_job_expired = on_job_expired
+        self._clock = clock
+
+        self._heap: list[_ScheduledJob] = []
+        self._entries: dict[int, _ScheduledJob] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+        self._dispatched_jobs = 0
+        self._expired_jobs = 0
+        self._last_dispatched_slack: float | None = None
+        self._dispatched_slack_total = 0.0
+        self._dispatched_with_deadline = 0
+
+    def __len__(self) -> int:
+        """Return the number of pending jobs."""
+        with self._lock:
+            return len(self._entries)
+
+    def add(
+        self,
+        job: HordeWorkerJob[Any, Any],
+        *,
+        ttl: float | None,
+        estimated_runtime: float | None = None,
+    ) -> float | None:
+        """Add a job to the schedule.
+
+        Args:
+            job (HordeWorkerJob): The job to schedule.
+            ttl (float | None): The job's time to live in seconds, usually the `ttl` of its dispatch parameters.
+                None if the job has no deadline.
+            estimated_runtime (float | None, optional): How many seconds the job is expected to take to run.
+                Defaults to the scheduler's `runtime_estimator`.
+
+        Returns:
+            float | None: The job's deadline in epoch time, or None if it has none.
+
+        Raises:
+            ValueError: If the job is already scheduled.
+        """
+        if estimated_runtime is None:
+            estimated_runtime = self._runtime_estimator(job) if self._runtime_estimator is not None else 0.0
+
+        deadline = math.inf
+        if ttl is not None:
+            deadline = (job.time_received if job.time_received is not None else self._clock()) + ttl
+
+        with self._lock:
+            if id(job) in self._entries:
+                raise ValueError(f"Job {job.job_id} is already scheduled")
+            entry = _ScheduledJob(job, deadline, max(estimated_runtime, 0.0), self._sequence)
+            self._sequence += 1
+            self._entries[id(job)] = entry
+            self._register(entry)
+            heapq.heappush(self._heap, entry)
+
+        return None if deadline == math.inf else deadline
+
+    def remove(self, job: HordeWorkerJob[Any, Any]) -> bool:
+        """Remove a job from the schedule without expiring it.
+
+        Returns:
+            bool: Whether the job was scheduled.
+        """
+        with self._lock:
+            entry = self._entries.get(id(job))
+            if entry is None:
+                return False
+            self._take(entry)
+            return True
+
+    def slack(self, job: HordeWorkerJob[Any, Any]) -> float | None:
+        """Return the slack of a scheduled job in seconds, or None if it has no deadline or is not scheduled."""
+        with self._lock:
+            entry = self._entries.get(id(job))
+        if entry is None or entry.deadline == math.inf:
+            return None
+        return entry.slack(self._clock())
+
+    def pop_next(self) -> HordeWorkerJob[Any, Any] | None:
+        """Remove and return the pending job to start next.
+
+        This is the pending job with the earliest deadline which can still finish in time. Jobs passed over because
+        they can no longer finish in time are expired. Jobs which were finalized or faulted elsewhere while pending
+        are discarded.
+
+        Returns:
+            HordeWorkerJob | None: The job to start next, or None if no job is pending.
+        """
+        expired: list[HordeWorkerJob[Any, Any]] = []
+        now = self._clock()
+        with self._lock:
+            entry = self._choose(now, expired)
+            if entry is not None:
+                self._dispatched_jobs += 1
+                self._last_dispatched_slack = None
+                if entry.deadline != math.inf:
+                    slack = entry.slack(now)
+                    self._last_dispatched_slack = slack
+                    self._dispatched_slack_total += slack
+                    self._dispatched_with_deadline += 1
+
+        self._expire(expired)
+        return entry.job if entry is not None else None
+
+    def _choose(self, now: float, expired: list[HordeWorkerJob[Any, Any]]) -> _ScheduledJob | None:
+        """Take the entry to dispatch next off the schedule, appending any jobs found to be hopeless to `expired`.
+
+        Called with the lock held. Subclasses override this to change the order jobs are started in.
+        """
+        while (entry := self._peek_earliest()) is not None:
+            self._take(entry)
+            if entry.job.is_faulted or entry.job.is_job_finalized:
+                continue
+            if entry.slack(now) < self._deadline_margin:
+                expired.append(entry.job)
+                continue
+            return entry
+        return None
+
+    def _peek_earliest(self) -> _ScheduledJob | None:
+        """Return the pending entry with the earliest deadline without taking it. Called with the lock held."""
+        while self._heap and self._heap[0].removed:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def _register(self, entry: _ScheduledJob) -> None:
+        """Record anything subclasses keep about a newly scheduled entry. Called with the lock held."""
+
+    def _take(self, entry: _ScheduledJob) -> None:
+        """Remove an entry from the schedule. Called with the lock held."""
+        entry.removed = True
+        del self._entries[id(entry.job)]
+
+    def expire_unfinishable(self) -> list[HordeWorkerJob[Any, Any]]:
+        """Expire every pending job which can no longer finish before its deadline.
+
+        `pop_next` only expires the jobs it passes over; call this periodically (for example, on every pop from the
+        horde) to fault hopeless jobs promptly, even those behind a long-running one. Jobs which were faulted or
+        finalized elsewhere are taken off the schedule without being expired, as `pop_next` does.
+
+        Returns:
+            list[HordeWorkerJob]: The jobs which were expired.
+        """
+        now = self._clock()
+        expired: list[HordeWorkerJob[Any, Any]] = []
+        with self._lock:
+            for entry in list(self._entries.values()):
+                if entry.job.is_faulted or entry.job.is_job_finalized:
+                    self._take(entry)
+                elif entry.slack(now) < self._deadline_margin:
+                    self._take(entry)
+                    expired.append(entry.job)
+
+        self._expire(expired)
+        return expired
+
+    def _expire(self, jobs: list[HordeWorkerJob[Any, Any]]) -> None:
+        if not jobs:
+            return
+
+        with self._lock:
+            self._expired_jobs += len(jobs)
+
+        for job in jobs:
+            logger.warning(f"Job {job.job_identifier_string} can no longer finish before its deadline ({job.job_id})")
+            if self._expired_job_action == EXPIRED_JOB_ACTION.FAULT and not job.is_faulted:
+                job.set_job_faulted(WORKER_ERRORS.SAFEGUARD_TIMEOUT)
+            if self._on_job_expired is not None:
+                self._on_job_expired(job)
+
+    def metrics(self) -> JobSchedulerMetrics:
+        """Return a snapshot of the scheduler's queue and history.
+
+        Returns:
+            JobSchedulerMetrics: The metrics.
+        """
+        now = self._clock()
+        with self._lock:
+            slacks = [entry.slack(now) for entry in self._entries.values() if entry.deadline != math.inf]
+            return JobSchedulerMetrics(
+                pending_jobs=len(self._entries),
+                pending_jobs_without_deadline=len(self._entries) - len(slacks),
+                dispatched_jobs=self._dispatched_jobs,
+                expired_jobs=self._expired_jobs,
+                min_pending_slack=min(slacks) if slacks else None,
+                mean_pending_slack=sum(slacks) / len(slacks) if slacks else None,
+                last_dispatched_slack=self._last_dispatched_slack,
+                mean_dispatched_slack=(
+                    self._dispatched_slack_total / self._dispatched_with_deadline
+                    if self._dispatched_with_deadline
+                    else None
+                ),
+            )
+
+
+DEFAULT_MODEL_LOAD_SECONDS = 10.0
+"""The default time, in seconds, `ModelResidency` assumes loading a model into VRAM takes."""
+
+DEFAULT_LORA_LOAD_SECONDS = 1.0
+"""The default time, in seconds, `ModelResidency` assumes loading one LoRA takes."""
+
+DEFAULT_AFFINITY_FAIRNESS_SLACK = 30.0
+"""The default slack, in seconds, below which `ModelAffinityScheduler` starts a job regardless of its model."""
+
+DEFAULT_AFFINITY_MAX_BYPASSES = 4
+"""The default number of times `ModelAffinityScheduler` may start a later job ahead of an earlier one."""
+
+
+@dataclass(frozen=True)
+class ModelAffinityKey:
+    """What must be loaded to run an image job: its model and its set of LoRAs."""
+
+    model: str
+    """The name of the model."""
+    loras: frozenset[str] = frozenset()
+    """The names (or other identifiers) of the LoRAs."""
+
+    @classmethod
+    def from_job(cls, job: HordeWorkerJob[Any, Any]) -> ModelAffinityKey | None:
+        """Return the key of an image job, or None for any other kind of job."""
+        parameters = job.generation.generation_parameters
+        if not isinstance(parameters, ImageGenerationParameters):
+            return None
+        loras = frozenset(
+            str(lora.name or lora.remote_version_id or lora.release_version)
+            for lora in parameters.additional_params.lora_entries
+        )
+        return cls(model=parameters.base_params.model, loras=loras)
+
+
+class ModelResidency:
+    """A least-recently-used model of which models and LoRAs a worker has loaded.
+
+    Used by `ModelAffinityScheduler` to predict what starting a job would cost in loading time, and to keep track of
+    what starting it (notionally) loaded.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_slots: int = 1,
+        lora_slots: int = 8,
+        model_load_seconds: float = DEFAULT_MODEL_LOAD_SECONDS,
+        lora_load_seconds: float = DEFAULT_LORA_LOAD_SECONDS,
+    ) -> None:
+        """Initialize a residency with nothing loaded.
+
+        Args:
+            model_slots (int, optional): How many models fit in VRAM at once. Defaults to 1.
+            lora_slots (int, optional): How many LoRAs are kept loaded at once. Defaults to 8.
+            model_load_seconds (float, optional): The time loading a model takes. Defaults to 10 seconds.
+            lora_load_seconds (float, optional): The time loading a LoRA takes. Defaults to 1 second.
+
+        Raises:
+            ValueError: If `model_slots` is less than 1 or `lora_slots` is negative.
+        """
+        if model_slots < 1:
+            raise ValueError(f"model_slots must be at least 1, got {model_slots}")
+        if lora_slots < 0:
+            raise ValueError(f"lora_slots must not be negative, got {lora_slots}")
+
+        self._model_slots = model_slots
+        self._lora_slots = lora_slots
+        self.model_load_seconds = model_load_seconds
+        """The time loading a model takes."""
+        self.lora_load_seconds = lora_load_seconds
+        """The time loading a LoRA takes."""
+        self._models: OrderedDict[str, None] = OrderedDict()
+        self._loras: OrderedDict[str, None] = OrderedDict()
+
+    @property
+    def resident_models(self) -> list[str]:
+        """The loaded models, least recently used first."""
+        return list(self._models)
+
+    def swap_cost(self, key: ModelAffinityKey) -> float:
+        """Return the loading time, in seconds, running a job with `key` would take right now."""
+        missing_loras = sum(1 for lora in key.loras if lora not in self._loras)
+        model_cost = 0.0 if key.model in self._models else self.model_load_seconds
+        return model_cost + missing_loras * self.lora_load_seconds
+
+    def load(self, key: ModelAffinityKey) -> tuple[int, int]:
+        """Mark the model and LoRAs of `key` as most recently used, loading (and evicting) as needed.
+
+        Returns:
+            tuple[int, int]: The number of models and of LoRAs which had to be loaded.
+        """
+        models_loaded = self._use(self._models, (key.model,), self._model_slots)
+        loras_loaded = self._use(self._loras, sorted(key.loras), self._lora_slots)
+        return models_loaded, loras_loaded
+
+    @staticmethod
+    def _use(resident: OrderedDict[str, None], names: Sequence[str], slots: int) -> int:
+        loaded = 0
+        for name in names:
+            if name in resident:
+                resident.move_to_end(name)
+                continue
+            loaded += 1
+            resident[name] = None
+            while len(resident) > slots:
+                resident.popitem(last=False)
+        return loaded
+
+
+class ModelAffinityMetrics(BaseModel):
+    """What a `ModelAffinityScheduler`'s choices have (notionally) cost in model and LoRA loading."""
+
+    model_loads: int
+    """The number of times a dispatched job needed a model which was not loaded."""
+    lora_loads: int
+    """The number of times a dispatched job needed a LoRA which was not loaded."""
+    load_seconds: float
+    """The total estimated loading time of the dispatched jobs."""
+    forced_by_deadline: int
+    """The number of jobs started out of model order because their deadline was close."""
+    forced_by_bypasses: int
+    """The number of jobs started out of model order because they had been passed over too often."""
+
+
+class ModelAffinityScheduler(JobDeadlineScheduler):
+    """Orders pending jobs to minimise model (and LoRA) swaps, within deadline and fairness bounds.
+
+    Loading a model typically takes far longer than generating with it, so of the pending jobs, the one whose model
+    and LoRAs are already loaded (according to a `ModelResidency`) is started first; ties go to the earliest
+    deadline. Two bounds keep this from starving jobs for unpopular models:
+
+    - a job whose slack falls below `deadline_margin + fairness_slack` is started next regardless of its model, and
+    - a job may be passed over for later arrivals at most `max_bypasses` times.
+
+    Jobs which can no longer finish in time are expired as by `JobDeadlineScheduler`. Jobs other than image jobs have
+    no model affinity and cost nothing to start.
+    """
+
+    def __init__(
+        self,
+        *,
+        residency: ModelResidency | None = None,
+        fairness_slack: float = DEFAULT_AFFINITY_FAIRNESS_SLACK,
+        max_bypasses: int = DEFAULT_AFFINITY_MAX_BYPASSES,
+        runtime_estimator: Callable[[HordeWorkerJob[Any, Any]], float] | None = None,
+        expired_job_action: EXPIRED_JOB_ACTION = EXPIRED_JOB_ACTION.FAULT,
+        deadline_margin: float = DEFAULT_JOB_DEADLINE_MARGIN,
+        on_job_expired: Callable[[HordeWorkerJob[Any, Any]], None] | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize an empty scheduler.
+
+        Args:
+            residency (ModelResidency | None, optional): The model of what is loaded. Defaults to a single model slot
+                with default load times.
+            fairness_slack (float, optional): The slack, in seconds, above the deadline margin below which a job is
+                started regardless of its model. Defaults to 30 seconds.
+            max_bypasses (int, optional): How many times a job may be passed over for a later one. Defaults to 4.
+            runtime_estimator (Callable[[HordeWorkerJob], float] | None, optional): See `JobDeadlineScheduler`.
+            expired_job_action (EXPIRED_JOB_ACTION, optional): See `JobDeadlineScheduler`.
+            deadline_margin (float, optional): See `JobDeadlineScheduler`.
+            on_job_expired (Callable[[HordeWorkerJob], None] | None, optional): See `JobDeadlineScheduler`.
+            clock (Callable[[], float], optional): See `JobDeadlineScheduler`.
+
+        Raises:
+            ValueError: If `fairness_slack` or `max_bypasses` is negative.
+        """
+        super().__init__(
+            runtime_estimator=runtime_estimator,
+            expired_job_action=expired_job_action,
+            deadline_margin=deadline_margin,
+            on_job_expired=on_job_expired,
+            clock=clock,
+        )
+        if fairness_slack < 0:
+            raise ValueError(f"fairness_slack must not be negative, got {fairness_slack}")
+        if max_bypasses < 0:
+            raise ValueError(f"max_bypasses must not be negative, got {max_bypasses}")
+
+        self.residency = residency if residency is not None else ModelResidency()
+        """The model of what is loaded, updated as jobs are dispatched."""
+        self._fairness_slack = fairness_slack
+        self._max_bypasses = max_bypasses
+        self._keys: dict[int, ModelAffinityKey | None] = {}
+        self._bypasses: dict[int, int] = {}
+
+        self._model_loads = 0
+        self._lora_loads = 0
+        self._load_seconds = 0.0
+        self._forced_by_deadline = 0
+        self._forced_by_bypasses = 0
+
+    @override
+    def _register(self, entry: _ScheduledJob) -> None:
+        # Registered along with the entry itself, so that no `pop_next` can see the entry without its key.
+        self._keys[id(entry.job)] = ModelAffinityKey.from_job(entry.job)
+        self._bypasses[id(entry.job)] = 0
+
+    @override
+    def _take(self, entry: _ScheduledJob) -> None:
+        super()._take(entry)
+        self._keys.pop(id(entry.job), None)
+        self._bypasses.pop(id(entry.job), None)
+
+    def _swap_cost(self, entry: _ScheduledJob) -> float:
+        key = self._keys.get(id(entry.job))
+        return self.residency.swap_cost(key) if key is not None else 0.0
+
+    @override
+    def _choose(self, now: float, expired: list[HordeWorkerJob[Any, Any]]) -> _ScheduledJob | None:
+        for entry in list(self._entries.values()):
+            if entry.job.is_faulted or entry.job.is_job_finalized:
+                self._take(entry)
+            elif entry.slack(now) < self._deadline_margin:
+                self._take(entry)
+                expired.append(entry.job)
+
+        earliest = self._peek_earliest()
+        if earliest is None:
+            return None
+
+        starved = [
+            entry for entry in self._entries.values() if self._bypasses.get(id(entry.job), 0) >= self._max_bypasses
+        ]
+        if earliest.slack(now) < self._deadline_margin + self._fairness_slack:
+            chosen = earliest
+            if self._swap_cost(earliest) > min(self._swap_cost(entry) for entry in self._entries.values()):
+                self._forced_by_deadline += 1
+        elif starved:
+            chosen = min(starved, key=lambda entry: entry.sequence)
+            self._forced_by_bypasses += 1
+        else:
+            chosen = min(
+                self._entries.values(),
+                key=lambda entry: (self._swap_cost(entry), entry.deadline, entry.sequence),
+            )
+
+        for entry in self._entries.values():
+            if entry.sequence < chosen.sequence:
+                self._bypasses[id(entry.job)] = self._bypasses.get(id(entry.job), 0) + 1
+
+        key = self._keys.get(id(chosen.job))
+        self._take(chosen)
+        if key is not None:
+            self._load_seconds += self.residency.swap_cost(key)
+            model_loads, lora_loads = self.residency.load(key)
+            self._model_loads += model_loads
+            self._lora_loads += lora_loads
+        return chosen
+
+    def affinity_metrics(self) -> ModelAffinityMetrics:
+        """Return what the jobs dispatched so far have (notionally) cost in loading.
+
+        Returns:
+            ModelAffinityMetrics: The metrics.
+        """
+        with self._lock:
+            return ModelAffinityMetrics(
+                model_loads=self._model_loads,
+                lora_loads=self._lora_loads,
+                load_seconds=self._load_seconds,
+                forced_by_deadline=self._forced_by_deadline,
+                forced_by_bypasses=self._forced_by_bypasses,
+            )
@@ -0,0 +1,128 @@
+import copy
+import json
+import math
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from horde_sdk.ai_horde_api.apimodels import AllWorkersDetailsResponse
+from horde_sdk.ai_horde_api.columnar import (
+    COLUMN_KIND,
+    ColumnSpec,
+    build_columnar_table,
+    columns_from_models_json,
+    columns_from_teams_json,
+    columns_from_users_json,
+    columns_from_workers_json,
+    parse_leading_number,
+)
+
+EXAMPLE_RESPONSES = Path(__file__).parent.parent / "test_data" / "ai_horde_api" / "example_responses"
+
+
+def _example(name: str) -> Any:  # noqa: ANN401
+    return json.loads((EXAMPLE_RESPONSES / name).read_text())
+
+
+def _fleet() -> list[dict[str, Any]]:
+    template = _example("_v2_workers_get_200.json")[0]
+    workers = []
+    for index in range(9):
+        worker = copy.deepcopy(template)
+        worker["name"] = f"worker-{index}"
+        worker["type"] = "image" if index % 3 else "text"
+        worker["uptime"] = index * 100
+        worker["megapixelsteps_generated"] = float(index)
+        worker["performance"] = f"{index}.5 megapixelsteps per second"
+        worker["models"] = ["Deliberate", "stable_diffusion"][: index % 3]
+        worker["kudos_details"] = {"generated": index * 10.0, "uptime": index}
+        workers.append(worker)
+    del workers[4]["uptime"]
+    workers[5]["team"] = None
+    return workers
+
+
+def test_worker_columns_match_the_models() -> None:
+    workers = _fleet()
+    table = columns_from_workers_json(json.dumps(workers).encode())
+    models = AllWorkersDetailsResponse.model_validate(workers).root
+
+    assert len(table) == len(models)
+    assert [table.categorical("name")[row] for row in range(len(table))] == [model.name for model in models]
+    assert [table.categorical("type")[row] for row in range(len(table))] == [model.type_ for model in models]
+    assert [table.categorical_list("models")[row] for row in range(len(table))] == [model.models for model in models]
+    assert table.categorical("team")[5] is None
+    assert table.categorical("online")[0] == "false"
+
+    uptime = table.numeric("uptime")
+    assert math.isnan(uptime.values[4])
+    assert [value for row, value in enumerate(uptime.values) if row != 4] == [
+        model.uptime for row, model in enumerate(models) if row != 4
+    ]
+    assert list(table.numeric("kudos_generated").values) == [
+        model.kudos_details.generated for model in models if model.kudos_details is not None
+    ]
+    assert table.numeric("performance").values[3] == 3.5
+
+
+def test_aggregates_over_columns() -> None:
+    table = columns_from_workers_json(_fleet())
+
+    megapixelsteps = table.numeric("megapixelsteps_generated")
+    assert megapixelsteps.sum() == sum(range(9))
+    assert megapixelsteps.sum_by(table.categorical("type")) == {"text": 0 + 3 + 6, "image": 1 + 2 + 4 + 5 + 7 + 8}
+    assert table.categorical("type").value_counts() == {"text": 3, "image": 6}
+
+    models = table.categorical_list("models")
+    assert models.value_counts() == {"Deliberate": 6, "stable_diffusion": 3}
+    assert models.sum_by(megapixelsteps) == {"Deliberate": 1 + 2 + 4 + 5 + 7 + 8, "stable_diffusion": 2 + 5 + 8}
+
+    assert table.numeric("uptime").percentiles([0, 50, 100]) == [0.0, 400.0, 800.0]
+    with pytest.raises(ValueError, match="between 0 and 100"):
+        table.numeric("uptime").percentiles([101])
+    with pytest.raises(TypeError, match="not numeric"):
+        table.numeric("name")
+
+
+def test_columns_from_the_other_listings() -> None:
+    users = columns_from_users_json((EXAMPLE_RESPONSES / "_v2_users_get_200.json").read_bytes())
+    models = columns_from_models_json((EXAMPLE_RESPONSES / "_v2_status_models_get_200.json").read_bytes())
+    teams = columns_from_teams_json((EXAMPLE_RESPONSES / "_v2_teams_get_200.json").read_bytes())
+
+    raw_users = _example("_v2_users_get_200.json")
+    assert list(users.numeric("kudos").values) == [user["kudos"] for user in raw_users]
+    assert len(models) == len(_example("_v2_status_models_get_200.json"))
+    assert teams.categorical_list("models")[0] == [
+        model["name"] for model in _example("_v2_teams_get_200.json")[0]["models"]
+    ]
+
+
+def test_build_columnar_table_handles_bad_values() -> None:
+    table = build_columnar_table(
+        [{"a": "12 units", "b": [None, "x"]}, {"a": "n/a"}, {"a": {"nested": 1}}],
+        [
+            ColumnSpec("a", ("a",), COLUMN_KIND.numeric, parse=parse_leading_number),
+            ColumnSpec("b", ("b",), COLUMN_KIND.categorical_list),
+        ],
+    )
+    assert table.numeric("a").values[0] == 12.0
+    assert math.isnan(table.numeric("a").values[1])
+    assert math.isnan(table.numeric("a").values[2])
+    assert [table.categorical_list("b")[row] for row in range(3)] == [["x"], [], []]
+
+    with pytest.raises(ValueError, match="JSON array"):
+        build_columnar_table('{"not": "a list"}', [])
+
+
+def test_columns_are_built_on_first_use() -> None:
+    table = columns_from_workers_json(_fleet())
+
+    uptime = table.numeric("uptime")
+    assert table["uptime"] is uptime
+    assert table._rows is not None
+
+    columns = table.materialize()
+    assert list(columns) == table.column_names
+    assert table._rows is None
+    assert table.numeric("uptime") is uptime
@@ -38,7 +38,7 @@ from horde_sdk.generic_api.apimodels import (
     HordeResponseBaseModel,
     ResponseRequiringFollowUpMixin,
 )
-from horde_sdk.generic_api.generic_clients import _build_cleanup_requests_safely
+from horde_sdk.generic_api.follow_ups import _build_cleanup_requests_safely
 
 _EXAMPLE_ID = str(uuid.UUID("00000000-0000-0000-0000-000000000001"))
 _EXAMPLE_ID_2 = str(uuid.UUID("00000000-0000-0000-0000-000000000002"))
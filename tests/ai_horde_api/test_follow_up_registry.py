@@ -0,0 +1,156 @@
+"""Tests for matching requests against the responses a session holds until they are followed up on."""
+
+import uuid
+
+from horde_sdk.ai_horde_api.apimodels import (
+    AlchemyJobPopResponse,
+    AlchemyJobSubmitRequest,
+    AlchemyJobSubmitResponse,
+    AlchemyPopFormPayload,
+    DeleteImageGenerateRequest,
+    FindUserRequest,
+    ImageGenerateAsyncRequest,
+    ImageGenerateAsyncResponse,
+    ImageGenerateCheckRequest,
+    ImageGenerateCheckResponse,
+    ImageGenerateStatusRequest,
+    ImageGenerateStatusResponse,
+)
+from horde_sdk.ai_horde_api.consts import GENERATION_STATE
+from horde_sdk.generation_parameters.alchemy.consts import KNOWN_ALCHEMY_TYPES
+from horde_sdk.generic_api.apimodels import RequestErrorResponse
+from horde_sdk.generic_api.follow_ups import FollowUpRegistry
+
+_EXAMPLE_ID = str(uuid.UUID("00000000-0000-0000-0000-000000000001"))
+_EXAMPLE_ID_2 = str(uuid.UUID("00000000-0000-0000-0000-000000000002"))
+
+_PROGRESS = {
+    "finished": 0,
+    "processing": 1,
+    "restarted": 0,
+    "waiting": 0,
+    "done": False,
+    "faulted": False,
+    "wait_time": 0,
+    "queue_position": 0,
+    "kudos": 10,
+    "is_possible": True,
+}
+
+
+def _image_async_request() -> ImageGenerateAsyncRequest:
+    return ImageGenerateAsyncRequest(prompt="a cat in a hat", models=["Deliberate"])
+
+
+def _image_async_response(job_id: str = _EXAMPLE_ID) -> ImageGenerateAsyncResponse:
+    return ImageGenerateAsyncResponse.model_validate({"id": job_id, "kudos": 10.0})
+
+
+def _image_status_response(*, generations: int) -> ImageGenerateStatusResponse:
+    generation = {
+        "id": _EXAMPLE_ID,
+        "img": "https://not.a.real.url.internal/image.webp",
+        "seed": "1234",
+        "censored": False,
+        "model": "Deliberate",
+        "worker_id": _EXAMPLE_ID_2,
+        "worker_name": "a worker",
+        "state": "ok",
+    }
+    return ImageGenerateStatusResponse.model_validate(
+        {**_PROGRESS, "finished": generations, "done": True, "generations": [generation] * generations},
+    )
+
+
+def _registry_with_image_job() -> FollowUpRegistry:
+    registry = FollowUpRegistry()
+    assert registry.add(_image_async_request(), _image_async_response()) is not None
+    return registry
+
+
+def test_unrelated_request_does_not_resolve() -> None:
+    registry = _registry_with_image_job()
+
+    assert registry.resolve(FindUserRequest(), AlchemyJobSubmitResponse(reward=1)) is None
+    assert len(registry) == 1
+
+
+def test_follow_up_for_another_job_does_not_resolve() -> None:
+    registry = _registry_with_image_job()
+
+    other_job = DeleteImageGenerateRequest(id=_EXAMPLE_ID_2)
+    assert registry.resolve(other_job, _image_status_response(generations=1)) is None
+    assert len(registry) == 1
+
+
+def test_progress_resolves_only_when_final_and_complete() -> None:
+    registry = _registry_with_image_job()
+
+    check = ImageGenerateCheckResponse.model_validate(_PROGRESS)
+    assert registry.resolve(ImageGenerateCheckRequest(id=_EXAMPLE_ID), check) is not None
+    assert len(registry) == 1
+
+    incomplete = _image_status_response(generations=0)
+    registry.resolve(ImageGenerateStatusRequest(id=_EXAMPLE_ID), incomplete)
+    assert len(registry) == 1
+
+    registry.resolve(ImageGenerateStatusRequest(id=_EXAMPLE_ID), _image_status_response(generations=1))
+    assert len(registry) == 0
+
+
+def test_cleanup_request_resolves_unless_it_failed() -> None:
+    registry = _registry_with_image_job()
+    cleanup = DeleteImageGenerateRequest(id=_EXAMPLE_ID)
+
+    registry.resolve(cleanup, RequestErrorResponse(message="The server is on fire", rc="InternalServerError"))
+    assert len(registry) == 1
+
+    registry.resolve(cleanup, _image_status_response(generations=0))
+    assert len(registry) == 0
+
+
+def test_oldest_of_several_jobs_is_matched() -> None:
+    registry = FollowUpRegistry()
+    first = registry.add(_image_async_request(), _image_async_response())
+    second = registry.add(_image_async_request(), _image_async_response(_EXAMPLE_ID_2))
+    third = registry.add(_image_async_request(), _image_async_response())
+
+    resolved = registry.resolve(DeleteImageGenerateRequest(id=_EXAMPLE_ID), _image_status_response(generations=0))
+
+    assert resolved is first
+    assert list(registry) == [second, third]
+
+
+def test_multi_form_alchemy_pop_is_tracked_per_form() -> None:
+    registry = FollowUpRegistry()
+    pop = AlchemyJobPopResponse(
+        forms=[
+            AlchemyPopFormPayload(id=_EXAMPLE_ID, form=KNOWN_ALCHEMY_TYPES.caption),
+            AlchemyPopFormPayload(id=_EXAMPLE_ID_2, form=KNOWN_ALCHEMY_TYPES.nsfw),
+        ],
+    )
+    entry = registry.add(FindUserRequest(), pop)
+    assert entry is not None
+
+    submit = AlchemyJobSubmitRequest(id=_EXAMPLE_ID, result="a cat in a hat", state=GENERATION_STATE.ok)
+    registry.resolve(submit, AlchemyJobSubmitResponse(reward=1))
+
+    assert len(registry) == 1
+    outstanding = entry.outstanding_cleanup_requests
+    assert outstanding is not None
+    assert all(isinstance(request, AlchemyJobSubmitRequest) for request in outstanding)
+    assert [str(request.id_) for request in outstanding if isinstance(request, AlchemyJobSubmitRequest)] == [
+        _EXAMPLE_ID_2,
+    ]
+
+    submit = AlchemyJobSubmitRequest(id=_EXAMPLE_ID_2, result="false", state=GENERATION_STATE.ok)
+    registry.resolve(submit, AlchemyJobSubmitResponse(reward=1))
+
+    assert len(registry) == 0
+
+
+def test_empty_pop_is_not_tracked() -> None:
+    registry = FollowUpRegistry()
+
+    assert registry.add(FindUserRequest(), AlchemyJobPopResponse(forms=[])) is None
+    assert len(registry) == 0
@@ -0,0 +1,126 @@
+"""Tests for the concurrent download of generation images, against a local HTTP server."""
+
+import base64
+import http.server
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+from horde_sdk.ai_horde_api.ai_horde_clients import AIHordeAPIAsyncSimpleClient, AIHordeAPISimpleClient
+from horde_sdk.ai_horde_api.apimodels import ImageGeneration
+from horde_sdk.ai_horde_api.exceptions import AIHordeImageDownloadError
+from horde_sdk.ai_horde_api.image_downloads import _check_length, download_generation_images
+
+
+def _image_bytes(index: int) -> bytes:
+    return f"RIFF-fake-webp-{index}-".encode() * (1000 + index)
+
+
+class _ImageHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        name = self.path.rsplit("/", 1)[-1]
+        if name == "truncated":
+            self.send_response(200)
+            self.send_header("Content-Length", "1000")
+            self.end_headers()
+            self.wfile.write(b"x" * 10)
+            return
+        if name == "missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = _image_bytes(int(name))
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        return
+
+
+@pytest.fixture(scope="module")
+def image_server_url(local_http_server: Callable[..., AbstractContextManager[str]]) -> Iterator[str]:
+    with local_http_server(_ImageHandler, "/images") as url:
+        yield url
+
+
+def _generation(img: str) -> ImageGeneration:
+    return ImageGeneration(
+        id=str(uuid.uuid4()),
+        img=img,
+        seed="1",
+        censored=False,
+        worker_id=str(uuid.uuid4()),
+        worker_name="worker",
+        model="model",
+        state="ok",
+    )
+
+
+def test_sync_download_returns_raw_bytes(image_server_url: str) -> None:
+    generations = [_generation(f"{image_server_url}/{index}") for index in range(6)]
+    generations.append(_generation(base64.b64encode(b"inline image").decode()))
+
+    images = AIHordeAPISimpleClient().download_images_from_generations(generations, max_concurrency=3)
+
+    assert [image.generation_id for image in images] == [generation.id_ for generation in generations]
+    assert [image.data for image in images[:6]] == [_image_bytes(index) for index in range(6)]
+    assert images[6].data == b"inline image"
+    assert all(image.path is None and image.size == len(image.data or b"") for image in images)
+
+
+def test_sync_download_streams_to_files(image_server_url: str, tmp_path: Path) -> None:
+    generations = [_generation(f"{image_server_url}/{index}") for index in range(3)]
+
+    images = download_generation_images(generations, destination_dir=tmp_path / "out")
+
+    for index, image in enumerate(images):
+        assert image.data is None
+        assert image.path == tmp_path / "out" / f"{generations[index].id_}.webp"
+        assert image.path.read_bytes() == _image_bytes(index)
+    assert not list((tmp_path / "out").glob("*.part"))
+
+
+def test_sync_download_failures_leave_no_partial_files(image_server_url: str, tmp_path: Path) -> None:
+    with pytest.raises(Exception):  # noqa: B017 - urllib3 may detect the short read before we do
+        download_generation_images([_generation(f"{image_server_url}/truncated")], destination_dir=tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+    with pytest.raises(Exception, match="404"):
+        download_generation_images([_generation(f"{image_server_url}/missing")])
+
+
+def test_content_length_mismatch_is_rejected() -> None:
+    _check_length("https://example.invalid/a.webp", None, 10)
+    _check_length("https://example.invalid/a.webp", 10, 10)
+    with pytest.raises(AIHordeImageDownloadError, match="announced 1000"):
+        _check_length("https://example.invalid/a.webp", 1000, 10)
+
+
+@pytest.mark.asyncio
+async def test_async_download_returns_bytes_and_streams_to_files(image_server_url: str, tmp_path: Path) -> None:
+    generations = [_generation(f"{image_server_url}/{index}") for index in range(5)]
+
+    async with aiohttp.ClientSession() as aiohttp_session:
+        simple_client = AIHordeAPIAsyncSimpleClient(aiohttp_session=aiohttp_session)
+        in_memory = await simple_client.download_images_from_generations(generations, max_concurrency=2)
+        on_disk = await simple_client.download_images_from_generations(generations, destination_dir=tmp_path)
+
+        with pytest.raises(aiohttp.ClientError):
+            await simple_client.download_images_from_generations(
+                [*generations, _generation(f"{image_server_url}/truncated")],
+                destination_dir=tmp_path / "failed",
+            )
+
+    assert [image.data for image in in_memory] == [_image_bytes(index) for index in range(5)]
+    assert [image.path.read_bytes() for image in on_disk if image.path is not None] == [
+        _image_bytes(index) for index in range(5)
+    ]
+    assert not list((tmp_path / "failed").glob("*.part"))
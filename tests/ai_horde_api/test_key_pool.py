@@ -0,0 +1,187 @@
+"""Tests for the API key pool session, against a local fake of the AI-Horde API."""
+
+import http.server
+import json
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+
+import aiohttp
+import pytest
+
+from horde_sdk.ai_horde_api.apimodels import (
+    ImageGenerateAsyncRequest,
+    ImageGenerateAsyncResponse,
+    ImageGenerateJobPopRequest,
+    ImageGenerateJobPopResponse,
+    ImageGenerationJobSubmitRequest,
+    JobSubmitResponse,
+)
+from horde_sdk.ai_horde_api.consts import GENERATION_STATE
+from horde_sdk.ai_horde_api.exceptions import AIHordeKeyPoolExhaustedError
+from horde_sdk.ai_horde_api.key_pool import AIHordeAPIKeyPoolClientSession
+from horde_sdk.generic_api.apimodels import RequestErrorResponse
+
+FIRST_KEY = "a" * 22
+SECOND_KEY = "b" * 22
+RATE_LIMITED_KEY = "c" * 22
+SHARED_KEY = str(uuid.UUID(int=1))
+
+_RECEIVED: list[tuple[str, str | None]] = []
+
+
+class _FakeHordeHandler(http.server.BaseHTTPRequestHandler):
+    def _reply(self, status: int, body: dict[str, object]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        apikey = self.headers.get("apikey")
+        _RECEIVED.append((self.path, apikey))
+
+        if self.path.endswith("/generate/async"):
+            if apikey == RATE_LIMITED_KEY:
+                self._reply(429, {"message": "Too many requests"})
+            else:
+                self._reply(202, {"id": str(uuid.uuid4()), "kudos": 10})
+        elif self.path.endswith("/generate/pop"):
+            self._reply(
+                200,
+                {
+                    "id": str(uuid.uuid4()),
+                    "ids": [str(uuid.uuid4())],
+                    "payload": {"prompt": "a cat in a hat"},
+                    "model": "Deliberate",
+                    "skipped": {},
+                },
+            )
+        else:
+            self._reply(200, {"reward": 10})
+
+    def do_GET(self) -> None:
+        _RECEIVED.append((self.path, self.headers.get("apikey")))
+        self._reply(
+            200,
+            {
+                "id": SHARED_KEY,
+                "name": "shared",
+                "kudos": 25,
+                "utilized": 20,
+                "username": "someone#1",
+                "max_image_pixels": -1,
+                "max_image_steps": -1,
+                "max_text_tokens": -1,
+            },
+        )
+
+    def log_message(self, *args: object) -> None:
+        return
+
+
+@pytest.fixture(scope="module")
+def fake_horde_url(local_http_server: Callable[..., AbstractContextManager[str]]) -> Iterator[str]:
+    with local_http_server(_FakeHordeHandler, "/api/") as url:
+        yield url
+
+
+@pytest.fixture
+def fake_horde(fake_horde_url: str, monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str | None]]:
+    monkeypatch.setattr("horde_sdk.ai_horde_api.apimodels.base.AI_HORDE_BASE_URL", fake_horde_url)
+    _RECEIVED.clear()
+    return _RECEIVED
+
+
+def _generate_request() -> ImageGenerateAsyncRequest:
+    return ImageGenerateAsyncRequest(prompt="a cat in a hat", models=["Deliberate"])
+
+
+@pytest.mark.asyncio
+async def test_requests_are_spread_over_keys_and_rate_limited_keys_rested(
+    fake_horde: list[tuple[str, str | None]],
+) -> None:
+    async with aiohttp.ClientSession() as aiohttp_session:
+        pool = AIHordeAPIKeyPoolClientSession(
+            aiohttp_session,
+            [RATE_LIMITED_KEY, FIRST_KEY, SECOND_KEY],
+            requests_per_second=1000,
+            burst=2,
+        )
+        responses = [await pool.submit_request(_generate_request(), ImageGenerateAsyncResponse) for _ in range(4)]
+
+        explicit = _generate_request().model_copy(update={"apikey": SECOND_KEY})
+        await pool.submit_request(explicit, ImageGenerateAsyncResponse)
+
+    assert all(isinstance(response, ImageGenerateAsyncResponse) for response in responses)
+    keys_used = [apikey for _, apikey in fake_horde]
+    # The first request found the rate limited key, and was retried on another; that key was then left alone.
+    assert keys_used.count(RATE_LIMITED_KEY) == 1
+    assert keys_used[1:5].count(FIRST_KEY) == keys_used[1:5].count(SECOND_KEY) == 2
+    assert keys_used[-1] == SECOND_KEY
+
+    stats = pool.stats()
+    assert stats.rate_limit_retries == 1
+    rate_limited, first, second = stats.keys
+    assert rate_limited.label == "...cccc"
+    assert rate_limited.rate_limited == 1
+    assert rate_limited.cooling_down_for > 0
+    assert (first.kudos_spent, second.kudos_spent) == (20, 20)
+
+
+@pytest.mark.asyncio
+async def test_job_submits_are_pinned_to_the_popping_key(fake_horde: list[tuple[str, str | None]]) -> None:
+    async with aiohttp.ClientSession() as aiohttp_session:
+        pool = AIHordeAPIKeyPoolClientSession(aiohttp_session, [FIRST_KEY, SECOND_KEY], requests_per_second=1000)
+        async with pool:
+            pop_request = ImageGenerateJobPopRequest(name="worker", models=["Deliberate"], max_pixels=512 * 512)
+            pop = await pool.submit_request(pop_request, ImageGenerateJobPopResponse)
+            assert isinstance(pop, ImageGenerateJobPopResponse)
+            popping_key = fake_horde[-1][1]
+
+            for _ in range(3):
+                await pool.submit_request(_generate_request(), ImageGenerateAsyncResponse)
+
+            assert pop.id_ is not None
+            submit = ImageGenerationJobSubmitRequest(
+                id=pop.id_,
+                generation="R2",
+                state=GENERATION_STATE.ok,
+                seed=1,
+            )
+            submitted = await pool.submit_request(submit, JobSubmitResponse)
+
+    assert isinstance(submitted, JobSubmitResponse)
+    assert fake_horde[-1] == ("/api/v2/generate/submit", popping_key)
+    assert pool.stats().pinned_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_keys_over_their_kudos_budget_are_skipped(fake_horde: list[tuple[str, str | None]]) -> None:
+    async with aiohttp.ClientSession() as aiohttp_session:
+        pool = AIHordeAPIKeyPoolClientSession(
+            aiohttp_session,
+            [SHARED_KEY, FIRST_KEY],
+            requests_per_second=1000,
+            kudos_budgets={FIRST_KEY: 10},
+        )
+        await pool.refresh_shared_key_budgets()
+        shared = pool.stats().keys[0]
+        assert (shared.kudos_budget, shared.kudos_spent) == (25, 20)
+
+        for _ in range(2):
+            response = await pool.submit_request(_generate_request(), ImageGenerateAsyncResponse)
+            assert not isinstance(response, RequestErrorResponse)
+
+        with pytest.raises(AIHordeKeyPoolExhaustedError):
+            await pool.submit_request(_generate_request(), ImageGenerateAsyncResponse)
+
+    assert sorted(apikey or "" for path, apikey in fake_horde if path.endswith("/generate/async")) == sorted(
+        [SHARED_KEY, FIRST_KEY],
+    )
+
+    with pytest.raises(ValueError):
+        AIHordeAPIKeyPoolClientSession(aiohttp_session, [])
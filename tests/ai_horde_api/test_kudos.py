@@ -0,0 +1,123 @@
+import pytest
+
+from horde_sdk.ai_horde_api.apimodels import (
+    ImageGenerateAsyncDryRunResponse,
+    ImageGenerateAsyncRequest,
+    ImageGenerationInputPayload,
+)
+from horde_sdk.ai_horde_api.kudos import ImageCostShape, KudosEstimator
+from horde_sdk.generation_parameters.image.consts import KNOWN_IMAGE_SAMPLERS
+
+_HIDDEN_RATE = 0.15
+_HIDDEN_FACTORS = {"hires_fix": 1.5, "post_processing:RealESRGAN_x4plus": 1.3}
+
+
+def _request(
+    *,
+    width: int = 512,
+    height: int = 512,
+    steps: int = 20,
+    n: int = 1,
+    hires_fix: bool = False,
+    post_processing: list[str] | None = None,
+    sampler_name: KNOWN_IMAGE_SAMPLERS = KNOWN_IMAGE_SAMPLERS.k_euler,
+    prompt: str = "a cat",
+) -> ImageGenerateAsyncRequest:
+    return ImageGenerateAsyncRequest(
+        prompt=prompt,
+        models=["Deliberate"],
+        params=ImageGenerationInputPayload(
+            width=width,
+            height=height,
+            steps=steps,
+            n=n,
+            hires_fix=hires_fix,
+            post_processing=post_processing or [],
+            sampler_name=sampler_name,
+        ),
+    )
+
+
+def _horde_price(request: ImageGenerateAsyncRequest) -> float:
+    """Stand in for a dry run, pricing with rates the estimator does not know."""
+    shape, n = ImageCostShape.from_request(request)
+    per_image = _HIDDEN_RATE * shape.base_cost()
+    for feature in shape.cost_features():
+        per_image *= _HIDDEN_FACTORS[feature]
+    return per_image * n
+
+
+def test_observed_shapes_are_reused_regardless_of_prompt_and_n() -> None:
+    estimator = KudosEstimator()
+    observed = _request(n=2)
+    estimator.calibrate(observed, ImageGenerateAsyncDryRunResponse(kudos=20.0))
+
+    estimate = estimator.estimate(_request(n=4, prompt="a dog"))
+
+    assert estimate.calibrated
+    assert estimate.per_image_kudos == 10.0
+    assert estimate.kudos == 40.0
+    assert estimator.is_calibrated(_request(prompt="anything"))
+    assert not estimator.is_calibrated(_request(steps=21))
+
+
+def test_unseen_shapes_are_modelled_from_the_calibration() -> None:
+    estimator = KudosEstimator()
+    calibration = [
+        _request(width=512, height=512, steps=20),
+        _request(width=1024, height=1024, steps=30),
+        _request(width=768, height=512, steps=25, hires_fix=True),
+        _request(width=512, height=768, steps=10, post_processing=["RealESRGAN_x4plus"]),
+    ]
+    for request in calibration:
+        estimator.calibrate(request, _horde_price(request))
+
+    unseen = [
+        _request(width=640, height=640, steps=40, hires_fix=True, post_processing=["RealESRGAN_x4plus"], n=3),
+        _request(width=1024, height=768, steps=15, sampler_name=KNOWN_IMAGE_SAMPLERS.k_heun),
+    ]
+    estimates = estimator.estimate_many(unseen)
+
+    for request, estimate in zip(unseen, estimates, strict=True):
+        assert not estimate.calibrated
+        assert estimate.kudos == pytest.approx(_horde_price(request), rel=0.01)
+
+
+def test_uncalibrated_returns_one_request_per_unseen_shape() -> None:
+    estimator = KudosEstimator()
+    seen = _request()
+    estimator.calibrate(seen, 5.0)
+
+    candidates = [
+        _request(prompt="variant 1"),
+        _request(steps=30, prompt="variant 2"),
+        _request(steps=30, prompt="variant 3", n=2),
+        _request(hires_fix=True),
+    ]
+
+    to_dry_run = estimator.uncalibrated(candidates)
+
+    assert to_dry_run == [candidates[1], candidates[3]]
+    for request in to_dry_run:
+        estimator.calibrate(request, _horde_price(request))
+    assert all(estimate.calibrated for estimate in estimator.estimate_many(candidates))
+    assert estimator.observed_shape_count == 3
+
+
+def test_charged_steps_follow_the_sampler_and_denoising_strength() -> None:
+    shape, _ = ImageCostShape.from_request(_request(steps=20, sampler_name=KNOWN_IMAGE_SAMPLERS.k_dpm_2))
+    assert shape.charged_steps() == 40
+
+    shape, _ = ImageCostShape.from_request(_request(steps=20, sampler_name=KNOWN_IMAGE_SAMPLERS.k_dpm_adaptive))
+    assert shape.charged_steps() == 50
+
+    img2img = ImageGenerateAsyncRequest(
+        prompt="a cat",
+        models=["Deliberate"],
+        params=ImageGenerationInputPayload(steps=20, denoising_strength=0.5),
+        source_image="aGVsbG8=",
+        source_processing="img2img",
+    )
+    shape, _ = ImageCostShape.from_request(img2img)
+    assert shape.charged_steps() == 10
+    assert "source_processing:img2img" in shape.cost_features()
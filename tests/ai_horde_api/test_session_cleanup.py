@@ -0,0 +1,152 @@
+"""Tests for the failure-cleanup sessions send for their pending follow-ups when they exit."""
+
+import asyncio
+import threading
+import time
+import uuid
+from typing import override
+
+import aiohttp
+import pytest
+
+from horde_sdk.ai_horde_api.ai_horde_clients import AIHordeAPIAsyncClientSession, AIHordeAPIClientSession
+from horde_sdk.ai_horde_api.apimodels import ImageGenerateAsyncRequest, ImageGenerateAsyncResponse
+from horde_sdk.generic_api.apimodels import HordeRequest, HordeResponse, ResponseRequiringFollowUpMixin
+
+
+def _image_job(kudos: float) -> tuple[ImageGenerateAsyncRequest, ImageGenerateAsyncResponse]:
+    request = ImageGenerateAsyncRequest(prompt="a cat in a hat", models=["Deliberate"])
+    response = ImageGenerateAsyncResponse.model_validate({"id": str(uuid.uuid4()), "kudos": kudos})
+    return request, response
+
+
+class _RecordingSession(AIHordeAPIClientSession):
+    """Records cleanups instead of sending them."""
+
+    def __init__(
+        self,
+        *,
+        delay: float = 0.0,
+        cleanup_concurrency: int = 1,
+        cleanup_deadline: float | None = None,
+    ) -> None:
+        super().__init__(cleanup_concurrency=cleanup_concurrency, cleanup_deadline=cleanup_deadline)
+        self.delay = delay
+        self.cleaned_up: list[float] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._counter_lock = threading.Lock()
+
+    @override
+    def _handle_exit(
+        self,
+        request_to_follow_up: HordeRequest,
+        response_to_follow_up: HordeResponse | ResponseRequiringFollowUpMixin,
+        cleanup_requests: list[HordeRequest] | None,
+    ) -> bool:
+        with self._counter_lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._counter_lock:
+            self.in_flight -= 1
+            assert isinstance(response_to_follow_up, ImageGenerateAsyncResponse)
+            self.cleaned_up.append(response_to_follow_up.kudos)
+        return True
+
+
+class _RecordingAsyncSession(AIHordeAPIAsyncClientSession):
+    """Records cleanups instead of sending them."""
+
+    def __init__(
+        self,
+        aiohttp_session: aiohttp.ClientSession,
+        *,
+        delay: float = 0.0,
+        cleanup_concurrency: int = 1,
+        cleanup_deadline: float | None = None,
+    ) -> None:
+        super().__init__(
+            aiohttp_session,
+            cleanup_concurrency=cleanup_concurrency,
+            cleanup_deadline=cleanup_deadline,
+        )
+        self.delay = delay
+        self.cleaned_up: list[float] = []
+
+    @override
+    async def _handle_exit_async(
+        self,
+        request_to_follow_up: HordeRequest,
+        response_to_follow_up: HordeResponse | ResponseRequiringFollowUpMixin,
+        cleanup_requests: list[HordeRequest] | None,
+    ) -> bool:
+        await asyncio.sleep(self.delay)
+        assert isinstance(response_to_follow_up, ImageGenerateAsyncResponse)
+        self.cleaned_up.append(response_to_follow_up.kudos)
+        return True
+
+
+def test_sync_cleanup_runs_most_expensive_first() -> None:
+    session = _RecordingSession(cleanup_concurrency=1)
+    for kudos in (5.0, 50.0, 1.0, 20.0):
+        session._pending_follow_ups.add(*_image_job(kudos))
+
+    report = session._clean_up_pending_follow_ups()
+
+    assert session.cleaned_up == [50.0, 20.0, 5.0, 1.0]
+    assert (report.pending, report.completed, report.failed, report.unfinished) == (4, 4, 0, 0)
+    assert session.last_cleanup_report == report
+
+
+def test_sync_cleanup_is_concurrent_but_bounded() -> None:
+    session = _RecordingSession(delay=0.05, cleanup_concurrency=4)
+    for kudos in range(12):
+        session._pending_follow_ups.add(*_image_job(float(kudos)))
+
+    report = session._clean_up_pending_follow_ups()
+
+    assert report.completed == 12
+    assert 1 < session.max_in_flight <= 4
+    assert report.elapsed_seconds < 12 * 0.05
+
+
+def test_sync_cleanup_stops_at_deadline() -> None:
+    session = _RecordingSession(delay=0.2, cleanup_concurrency=1, cleanup_deadline=0.05)
+    for kudos in (1.0, 2.0, 3.0):
+        session._pending_follow_ups.add(*_image_job(kudos))
+
+    start = time.monotonic()
+    report = session._clean_up_pending_follow_ups()
+
+    assert time.monotonic() - start < 0.2
+    assert (report.pending, report.completed, report.unfinished) == (3, 0, 3)
+
+
+def test_sync_session_exit_reports_cleanup() -> None:
+    session = _RecordingSession(cleanup_concurrency=2)
+    with pytest.raises(RuntimeError), session:
+        session._pending_follow_ups.add(*_image_job(1.0))
+        raise RuntimeError("The program crashed")
+
+    assert session.last_cleanup_report is not None
+    assert session.last_cleanup_report.completed == 1
+
+
+def test_cleanup_concurrency_must_be_positive() -> None:
+    with pytest.raises(ValueError, match="cleanup_concurrency"):
+        AIHordeAPIClientSession(cleanup_concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_async_cleanup_prioritizes_and_stops_at_deadline() -> None:
+    async with aiohttp.ClientSession() as aiohttp_session:
+        session = _RecordingAsyncSession(aiohttp_session, delay=0.05, cleanup_concurrency=1, cleanup_deadline=0.125)
+        for kudos in (5.0, 50.0, 1.0, 20.0, 10.0):
+            session._pending_follow_ups.add(*_image_job(kudos))
+
+        report = await session._clean_up_pending_follow_ups_async()
+
+    assert session.cleaned_up == [50.0, 20.0]
+    assert (report.pending, report.completed, report.failed, report.unfinished) == (5, 2, 0, 3)
+    assert session.last_cleanup_report == report
@@ -0,0 +1,207 @@
+"""Tests for the source image cache, against a local HTTP server."""
+
+import asyncio
+import base64
+import http.server
+import io
+import uuid
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+from uuid import UUID
+
+import aiohttp
+import PIL.Image
+import pytest
+
+from horde_sdk.ai_horde_api.apimodels import (
+    ExtraSourceImageEntry,
+    ImageGenerateJobPopPayload,
+    ImageGenerateJobPopResponse,
+    ImageGenerateJobPopSkippedStatus,
+)
+from horde_sdk.ai_horde_api.fields import GenerationID
+from horde_sdk.ai_horde_api.source_image_cache import (
+    CachedSourceImage,
+    SourceImageCache,
+    get_shared_source_image_cache,
+)
+
+_REQUESTS: Counter[str] = Counter()
+
+
+def _png(name: str, mode: str = "RGB") -> bytes:
+    shade = sum(name.encode()) % 256
+    colors: dict[str, int | tuple[int, int, int] | tuple[int, int, int, int]] = {
+        "L": shade,
+        "RGB": (shade, shade, shade),
+        "RGBA": (shade, shade, shade, shade),
+    }
+    buffer = io.BytesIO()
+    PIL.Image.new(mode, (16, 8), color=colors[mode]).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class _ImageHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        name = self.path.rsplit("/", 1)[-1]
+        _REQUESTS[name] += 1
+        if name == "missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        # Every "alias-*" URL serves the same image.
+        body = _png("alias" if name.startswith("alias-") else name)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        return
+
+
+@pytest.fixture(scope="module")
+def image_server_url(local_http_server: Callable[..., AbstractContextManager[str]]) -> Iterator[str]:
+    with local_http_server(_ImageHandler, "/images") as url:
+        yield url
+
+
+@pytest.mark.asyncio
+async def test_fetches_are_deduplicated_by_url_and_content(image_server_url: str) -> None:
+    cache = SourceImageCache()
+    name = f"shared-{uuid.uuid4()}"
+
+    async with aiohttp.ClientSession() as session:
+        concurrent = await asyncio.gather(
+            *(cache.async_fetch(session, f"{image_server_url}/{name}") for _ in range(4))
+        )
+        again = await cache.async_fetch(session, f"{image_server_url}/{name}")
+        first_alias = await cache.async_fetch(session, f"{image_server_url}/alias-1")
+        second_alias = await cache.async_fetch(session, f"{image_server_url}/alias-2")
+
+        with pytest.raises(aiohttp.ClientResponseError):
+            await cache.async_fetch(session, f"{image_server_url}/missing")
+
+    assert all(image is again for image in concurrent)
+    assert again.data == _png(name)
+    assert _REQUESTS[name] == 1
+    assert first_alias is second_alias
+
+    stats = cache.stats()
+    assert (stats.downloads, stats.deduplicated_downloads, stats.url_hits) == (4, 3, 1)
+    assert stats.content_hits == 1
+    assert stats.cached_images == 2
+
+
+def test_base64_and_pixels_are_computed_once_and_shared() -> None:
+    cache = SourceImageCache()
+    data = _png("pixels", "RGBA")
+    encoded = base64.b64encode(data).decode()
+
+    image = cache.put_base64(encoded)
+    assert cache.put(data) is image
+    assert image.base64 is encoded
+
+    first = image.image()
+    second = image.image()
+    assert first.mode == "RGBA"
+    assert first.size == (16, 8)
+    assert first.readonly
+    assert first.tobytes() == second.tobytes() == PIL.Image.open(io.BytesIO(data)).tobytes()
+    assert cache.stats().decodes == 1
+
+    _, _, pixels = image.pixels()
+    assert pixels.readonly
+
+    # Modifying an image handed out must not change what other jobs see.
+    first.putpixel((0, 0), (1, 2, 3, 4))
+    assert image.image().getpixel((0, 0)) == second.getpixel((0, 0)) != (1, 2, 3, 4)
+
+    rgb = cache.put(_png("rgb")).image()
+    assert rgb.mode == "RGB"
+    assert not rgb.readonly
+
+
+def test_least_recently_used_images_are_evicted_over_budget() -> None:
+    images = [_png(f"evict-{index}") for index in range(3)]
+    cache = SourceImageCache(max_bytes=len(images[0]) * 2 + 10)
+
+    first = cache.put(images[0], url="first")
+    cache.put(images[1])
+    assert cache.get(first.digest) is first
+    cache.put(images[2])
+
+    assert cache.get_by_url("first") is first
+    assert cache.stats().evictions == 1
+    assert cache.stats().cached_bytes <= len(images[0]) * 2 + 10
+
+    # Decoding counts against the budget, but never evicts the image being decoded.
+    first.pixels()
+    assert cache.get(first.digest) is first
+    assert cache.stats().cached_images == 1
+    # Evicted images stay usable.
+    assert first.image().size == (16, 8)
+
+    with pytest.raises(ValueError):
+        SourceImageCache(max_bytes=-1)
+
+
+def test_eviction_only_releases_the_bytes_which_were_counted() -> None:
+    images = [_png(f"counted-{index}") for index in range(3)]
+    cache = SourceImageCache(max_bytes=len(images[0]) * 2 + 10)
+    first = cache.put(images[0])
+
+    # As if another thread had just published the base64 form, but not yet added its size to the cache.
+    first._base64 = base64.b64encode(images[0]).decode()
+    cache.put(images[1])
+    cache.put(images[2])
+
+    assert cache.get(first.digest) is None
+    assert cache.stats().cached_bytes == len(images[1]) + len(images[2])
+
+
+@pytest.mark.asyncio
+async def test_pop_response_downloads_through_the_shared_cache(
+    image_server_url: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    token = uuid.uuid4()
+    source, extra = f"source-{token}", f"extra-{token}"
+    response = ImageGenerateJobPopResponse(
+        id=None,
+        ids=[GenerationID(root=UUID("00000000-0000-0000-0000-000000000000"))],
+        payload=ImageGenerateJobPopPayload(prompt="A cat in a hat"),
+        model="Deliberate",
+        source_image=f"{image_server_url}/{source}",
+        source_mask=f"{image_server_url}/{source}",
+        extra_source_images=[
+            ExtraSourceImageEntry(image=f"{image_server_url}/{extra}", strength=0.5),
+            ExtraSourceImageEntry(image=f"{image_server_url}/{source}", strength=1.0),
+        ],
+        skipped=ImageGenerateJobPopSkippedStatus(),
+    )
+
+    async with aiohttp.ClientSession() as session:
+        await response.async_download_additional_data(session)
+
+    assert _REQUESTS[source] == 1
+    assert _REQUESTS[extra] == 1
+    assert response.get_downloaded_source_image() == base64.b64encode(_png(source)).decode()
+
+    extra_source_images = response.get_downloaded_extra_source_images()
+    assert extra_source_images is not None
+    assert [entry.strength for entry in extra_source_images] == [0.5, 1.0]
+    assert base64.b64decode(extra_source_images[0].image) == _png(extra)
+
+    def _decode_again(*args: object) -> CachedSourceImage:
+        raise AssertionError("The downloaded image was decoded and hashed again")
+
+    # The download already knows the digest, so the lookup must not go through the base64 again.
+    monkeypatch.setattr(SourceImageCache, "put_base64", _decode_again)
+    cached_source = response.get_cached_source_image()
+    assert cached_source is not None
+    assert cached_source is response.get_cached_source_mask()
+    assert get_shared_source_image_cache().get_by_url(f"{image_server_url}/{source}") is cached_source
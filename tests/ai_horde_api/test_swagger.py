@@ -1,4 +1,7 @@
+from pathlib import Path
+
 from horde_sdk.ai_horde_api.endpoints import get_ai_horde_swagger_url
+from horde_sdk.consts import HTTPMethod
 from horde_sdk.generic_api.utils.swagger import SwaggerDoc, SwaggerParser
 
 
@@ -47,3 +50,35 @@ def test_extract_all_response_examples() -> None:
 
     all_response_examples = swagger_doc.get_all_response_examples()
     assert len(all_response_examples) > 0, "Failed to extract any examples from the swagger doc"
+
+
+def test_swagger_doc_index_matches_endpoint_scans() -> None:
+    """Test that the prebuilt endpoint index agrees with scanning each endpoint, using the vendored swagger doc."""
+    swagger_doc_path = Path(__file__).parent.parent.parent / "codegen" / "ai_horde" / "swagger.json"
+    swagger_doc = SwaggerParser(swagger_doc_path=swagger_doc_path).get_swagger_doc()
+    index = swagger_doc.get_index()
+
+    assert index is swagger_doc.get_index()
+    assert index.get_request_models("/v2/generate/async", HTTPMethod.POST) == ("GenerationInputStable",)
+    assert index.get_response_models("/v2/generate/async", "post")["202"] == "RequestAsync"
+    assert index.get_endpoint_method("/v2/generate/async", "GET") is None
+
+    for path, endpoint in swagger_doc.paths.items():
+        defined_methods = endpoint.get_defined_endpoints()
+        assert {
+            method_name: index.get_endpoint_method(path, method_name) for method_name in defined_methods
+        } == defined_methods
+
+        indexed_request_models = [
+            model_name for method_name in defined_methods for model_name in index.get_request_models(path, method_name)
+        ]
+        indexed_response_models = [
+            model_name
+            for method_name in defined_methods
+            for model_name in index.get_response_models(path, method_name).values()
+        ]
+        assert indexed_request_models == endpoint.get_all_request_models()
+        assert indexed_response_models == endpoint.get_all_response_models()
+
+        for model_name in indexed_request_models + indexed_response_models:
+            assert path in {indexed_path for indexed_path, _ in index.endpoints_by_model[model_name]}
@@ -1,3 +1,7 @@
+from typing import Any
+
+from strenum import StrEnum
+
 from horde_sdk.backend_parsing.image.comfyui.hordelib import (
     KNOWN_COMFYUI_CONTROLNETS,
     KNOWN_COMFYUI_IMAGE_SAMPLERS,
@@ -65,3 +69,64 @@ def test_comfyui_backend_values_mapper_accurate() -> None:
     assert mapper.map_to_sdk_controlnet("canny") == KNOWN_IMAGE_CONTROLNETS.canny
     assert mapper.map_to_sdk_controlnet("canny") == "canny"
     assert mapper.map_to_sdk_controlnet(KNOWN_IMAGE_CONTROLNETS.canny) == "canny"
+
+
+def test_comfyui_backend_values_mapper_lookup_tables_match_uncompiled_mapping() -> None:
+    """The precomputed lookups must map (or reject) every value exactly as the original lookup logic does."""
+    mapper = ComfyUIBackendValuesMapper()
+    enum_types = (
+        KNOWN_IMAGE_SAMPLERS,
+        KNOWN_COMFYUI_IMAGE_SAMPLERS,
+        KNOWN_IMAGE_SCHEDULERS,
+        KNOWN_IMAGE_CONTROLNETS,
+    )
+    candidates: list[str] = ["not_a_real_value", ""]
+    for enum_type in enum_types:
+        candidates.extend(enum_type.__members__.values())
+        candidates.extend(str(member) for member in enum_type.__members__.values())
+
+    cases: list[tuple[Any, type[StrEnum], type[StrEnum]]] = [
+        (mapper._to_backend_sampler_map, KNOWN_IMAGE_SAMPLERS, KNOWN_COMFYUI_IMAGE_SAMPLERS),
+        (mapper._to_sdk_sampler_map, KNOWN_COMFYUI_IMAGE_SAMPLERS, KNOWN_IMAGE_SAMPLERS),
+        (mapper._to_backend_scheduler_map, KNOWN_IMAGE_SCHEDULERS, KNOWN_COMFYUI_IMAGE_SCHEDULERS),
+        (mapper._to_sdk_controlnet_map, KNOWN_COMFYUI_CONTROLNETS, KNOWN_IMAGE_CONTROLNETS),
+    ]
+    for mapping, input_type, target_type in cases:
+        for value in candidates:
+            try:
+                expected: object = mapper._map_value_uncompiled(value, mapping, input_type, target_type)
+            except Exception as e:
+                expected = type(e)
+            try:
+                actual: object = mapper._map_value(value, mapping, input_type, target_type)
+            except Exception as e:
+                actual = type(e)
+            assert actual == expected, (value, input_type, target_type)
+
+
+def test_comfyui_backend_values_mapper_normalizes_case() -> None:
+    mapper = ComfyUIBackendValuesMapper()
+
+    assert mapper.map_to_backend_sampler("K_LMS") == KNOWN_COMFYUI_IMAGE_SAMPLERS.lms
+    assert mapper.map_to_backend_sampler("ddim") == KNOWN_COMFYUI_IMAGE_SAMPLERS.ddim
+    assert mapper.map_to_sdk_sampler("LMS") == KNOWN_IMAGE_SAMPLERS.k_lms
+    assert mapper.map_to_sdk_scheduler("Simple") == KNOWN_IMAGE_SCHEDULERS.simple
+
+
+def test_comfyui_backend_values_mapper_batch_mapping() -> None:
+    mapper = ComfyUIBackendValuesMapper()
+    sdk_samplers = [KNOWN_IMAGE_SAMPLERS.k_lms, "k_euler", KNOWN_IMAGE_SAMPLERS.DDIM]
+
+    backend_samplers = mapper.map_to_backend_samplers(sdk_samplers)
+
+    assert backend_samplers == [mapper.map_to_backend_sampler(sampler) for sampler in sdk_samplers]
+    assert mapper.map_to_sdk_samplers(backend_samplers) == [
+        KNOWN_IMAGE_SAMPLERS.k_lms,
+        KNOWN_IMAGE_SAMPLERS.k_euler,
+        KNOWN_IMAGE_SAMPLERS.DDIM,
+    ]
+    assert mapper.map_to_backend_schedulers(["simple", KNOWN_IMAGE_SCHEDULERS.normal]) == [
+        KNOWN_COMFYUI_IMAGE_SCHEDULERS.simple,
+        KNOWN_COMFYUI_IMAGE_SCHEDULERS.normal,
+    ]
+    assert mapper.map_to_sdk_schedulers([]) == []
@@ -1,11 +1,14 @@
 import asyncio
 import base64
+import contextlib
 import functools
+import http.server
 import io
 import os
 import pathlib
 import sys
-from collections.abc import Callable
+import threading
+from collections.abc import Callable, Iterator
 from typing import Final
 from uuid import UUID
 
@@ -138,6 +141,29 @@ def ai_horde_api_key() -> str:
     return dev_key if dev_key is not None else ANON_API_KEY
 
 
+@contextlib.contextmanager
+def _serve_locally(handler: type[http.server.BaseHTTPRequestHandler], path: str = "") -> Iterator[str]:
+    """Serve `handler` on a free local port in a background thread, yielding the URL of `path` on it."""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}{path}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope="session")
+def local_http_server() -> Callable[..., contextlib.AbstractContextManager[str]]:
+    """Return a context manager serving a request handler locally, e.g. for a suite's module scoped server fixture.
+
+    `with local_http_server(handler, "/api/") as url:` serves `handler` on a free port for the duration of the block.
+    """
+    return _serve_locally
+
+
 async def _async_model_reference_manager() -> ModelReferenceManager:
     """Asynchronously initialize and return the model reference manager."""
     if ModelReferenceManager.has_instance():
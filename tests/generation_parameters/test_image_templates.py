@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
+
+import pytest
+
+from horde_sdk.generation_parameters.image.consts import KNOWN_IMAGE_SOURCE_PROCESSING
 from horde_sdk.generation_parameters.image.object_models import (
     BasicImageGenerationParameters,
     BasicImageGenerationParametersTemplate,
+    Image2ImageGenerationParameters,
+    ImageGenerationComponentContainer,
     ImageGenerationParameters,
     ImageGenerationParametersTemplate,
 )
+from horde_sdk.generation_parameters.utils import ResultIdAllocator
 
 
 def _create_basic_template(prompt: str) -> BasicImageGenerationParametersTemplate:
@@ -49,3 +57,57 @@ def test_image_parameters_accept_existing_instance_via_model_validate() -> None:
     clone = ImageGenerationParameters.model_validate(parameters, from_attributes=True)
 
     assert clone.model_dump() == parameters.model_dump()
+
+
+def _img2img_template() -> ImageGenerationParametersTemplate:
+    return ImageGenerationParametersTemplate(
+        base_params=_create_basic_template(prompt="starting"),
+        batch_size=2,
+        source_processing=KNOWN_IMAGE_SOURCE_PROCESSING.img2img,
+        additional_params=ImageGenerationComponentContainer(
+            components=[Image2ImageGenerationParameters(source_image=b"image" * 1000, source_mask=None)],
+        ),
+    )
+
+
+def test_image_template_expand_parameters_matches_to_parameters() -> None:
+    template = _img2img_template()
+    allocator = ResultIdAllocator()
+    variants = [
+        BasicImageGenerationParametersTemplate(prompt=f"variant {index}", seed=str(index)) for index in range(3)
+    ]
+
+    expected = [
+        template.to_parameters(base_param_updates=variant, allocator=allocator) for variant in [*variants, None]
+    ]
+    expanded = list(template.expand_parameters([*variants, None], allocator=allocator))
+
+    assert [parameters.model_dump() for parameters in expanded] == [parameters.model_dump() for parameters in expected]
+    assert len({parameters.result_ids[0] for parameters in expanded}) == 4
+
+
+def test_image_template_expand_parameters_copies_mutable_components() -> None:
+    template = _img2img_template()
+
+    first, second = template.expand_parameters([None, None])
+
+    assert first.additional_params is not second.additional_params
+    assert first.additional_params.components is not template.additional_params.components  # type: ignore[union-attr]
+    first.additional_params.components.clear()
+    assert len(second.additional_params.components) == 1
+
+
+def test_image_template_expand_parameters_is_lazy_but_validates_eagerly() -> None:
+    consumed: list[int] = []
+
+    def _variants() -> Iterator[BasicImageGenerationParametersTemplate]:
+        for index in range(1_000_000):
+            consumed.append(index)
+            yield BasicImageGenerationParametersTemplate(seed=str(index))
+
+    expansion = _img2img_template().expand_parameters(_variants())
+    next(expansion)
+    assert consumed == [0]
+
+    with pytest.raises(ValueError, match="base_params"):
+        ImageGenerationParametersTemplate().expand_parameters([None])
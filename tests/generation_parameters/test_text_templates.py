@@ -6,6 +6,7 @@ from horde_sdk.generation_parameters.text.object_models import (
     TextGenerationParameters,
     TextGenerationParametersTemplate,
 )
+from horde_sdk.generation_parameters.utils import ResultIdAllocator
 
 
 def _create_basic_template(prompt: str) -> BasicTextGenerationParametersTemplate:
@@ -49,3 +50,18 @@ def test_text_parameters_accept_existing_instance_via_model_validate() -> None:
     clone = TextGenerationParameters.model_validate(parameters, from_attributes=True)
 
     assert clone.model_dump() == parameters.model_dump()
+
+
+def test_text_template_expand_parameters_matches_to_parameters() -> None:
+    template = TextGenerationParametersTemplate(
+        base_params=_create_basic_template(prompt="initial"),
+    )
+    allocator = ResultIdAllocator()
+    variants = [BasicTextGenerationParametersTemplate(prompt=f"variant {index}") for index in range(3)]
+
+    expected = [
+        template.to_parameters(base_param_updates=variant, allocator=allocator) for variant in [*variants, None]
+    ]
+    expanded = list(template.expand_parameters([*variants, None], allocator=allocator))
+
+    assert [parameters.model_dump() for parameters in expanded] == [parameters.model_dump() for parameters in expected]
@@ -4,9 +4,12 @@ from enum import Enum
 from uuid import UUID
 
 import pytest
+from pydantic import ConfigDict
 
+from horde_sdk.generation_parameters import utils
 from horde_sdk.generation_parameters.generic import CompositeParametersBase
 from horde_sdk.generation_parameters.utils import (
+    PartialParameterFingerprint,
     ResultIdAllocator,
     compute_parameter_fingerprint,
     ensure_result_id,
@@ -50,6 +53,102 @@ def test_compute_parameter_fingerprint_deterministic_order() -> None:
     assert compute_parameter_fingerprint(payload_one) == compute_parameter_fingerprint(payload_two)
 
 
+class _FrozenTemplate(CompositeParametersBase):
+    model_config = ConfigDict(frozen=True)
+
+    value: int = 1
+    source_image: bytes = b""
+
+    def get_number_expected_results(self) -> int:  # pragma: no cover - simple return
+        return 1
+
+
+def test_compute_parameter_fingerprint_is_stable() -> None:
+    """The fingerprint framing is part of the contract; changing it changes every derived result id."""
+
+    payload = {
+        "prompt": "a cat",
+        "seed": 42,
+        "strength": 0.5,
+        "tiling": False,
+        "mask": None,
+        "source_image": b"\x00\x01" * 3000,
+        "loras": [{"name": "x", "model": 1.0}],
+        "id": UUID(int=1),
+    }
+
+    assert compute_parameter_fingerprint(payload) == (
+        "af86eb5f93c298b26848659c1edf8b74e0d5b95d430af47f8ad53b77c211526a"
+    )
+
+
+@pytest.mark.parametrize(
+    ("payload_one", "payload_two"),
+    [
+        ({"value": b"abc"}, {"value": "abc"}),
+        ({"value": b"abc"}, {"value": {"__type__": "bytes", "base64": "YWJj"}}),
+        ({"value": 1}, {"value": True}),
+        ({"value": 1}, {"value": 1.0}),
+        ({"value": "1"}, {"value": 1}),
+        ({"value": ["a", "b"]}, {"value": ["ab"]}),
+        ({"value": [None]}, {"value": []}),
+    ],
+)
+def test_compute_parameter_fingerprint_distinguishes_types(
+    payload_one: dict[str, object],
+    payload_two: dict[str, object],
+) -> None:
+    """Values which serialise alike but differ in type or structure must not collide."""
+
+    assert compute_parameter_fingerprint(payload_one) != compute_parameter_fingerprint(payload_two)
+
+
+def test_compute_parameter_fingerprint_treats_binary_types_alike() -> None:
+    """Source images may be any bytes-like object; only their contents matter."""
+
+    image = bytes(range(256)) * 64
+
+    fingerprint = compute_parameter_fingerprint({"source_image": image})
+
+    assert compute_parameter_fingerprint({"source_image": bytearray(image)}) == fingerprint
+    assert compute_parameter_fingerprint({"source_image": memoryview(image)}) == fingerprint
+    assert compute_parameter_fingerprint({"source_image": image[:-1] + b"\x00"}) != fingerprint
+
+
+def test_compute_parameter_fingerprint_rejects_unsupported_types() -> None:
+    with pytest.raises(TypeError):
+        compute_parameter_fingerprint({"value": object()})
+
+
+def test_finalize_template_memoizes_frozen_templates(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Fingerprints of immutable templates are computed once per instance."""
+
+    calls: list[object] = []
+    original = utils.compute_parameter_fingerprint
+
+    def _counting(payload: dict[str, object]) -> str:
+        calls.append(payload)
+        return original(payload)
+
+    monkeypatch.setattr(utils, "compute_parameter_fingerprint", _counting)
+
+    frozen = _FrozenTemplate(source_image=b"image" * 1000)
+    first = finalize_template_for_parameters(frozen)
+    second = finalize_template_for_parameters(frozen)
+    assert first.fingerprint == second.fingerprint
+    assert len(calls) == 1
+
+    finalize_template_for_parameters(frozen, overrides={"value": 2})
+    assert len(calls) == 2
+
+    mutable = _SimpleTemplate()
+    finalize_template_for_parameters(mutable)
+    mutable.value = 2
+    changed = finalize_template_for_parameters(mutable)
+    assert len(calls) == 4
+    assert changed.fingerprint != finalize_template_for_parameters(_SimpleTemplate()).fingerprint
+
+
 def test_result_id_allocator_includes_fingerprint() -> None:
     """Allocator derives different identifiers when payload fingerprints diverge."""
 
@@ -66,6 +165,30 @@ def test_result_id_allocator_includes_fingerprint() -> None:
     assert UUID(allocation_a)
 
 
+def test_result_id_allocator_allocate_many_matches_allocate() -> None:
+    """Bulk allocation yields the same identifiers as allocating one index at a time."""
+
+    allocator = ResultIdAllocator()
+    fingerprint = compute_parameter_fingerprint({"value": "alpha"})
+
+    expected = [allocator.allocate(seed="example", index=index, fingerprint=fingerprint) for index in range(4)]
+
+    assert allocator.allocate_many(seed="example", count=4, fingerprint=fingerprint) == expected
+    assert allocator.allocate_many(seed="example", count=2) == [
+        allocator.allocate(seed="example", index=index) for index in range(2)
+    ]
+
+
+def test_partial_parameter_fingerprint_matches_full_fingerprint() -> None:
+    """Prehashing the fixed fields must not change the resulting fingerprint."""
+
+    payload = {"alpha": 1, "omega": [b"image", None], "middle": {"nested": 1.5}}
+    partial = PartialParameterFingerprint(payload, "base_params")
+
+    for value in ({"prompt": "a"}, {"prompt": "b", "seed": "1"}, None):
+        assert partial.fingerprint(value) == compute_parameter_fingerprint({**payload, "base_params": value})
+
+
 def test_ensure_result_ids_respects_existing_values() -> None:
     """Existing identifiers should be returned untouched."""
 
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+from typing import ClassVar
+
+import pytest
+
+from horde_sdk.generation_parameters.bulk_migration import (
+    BulkMigrationProgress,
+    iter_migrated_lines,
+    main,
+    migrate_jsonl,
+)
+from horde_sdk.generation_parameters.generic import CompositeParametersBase
+from horde_sdk.generation_parameters.versioning import (
+    ParameterSchemaMigrationError,
+    _ParameterSchemaMigrationRegistry,
+    register_parameter_schema_migration,
+)
+
+
+class _ArchivedParameters(CompositeParametersBase):
+    """Parameters whose stored payloads went through two schema changes."""
+
+    SCHEMA_VERSION: ClassVar[str] = "3.0"
+    LEGACY_SCHEMA_VERSION: ClassVar[str] = "1.0"
+
+    steps: int = 1
+
+    def get_number_expected_results(self) -> int:  # pragma: no cover - simple return
+        return 1
+
+
+def _rename_ddim_steps(payload: dict[str, object]) -> dict[str, object]:
+    payload["steps"] = payload.pop("ddim_steps", 1)
+    return payload
+
+
+def _double_steps(payload: dict[str, object]) -> dict[str, object]:
+    steps = payload["steps"]
+    assert isinstance(steps, int)
+    payload["steps"] = steps * 2
+    return payload
+
+
+# Registered at import so that worker processes see them too.
+register_parameter_schema_migration(
+    _ArchivedParameters,
+    from_version="1.0",
+    to_version="2.0",
+    migration=_rename_ddim_steps,
+)
+register_parameter_schema_migration(
+    _ArchivedParameters,
+    from_version="2.0",
+    to_version="3.0",
+    migration=_double_steps,
+)
+
+
+def test_migration_path_is_cached_until_a_migration_is_registered() -> None:
+    registry = _ParameterSchemaMigrationRegistry()
+    registry.register(_ArchivedParameters, from_version="1.0", to_version="2.0", migration=_rename_ddim_steps)
+
+    with pytest.raises(ParameterSchemaMigrationError, match=r"No migration path from version '2\.0'"):
+        registry.migration_path(_ArchivedParameters, "1.0")
+
+    registry.register(_ArchivedParameters, from_version="2.0", to_version="3.0", migration=_double_steps)
+    path = registry.migration_path(_ArchivedParameters, "1.0")
+
+    assert [version for version, _ in path] == ["2.0", "3.0"]
+    assert registry.migration_path(_ArchivedParameters, "1.0") is path
+    assert registry.migration_path(_ArchivedParameters, "3.0") == ()
+    assert registry.apply(_ArchivedParameters, {"ddim_steps": 10}) == {"steps": 20, "schema_version": "3.0"}
+
+
+def test_migration_cycle_is_detected_before_migrating() -> None:
+    registry = _ParameterSchemaMigrationRegistry()
+    registry.register(_ArchivedParameters, from_version="1.0", to_version="2.0", migration=_rename_ddim_steps)
+    registry.register(_ArchivedParameters, from_version="2.0", to_version="1.0", migration=_rename_ddim_steps)
+
+    with pytest.raises(ParameterSchemaMigrationError, match="cycle"):
+        registry.apply(_ArchivedParameters, {"ddim_steps": 10})
+
+
+def _archive_lines() -> list[str]:
+    return [
+        json.dumps({"ddim_steps": 10}),
+        "",
+        json.dumps({"schema_version": "2.0", "steps": 4}),
+        "not json",
+        json.dumps({"schema_version": "3.0", "steps": 7}),
+        json.dumps(["a", "list"]),
+    ]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_iter_migrated_lines_preserves_order_and_reports_failures(workers: int) -> None:
+    progress_updates: list[int] = []
+
+    results = list(
+        iter_migrated_lines(
+            _ArchivedParameters,
+            _archive_lines(),
+            workers=workers,
+            chunk_size=2,
+            on_progress=lambda progress: progress_updates.append(progress.lines),
+        ),
+    )
+
+    assert [result.line_number for result in results] == [1, 3, 4, 5, 6]
+    assert [json.loads(result.payload) for result in results if result.payload is not None] == [
+        {"steps": 20, "schema_version": "3.0"},
+        {"steps": 8, "schema_version": "3.0"},
+        {"steps": 7, "schema_version": "3.0"},
+    ]
+    errors = [result.error for result in results if result.error is not None]
+    assert len(errors) == 2
+    assert "JSONDecodeError" in errors[0]
+    assert "Expected a JSON object" in errors[1]
+    assert progress_updates == [2, 4, 5]
+
+
+def test_migrate_jsonl_writes_migrated_payloads_and_rejects() -> None:
+    destination = io.StringIO()
+    rejects = io.StringIO()
+
+    progress = migrate_jsonl(
+        _ArchivedParameters,
+        io.StringIO("\n".join(_archive_lines())),
+        destination,
+        rejects=rejects,
+        workers=0,
+    )
+
+    assert (progress.lines, progress.migrated, progress.failed) == (5, 3, 2)
+    assert len(destination.getvalue().splitlines()) == 3
+    assert [json.loads(line)["line_number"] for line in rejects.getvalue().splitlines()] == [4, 6]
+
+
+def test_bulk_migration_argument_validation() -> None:
+    with pytest.raises(ValueError, match="chunk_size"):
+        iter_migrated_lines(_ArchivedParameters, [], chunk_size=0)
+    with pytest.raises(ValueError, match="workers"):
+        iter_migrated_lines(_ArchivedParameters, [], workers=-1)
+    assert BulkMigrationProgress().lines_per_second == 0.0
+
+
+def test_bulk_migration_cli(tmp_path: Path) -> None:
+    source = tmp_path / "archive.jsonl"
+    destination = tmp_path / "migrated.jsonl"
+    source.write_text(json.dumps({"ddim_steps": 3}) + "\n")
+
+    exit_code = main(
+        [f"{__name__}:_ArchivedParameters", str(source), str(destination), "--workers", "0"],
+    )
+
+    assert exit_code == 0
+    assert json.loads(destination.read_text()) == {"steps": 6, "schema_version": "3.0"}
@@ -0,0 +1,182 @@
+"""Tests for the streaming ratings export, against a local fake of the Ratings API."""
+
+import http.server
+import json
+import urllib.parse
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+from horde_sdk.ratings_api.apimodels import SelectableReturnFormats, UserRatingsRequest
+from horde_sdk.ratings_api.exceptions import RatingsAPIRequestError
+from horde_sdk.ratings_api.export import (
+    JSONLRatingsSink,
+    ParquetRatingsSink,
+    RatingsExportCheckpoint,
+    export_user_ratings,
+)
+from horde_sdk.ratings_api.ratings_client import RatingsAPIAsyncClient
+
+TOTAL_RATINGS = 23
+
+_FAILING_OFFSETS: set[int] = set()
+_REQUESTED_OFFSETS: list[int] = []
+
+
+def _rating(index: int) -> dict[str, object]:
+    return {
+        "image": f"https://example.com/{index}.webp",
+        "rating": index % 10,
+        "artifacts": None if index % 3 else 1,
+        "average": index / 2,
+        "times_rated": index + 1,
+        "username": f"user#{index}",
+    }
+
+
+class _RatingsHandler(http.server.BaseHTTPRequestHandler):
+    total_counts_page_only = False
+    """Whether `total` is the number of ratings in the page rather than of all matching ratings."""
+
+    def do_GET(self) -> None:
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        offset, limit = int(query["offset"][0]), int(query["limit"][0])
+        _REQUESTED_OFFSETS.append(offset)
+
+        body: dict[str, object]
+        if offset in _FAILING_OFFSETS:
+            status, body = 500, {"message": "Something went wrong"}
+        else:
+            ratings = [_rating(index) for index in range(offset, min(offset + limit, TOTAL_RATINGS))]
+            total = len(ratings) if self.total_counts_page_only else TOTAL_RATINGS
+            status, body = 200, {"total": total, "ratings": ratings}
+
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args: object) -> None:
+        return
+
+
+@pytest.fixture(scope="module")
+def ratings_server_url(local_http_server: Callable[..., AbstractContextManager[str]]) -> Iterator[str]:
+    with local_http_server(_RatingsHandler, "/api/") as url:
+        yield url
+
+
+@pytest.fixture
+def ratings_api(ratings_server_url: str, monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    monkeypatch.setattr("horde_sdk.ratings_api.apimodels.RATING_API_BASE_URL", ratings_server_url)
+    _FAILING_OFFSETS.clear()
+    _REQUESTED_OFFSETS.clear()
+    return _REQUESTED_OFFSETS
+
+
+def _request(limit: int = 5) -> UserRatingsRequest:
+    return UserRatingsRequest(
+        format=SelectableReturnFormats.json,
+        rating=None,
+        rating_comparison=None,
+        min_ratings=None,
+        diverge=None,
+        limit=limit,
+    )
+
+
+def _read_jsonl(path: Path) -> list[dict[str, object]]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_export_writes_every_rating_in_order(ratings_api: list[int], tmp_path: Path) -> None:
+    output = tmp_path / "ratings.jsonl"
+
+    async with aiohttp.ClientSession() as aiohttp_session:
+        client = RatingsAPIAsyncClient(aiohttp_session)
+        report = await export_user_ratings(client, _request(), JSONLRatingsSink(output), prefetch=3)
+
+    assert _read_jsonl(output) == [_rating(index) for index in range(TOTAL_RATINGS)]
+    assert report.records_written == TOTAL_RATINGS
+    assert report.pages_written == 5
+    assert report.next_offset == TOTAL_RATINGS
+    assert report.total == TOTAL_RATINGS
+    assert report.resumed_from is None
+    assert sorted(ratings_api) == [0, 5, 10, 15, 20]
+
+
+@pytest.mark.asyncio
+async def test_export_does_not_stop_at_a_total_counting_one_page(
+    ratings_api: list[int],
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(_RatingsHandler, "total_counts_page_only", True)
+    output = tmp_path / "ratings.jsonl"
+
+    async with aiohttp.ClientSession() as aiohttp_session:
+        client = RatingsAPIAsyncClient(aiohttp_session)
+        report = await export_user_ratings(client, _request(), JSONLRatingsSink(output), prefetch=3)
+
+    assert _read_jsonl(output) == [_rating(index) for index in range(TOTAL_RATINGS)]
+    assert report.records_written == TOTAL_RATINGS
+    assert report.pages_written == 5
+    assert ratings_api == [0, 5, 10, 15, 20]
+
+
+@pytest.mark.asyncio
+async def test_export_resumes_after_a_failure(ratings_api: list[int], tmp_path: Path) -> None:
+    output = tmp_path / "ratings.jsonl"
+    sink = JSONLRatingsSink(output)
+    _FAILING_OFFSETS.add(10)
+
+    async with aiohttp.ClientSession() as aiohttp_session:
+        client = RatingsAPIAsyncClient(aiohttp_session)
+        with pytest.raises(RatingsAPIRequestError):
+            await export_user_ratings(client, _request(), sink, prefetch=2)
+
+        checkpoint = RatingsExportCheckpoint.model_validate_json(sink.default_checkpoint_path.read_text())
+        assert (checkpoint.next_offset, checkpoint.records_written) == (10, 10)
+
+        # Simulate a crash part way through writing the next page.
+        with output.open("ab") as output_file:
+            output_file.write(b'{"image": "half a rec')
+
+        _FAILING_OFFSETS.clear()
+        ratings_api.clear()
+        report = await export_user_ratings(client, _request(), sink, prefetch=2)
+
+    assert _read_jsonl(output) == [_rating(index) for index in range(TOTAL_RATINGS)]
+    assert report.resumed_from == 10
+    assert report.records_written == TOTAL_RATINGS
+    assert report.pages_written == 3
+    assert min(ratings_api) == 10
+
+
+@pytest.mark.asyncio
+async def test_export_to_parquet(ratings_api: list[int], tmp_path: Path) -> None:
+    parquet = pytest.importorskip("pyarrow.parquet")
+
+    async with aiohttp.ClientSession() as aiohttp_session:
+        client = RatingsAPIAsyncClient(aiohttp_session)
+        await export_user_ratings(client, _request(limit=10), ParquetRatingsSink(tmp_path / "ratings"))
+
+    table = parquet.read_table(tmp_path / "ratings")
+    assert table.to_pylist() == [_rating(index) for index in range(TOTAL_RATINGS)]
+
+
+@pytest.mark.asyncio
+async def test_export_rejects_bad_arguments(tmp_path: Path) -> None:
+    async with aiohttp.ClientSession() as aiohttp_session:
+        client = RatingsAPIAsyncClient(aiohttp_session)
+        sink = JSONLRatingsSink(tmp_path / "ratings.jsonl")
+        with pytest.raises(ValueError, match="limit"):
+            await export_user_ratings(client, _request(limit=0), sink)
+        with pytest.raises(ValueError, match="prefetch"):
+            await export_user_ratings(client, _request(), sink, prefetch=0)
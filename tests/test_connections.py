@@ -0,0 +1,129 @@
+"""Tests for the warm connection pool, against a local keep-alive HTTP server."""
+
+import asyncio
+import http.server
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+
+import aiohttp
+import pytest
+
+from horde_sdk import _default_sslcontext
+from horde_sdk.generic_api.connections import WarmConnectionPool
+
+_CONNECTIONS_ACCEPTED: list[int] = []
+
+
+class _KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        _CONNECTIONS_ACCEPTED.append(1)
+
+    def _reply(self, body: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self) -> None:
+        self._reply(b"")
+
+    def do_GET(self) -> None:
+        self._reply(b"ok")
+
+    def log_message(self, *args: object) -> None:
+        return
+
+
+@pytest.fixture(scope="module")
+def server_url(local_http_server: Callable[..., AbstractContextManager[str]]) -> Iterator[str]:
+    with local_http_server(_KeepAliveHandler) as url:
+        yield url
+
+
+@pytest.fixture
+def connections_accepted() -> list[int]:
+    _CONNECTIONS_ACCEPTED.clear()
+    return _CONNECTIONS_ACCEPTED
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_the_warm_connections(server_url: str, connections_accepted: list[int]) -> None:
+    # By name rather than address, so that the lookup goes through the DNS cache.
+    server_url = server_url.replace("127.0.0.1", "localhost")
+    async with WarmConnectionPool([f"{server_url}/api/"], min_warm_connections=3, rewarm_interval=None) as pool:
+        assert len(connections_accepted) == 3
+
+        async def get() -> str:
+            # As the clients do; connections are pooled separately for each SSL context.
+            url = f"{server_url}/api/v2/status/heartbeat"
+            async with pool.session.get(url, ssl=_default_sslcontext) as response:
+                return await response.text()
+
+        assert await asyncio.gather(*(get() for _ in range(3))) == ["ok"] * 3
+        await pool.warm()
+
+    assert len(connections_accepted) == 3
+    stats = pool.stats()
+    (host,) = stats.hosts
+    assert host.host == server_url
+    assert host.warm
+    # The warm-ups opened the connections and refreshed them once; only the three GETs count as requests.
+    assert (host.connections_created, host.connections_reused) == (0, 3)
+    assert (host.warmup_connections_created, host.warmup_connections_reused) == (3, 3)
+    assert host.reuse_ratio == 1.0
+    assert (stats.connections_created, stats.connections_reused) == (0, 3)
+    assert stats.warmup_connections_created == 3
+    assert host.dns_cache_misses >= 1
+    assert stats.warmups == 2
+    assert stats.warmup_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_hosts_added_later_are_warmed_in_the_background(
+    server_url: str,
+    connections_accepted: list[int],
+) -> None:
+    async with WarmConnectionPool(min_warm_connections=2, rewarm_interval=0.05, keepalive_timeout=5) as pool:
+        assert connections_accepted == []
+
+        added = pool.add_hosts([f"{server_url}/r2/upload?signature=x", None, "iVBORw0KGgo=", f"{server_url}/other"])
+        assert added == [server_url]
+        assert pool.warm_hosts == [server_url]
+
+        await asyncio.sleep(0.3)
+        stats = pool.stats()
+
+    assert len(connections_accepted) == 2
+    assert stats.warmups > 1
+    # Keeping an idle host warm is not reuse.
+    assert stats.hosts[0].warmup_connections_reused > 0
+    assert (stats.connections_created, stats.connections_reused) == (0, 0)
+    assert stats.reuse_ratio == 0.0
+
+
+@pytest.mark.asyncio
+async def test_unreachable_hosts_do_not_fail_warming() -> None:
+    async with WarmConnectionPool(["http://127.0.0.1:9/"], rewarm_interval=None, warmup_timeout=2) as pool:
+        assert isinstance(pool.session, aiohttp.ClientSession)
+
+    assert pool.stats().warmup_failures == 2
+    with pytest.raises(RuntimeError):
+        _ = pool.session
+
+
+def test_pool_rejects_bad_arguments() -> None:
+    with pytest.raises(ValueError):
+        WarmConnectionPool(["ftp://example.com"])
+    with pytest.raises(ValueError):
+        WarmConnectionPool(rewarm_interval=120, keepalive_timeout=60)
+    with pytest.raises(ValueError):
+        WarmConnectionPool(min_warm_connections=-1)
+
+    pool = WarmConnectionPool(["https://aihorde.net/api/", "https://aihorde.net:443/other"], max_warm_hosts=1)
+    assert pool.warm_hosts == ["https://aihorde.net:443"]
+    assert pool.add_hosts(["https://r2.example.com/upload"]) == []
@@ -0,0 +1,83 @@
+from collections.abc import Iterator
+
+import pytest
+
+from horde_sdk._telemetry import metrics
+
+
+class _RecordingInstrument:
+    def __init__(self) -> None:
+        self.recorded: list[tuple[float, dict[str, object]]] = []
+        self.added: list[int] = []
+
+    def record(self, value: float, attributes: dict[str, object]) -> None:
+        self.recorded.append((value, attributes))
+
+    def add(self, value: int) -> None:
+        self.added.append(value)
+
+
+@pytest.fixture
+def request_telemetry(monkeypatch: pytest.MonkeyPatch) -> Iterator[dict[str, _RecordingInstrument]]:
+    instruments = {name: _RecordingInstrument() for name in ("prepare", "network", "decode", "validate")}
+    in_flight = _RecordingInstrument()
+    follow_ups = _RecordingInstrument()
+    monkeypatch.setattr(metrics, "_PHASE_HISTOGRAMS", tuple(instruments.values()))
+    monkeypatch.setattr(metrics, "_telemetry_client_requests_in_flight", in_flight)
+    monkeypatch.setattr(metrics, "_telemetry_client_pending_follow_ups", follow_ups)
+    instruments["in_flight"] = in_flight
+    instruments["follow_ups"] = follow_ups
+
+    previous = metrics._telemetry_client_timings_enabled
+    metrics.set_client_request_telemetry_enabled(True)
+    yield instruments
+    metrics.set_client_request_telemetry_enabled(previous)
+
+
+def test_disabled_request_telemetry_creates_no_timer() -> None:
+    previous = metrics._telemetry_client_timings_enabled
+    metrics.set_client_request_telemetry_enabled(False)
+    try:
+        assert metrics._start_request_timer("/v2/generate/check/{id}") is None
+    finally:
+        metrics.set_client_request_telemetry_enabled(previous)
+
+
+def test_request_timer_records_phases_with_labels(request_telemetry: dict[str, _RecordingInstrument]) -> None:
+    timer = metrics._start_request_timer("/v2/generate/check/{id}")
+    assert timer is not None
+    assert request_telemetry["in_flight"].added == [1]
+
+    for _ in range(4):
+        timer.lap()
+    timer.finish(200)
+    timer.close()
+
+    for phase in ("prepare", "network", "decode", "validate"):
+        ((duration, attributes),) = request_telemetry[phase].recorded
+        assert duration >= 0
+        assert attributes == {"endpoint": "/v2/generate/check/{id}", "status_code": 200}
+    assert request_telemetry["in_flight"].added == [1, -1]
+
+
+def test_request_timer_records_only_completed_phases(request_telemetry: dict[str, _RecordingInstrument]) -> None:
+    timer = metrics._start_request_timer("/v2/generate/async")
+    assert timer is not None
+
+    timer.lap()
+    timer.lap()
+    timer.finish(503)
+    timer.close()
+
+    assert len(request_telemetry["prepare"].recorded) == 1
+    assert len(request_telemetry["network"].recorded) == 1
+    assert request_telemetry["decode"].recorded == []
+    assert request_telemetry["validate"].recorded == []
+
+
+def test_pending_follow_ups_gauge(request_telemetry: dict[str, _RecordingInstrument]) -> None:
+    metrics._record_pending_follow_ups_change(1)
+    metrics._record_pending_follow_ups_change(0)
+    metrics._record_pending_follow_ups_change(-1)
+
+    assert request_telemetry["follow_ups"].added == [1, -1]
@@ -187,6 +187,56 @@ class TestChainFlowBuilder:
             flow.get_node_handle("nonexistent")
 
 
+class TestCompiledTopology:
+    """The adjacency tables a flow precomputes at construction."""
+
+    def test_tables_agree_with_graph(self) -> None:
+        """Precomputed neighbours, descendants, and bitsets match the underlying graph on a diamond."""
+        builder = ChainFlowBuilder()
+        top = builder.add_stage(
+            _stage("top", GENERATION_PROGRESS.GENERATING, GENERATION_PROGRESS.GENERATION_COMPLETE),
+        )
+        left = builder.add_stage(
+            _stage("left", GENERATION_PROGRESS.POST_PROCESSING, GENERATION_PROGRESS.POST_PROCESSING_COMPLETE),
+        )
+        right = builder.add_stage(
+            _stage("right", GENERATION_PROGRESS.SAFETY_CHECKING, GENERATION_PROGRESS.SAFETY_CHECK_COMPLETE),
+        )
+        bottom = builder.add_stage(
+            _stage("bottom", GENERATION_PROGRESS.SUBMITTING, GENERATION_PROGRESS.SUBMIT_COMPLETE),
+        )
+        builder.connect(top, left)
+        builder.connect(top, right)
+        builder.connect(left, bottom)
+        builder.connect(right, bottom)
+        flow = builder.build()
+
+        assert flow.successors(top) == (left, right)
+        assert flow.predecessors(bottom) == (left, right)
+        assert flow.descendants(top) == {left, right, bottom}
+        assert flow.descendants_in_order(top)[-1] == bottom
+        assert flow.descendants(bottom) == set()
+
+        assert flow.descendant_mask(top) == flow.bit_for(left) | flow.bit_for(right) | flow.bit_for(bottom)
+        assert flow.predecessor_mask(bottom) == flow.bit_for(left) | flow.bit_for(right)
+        assert flow.all_nodes_mask == 0b1111
+
+        assert flow.route_for_progress(GENERATION_PROGRESS.GENERATING) == (top, None)
+        assert flow.route_for_progress(GENERATION_PROGRESS.GENERATION_COMPLETE) == (None, top)
+        assert flow.route_for_progress(GENERATION_PROGRESS.PRELOADING) == (None, None)
+
+        context = ChainExecutionContext(flow)
+        context.advance_for_progress(GENERATION_PROGRESS.GENERATING)
+        assert context.advance_for_progress(GENERATION_PROGRESS.GENERATION_COMPLETE) == (left, right)
+        context.advance_for_progress(GENERATION_PROGRESS.POST_PROCESSING)
+        assert context.advance_for_progress(GENERATION_PROGRESS.POST_PROCESSING_COMPLETE) == ()
+        assert bottom not in context.ready_nodes()
+        context.mark_failed(right, error="boom")
+        assert context.node_state(bottom) == CHAIN_NODE_STATE.SKIPPED
+        assert context.is_finished
+        assert context.has_failed
+
+
 class TestCommonFlows:
     """Shapes of the canonical flows."""
 
@@ -216,6 +266,20 @@ class TestCommonFlows:
         flow = text_generation_flow()
         assert [node.name for node in flow.nodes] == [GENERATE_STAGE_NAME, SUBMIT_STAGE_NAME]
 
+    def test_flows_are_shared_per_options(self) -> None:
+        """Identical options return the same immutable flow; different options do not."""
+        assert image_generation_flow(post_processing=True, safety_check=False) is image_generation_flow(
+            post_processing=True,
+            safety_check=False,
+            submit=True,
+        )
+        assert image_generation_flow(post_processing=True, safety_check=False) is not image_generation_flow(
+            post_processing=False,
+            safety_check=False,
+        )
+        assert alchemy_flow() is alchemy_flow(safety_check=False)
+        assert text_generation_flow() is text_generation_flow(submit=True)
+
     def test_capabilities_assigned(self) -> None:
         """Stages carry the lane capabilities workers route on."""
         flow = image_generation_flow(post_processing=True, safety_check=True)
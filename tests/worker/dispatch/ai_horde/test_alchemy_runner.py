@@ -0,0 +1,118 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from horde_sdk.ai_horde_api.apimodels import AlchemyJobPopResponse, NoValidAlchemyFound
+from horde_sdk.ai_horde_api.apimodels.alchemy.pop import AlchemyPopFormPayload
+from horde_sdk.generation_parameters.alchemy.consts import KNOWN_ALCHEMY_FORMS, KNOWN_ALCHEMY_TYPES, KNOWN_UPSCALERS
+from horde_sdk.worker.dispatch.ai_horde.alchemy.runner import (
+    AlchemyFormOutcome,
+    AlchemyFormTask,
+    AlchemyJobRunner,
+    split_alchemy_job_pop_response,
+)
+
+
+def _multi_form_job(source_image: str) -> AlchemyJobPopResponse:
+    return AlchemyJobPopResponse(
+        forms=[
+            AlchemyPopFormPayload(
+                id=uuid4(),
+                form=KNOWN_UPSCALERS.RealESRGAN_x4plus,
+                r2_upload="https://r2.example/0",
+                source_image=source_image,
+            ),
+            AlchemyPopFormPayload(
+                id=uuid4(),
+                form=KNOWN_UPSCALERS.RealESRGAN_x2plus,
+                r2_upload="https://r2.example/1",
+                source_image=source_image,
+            ),
+            AlchemyPopFormPayload(id=uuid4(), form=KNOWN_ALCHEMY_TYPES.caption, source_image=source_image),
+            AlchemyPopFormPayload(id=uuid4(), form=KNOWN_ALCHEMY_TYPES.nsfw, source_image=source_image),
+        ],
+        skipped=NoValidAlchemyFound(),
+    )
+
+
+def test_split_shares_the_decoded_source_image(default_testing_image_base64: str) -> None:
+    response = _multi_form_job(default_testing_image_base64)
+    assert response.forms is not None
+
+    tasks = split_alchemy_job_pop_response(response)
+
+    assert [task.form_id for task in tasks] == [str(form.id_) for form in response.forms]
+    assert [task.form_kind for task in tasks] == [
+        KNOWN_ALCHEMY_FORMS.post_process,
+        KNOWN_ALCHEMY_FORMS.post_process,
+        KNOWN_ALCHEMY_FORMS.caption,
+        KNOWN_ALCHEMY_FORMS.nsfw,
+    ]
+    assert [task.r2_upload_url for task in tasks] == ["https://r2.example/0", "https://r2.example/1", None, None]
+    assert isinstance(tasks[0].parameters.source_image, bytes)
+    assert all(task.parameters.source_image is tasks[0].parameters.source_image for task in tasks)
+
+
+@pytest.mark.asyncio
+async def test_runner_limits_each_form_kind_and_delivers_as_ready(default_testing_image_base64: str) -> None:
+    in_flight: dict[str, int] = {}
+    max_in_flight: dict[str, int] = {}
+    events: list[str] = []
+
+    async def process_form(task: AlchemyFormTask) -> object:
+        kind = str(task.form_kind)
+        in_flight[kind] = in_flight.get(kind, 0) + 1
+        max_in_flight[kind] = max(max_in_flight.get(kind, 0), in_flight[kind])
+        await asyncio.sleep(0.05 if task.form_kind == KNOWN_ALCHEMY_FORMS.post_process else 0.01)
+        in_flight[kind] -= 1
+        events.append(f"done:{kind}")
+        return f"result of {task.form_id}"
+
+    async def deliver(outcome: AlchemyFormOutcome) -> None:
+        events.append(f"delivered:{outcome.task.form_kind}")
+
+    runner = AlchemyJobRunner(process_form, deliver)
+    response = _multi_form_job(default_testing_image_base64)
+    outcomes = await runner.run(response)
+
+    assert [outcome.result for outcome in outcomes] == [f"result of {task.task.form_id}" for task in outcomes]
+    assert all(outcome.succeeded for outcome in outcomes)
+    assert max_in_flight[KNOWN_ALCHEMY_FORMS.post_process] == 1
+    # The light forms finish and are delivered before the first upscale is done.
+    assert events[:4] == ["done:caption", "delivered:caption", "done:nsfw", "delivered:nsfw"]
+
+
+@pytest.mark.asyncio
+async def test_runner_records_failures_without_stopping_other_forms(default_testing_image_base64: str) -> None:
+    delivered: list[AlchemyFormOutcome] = []
+
+    async def process_form(task: AlchemyFormTask) -> object:
+        if task.form_kind == KNOWN_ALCHEMY_FORMS.caption:
+            raise RuntimeError("caption model crashed")
+        return b"ok"
+
+    async def deliver(outcome: AlchemyFormOutcome) -> None:
+        delivered.append(outcome)
+        if outcome.task.form_kind == KNOWN_ALCHEMY_FORMS.nsfw:
+            raise ConnectionError("submit failed")
+
+    runner = AlchemyJobRunner(process_form, deliver, concurrency={KNOWN_ALCHEMY_FORMS.post_process: 2})
+    outcomes = await runner.run(_multi_form_job(default_testing_image_base64))
+
+    assert len(delivered) == 4
+    assert [outcome.succeeded for outcome in outcomes] == [True, True, False, True]
+    assert isinstance(outcomes[2].error, RuntimeError)
+    assert isinstance(outcomes[3].delivery_error, ConnectionError)
+    assert runner.get_concurrency(KNOWN_ALCHEMY_FORMS.post_process) == 2
+    assert runner.get_concurrency("some_new_form") == 1
+
+
+def test_runner_rejects_invalid_concurrency() -> None:
+    async def _noop(_: object) -> None:
+        return None
+
+    with pytest.raises(ValueError, match="caption"):
+        AlchemyJobRunner(_noop, _noop, concurrency={KNOWN_ALCHEMY_FORMS.caption: 0})
+    with pytest.raises(ValueError, match="default_concurrency"):
+        AlchemyJobRunner(_noop, _noop, default_concurrency=0)
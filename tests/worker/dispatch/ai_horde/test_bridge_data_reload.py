@@ -0,0 +1,164 @@
+"""Tests for the incremental hot reload of image worker bridge data."""
+
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from horde_model_reference.model_reference_manager import ModelReferenceManager
+from pydantic import ValidationError
+
+from horde_sdk.ai_horde_api.ai_horde_clients import AIHordeAPIClientSession
+from horde_sdk.ai_horde_api.apimodels import ImageGenerateJobPopRequest
+from horde_sdk.generic_api.apimodels import RequestErrorResponse
+from horde_sdk.worker.dispatch.ai_horde.bridge_data import ImageWorkerBridgeData, MetaInstruction
+from horde_sdk.worker.dispatch.ai_horde.bridge_data_reload import (
+    BRIDGE_DATA_DERIVED_STATE,
+    ImageWorkerBridgeDataReloader,
+    ImageWorkerConfigSnapshot,
+)
+from horde_sdk.worker.dispatch.ai_horde.pop_strategy import AIHordeImageWorkerJobPopStrategy
+
+_BASE_CONFIG: dict[str, Any] = {
+    "horde_url": "https://aihorde.net/api/",
+    "models_to_load": ["top 2", "Deliberate"],
+    "models_to_skip": ["Stable Diffusion"],
+    "max_power": 8,
+}
+
+
+class _CountingResolver:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def __call__(self, meta_instructions: list[str]) -> set[str]:
+        self.calls.append(meta_instructions)
+        return {"AlbedoBase XL (SDXL)", "Stable Diffusion"} if "top 2" in meta_instructions else {"Anything Diffusion"}
+
+
+def _config(**changes: object) -> dict[str, Any]:
+    return {**_BASE_CONFIG, **changes}
+
+
+def test_meta_instructions_are_split_from_model_names_in_order() -> None:
+    bridge_data = ImageWorkerBridgeData.model_validate(
+        _config(models_to_load=["top 5", "all sdxl", "Deliberate", "BOTTOM 3"], models_to_skip=["all nsfw", "x"]),
+    )
+
+    assert bridge_data.image_models_to_load == ["Deliberate"]
+    assert bridge_data.meta_load_instructions == ["top 5", "all sdxl", "BOTTOM 3"]
+    assert bridge_data.image_models_to_skip == ["x", "SDXL_beta::stability.ai#6901"]
+    assert bridge_data.meta_skip_instructions == ["all nsfw"]
+
+    match = MetaInstruction.TOP_N_REGEX.pattern.match("top 12")
+    assert match is not None
+    assert match.group(1) == "12"
+
+    revalidated = ImageWorkerBridgeData.model_validate(bridge_data.model_dump(by_alias=True))
+    assert revalidated.image_models_to_skip.count("SDXL_beta::stability.ai#6901") == 1
+
+
+def test_reload_recomputes_only_the_affected_state() -> None:
+    resolver = _CountingResolver()
+    reloader = ImageWorkerBridgeDataReloader(
+        ImageWorkerBridgeData.model_validate(_config()),
+        resolve_meta_instructions=resolver,
+    )
+    snapshots: list[ImageWorkerConfigSnapshot] = []
+    reloader.subscribe(snapshots.append)
+
+    assert reloader.snapshot.models == ["Deliberate", "AlbedoBase XL (SDXL)"]
+    assert len(resolver.calls) == 1
+
+    result = reloader.reload(_config(max_power=32))
+    assert result.changed_fields == ["max_power"]
+    assert result.recomputed == [BRIDGE_DATA_DERIVED_STATE.max_pixels]
+    assert result.snapshot.max_pixels == 32 * 8 * 64 * 64
+    assert result.snapshot.version == 1
+    assert snapshots == [result.snapshot]
+
+    # The same file again is neither validated nor reported as a change.
+    assert reloader.reload(_config(max_power=32)).changed_fields == []
+    assert len(snapshots) == 1
+
+    result = reloader.reload(_config(max_power=32, models_to_load=["top 2", "Deliberate", "Dreamshaper"]))
+    assert result.recomputed == [BRIDGE_DATA_DERIVED_STATE.models]
+    assert not result.meta_instructions_resolved
+    assert result.snapshot.models == ["Deliberate", "Dreamshaper", "AlbedoBase XL (SDXL)"]
+    assert len(resolver.calls) == 1
+
+    result = reloader.reload(_config(max_power=32, models_to_load=["bottom 1"], allow_lora=True, nsfw=False))
+    assert set(result.recomputed) == {BRIDGE_DATA_DERIVED_STATE.models, BRIDGE_DATA_DERIVED_STATE.feature_flags}
+    assert result.meta_instructions_resolved
+    assert result.snapshot.models == ["Anything Diffusion"]
+    assert result.snapshot.feature_flags.allow_lora
+    assert not result.snapshot.feature_flags.nsfw
+    assert resolver.calls[-1] == ["bottom 1"]
+
+
+def test_invalid_bridge_data_keeps_the_current_snapshot() -> None:
+    reloader = ImageWorkerBridgeDataReloader(ImageWorkerBridgeData.model_validate(_config(models_to_load=["a"])))
+    snapshot = reloader.snapshot
+
+    with pytest.raises(ValidationError):
+        reloader.reload(_config(models_to_load=["a"], max_power=0))
+
+    assert reloader.snapshot is snapshot
+    assert reloader.reload(ImageWorkerBridgeData.model_validate(_config(models_to_load=["b"]))).snapshot.models == [
+        "b",
+    ]
+
+
+def test_pop_strategy_pops_with_the_same_models_before_and_after_a_reload() -> None:
+    reloader = ImageWorkerBridgeDataReloader(
+        ImageWorkerBridgeData.model_validate(_config()),
+        resolve_meta_instructions=_CountingResolver(),
+    )
+    session = MagicMock(spec=AIHordeAPIClientSession)
+    session.submit_request.return_value = RequestErrorResponse(message="No jobs")
+    pop_strategy = AIHordeImageWorkerJobPopStrategy(
+        config_snapshot=reloader.snapshot,
+        sync_client_session=session,
+        model_reference_manager=MagicMock(spec=ModelReferenceManager),
+    )
+    reloader.subscribe(pop_strategy.apply_config_snapshot)
+
+    def popped_request() -> ImageGenerateJobPopRequest:
+        assert pop_strategy.pop_job() is None
+        request = session.submit_request.call_args.args[0]
+        assert isinstance(request, ImageGenerateJobPopRequest)
+        return request
+
+    before = popped_request()
+    assert before.models == ["Deliberate", "AlbedoBase XL (SDXL)"]
+    assert before.nsfw
+
+    reloader.reload(_config(nsfw=False))
+    after = popped_request()
+    assert after.models == before.models
+    assert not after.nsfw
+
+
+def test_pop_strategy_still_accepts_bridge_data() -> None:
+    session = MagicMock(spec=AIHordeAPIClientSession)
+    session.submit_request.return_value = RequestErrorResponse(message="No jobs")
+    bridge_data = ImageWorkerBridgeData.model_validate(_config(models_to_load=["Deliberate", "Stable Diffusion"]))
+    pop_strategy = AIHordeImageWorkerJobPopStrategy(
+        image_worker_bridge_data=bridge_data,
+        sync_client_session=session,
+        model_reference_manager=MagicMock(spec=ModelReferenceManager),
+    )
+
+    assert pop_strategy.pop_job() is None
+    request = session.submit_request.call_args.args[0]
+    assert isinstance(request, ImageGenerateJobPopRequest)
+    assert request.models == ["Deliberate"]
+    assert request.max_pixels == bridge_data.max_pixels
+
+    with pytest.raises(ValueError):
+        AIHordeImageWorkerJobPopStrategy(model_reference_manager=MagicMock(spec=ModelReferenceManager))
+    with pytest.raises(ValueError):
+        AIHordeImageWorkerJobPopStrategy(
+            image_worker_bridge_data=bridge_data,
+            config_snapshot=ImageWorkerBridgeDataReloader(bridge_data).snapshot,
+            model_reference_manager=MagicMock(spec=ModelReferenceManager),
+        )
@@ -0,0 +1,176 @@
+"""Tests for the aux model cache, against a local HTTP server."""
+
+import asyncio
+import hashlib
+import http.server
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+from pathlib import Path
+
+import pytest
+
+from horde_sdk.generation_parameters import ImageGenerationParameters
+from horde_sdk.generation_parameters.generic.consts import KNOWN_AUX_MODEL_SOURCE
+from horde_sdk.generation_parameters.image.object_models import (
+    AuxModelEntry,
+    ImageGenerationComponentContainer,
+    LoRaEntry,
+    TIEntry,
+)
+from horde_sdk.worker.aux_model_cache import (
+    AUX_MODEL_EVICTION_POLICY,
+    AuxModelCache,
+    AuxModelCacheKey,
+)
+from horde_sdk.worker.exceptions import AuxModelDownloadError
+from horde_sdk.worker.generations import ImageSingleGeneration
+from horde_sdk.worker.jobs import ImageWorkerJob
+
+_REQUESTS: Counter[str] = Counter()
+
+
+def _artifact(name: str) -> bytes:
+    return f"weights-of-{name}-".encode() * 100
+
+
+class _ArtifactHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        name = self.path.rsplit("/", 1)[-1]
+        _REQUESTS[name] += 1
+        if name == "missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = _artifact(name)
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        return
+
+
+@pytest.fixture(scope="module")
+def artifact_server_url(local_http_server: Callable[..., AbstractContextManager[str]]) -> Iterator[str]:
+    with local_http_server(_ArtifactHandler, "/artifacts") as url:
+        yield url
+
+
+def _file_names(directory: Path) -> list[str]:
+    return sorted(path.name for path in directory.iterdir())
+
+
+def _lora(url: str, name: str, **kwargs: str) -> LoRaEntry:
+    return LoRaEntry(
+        name=name,
+        remote_version_id=None,
+        source=KNOWN_AUX_MODEL_SOURCE.CIVITAI,
+        remote_url=f"{url}/{name}",
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_download(artifact_server_url: str, tmp_path: Path) -> None:
+    entry = _lora(artifact_server_url, "shared")
+
+    async with AuxModelCache(tmp_path) as cache:
+        paths = await asyncio.gather(*(cache.get(entry) for _ in range(5)))
+        again = await cache.get(entry)
+
+        assert set(paths) == {again}
+        assert again.read_bytes() == _artifact("shared")
+        assert _REQUESTS["shared"] == 1
+        stats = cache.stats()
+        assert (stats.misses, stats.deduplicated, stats.hits) == (1, 4, 1)
+        assert stats.cached_bytes == len(_artifact("shared"))
+        assert not [name for name in _file_names(tmp_path) if name.endswith(".part")]
+
+    # A new cache adopts the files left behind.
+    reopened = AuxModelCache(tmp_path)
+    assert reopened.path_if_cached(entry) == again
+    assert await reopened.get(entry) == again
+    assert _REQUESTS["shared"] == 1
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_prefetch_job_fetches_loras_and_tis(
+    artifact_server_url: str,
+    tmp_path: Path,
+    simple_image_generation_parameters: ImageGenerationParameters,
+) -> None:
+    ti = TIEntry(name="embedding", remote_version_id=None, source=KNOWN_AUX_MODEL_SOURCE.HORDELING)
+    parameters = simple_image_generation_parameters.model_copy(
+        update={
+            "additional_params": ImageGenerationComponentContainer(
+                components=[_lora(artifact_server_url, "style"), ti],
+            ),
+        },
+    )
+    job = ImageWorkerJob(generation=ImageSingleGeneration(generation_parameters=parameters))
+
+    def _resolve(entry: AuxModelEntry) -> str | None:
+        return f"{artifact_server_url}/{entry.name}" if isinstance(entry, TIEntry) else None
+
+    async with AuxModelCache(tmp_path, url_resolver=_resolve) as cache:
+        tasks = cache.prefetch_job(job)
+        paths = await asyncio.gather(*tasks)
+
+    assert [path.read_bytes() for path in paths] == [_artifact("style"), _artifact("embedding")]
+    assert paths[0].name == AuxModelCacheKey.from_entry(parameters.additional_params.lora_entries[0]).filename
+    assert paths[1].name.startswith("ti-")
+
+
+@pytest.mark.parametrize("policy", [AUX_MODEL_EVICTION_POLICY.LRU, AUX_MODEL_EVICTION_POLICY.LFU])
+@pytest.mark.asyncio
+async def test_eviction_keeps_the_cache_within_budget(
+    artifact_server_url: str,
+    tmp_path: Path,
+    policy: AUX_MODEL_EVICTION_POLICY,
+) -> None:
+    size = len(_artifact("lora-a"))
+    a, b, c = (_lora(artifact_server_url, f"lora-{name}") for name in "abc")
+
+    async with AuxModelCache(tmp_path, max_bytes=2 * size + 10, eviction_policy=policy) as cache:
+        await cache.get(a)
+        await cache.get(a)
+        await cache.get(b)
+        async with cache.use([b]):
+            await cache.get(c)
+
+            # `b` is in use and `c` was just fetched, so `a` must go regardless of the policy.
+            assert cache.path_if_cached(a) is None
+            assert cache.path_if_cached(b) is not None
+            assert cache.path_if_cached(c) is not None
+
+        stats = cache.stats()
+        assert stats.evictions == 1
+        assert stats.cached_bytes <= 2 * size + 10
+        assert len(_file_names(tmp_path)) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_downloads_leave_nothing_behind(artifact_server_url: str, tmp_path: Path) -> None:
+    async with AuxModelCache(tmp_path) as cache:
+        with pytest.raises(Exception, match="404"):
+            await cache.get(_lora(artifact_server_url, "missing"))
+
+        with pytest.raises(AuxModelDownloadError, match="hash"):
+            await cache.get(_lora(artifact_server_url, "tampered", file_hash=hashlib.sha256(b"other").hexdigest()))
+
+        with pytest.raises(AuxModelDownloadError, match="no download URL"):
+            await cache.get(LoRaEntry(name="nowhere", remote_version_id=None, source=KNOWN_AUX_MODEL_SOURCE.CIVITAI))
+
+        verified = _lora(
+            artifact_server_url,
+            "verified",
+            file_hash=hashlib.sha256(_artifact("verified")).hexdigest(),
+        )
+        assert (await cache.get(verified)).read_bytes() == _artifact("verified")
+
+    assert _file_names(tmp_path) == [AuxModelCacheKey.from_entry(verified).filename]
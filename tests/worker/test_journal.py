@@ -0,0 +1,121 @@
+"""Tests for the crash-recovery job journal."""
+
+from pathlib import Path
+
+import pytest
+
+from horde_sdk.safety import ImageSafetyResult
+from horde_sdk.worker.consts import GENERATION_PROGRESS
+from horde_sdk.worker.jobs import ImageWorkerJob
+from horde_sdk.worker.journal import JobJournal
+
+
+def _walk_to_pending_submit(job: ImageWorkerJob, image_bytes: bytes) -> None:
+    generation = job.generation
+    generation.on_preloading()
+    generation.on_preloading_complete()
+    generation.on_generating()
+    generation.on_generation_work_complete(image_bytes)
+    generation.on_safety_checking()
+    generation.on_safety_check_complete(
+        batch_index=0,
+        safety_result=ImageSafetyResult(is_nsfw=False, is_csam=False),
+    )
+
+
+def test_generated_but_unsubmitted_job_is_recoverable(
+    tmp_path: Path,
+    simple_image_worker_job: ImageWorkerJob,
+    default_testing_image_bytes: bytes,
+) -> None:
+    """A job that crashed after persisting its results replays as awaiting submit."""
+    journal_path = tmp_path / "jobs.journal"
+    job = simple_image_worker_job
+    job.set_dispatch_job_id("dispatch-1")
+
+    with JobJournal(journal_path, flush_interval=0.0) as journal:
+        journal.attach_job(job, extra={"source": "test"})
+        _walk_to_pending_submit(job, default_testing_image_bytes)
+        job.generation.on_submitting()
+        job.generation.on_error(failed_message="submit timed out")
+        for result_id in job.generation.result_ids:
+            journal.record_result_reference(job.job_id, result_id, f"/results/{result_id}.webp")
+        assert journal.flush(timeout=5)
+
+    (recovered,) = JobJournal.replay(journal_path)
+    assert recovered.job_id == str(job.job_id)
+    assert recovered.dispatch_job_id == "dispatch-1"
+    assert recovered.extra == {"source": "test"}
+    assert recovered.last_progress == GENERATION_PROGRESS.ERROR
+    assert recovered.last_non_error_progress == GENERATION_PROGRESS.SUBMITTING
+    assert recovered.is_awaiting_submit
+    assert not recovered.is_interrupted
+
+
+def test_in_flight_job_without_results_is_interrupted(
+    tmp_path: Path,
+    simple_image_worker_job: ImageWorkerJob,
+) -> None:
+    """A job that crashed mid-generation replays as interrupted."""
+    journal_path = tmp_path / "jobs.journal"
+    with JobJournal(journal_path) as journal:
+        journal.attach_job(simple_image_worker_job)
+        simple_image_worker_job.generation.on_generating()
+
+    (recovered,) = JobJournal.replay(journal_path)
+    assert recovered.last_progress == GENERATION_PROGRESS.GENERATING
+    assert recovered.is_interrupted
+
+
+def test_finalized_jobs_are_compacted_away(
+    tmp_path: Path,
+    simple_image_worker_job: ImageWorkerJob,
+    default_testing_image_bytes: bytes,
+) -> None:
+    """Submitted and forgotten jobs drop out of replay and out of the file on the next start."""
+    journal_path = tmp_path / "jobs.journal"
+    with JobJournal(journal_path) as journal:
+        journal.attach_job(simple_image_worker_job)
+        _walk_to_pending_submit(simple_image_worker_job, default_testing_image_bytes)
+        simple_image_worker_job.generation.on_submitting()
+        simple_image_worker_job.generation.on_submit_complete()
+        journal.record_job_popped("dropped-job")
+        journal.forget_job("dropped-job")
+        journal.record_job_popped("live-job")
+
+    assert [job.job_id for job in JobJournal.replay(journal_path)] == ["live-job"]
+    assert len(JobJournal.replay(journal_path, include_finalized=True)) == 3
+
+    journal = JobJournal(journal_path)
+    assert journal.compact() == 1
+    assert [job.job_id for job in JobJournal.replay(journal_path, include_finalized=True)] == ["live-job"]
+
+
+def test_torn_final_line_is_skipped(tmp_path: Path) -> None:
+    """A partially written last record does not prevent replay."""
+    journal_path = tmp_path / "jobs.journal"
+    with JobJournal(journal_path) as journal:
+        journal.record_job_popped("job-1", dispatch_job_id="dispatch-1")
+        journal.record_progress("job-1", GENERATION_PROGRESS.GENERATING)
+
+    with open(journal_path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"kind":"progress","job_id":"job-1","at":1.0,"progr')
+
+    (recovered,) = JobJournal.replay(journal_path)
+    assert recovered.last_progress == GENERATION_PROGRESS.GENERATING
+
+
+def test_records_are_refused_when_the_writer_is_not_running(tmp_path: Path) -> None:
+    """Nothing can be recorded (and so nothing can be waited for forever) without a running writer."""
+    journal = JobJournal(tmp_path / "jobs.journal")
+    with pytest.raises(RuntimeError, match="not running"):
+        journal.record_job_popped("job-1")
+    assert journal.flush()
+
+    with journal:
+        journal.record_job_popped("job-1")
+        assert journal.flush(timeout=5)
+
+    with pytest.raises(RuntimeError, match="not running"):
+        journal.record_progress("job-1", GENERATION_PROGRESS.GENERATING)
+    assert journal.flush()
@@ -0,0 +1,75 @@
+"""Tests for the compact, array-backed progress and retry logs."""
+
+import pytest
+
+from horde_sdk.worker.consts import GENERATION_PROGRESS, GENERATION_RETRY_KIND
+from horde_sdk.worker.progress_log import ProgressTransitionLog, RetryEventLog
+
+
+class TestProgressTransitionLog:
+    """The progress log's tuple view and incrementally maintained figures."""
+
+    def test_sequence_view_round_trips(self) -> None:
+        """Entries read back as the (state, time) tuples they were appended as, through growth."""
+        log = ProgressTransitionLog(capacity=2)
+        expected = [
+            (GENERATION_PROGRESS.NOT_STARTED, 1.0),
+            (GENERATION_PROGRESS.GENERATING, 2.0),
+            (GENERATION_PROGRESS.ERROR, 2.5),
+            (GENERATION_PROGRESS.GENERATING, 3.0),
+            (GENERATION_PROGRESS.GENERATION_COMPLETE, 5.0),
+        ]
+        for progress, time_set in expected:
+            log.append(progress, time_set)
+
+        assert len(log) == len(expected)
+        assert log.to_list() == expected
+        assert log[0] == expected[0]
+        assert log[-1] == expected[-1]
+        assert log[1:3] == expected[1:3]
+        assert list(reversed(log)) == list(reversed(expected))
+        with pytest.raises(IndexError):
+            log[len(expected)]
+
+    def test_durations_and_counts_maintained_incrementally(self) -> None:
+        """Stage durations accumulate across revisits and include the ongoing state."""
+        log = ProgressTransitionLog()
+        log.append(GENERATION_PROGRESS.NOT_STARTED, 0.0)
+        log.append(GENERATION_PROGRESS.GENERATING, 1.0)
+        log.append(GENERATION_PROGRESS.ERROR, 3.0)
+        log.append(GENERATION_PROGRESS.GENERATING, 4.0)
+
+        assert log.stage_durations(now=10.0) == {
+            GENERATION_PROGRESS.NOT_STARTED: 1.0,
+            GENERATION_PROGRESS.GENERATING: 8.0,
+            GENERATION_PROGRESS.ERROR: 1.0,
+        }
+        assert log.count(GENERATION_PROGRESS.GENERATING) == 2
+        assert log.count(GENERATION_PROGRESS.SUBMITTING) == 0
+        assert log.counts()[GENERATION_PROGRESS.ERROR] == 1
+
+    def test_last_non_error(self) -> None:
+        """The most recent non-error entry is tracked without scanning."""
+        log = ProgressTransitionLog()
+        assert log.last_non_error() is None
+        log.append(GENERATION_PROGRESS.ERROR, 0.5)
+        assert log.last_non_error() is None
+        log.append(GENERATION_PROGRESS.GENERATING, 1.0)
+        log.append(GENERATION_PROGRESS.ERROR, 2.0)
+        assert log.last_non_error() == (GENERATION_PROGRESS.GENERATING, 1.0)
+        assert log.last() == (GENERATION_PROGRESS.ERROR, 2.0)
+
+
+def test_retry_event_log() -> None:
+    """Retry entries read back as (kind, state, time) tuples with per-kind counts."""
+    log = RetryEventLog(capacity=1)
+    log.append(GENERATION_RETRY_KIND.NORMAL, GENERATION_PROGRESS.GENERATING, 1.0)
+    log.append(GENERATION_RETRY_KIND.DEGRADED, GENERATION_PROGRESS.GENERATING, 2.0)
+    log.append(GENERATION_RETRY_KIND.NORMAL, GENERATION_PROGRESS.SUBMITTING, 3.0)
+
+    assert log.to_list() == [
+        (GENERATION_RETRY_KIND.NORMAL, GENERATION_PROGRESS.GENERATING, 1.0),
+        (GENERATION_RETRY_KIND.DEGRADED, GENERATION_PROGRESS.GENERATING, 2.0),
+        (GENERATION_RETRY_KIND.NORMAL, GENERATION_PROGRESS.SUBMITTING, 3.0),
+    ]
+    assert log.counts() == {GENERATION_RETRY_KIND.NORMAL: 2, GENERATION_RETRY_KIND.DEGRADED: 1}
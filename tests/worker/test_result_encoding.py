@@ -0,0 +1,82 @@
+import io
+
+import PIL.Image
+import pytest
+
+from horde_sdk.worker.job_base import HordeWorkerJobConfig
+from horde_sdk.worker.result_encoding import ResultImageEncoder
+
+
+def _noise_image(seed: int, size: int = 64) -> PIL.Image.Image:
+    return PIL.Image.frombytes("RGB", (size, size), bytes((seed * 31 + i * 7) % 256 for i in range(size * size * 3)))
+
+
+def test_encode_batch_honors_config_and_reports() -> None:
+    config = HordeWorkerJobConfig(result_image_format="WebP", result_image_quality=80, result_image_pil_method=4)
+    images: list[PIL.Image.Image | bytes] = [_noise_image(seed) for seed in range(6)]
+    png_buffer = io.BytesIO()
+    _noise_image(99).save(png_buffer, format="PNG")
+    images.append(png_buffer.getvalue())
+
+    with ResultImageEncoder(config, max_workers=4) as encoder:
+        encoded, report = encoder.encode_batch(images, job_id="job-1")
+
+    assert len(encoded) == len(images)
+    for result in encoded:
+        with PIL.Image.open(io.BytesIO(result.data)) as decoded:
+            assert decoded.format == "WEBP"
+            assert decoded.size == (64, 64)
+        assert result.method == 4
+        assert result.raw_size == 64 * 64 * 3
+
+    assert report.job_id == "job-1"
+    assert report.images == len(images)
+    assert report.encoded_bytes == sum(len(result.data) for result in encoded)
+    assert report.compression_ratio == pytest.approx(report.raw_bytes / report.encoded_bytes)
+    assert report.methods == [4] * len(images)
+
+
+@pytest.mark.asyncio
+async def test_async_encode_batch_matches_sync() -> None:
+    config = HordeWorkerJobConfig(result_image_format="PNG")
+    images: list[PIL.Image.Image | bytes] = [_noise_image(seed) for seed in range(3)]
+
+    with ResultImageEncoder(config, max_workers=2) as encoder:
+        encoded, report = await encoder.async_encode_batch(images)
+        sync_encoded, _ = encoder.encode_batch(images)
+
+    assert [result.data for result in encoded] == [result.data for result in sync_encoded]
+    assert report.methods == [None, None, None]
+
+
+def test_method_adapts_to_latency_budget() -> None:
+    config = HordeWorkerJobConfig(result_image_pil_method=6, result_image_encode_latency_budget=1.0)
+    with ResultImageEncoder(config, max_workers=1) as encoder:
+        encoder._observe_encode_time(6, 2.0)
+        assert encoder.current_method == 5
+        encoder._observe_encode_time(5, 3.0)
+        assert encoder.current_method == 4
+        # A slow encode at an already-abandoned method does not lower the method further.
+        encoder._observe_encode_time(6, 3.0)
+        assert encoder.current_method == 4
+        encoder._observe_encode_time(4, 0.1)
+        encoder._observe_encode_time(5, 0.1)
+        encoder._observe_encode_time(6, 0.1)
+        assert encoder.current_method == 6
+
+
+def test_method_is_fixed_without_a_budget() -> None:
+    with ResultImageEncoder(max_workers=1) as encoder:
+        encoder._observe_encode_time(6, 100.0)
+        assert encoder.current_method == HordeWorkerJobConfig().result_image_pil_method
+
+
+def test_jpeg_encodes_images_with_alpha() -> None:
+    image = PIL.Image.new("RGBA", (8, 8), (255, 0, 0, 128))
+    with ResultImageEncoder(HordeWorkerJobConfig(result_image_format="JPEG"), max_workers=1) as encoder:
+        result = encoder.encode(image)
+
+    assert result.method is None
+    assert result.raw_size == 8 * 8 * 3
+    with PIL.Image.open(io.BytesIO(result.data)) as decoded:
+        assert decoded.format == "JPEG"
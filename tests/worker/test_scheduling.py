@@ -0,0 +1,272 @@
+import threading
+from collections.abc import Callable
+
+import pytest
+
+from horde_sdk.generation_parameters import ImageGenerationParameters
+from horde_sdk.generation_parameters.generic.consts import KNOWN_AUX_MODEL_SOURCE
+from horde_sdk.generation_parameters.image.object_models import ImageGenerationComponentContainer, LoRaEntry
+from horde_sdk.worker.consts import GENERATION_PROGRESS, WORKER_ERRORS
+from horde_sdk.worker.generations import ImageSingleGeneration
+from horde_sdk.worker.jobs import ImageWorkerJob
+from horde_sdk.worker.scheduling import (
+    EXPIRED_JOB_ACTION,
+    JobDeadlineScheduler,
+    ModelAffinityKey,
+    ModelAffinityScheduler,
+    ModelResidency,
+)
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(scope="function")
+def make_job(
+    simple_image_generation_parameters: ImageGenerationParameters,
+) -> Callable[[float | None], ImageWorkerJob]:
+    def _make_job(time_received: float | None) -> ImageWorkerJob:
+        generation = ImageSingleGeneration(generation_parameters=simple_image_generation_parameters)
+        return ImageWorkerJob(generation=generation, time_received=time_received)
+
+    return _make_job
+
+
+@pytest.fixture(scope="function")
+def make_model_job(
+    simple_image_generation_parameters: ImageGenerationParameters,
+) -> Callable[..., ImageWorkerJob]:
+    def _make_model_job(model: str, *loras: str, time_received: float = 1000.0) -> ImageWorkerJob:
+        parameters = simple_image_generation_parameters.model_copy(
+            update={
+                "base_params": simple_image_generation_parameters.base_params.model_copy(update={"model": model}),
+                "additional_params": ImageGenerationComponentContainer(
+                    components=[
+                        LoRaEntry(name=lora, remote_version_id=None, source=KNOWN_AUX_MODEL_SOURCE.CIVITAI)
+                        for lora in loras
+                    ],
+                ),
+            },
+        )
+        generation = ImageSingleGeneration(generation_parameters=parameters)
+        return ImageWorkerJob(generation=generation, time_received=time_received)
+
+    return _make_model_job
+
+
+def test_jobs_are_started_earliest_deadline_first(make_job: Callable[[float | None], ImageWorkerJob]) -> None:
+    clock = _Clock()
+    scheduler = JobDeadlineScheduler(clock=clock)
+
+    fresh = make_job(clock.now)
+    old = make_job(clock.now - 60)
+    no_deadline = make_job(None)
+    short_ttl = make_job(clock.now)
+
+    assert scheduler.add(fresh, ttl=150) == clock.now + 150
+    scheduler.add(no_deadline, ttl=None)
+    scheduler.add(old, ttl=150)
+    scheduler.add(short_ttl, ttl=100)
+
+    assert len(scheduler) == 4
+    assert [scheduler.pop_next() for _ in range(4)] == [old, short_ttl, fresh, no_deadline]
+    assert scheduler.pop_next() is None
+
+    metrics = scheduler.metrics()
+    assert metrics.dispatched_jobs == 4
+    assert metrics.expired_jobs == 0
+    assert metrics.last_dispatched_slack is None
+    assert metrics.mean_dispatched_slack == pytest.approx((90 + 100 + 150) / 3)
+
+
+def test_jobs_which_cannot_finish_in_time_are_faulted(make_job: Callable[[float | None], ImageWorkerJob]) -> None:
+    clock = _Clock()
+    expired_seen: list[ImageWorkerJob] = []
+    scheduler = JobDeadlineScheduler(
+        clock=clock,
+        runtime_estimator=lambda job: 30.0,
+        on_job_expired=expired_seen.append,  # type: ignore[arg-type]
+    )
+
+    hopeless = make_job(clock.now - 130)
+    slow = make_job(clock.now)
+    fine = make_job(clock.now)
+    scheduler.add(hopeless, ttl=150)
+    scheduler.add(slow, ttl=150, estimated_runtime=149)
+    scheduler.add(fine, ttl=150)
+
+    assert scheduler.slack(hopeless) == pytest.approx(-10)
+    assert scheduler.metrics().min_pending_slack == pytest.approx(-10)
+
+    assert scheduler.expire_unfinishable() == [hopeless, slow]
+    assert expired_seen == [hopeless, slow]
+    assert hopeless.is_faulted
+    assert hopeless.faulted_reason == WORKER_ERRORS.SAFEGUARD_TIMEOUT
+    assert hopeless.generation.get_generation_progress() == GENERATION_PROGRESS.ABORTED
+
+    assert scheduler.pop_next() is fine
+    metrics = scheduler.metrics()
+    assert metrics.expired_jobs == 2
+    assert metrics.last_dispatched_slack == pytest.approx(120)
+    assert metrics.pending_jobs == 0
+
+
+def test_jobs_finished_elsewhere_are_not_expired(make_job: Callable[[float | None], ImageWorkerJob]) -> None:
+    clock = _Clock()
+    expired_seen: list[ImageWorkerJob] = []
+    scheduler = JobDeadlineScheduler(clock=clock, on_job_expired=expired_seen.append)  # type: ignore[arg-type]
+
+    faulted = make_job(clock.now - 200)
+    aborted = make_job(clock.now - 200)
+    pending = make_job(clock.now)
+    for job in (faulted, aborted, pending):
+        scheduler.add(job, ttl=150)
+
+    faulted.set_job_faulted(WORKER_ERRORS.UNHANDLED_EXCEPTION)
+    aborted.generation.on_user_requested_abort()
+    aborted.generation.on_user_abort_complete()
+    assert aborted.is_job_finalized
+
+    assert scheduler.expire_unfinishable() == []
+    assert expired_seen == []
+    assert faulted.faulted_reason == WORKER_ERRORS.UNHANDLED_EXCEPTION
+    assert not aborted.is_faulted
+    assert scheduler.metrics().expired_jobs == 0
+    assert len(scheduler) == 1
+    assert scheduler.pop_next() is pending
+
+
+def test_pop_next_expires_passed_over_jobs_and_skips_removed_ones(
+    make_job: Callable[[float | None], ImageWorkerJob],
+) -> None:
+    clock = _Clock()
+    scheduler = JobDeadlineScheduler(clock=clock, expired_job_action=EXPIRED_JOB_ACTION.DROP)
+
+    first = make_job(clock.now)
+    second = make_job(clock.now)
+    removed = make_job(clock.now)
+    scheduler.add(first, ttl=10)
+    scheduler.add(removed, ttl=20)
+    scheduler.add(second, ttl=100)
+    with pytest.raises(ValueError, match="already scheduled"):
+        scheduler.add(first, ttl=10)
+
+    assert scheduler.remove(removed)
+    assert not scheduler.remove(removed)
+
+    clock.now += 9
+    assert scheduler.pop_next() is second
+    assert not first.is_faulted
+    assert scheduler.metrics().expired_jobs == 1
+    assert scheduler.pop_next() is None
+
+
+def test_model_residency_is_least_recently_used() -> None:
+    residency = ModelResidency(model_slots=2, lora_slots=1, model_load_seconds=10, lora_load_seconds=1)
+    first = ModelAffinityKey("first", frozenset({"a"}))
+    second = ModelAffinityKey("second")
+
+    assert residency.swap_cost(first) == 11
+    assert residency.load(first) == (1, 1)
+    assert residency.swap_cost(first) == 0
+    assert residency.load(second) == (1, 0)
+    assert residency.load(first) == (0, 0)
+    assert residency.load(ModelAffinityKey("third", frozenset({"b"}))) == (1, 1)
+    assert residency.resident_models == ["first", "third"]
+    assert residency.swap_cost(first) == 1
+
+
+def test_affinity_groups_jobs_by_model_and_loras(make_model_job: Callable[..., ImageWorkerJob]) -> None:
+    clock = _Clock()
+    scheduler = ModelAffinityScheduler(clock=clock, max_bypasses=10)
+
+    jobs = [
+        make_model_job("A"),
+        make_model_job("B"),
+        make_model_job("A", "detail"),
+        make_model_job("B"),
+        make_model_job("A"),
+    ]
+    for job in jobs:
+        scheduler.add(job, ttl=600)
+    assert ModelAffinityKey.from_job(jobs[2]) == ModelAffinityKey("A", frozenset({"detail"}))
+
+    order = [scheduler.pop_next() for _ in jobs]
+
+    assert order == [jobs[0], jobs[4], jobs[2], jobs[1], jobs[3]]
+    metrics = scheduler.affinity_metrics()
+    assert metrics.model_loads == 2
+    assert metrics.lora_loads == 1
+    assert metrics.load_seconds == 21
+
+
+def test_affinity_respects_deadlines_and_bypass_bounds(make_model_job: Callable[..., ImageWorkerJob]) -> None:
+    clock = _Clock()
+    scheduler = ModelAffinityScheduler(clock=clock, fairness_slack=30, max_bypasses=1)
+
+    warm = make_model_job("A")
+    scheduler.add(warm, ttl=600)
+    assert scheduler.pop_next() is warm
+
+    urgent = make_model_job("B")
+    patient = make_model_job("C")
+    scheduler.add(patient, ttl=600)
+    scheduler.add(urgent, ttl=40)
+    scheduler.add(make_model_job("A"), ttl=600)
+    scheduler.add(make_model_job("A"), ttl=600)
+
+    clock.now += 10
+    assert scheduler.pop_next() is urgent
+    assert scheduler.pop_next() is patient
+    assert scheduler.affinity_metrics().forced_by_deadline == 1
+    assert scheduler.affinity_metrics().forced_by_bypasses == 1
+
+
+def test_affinity_keys_are_registered_with_the_entry(make_model_job: Callable[..., ImageWorkerJob]) -> None:
+    scheduler = ModelAffinityScheduler(clock=_Clock())
+    job = make_model_job("A")
+
+    # The base class's `add` alone must leave the job poppable; nothing may be registered after it returns.
+    JobDeadlineScheduler.add(scheduler, job, ttl=100)
+    assert scheduler.pop_next() is job
+
+
+def test_affinity_scheduler_is_thread_safe(make_model_job: Callable[..., ImageWorkerJob]) -> None:
+    scheduler = ModelAffinityScheduler(clock=_Clock(), max_bypasses=2)
+    jobs = [make_model_job("AB"[index % 2]) for index in range(400)]
+    popped: list[object] = []
+    errors: list[BaseException] = []
+
+    def add_jobs(chunk: list[ImageWorkerJob]) -> None:
+        for job in chunk:
+            scheduler.add(job, ttl=600)
+
+    def pop_jobs() -> None:
+        try:
+            for _ in range(200):
+                popped.append(scheduler.pop_next())
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=add_jobs, args=(jobs[:200],)),
+        threading.Thread(target=add_jobs, args=(jobs[200:],)),
+        threading.Thread(target=pop_jobs),
+        threading.Thread(target=pop_jobs),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    while (job := scheduler.pop_next()) is not None:
+        popped.append(job)
+
+    assert errors == []
+    assert {id(job) for job in popped if job is not None} == {id(job) for job in jobs}
+    assert scheduler._keys == {}
+    assert scheduler._bypasses == {}